@@ -2,10 +2,14 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 import os
 from pathlib import Path
+from urllib.parse import quote_plus
 
 # Get the base directory (project root)
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+# Supabase's transaction pooler (PgBouncer) listens on this port
+TRANSACTION_POOLER_PORT = 6543
+
 
 class Settings(BaseSettings):
 
@@ -17,11 +21,36 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = Field(default="", env="DB_PASSWORD")
     DATABASE_URL: str = Field(default="", env="DATABASE_URL")
 
-    # SQLAlchemy connection pool settings 
+    # SQLAlchemy connection pool settings
     POOL_SIZE: int = 10
     MAX_OVERFLOW: int = 20
     POOL_RECYCLE: int = 300
     POOL_TIMEOUT: int = 30
+    POOL_PRE_PING: bool = True
+    POOL_INSTRUMENTATION: bool = True
+
+    # asyncpg prepared statement cache (per connection). Ignored behind a
+    # transaction pooler, where prepared statements cannot be reused.
+    STATEMENT_CACHE_SIZE: int = 100
+    # Force PgBouncer-compatible statement handling; None = detect from the port
+    DB_USE_TRANSACTION_POOLER: bool | None = None
+
+    # Monthly partitions of glucose_readings / biometric_data: months created
+    # ahead, months kept (0 keeps all history) and the schema expired months
+    # are moved to ("" drops them)
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_MONTHS: int = 0
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+    # Create upcoming partitions when the application starts
+    PARTITION_MAINTENANCE_ON_STARTUP: bool = True
+
+    # Background Fitbit sync into biometric_data (app.services.fitbit_sync):
+    # run it inside the API process, how often, how many users at a time and
+    # how far back a user without a cursor is filled in
+    FITBIT_SYNC_ENABLED: bool = False
+    FITBIT_SYNC_INTERVAL_SECONDS: int = 900
+    FITBIT_SYNC_CONCURRENCY: int = 4
+    FITBIT_SYNC_BACKFILL_DAYS: int = 7
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(BASE_DIR, ".env"),
@@ -29,3 +58,22 @@ class Settings(BaseSettings):
         extra='ignore'
     )
 
+    @property
+    def database_url(self) -> str:
+        """DATABASE_URL, or an asyncpg URL built from the DB_* settings when it is empty."""
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
+        return (
+            f"postgresql+asyncpg://{quote_plus(self.DB_USER)}:{quote_plus(self.DB_PASSWORD)}"
+            f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_DATABASE}"
+        )
+
+    @property
+    def uses_transaction_pooler(self) -> bool:
+        """Whether connections go through a transaction-mode pooler such as PgBouncer."""
+        if self.DB_USE_TRANSACTION_POOLER is not None:
+            return self.DB_USE_TRANSACTION_POOLER
+        if self.DATABASE_URL:
+            from sqlalchemy.engine import make_url
+            return make_url(self.DATABASE_URL).port == TRANSACTION_POOLER_PORT
+        return self.DB_PORT == TRANSACTION_POOLER_PORT
@@ -1,16 +1,46 @@
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.core.dependencies import get_settings # Import the cached settings getter
+from app.core.pool_metrics import InstrumentedQueuePool, register_pool_events
 
 # Get application settings
 settings = get_settings()
 
+
+def _connect_args(settings) -> dict:
+    """asyncpg connection arguments for a direct connection or a transaction pooler."""
+    if settings.uses_transaction_pooler:
+        # PgBouncer in transaction mode hands each transaction to any server
+        # connection, so named prepared statements cannot be cached or reused
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.STATEMENT_CACHE_SIZE,
+    }
+
+
 # Create the asynchronous database engine
 engine = create_async_engine(
-    settings.DATABASE_URL,
+    settings.database_url,
+    pool_size=settings.POOL_SIZE,
+    max_overflow=settings.MAX_OVERFLOW,
+    pool_recycle=settings.POOL_RECYCLE,
+    pool_timeout=settings.POOL_TIMEOUT,
+    pool_pre_ping=settings.POOL_PRE_PING,
+    connect_args=_connect_args(settings),
+    **({"poolclass": InstrumentedQueuePool} if settings.POOL_INSTRUMENTATION else {}),
 )
 
+if settings.POOL_INSTRUMENTATION:
+    register_pool_events(engine)
+
 # Create a configured "SessionLocal" class factory
 AsyncSessionLocal = sessionmaker(
     bind=engine,
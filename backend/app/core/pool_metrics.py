@@ -0,0 +1,137 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+# Upper bounds (milliseconds) of the checkout latency histogram buckets
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """
+    Connection pool counters and a checkout latency histogram.
+
+    Checkout latency is the time spent getting a connection from the pool,
+    including waiting for a free slot and opening a new connection.
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = CHECKOUT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.peak_checked_out = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            # One count per bucket plus a final +Inf bucket
+            self.histogram: List[int] = [0] * (len(self.buckets_ms) + 1)
+
+    def observe_checkout(self, wait_ms: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.histogram[bisect.bisect_left(self.buckets_ms, wait_ms)] += 1
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def observe_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def observe_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def percentile_ms(self, percentile: float) -> float:
+        """Upper bound of the bucket containing the given percentile (0-100)."""
+        with self._lock:
+            total = sum(self.histogram)
+            if not total:
+                return 0.0
+            rank = total * percentile / 100
+            seen = 0
+            for bound, count in zip(self.buckets_ms + (float("inf"),), self.histogram):
+                seen += count
+                if seen >= rank:
+                    return bound if bound != float("inf") else self.max_wait_ms
+        return self.max_wait_ms
+
+    def snapshot(self, pool: Any = None) -> Dict[str, Any]:
+        """
+        Current pool state and checkout statistics.
+
+        Args:
+            pool: The engine's pool, for live size/checked-out/overflow values
+
+        Returns:
+            Dictionary suitable for a JSON response
+        """
+        p50, p95, p99 = (self.percentile_ms(p) for p in (50, 95, 99))
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_ms": {
+                    "mean": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                    "max": round(self.max_wait_ms, 3),
+                    "p50": p50,
+                    "p95": p95,
+                    "p99": p99,
+                },
+                "checkout_histogram_ms": {
+                    **{f"le_{bound}": count for bound, count in zip(self.buckets_ms, self.histogram)},
+                    "le_inf": self.histogram[-1],
+                },
+            }
+        if pool is not None and hasattr(pool, "checkedout"):
+            data["pool"] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        return data
+
+
+# Shared by every engine built with InstrumentedQueuePool
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout latency and timeouts in pool_metrics."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe_timeout()
+            raise
+        pool_metrics.observe_checkout((time.perf_counter() - started) * 1000, self.checkedout())
+        return record
+
+
+def register_pool_events(engine: Any) -> None:
+    """Count new and invalidated connections of an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine.pool, "connect", lambda *args: pool_metrics.observe_connect())
+    event.listen(sync_engine.pool, "invalidate", lambda *args: pool_metrics.observe_invalidation())
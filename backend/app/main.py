@@ -1,3 +1,7 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, HTTPException, status
 from typing_extensions import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -5,13 +9,43 @@ from sqlalchemy import text
 
 from app.core.dependencies import get_settings
 from app.core.config import Settings
-from app.core.db import get_db
+from app.core.db import AsyncSessionLocal, engine, get_db
+from app.core.pool_metrics import pool_metrics
+from app.router.api import api_router
+from app.services.partitions import partition_sizes, run_partition_maintenance
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    if settings.PARTITION_MAINTENANCE_ON_STARTUP:
+        # Best effort: the API should still come up if the database is unreachable
+        try:
+            async with AsyncSessionLocal() as session:
+                await run_partition_maintenance(session)
+        except Exception as e:
+            logger.warning(f"Partition maintenance at startup failed: {e}")
+
+    fitbit_sync = None
+    if settings.FITBIT_SYNC_ENABLED:
+        # Imported here: the Fitbit client lives in the agent package, which
+        # needs the agent's environment (Supabase settings) to import
+        from app.services.fitbit_sync import FitbitSyncWorker
+        fitbit_sync = asyncio.create_task(FitbitSyncWorker(settings=settings).run_forever())
+    yield
+    if fitbit_sync is not None:
+        fitbit_sync.cancel()
 
 
 app = FastAPI(
-    title="DiaBeatThis API"
+    title="DiaBeatThis API",
+    lifespan=lifespan
 )
 
+app.include_router(api_router)
+
 @app.get("/status", tags=["Health Check"])
 async def get_api_status(
     settings: Annotated[Settings, Depends(get_settings)],
@@ -35,4 +69,24 @@ async def get_api_status(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database connection failed: {e} ({settings.DATABASE_URL})",
-        )
\ No newline at end of file
+        )
+
+@app.get("/status/pool", tags=["Health Check"])
+async def get_pool_status(reset: bool = False):
+    """
+    Connection pool state and checkout latency histogram, for sizing
+    POOL_SIZE / MAX_OVERFLOW under load. Pass reset=true to start a new
+    measurement window.
+    """
+    snapshot = pool_metrics.snapshot(engine.sync_engine.pool)
+    if reset:
+        pool_metrics.reset()
+    return snapshot
+
+@app.get("/status/partitions", tags=["Health Check"])
+async def get_partition_status(db: Annotated[AsyncSession, Depends(get_db)]):
+    """
+    Estimated rows and table/index size of each monthly partition of
+    glucose_readings and biometric_data.
+    """
+    return await partition_sizes(db)
@@ -1,26 +1,30 @@
-from backend.app.models.base import Base, TimestampMixin
-from backend.app.models.users import User, UserSetting
-from backend.app.models.health import (
+from .base import Base, TimestampMixin
+from .users import User, UserSetting
+from .health import (
     GlucoseReading, 
     FoodLog, 
     BiometricData, 
+    FitbitIntradayDay,
     MedicationLog, 
     InsulinIntakeLog
 )
-from backend.app.models.lookups import (
+from .lookups import (
     SenderType, 
     MessageType, 
     InsightType, 
     NotificationType, 
-    FoodCategory, 
     MealType, 
-    MedicationType, 
-    ExerciseType, 
+    Medication, 
+    BiometricType, 
     InsulinType
 )
-from backend.app.models.chat import Conversation, Message
-from backend.app.models.ai import AIInsight
-from backend.app.models.notifications import Notification
+from .chat import Conversation, Message
+from .ai import AIInsight
+from .notifications import Notification
+from .rollups import GlucoseRollup, BiometricRollup
+from .partitions import PARTITIONED_TABLES
+from .sync import FitbitSyncCursor
+from .calendar import GoogleCalendarCredential, CalendarSyncCursor, CalendarEvent
 
 # This file ensures all models are imported and registered with SQLAlchemy
 # This allows for string-based relationship references and resolves circular dependencies
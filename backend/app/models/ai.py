@@ -1,4 +1,4 @@
-from sqlalchemy import Column, TIMESTAMP, text, ForeignKey, Integer, String
+from sqlalchemy import Column, TIMESTAMP, text, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -7,10 +7,17 @@ from .base import Base, TimestampMixin
 
 class AIInsight(TimestampMixin, Base):
     __tablename__ = 'ai_insights'
+    # Newest-first per user; insight_type_id is included for index-only listings
+    __table_args__ = (
+        Index(
+            'ix_ai_insights_user_generated', 'user_id', text('generated_timestamp DESC'),
+            postgresql_include=['insight_type_id']
+        ),
+    )
     insight_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()'))
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
     insight_type_id = Column(Integer, ForeignKey('insight_types.insight_type_id'), nullable=False)
-    generated_timestamp = Column(TIMESTAMP(with_timezone=True), server_default=text('CURRENT_TIMESTAMP'), nullable=False, index=True)
+    generated_timestamp = Column(TIMESTAMP(timezone=True), server_default=text('CURRENT_TIMESTAMP'), nullable=False, index=True)
     insight_details = Column(JSONB, nullable=False)
     related_data_points = Column(JSONB)
     model_version = Column(String(50))
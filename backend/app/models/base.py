@@ -5,6 +5,6 @@ Base = declarative_base()
 
 
 class TimestampMixin:
-    created_at = Column(TIMESTAMP(with_timezone=True), server_default=text('CURRENT_TIMESTAMP'), nullable=False)
-    updated_at = Column(TIMESTAMP(with_timezone=True), server_default=text('CURRENT_TIMESTAMP'), nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text('CURRENT_TIMESTAMP'), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=text('CURRENT_TIMESTAMP'), nullable=False)
     
\ No newline at end of file
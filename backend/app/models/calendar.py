@@ -0,0 +1,68 @@
+from sqlalchemy import Boolean, Column, Index, String, Text, TIMESTAMP, ForeignKey, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from .base import Base, TimestampMixin
+
+
+class GoogleCalendarCredential(TimestampMixin, Base):
+    """
+    A user's Google Calendar OAuth grant, read into memory and refreshed
+    ahead of expiry by debie_agent.utils.calendar_auth.
+    """
+    __tablename__ = 'google_calendar_credentials'
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    refresh_token = Column(Text, nullable=False)
+    access_token = Column(Text)
+    token_expiry = Column(TIMESTAMP(timezone=True))
+    # Space-separated OAuth scopes
+    scopes = Column(Text)
+    last_refreshed_at = Column(TIMESTAMP(timezone=True))
+    # Why the last refresh failed (revoked grant); the user must reconnect
+    last_error = Column(Text)
+
+
+class CalendarSyncCursor(TimestampMixin, Base):
+    """
+    Where the incremental sync of a user's calendar left off, maintained by
+    debie_agent.utils.calendar_sync.
+    """
+    __tablename__ = 'calendar_sync_cursors'
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    calendar_id = Column(String(255), primary_key=True)
+    # nextSyncToken of the last completed sync; NULL makes the next sync a full one
+    sync_token = Column(Text)
+    last_synced_at = Column(TIMESTAMP(timezone=True))
+    last_error = Column(Text)
+
+
+class CalendarEvent(TimestampMixin, Base):
+    """
+    A Google Calendar event as last synced: single events, recurring series
+    (expanded locally, see debie_agent/utils/recurrence.py) and the modified
+    or cancelled instances of a series.
+    """
+    __tablename__ = 'calendar_events'
+    __table_args__ = (
+        Index('ix_calendar_events_user_starts_at', 'user_id', 'calendar_id', 'starts_at'),
+        Index('ix_calendar_events_user_category', 'user_id', 'category', 'starts_at'),
+        Index('ix_calendar_events_user_recurring_event', 'user_id', 'calendar_id', 'recurring_event_id'),
+    )
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    calendar_id = Column(String(255), primary_key=True)
+    # Google's event ID
+    event_id = Column(String(1024), primary_key=True)
+    # Series an instance belongs to (set on modified/cancelled instances)
+    recurring_event_id = Column(String(1024))
+    status = Column(String(20), nullable=False)
+    summary = Column(Text)
+    # helpers.categorize_event of the summary: medication, meal, exercise, glucose_check or other
+    category = Column(String(20), nullable=False)
+    all_day = Column(Boolean, server_default=text('false'), nullable=False)
+    # Start of the (first) occurrence
+    starts_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    # End of the (last) occurrence; NULL for a series that never ends
+    ends_at = Column(TIMESTAMP(timezone=True))
+    # Google's last modification time of the event
+    event_updated_at = Column(TIMESTAMP(timezone=True))
+    # The event resource as returned by the Calendar API
+    event = Column(JSONB, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, TIMESTAMP, text, DECIMAL, ForeignKey, Integer, Text
+from sqlalchemy import Column, Date, String, TIMESTAMP, text, DECIMAL, ForeignKey, Index, Integer, LargeBinary, SmallInteger, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -7,9 +7,18 @@ from .base import Base, TimestampMixin
 
 class GlucoseReading(TimestampMixin, Base):
     __tablename__ = 'glucose_readings'
+    __table_args__ = (
+        # One reading per user and timestamp; bulk ingestion relies on it for ON CONFLICT,
+        # and its index serves the (user_id, reading_timestamp) range reads
+        UniqueConstraint('user_id', 'reading_timestamp', name='uq_glucose_readings_user_timestamp'),
+        Index('ix_glucose_readings_reading_timestamp_brin', 'reading_timestamp', postgresql_using='brin'),
+        # Monthly partitions, see app/models/partitions.py
+        {'postgresql_partition_by': 'RANGE (reading_timestamp)'},
+    )
     glucose_reading_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()'))
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
-    reading_timestamp = Column(TIMESTAMP(with_timezone=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    # Part of the primary key because unique constraints must include the partition key
+    reading_timestamp = Column(TIMESTAMP(timezone=True), primary_key=True)
     glucose_value = Column(DECIMAL(6, 2), nullable=False)
     reading_source = Column(String(50))
     user = relationship("User", back_populates="glucose_readings")
@@ -17,9 +26,10 @@ class GlucoseReading(TimestampMixin, Base):
 
 class FoodLog(TimestampMixin, Base):
     __tablename__ = 'food_logs'
+    __table_args__ = (Index('ix_food_logs_user_timestamp', 'user_id', 'log_timestamp'),)
     food_log_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()'))
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
-    log_timestamp = Column(TIMESTAMP(with_timezone=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    log_timestamp = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
     meal_type_id = Column(Integer, ForeignKey('meal_types.meal_type_id'))
     food_description = Column(Text, nullable=False)
     quantity = Column(DECIMAL(10, 2))
@@ -32,9 +42,14 @@ class FoodLog(TimestampMixin, Base):
 
 class BiometricData(TimestampMixin, Base):
     __tablename__ = 'biometric_data'
+    __table_args__ = (
+        Index('ix_biometric_data_user_type_timestamp', 'user_id', 'biometric_type_id', 'reading_timestamp'),
+        Index('ix_biometric_data_reading_timestamp_brin', 'reading_timestamp', postgresql_using='brin'),
+        {'postgresql_partition_by': 'RANGE (reading_timestamp)'},
+    )
     biometric_data_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()'))
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
-    reading_timestamp = Column(TIMESTAMP(with_timezone=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    reading_timestamp = Column(TIMESTAMP(timezone=True), primary_key=True)
     biometric_type_id = Column(Integer, ForeignKey('biometric_types.biometric_type_id'), nullable=False)
     value = Column(DECIMAL(10, 2), nullable=False)
     systolic_bp = Column(DECIMAL(5, 2))
@@ -44,11 +59,29 @@ class BiometricData(TimestampMixin, Base):
     biometric_type = relationship("BiometricType", back_populates="biometric_data")
 
 
+class FitbitIntradayDay(TimestampMixin, Base):
+    """
+    One local day of a 1-minute Fitbit metric, packed as 1440 int16 samples
+    (see debie_agent/utils/intraday.py for the format).
+    """
+    __tablename__ = 'fitbit_intraday'
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    # "heart_rate" or "steps"
+    metric = Column(String(20), primary_key=True)
+    # The user's local date; samples start at its midnight
+    day = Column(Date, primary_key=True)
+    utc_offset_minutes = Column(SmallInteger, nullable=False, server_default=text('0'))
+    samples = Column(LargeBinary, nullable=False)
+    sample_count = Column(SmallInteger, nullable=False)
+    user = relationship("User", back_populates="fitbit_intraday")
+
+
 class MedicationLog(TimestampMixin, Base):
     __tablename__ = 'medications_log'
+    __table_args__ = (Index('ix_medications_log_user_timestamp', 'user_id', 'log_timestamp'),)
     medication_log_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()'))
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
-    log_timestamp = Column(TIMESTAMP(with_timezone=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    log_timestamp = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
     medication_id = Column(UUID(as_uuid=True), ForeignKey('medications.medication_id'), nullable=False, index=True)
     dosage = Column(String(100))
     notes = Column(Text)
@@ -58,9 +91,10 @@ class MedicationLog(TimestampMixin, Base):
 
 class InsulinIntakeLog(TimestampMixin, Base):
     __tablename__ = 'insulin_intake_log'
+    __table_args__ = (Index('ix_insulin_intake_log_user_timestamp', 'user_id', 'log_timestamp'),)
     insulin_log_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()'))
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
-    log_timestamp = Column(TIMESTAMP(with_timezone=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    log_timestamp = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
     insulin_type_id = Column(UUID(as_uuid=True), ForeignKey('insulin_types.insulin_type_id'), nullable=False, index=True)
     dosage_units = Column(DECIMAL(10, 2), nullable=False)
     notes = Column(Text)
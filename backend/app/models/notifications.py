@@ -12,8 +12,8 @@ class Notification(TimestampMixin, Base):
     notification_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text('gen_random_uuid()'))
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
     notification_type_id = Column(Integer, ForeignKey('notification_types.notification_type_id'), nullable=False)
-    scheduled_send_time = Column(TIMESTAMP(with_timezone=True))
-    sent_at = Column(TIMESTAMP(with_timezone=True))
+    scheduled_send_time = Column(TIMESTAMP(timezone=True))
+    sent_at = Column(TIMESTAMP(timezone=True))
     is_sent = Column(Boolean, default=False, nullable=False)
     is_read = Column(Boolean, default=False, nullable=False)
     title = Column(String(255))
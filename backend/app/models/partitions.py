@@ -0,0 +1,115 @@
+from sqlalchemy import DDL, event
+
+from .health import BiometricData, GlucoseReading
+
+# Tables range-partitioned by month on their timestamp column
+PARTITIONED_TABLES = {
+    "glucose_readings": "reading_timestamp",
+    "biometric_data": "reading_timestamp",
+}
+
+# Monthly partitions kept ready ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+
+# ---------------------------------------------------------------------------
+# Partition maintenance
+#
+# Partitions are named {parent}_pYYYYMM and cover one UTC month. A
+# {parent}_default partition catches rows outside the created months (e.g. a
+# backfill of old history); creating the month they belong to moves them out
+# of it. Rows are moved between partitions directly, so the rollup triggers on
+# the parent don't fire and the rollups are unaffected.
+# ---------------------------------------------------------------------------
+
+# (DDL text is %-formatted by SQLAlchemy, hence the doubled %% of format())
+PARTITION_FUNCTIONS_DDL = [
+    DDL("""
+CREATE OR REPLACE FUNCTION create_monthly_partitions(
+    parent text, timestamp_column text, from_month timestamptz, months_ahead integer
+) RETURNS SETOF text LANGUAGE plpgsql AS $$
+DECLARE
+    month_start timestamptz;
+    month_end timestamptz;
+    last_month timestamptz := date_trunc('month', now(), 'UTC') + make_interval(months => months_ahead);
+    partition_name text;
+    has_default boolean;
+BEGIN
+    -- Serialize concurrent maintenance runs of the same table
+    PERFORM pg_advisory_xact_lock(hashtext('create_monthly_partitions:' || parent));
+    has_default := to_regclass(format('%%I', parent || '_default')) IS NOT NULL;
+    month_start := date_trunc('month', from_month, 'UTC');
+    WHILE month_start <= last_month LOOP
+        month_end := month_start + interval '1 month';
+        partition_name := parent || '_p' || to_char(month_start AT TIME ZONE 'UTC', 'YYYYMM');
+        IF to_regclass(format('%%I', partition_name)) IS NULL THEN
+            IF has_default THEN
+                -- A new partition cannot overlap rows held by the default one: move them first
+                EXECUTE format('CREATE TABLE %%I (LIKE %%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, parent);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %%I WHERE %%I >= $1 AND %%I < $2 RETURNING *) INSERT INTO %%I SELECT * FROM moved',
+                    parent || '_default', timestamp_column, timestamp_column, partition_name
+                ) USING month_start, month_end;
+                EXECUTE format(
+                    'ALTER TABLE %%I ATTACH PARTITION %%I FOR VALUES FROM (%%L) TO (%%L)',
+                    parent, partition_name, month_start, month_end
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %%I PARTITION OF %%I FOR VALUES FROM (%%L) TO (%%L)',
+                    partition_name, parent, month_start, month_end
+                );
+            END IF;
+            RETURN NEXT partition_name;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+END $$;
+"""),
+    DDL("""
+CREATE OR REPLACE FUNCTION detach_expired_partitions(
+    parent text, keep_months integer, archive_schema text
+) RETURNS SETOF text LANGUAGE plpgsql AS $$
+DECLARE
+    cutoff text := to_char(date_trunc('month', now(), 'UTC') - make_interval(months => keep_months), 'YYYYMM');
+    partition_name text;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_monthly_partitions:' || parent));
+    FOR partition_name IN
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(format('%%I', parent))
+            AND c.relname ~ ('^' || parent || '_p[0-9]{6}$')
+            AND right(c.relname, 6) < cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE %%I DETACH PARTITION %%I', parent, partition_name);
+        IF archive_schema IS NULL OR archive_schema = '' THEN
+            EXECUTE format('DROP TABLE %%I', partition_name);
+        ELSE
+            EXECUTE format('CREATE SCHEMA IF NOT EXISTS %%I', archive_schema);
+            EXECUTE format('ALTER TABLE %%I SET SCHEMA %%I', partition_name, archive_schema);
+        END IF;
+        RETURN NEXT partition_name;
+    END LOOP;
+END $$;
+"""),
+]
+
+
+def partition_setup_ddl(parent: str, timestamp_column: str) -> list:
+    """DDL creating the default partition and the months up to PARTITION_MONTHS_AHEAD."""
+    return [
+        DDL(f"CREATE TABLE IF NOT EXISTS {parent}_default PARTITION OF {parent} DEFAULT"),
+        DDL(
+            f"SELECT create_monthly_partitions('{parent}', '{timestamp_column}', "
+            f"now(), {PARTITION_MONTHS_AHEAD})"
+        ),
+    ]
+
+
+# Installed when the tables are created from the metadata (migration 0003 does
+# the same for existing databases)
+for _table in (GlucoseReading.__table__, BiometricData.__table__):
+    for _ddl in PARTITION_FUNCTIONS_DDL + partition_setup_ddl(_table.name, PARTITIONED_TABLES[_table.name]):
+        event.listen(_table, "after_create", _ddl.execute_if(dialect="postgresql"))
@@ -0,0 +1,184 @@
+from sqlalchemy import Column, DDL, TIMESTAMP, DECIMAL, Float, ForeignKey, Integer, String, event
+from sqlalchemy.dialects.postgresql import UUID
+
+from .base import Base, TimestampMixin
+from .health import BiometricData, GlucoseReading
+
+# Bucket sizes kept for every reading (date_trunc units, UTC)
+ROLLUP_GRANULARITIES = ("hour", "day")
+
+
+class GlucoseRollup(TimestampMixin, Base):
+    """Per-user hourly and daily glucose aggregates, maintained by triggers on glucose_readings."""
+    __tablename__ = 'glucose_rollups'
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    granularity = Column(String(10), primary_key=True)
+    bucket_start = Column(TIMESTAMP(timezone=True), primary_key=True)
+    reading_count = Column(Integer, nullable=False)
+    value_sum = Column(Float, nullable=False)
+    value_sum_squares = Column(Float, nullable=False)
+    min_value = Column(DECIMAL(6, 2), nullable=False)
+    max_value = Column(DECIMAL(6, 2), nullable=False)
+    # Consensus ranges: <54, 54-69, 70-180, 181-250, >250 mg/dL
+    very_low_count = Column(Integer, nullable=False, default=0)
+    low_count = Column(Integer, nullable=False, default=0)
+    in_range_count = Column(Integer, nullable=False, default=0)
+    high_count = Column(Integer, nullable=False, default=0)
+    very_high_count = Column(Integer, nullable=False, default=0)
+
+
+class BiometricRollup(TimestampMixin, Base):
+    """Per-user hourly and daily aggregates of each biometric type, maintained by triggers on biometric_data."""
+    __tablename__ = 'biometric_rollups'
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    biometric_type_id = Column(Integer, ForeignKey('biometric_types.biometric_type_id'), primary_key=True)
+    granularity = Column(String(10), primary_key=True)
+    bucket_start = Column(TIMESTAMP(timezone=True), primary_key=True)
+    reading_count = Column(Integer, nullable=False)
+    value_sum = Column(Float, nullable=False)
+    value_sum_squares = Column(Float, nullable=False)
+    min_value = Column(DECIMAL(10, 2), nullable=False)
+    max_value = Column(DECIMAL(10, 2), nullable=False)
+
+
+# ---------------------------------------------------------------------------
+# Rollup maintenance
+#
+# Inserts are folded into the rollups incrementally by statement-level
+# triggers over the inserted rows (one upsert per statement, however many
+# rows it wrote). Deletes and updates recompute only the buckets they touch,
+# since min/max cannot be decremented.
+# ---------------------------------------------------------------------------
+
+_GRANULARITIES_SQL = "(VALUES " + ", ".join(f"('{g}')" for g in ROLLUP_GRANULARITIES) + ") AS g(granularity)"
+
+_GLUCOSE_AGGREGATES = """
+    count(*), sum(s.glucose_value), sum(s.glucose_value * s.glucose_value),
+    min(s.glucose_value), max(s.glucose_value),
+    count(*) FILTER (WHERE s.glucose_value < 54),
+    count(*) FILTER (WHERE s.glucose_value >= 54 AND s.glucose_value < 70),
+    count(*) FILTER (WHERE s.glucose_value >= 70 AND s.glucose_value <= 180),
+    count(*) FILTER (WHERE s.glucose_value > 180 AND s.glucose_value <= 250),
+    count(*) FILTER (WHERE s.glucose_value > 250)"""
+
+_GLUCOSE_COLUMNS = """
+    user_id, granularity, bucket_start, reading_count, value_sum, value_sum_squares,
+    min_value, max_value, very_low_count, low_count, in_range_count, high_count, very_high_count"""
+
+_BIOMETRIC_AGGREGATES = """
+    count(*), sum(s.value), sum(s.value * s.value), min(s.value), max(s.value)"""
+
+_BIOMETRIC_COLUMNS = """
+    user_id, biometric_type_id, granularity, bucket_start, reading_count, value_sum,
+    value_sum_squares, min_value, max_value"""
+
+
+def _rollup_trigger_ddl(
+    source: str,
+    timestamp_column: str,
+    rollup: str,
+    key_columns: str,
+    columns: str,
+    aggregates: str,
+    additive: list
+) -> list:
+    """DDL for the insert (incremental) and delete/update (recompute) triggers of one rollup table."""
+    bucket = f"date_trunc(g.granularity, s.{timestamp_column}, 'UTC')"
+    keys = ", ".join(f"s.{column}" for column in key_columns.split(", "))
+    conflict = f"{key_columns}, granularity, bucket_start"
+    merge = ",\n            ".join(
+        [f"{column} = r.{column} + EXCLUDED.{column}" for column in additive]
+        + ["min_value = LEAST(r.min_value, EXCLUDED.min_value)",
+           "max_value = GREATEST(r.max_value, EXCLUDED.max_value)",
+           "updated_at = CURRENT_TIMESTAMP"]
+    )
+    overwrite = ",\n            ".join(
+        [f"{column} = EXCLUDED.{column}" for column in additive + ["min_value", "max_value"]]
+        + ["updated_at = CURRENT_TIMESTAMP"]
+    )
+    a_keys = ", ".join(f"a.{column}" for column in key_columns.split(", "))
+    key_match = " AND ".join(f"r.{column} = a.{column}" for column in key_columns.split(", "))
+    source_match = " AND ".join(f"s.{column} = a.{column}" for column in key_columns.split(", "))
+    in_bucket = (
+        f"s.{timestamp_column} >= a.bucket_start "
+        f"AND s.{timestamp_column} < a.bucket_start + ('1 ' || a.granularity)::interval"
+    )
+
+    def affected(transition_tables):
+        return " UNION ".join(
+            f"SELECT {keys}, g.granularity, {bucket} AS bucket_start FROM {table} s CROSS JOIN {_GRANULARITIES_SQL}"
+            for table in transition_tables
+        )
+
+    def recompute(name, transition_tables):
+        return DDL(f"""
+CREATE OR REPLACE FUNCTION {rollup}_{name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {rollup} AS r ({columns})
+    SELECT {a_keys}, a.granularity, a.bucket_start, {aggregates}
+    FROM ({affected(transition_tables)}) a
+    JOIN {source} s ON {source_match} AND {in_bucket}
+    GROUP BY {a_keys}, a.granularity, a.bucket_start
+    ON CONFLICT ({conflict}) DO UPDATE SET
+            {overwrite};
+
+    DELETE FROM {rollup} r
+    USING ({affected(transition_tables)}) a
+    WHERE {key_match} AND r.granularity = a.granularity AND r.bucket_start = a.bucket_start
+        AND NOT EXISTS (SELECT 1 FROM {source} s WHERE {source_match} AND {in_bucket});
+    RETURN NULL;
+END $$;
+""")
+
+    return [
+        DDL(f"""
+CREATE OR REPLACE FUNCTION {rollup}_apply_inserts() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO {rollup} AS r ({columns})
+    SELECT {keys}, g.granularity, {bucket}, {aggregates}
+    FROM new_rows s CROSS JOIN {_GRANULARITIES_SQL}
+    GROUP BY {keys}, g.granularity, {bucket}
+    ON CONFLICT ({conflict}) DO UPDATE SET
+            {merge};
+    RETURN NULL;
+END $$;
+"""),
+        recompute("recompute_updated", ["old_rows", "new_rows"]),
+        recompute("recompute_deleted", ["old_rows"]),
+        DDL(f"""
+CREATE TRIGGER {source}_rollup_insert AFTER INSERT ON {source}
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION {rollup}_apply_inserts();
+"""),
+        DDL(f"""
+CREATE TRIGGER {source}_rollup_update AFTER UPDATE ON {source}
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION {rollup}_recompute_updated();
+"""),
+        DDL(f"""
+CREATE TRIGGER {source}_rollup_delete AFTER DELETE ON {source}
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION {rollup}_recompute_deleted();
+"""),
+    ]
+
+
+GLUCOSE_ROLLUP_DDL = _rollup_trigger_ddl(
+    "glucose_readings", "reading_timestamp", "glucose_rollups", "user_id",
+    _GLUCOSE_COLUMNS, _GLUCOSE_AGGREGATES,
+    ["reading_count", "value_sum", "value_sum_squares",
+     "very_low_count", "low_count", "in_range_count", "high_count", "very_high_count"]
+)
+
+BIOMETRIC_ROLLUP_DDL = _rollup_trigger_ddl(
+    "biometric_data", "reading_timestamp", "biometric_rollups", "user_id, biometric_type_id",
+    _BIOMETRIC_COLUMNS, _BIOMETRIC_AGGREGATES,
+    ["reading_count", "value_sum", "value_sum_squares"]
+)
+
+# Installed when the tables are created from the metadata; the plpgsql bodies
+# are only resolved when the triggers first fire
+for _ddl in GLUCOSE_ROLLUP_DDL:
+    event.listen(GlucoseReading.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
+for _ddl in BIOMETRIC_ROLLUP_DDL:
+    event.listen(BiometricData.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from .base import Base, TimestampMixin
+
+
+class FitbitSyncCursor(TimestampMixin, Base):
+    """
+    How far each Fitbit resource of a user has been copied into biometric_data,
+    maintained by app.services.fitbit_sync.
+    """
+    __tablename__ = 'fitbit_sync_cursors'
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    # "heart_rate", "steps" or "sleep"
+    resource = Column(String(30), primary_key=True)
+    # Data up to this instant is stored; the next sync only asks for what follows
+    synced_through = Column(TIMESTAMP(timezone=True))
+    last_synced_at = Column(TIMESTAMP(timezone=True))
+    # Set after a failed sync (expired token, exhausted quota); the user is skipped until then
+    retry_after = Column(TIMESTAMP(timezone=True))
+    last_error = Column(Text)
+
+
+# biometric_types rows written by the Fitbit sync (seeded by migration 0004)
+FITBIT_BIOMETRIC_TYPES = ("Steps", "Resting Heart Rate", "Sleep Minutes", "Sleep Efficiency")
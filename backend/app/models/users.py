@@ -7,10 +7,10 @@ from .base import Base, TimestampMixin
 
 class User(TimestampMixin, Base):
     __tablename__ = 'users'
-    user_id = Column(UUID(as_uuid=True), primary_key=True, ondelete='CASCADE') #ForeignKey('auth.users.id', ))
+    user_id = Column(UUID(as_uuid=True), primary_key=True) #ForeignKey('auth.users.id', ondelete='CASCADE'))
     username = Column(String(100), unique=True)
     email = Column(String(255), unique=True)
-    last_login_at = Column(TIMESTAMP(with_timezone=True))
+    last_login_at = Column(TIMESTAMP(timezone=True))
     date_of_birth = Column(Date)
     gender = Column(String(20))
     weight = Column(DECIMAL(5, 2))
@@ -25,6 +25,7 @@ class User(TimestampMixin, Base):
     glucose_readings = relationship("GlucoseReading", back_populates="user")
     food_logs = relationship("FoodLog", back_populates="user")
     biometric_data = relationship("BiometricData", back_populates="user")
+    fitbit_intraday = relationship("FitbitIntradayDay", back_populates="user")
     medications_log = relationship("MedicationLog", back_populates="user")
     insulin_intake_logs = relationship("InsulinIntakeLog", back_populates="user")
     conversations = relationship("Conversation", back_populates="user")
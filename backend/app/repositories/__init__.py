@@ -0,0 +1,5 @@
+from .base import TimeSeriesRepository, session_scope
+from .glucose import GlucoseRepository
+from .food_logs import FoodLogRepository
+from .biometrics import BiometricRepository
+from .medications import MedicationLogRepository, InsulinLogRepository
@@ -0,0 +1,176 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Generic, Iterable, List, Optional, Sequence, Type, TypeVar
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.base import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+# date_trunc units accepted for bucketed aggregates
+BUCKET_UNITS = ("minute", "hour", "day", "week", "month")
+
+# How far back latest()/latest_per_user() look. A lower bound on the timestamp
+# lets Postgres prune the monthly partitions instead of probing every one.
+LATEST_LOOKBACK = timedelta(days=90)
+
+
+def to_floats(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert Decimal aggregates to floats so results serialize as JSON numbers."""
+    return {
+        key: float(value) if value is not None and not isinstance(value, (int, datetime, UUID)) else value
+        for key, value in values.items()
+    }
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Open a pooled session outside of a request (agents, workers, scripts).
+
+    Commits on success and rolls back on error. Inside FastAPI routes use the
+    get_db dependency instead.
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+class TimeSeriesRepository(Generic[ModelT]):
+    """
+    Base repository for per-user, timestamped tables.
+
+    Subclasses set the model and the name of its timestamp column. Every query
+    filters on (user_id, timestamp), matching the tables' indexes, and bounds
+    the timestamp so partitioned tables only scan the months in the window.
+    """
+
+    model: Type[ModelT]
+    timestamp_column: str = "reading_timestamp"
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def timestamp(self):
+        return getattr(self.model, self.timestamp_column)
+
+    def _window_filter(self, user_id: UUID, start: datetime, end: Optional[datetime] = None) -> List[Any]:
+        conditions = [self.model.user_id == user_id, self.timestamp >= start]
+        if end is not None:
+            conditions.append(self.timestamp < end)
+        return conditions
+
+    def _since(self, lookback: Optional[timedelta]) -> List[Any]:
+        if lookback is None:
+            return []
+        return [self.timestamp >= datetime.now(timezone.utc) - lookback]
+
+    async def get(self, row_id: UUID, timestamp: Optional[datetime] = None) -> Optional[ModelT]:
+        """
+        Fetch one row by id.
+
+        The partitioned tables key rows by (id, timestamp); passing the
+        timestamp confines the lookup to one partition.
+        """
+        id_column = self.model.__mapper__.primary_key[0]
+        stmt = select(self.model).where(id_column == row_id)
+        if timestamp is not None:
+            stmt = stmt.where(self.timestamp == timestamp)
+        return (await self.session.scalars(stmt)).first()
+
+    async def window(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False
+    ) -> Sequence[ModelT]:
+        """Rows of one user within [start, end), in time order."""
+        stmt = select(self.model) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .order_by(self.timestamp.desc() if newest_first else self.timestamp.asc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return (await self.session.scalars(stmt)).all()
+
+    async def latest(
+        self,
+        user_id: UUID,
+        limit: int = 1,
+        lookback: Optional[timedelta] = LATEST_LOOKBACK
+    ) -> Sequence[ModelT]:
+        """Most recent rows of one user within lookback (None: all history), newest first."""
+        stmt = select(self.model) \
+            .where(self.model.user_id == user_id, *self._since(lookback)) \
+            .order_by(self.timestamp.desc()) \
+            .limit(limit)
+        return (await self.session.scalars(stmt)).all()
+
+    async def bulk_fetch(
+        self,
+        user_ids: Iterable[UUID],
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Dict[UUID, List[ModelT]]:
+        """
+        Rows of several users within [start, end) in a single query.
+
+        Returns:
+            Dictionary mapping every requested user to their rows in time order
+        """
+        user_ids = list(user_ids)
+        grouped: Dict[UUID, List[ModelT]] = {user_id: [] for user_id in user_ids}
+        if not user_ids:
+            return grouped
+
+        conditions = [self.model.user_id.in_(user_ids), self.timestamp >= start]
+        if end is not None:
+            conditions.append(self.timestamp < end)
+        stmt = select(self.model) \
+            .where(*conditions) \
+            .order_by(self.model.user_id, self.timestamp.asc())
+        for row in (await self.session.scalars(stmt)).all():
+            grouped[row.user_id].append(row)
+        return grouped
+
+    async def latest_per_user(
+        self,
+        user_ids: Iterable[UUID],
+        lookback: Optional[timedelta] = LATEST_LOOKBACK
+    ) -> Dict[UUID, ModelT]:
+        """Most recent row of each user within lookback, in one DISTINCT ON query."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        stmt = select(self.model) \
+            .where(self.model.user_id.in_(user_ids), *self._since(lookback)) \
+            .order_by(self.model.user_id, self.timestamp.desc()) \
+            .distinct(self.model.user_id)
+        return {row.user_id: row for row in (await self.session.scalars(stmt)).all()}
+
+    async def count(self, user_id: UUID, start: datetime, end: Optional[datetime] = None) -> int:
+        """Number of rows of one user within [start, end)."""
+        stmt = select(func.count()).select_from(self.model).where(*self._window_filter(user_id, start, end))
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def add_all(self, rows: Iterable[ModelT]) -> None:
+        """Stage new rows and flush them so their server defaults are loaded."""
+        self.session.add_all(list(rows))
+        await self.session.flush()
+
+    def _bucket(self, bucket: str):
+        """date_trunc expression over the timestamp column ("hour", "day", "week", ...)."""
+        if bucket not in BUCKET_UNITS:
+            raise ValueError(f"Unsupported bucket '{bucket}', expected one of {', '.join(BUCKET_UNITS)}")
+        # Inlined rather than bound so SELECT and GROUP BY render the same expression
+        return func.date_trunc(literal_column(f"'{bucket}'"), self.timestamp).label("bucket")
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from app.models.health import BiometricData
+from app.models.lookups import BiometricType
+from app.repositories.base import TimeSeriesRepository, to_floats
+
+
+class BiometricRepository(TimeSeriesRepository[BiometricData]):
+    model = BiometricData
+    timestamp_column = "reading_timestamp"
+
+    async def window_by_types(
+        self,
+        user_id: UUID,
+        type_names: List[str],
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Dict[str, List[BiometricData]]:
+        """
+        Readings of several biometric types in one joined query.
+
+        Returns:
+            Dictionary mapping each requested type name to its readings in time order
+        """
+        grouped: Dict[str, List[BiometricData]] = {name: [] for name in type_names}
+        if not type_names:
+            return grouped
+        stmt = select(BiometricType.type_name, BiometricData) \
+            .join(BiometricType, BiometricData.biometric_type_id == BiometricType.biometric_type_id) \
+            .where(BiometricType.type_name.in_(type_names), *self._window_filter(user_id, start, end)) \
+            .order_by(BiometricData.reading_timestamp)
+        for type_name, reading in (await self.session.execute(stmt)).all():
+            grouped[type_name].append(reading)
+        return grouped
+
+    async def aggregate_by_type(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None,
+        bucket: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Count, mean, min, max and sum per biometric type, optionally per time bucket.
+
+        Args:
+            bucket: Optional date_trunc unit ("hour", "day", ...) to also group by
+        """
+        group_columns = [BiometricType.type_name.label("type_name")]
+        if bucket:
+            group_columns.append(self._bucket(bucket))
+        stmt = select(
+            *group_columns,
+            func.count().label("count"),
+            func.avg(BiometricData.value).label("mean"),
+            func.min(BiometricData.value).label("minimum"),
+            func.max(BiometricData.value).label("maximum"),
+            func.sum(BiometricData.value).label("total"),
+        ).join(BiometricType, BiometricData.biometric_type_id == BiometricType.biometric_type_id) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .group_by(*group_columns) \
+            .order_by(*group_columns)
+        return [to_floats(row._asdict()) for row in (await self.session.execute(stmt)).all()]
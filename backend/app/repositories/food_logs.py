@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app.models.health import FoodLog
+from app.models.lookups import MealType
+from app.repositories.base import TimeSeriesRepository, to_floats
+
+
+class FoodLogRepository(TimeSeriesRepository[FoodLog]):
+    model = FoodLog
+    timestamp_column = "log_timestamp"
+
+    async def window_with_meal_types(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Sequence[FoodLog]:
+        """Food logs within [start, end) with their meal type loaded in the same query."""
+        stmt = select(FoodLog) \
+            .options(joinedload(FoodLog.meal_type)) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .order_by(FoodLog.log_timestamp)
+        return (await self.session.scalars(stmt)).all()
+
+    async def totals(self, user_id: UUID, start: datetime, end: Optional[datetime] = None) -> Dict[str, Any]:
+        """Number of logs and total carbs/calories within [start, end)."""
+        stmt = select(
+            func.count().label("count"),
+            func.coalesce(func.sum(FoodLog.estimated_carbs), 0).label("total_carbs"),
+            func.coalesce(func.sum(FoodLog.estimated_calories), 0).label("total_calories"),
+        ).where(*self._window_filter(user_id, start, end))
+        return to_floats((await self.session.execute(stmt)).one()._asdict())
+
+    async def daily_totals(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Carbs and calories per day."""
+        day = self._bucket("day")
+        stmt = select(
+            day,
+            func.count().label("count"),
+            func.coalesce(func.sum(FoodLog.estimated_carbs), 0).label("total_carbs"),
+            func.coalesce(func.sum(FoodLog.estimated_calories), 0).label("total_calories"),
+        ).where(*self._window_filter(user_id, start, end)).group_by(day).order_by(day)
+        return [to_floats(row._asdict()) for row in (await self.session.execute(stmt)).all()]
+
+    async def totals_by_meal_type(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Number of logs and average carbs per meal type."""
+        stmt = select(
+            MealType.type_name.label("meal_type"),
+            func.count().label("count"),
+            func.avg(FoodLog.estimated_carbs).label("average_carbs"),
+        ).select_from(FoodLog) \
+            .outerjoin(MealType, FoodLog.meal_type_id == MealType.meal_type_id) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .group_by(MealType.type_name) \
+            .order_by(func.count().desc())
+        return [to_floats(row._asdict()) for row in (await self.session.execute(stmt)).all()]
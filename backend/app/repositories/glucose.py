@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from app.models.health import GlucoseReading
+from app.repositories.base import TimeSeriesRepository, to_floats
+
+# Consensus CGM thresholds (mg/dL), as in debie_agent.utils.glucose_metrics
+VERY_LOW_THRESHOLD = 54
+LOW_THRESHOLD = 70
+HIGH_THRESHOLD = 180
+VERY_HIGH_THRESHOLD = 250
+
+
+class GlucoseRepository(TimeSeriesRepository[GlucoseReading]):
+    model = GlucoseReading
+    timestamp_column = "reading_timestamp"
+
+    def _aggregate_columns(self) -> List[Any]:
+        value = GlucoseReading.glucose_value
+        return [
+            func.count().label("count"),
+            func.avg(value).label("mean"),
+            func.stddev_samp(value).label("standard_deviation"),
+            func.min(value).label("minimum"),
+            func.max(value).label("maximum"),
+            func.count().filter(value < VERY_LOW_THRESHOLD).label("very_low"),
+            func.count().filter(value < LOW_THRESHOLD).label("below_range"),
+            func.count().filter(value.between(LOW_THRESHOLD, HIGH_THRESHOLD)).label("in_range"),
+            func.count().filter(value > HIGH_THRESHOLD).label("above_range"),
+            func.count().filter(value > VERY_HIGH_THRESHOLD).label("very_high"),
+        ]
+
+    async def aggregate(self, user_id: UUID, start: datetime, end: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Summary statistics and time-in-range counts computed in the database.
+
+        Returns:
+            Dictionary with count, mean, standard_deviation, minimum, maximum
+            and the reading counts per range
+        """
+        stmt = select(*self._aggregate_columns()).where(*self._window_filter(user_id, start, end))
+        row = (await self.session.execute(stmt)).one()
+        return to_floats(row._asdict())
+
+    async def bucketed(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None,
+        bucket: str = "hour"
+    ) -> List[Dict[str, Any]]:
+        """Aggregates per time bucket (date_trunc unit: "hour", "day", "week", ...)."""
+        bucket_column = self._bucket(bucket)
+        stmt = select(bucket_column, *self._aggregate_columns()) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .group_by(bucket_column) \
+            .order_by(bucket_column)
+        return [to_floats(row._asdict()) for row in (await self.session.execute(stmt)).all()]
+
+    async def aggregate_per_user(
+        self,
+        user_ids: List[UUID],
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Dict[UUID, Dict[str, Any]]:
+        """Summary statistics for several users in one grouped query."""
+        if not user_ids:
+            return {}
+        conditions = [GlucoseReading.user_id.in_(user_ids), GlucoseReading.reading_timestamp >= start]
+        if end is not None:
+            conditions.append(GlucoseReading.reading_timestamp < end)
+        stmt = select(GlucoseReading.user_id, *self._aggregate_columns()) \
+            .where(*conditions) \
+            .group_by(GlucoseReading.user_id)
+        result = {}
+        for row in (await self.session.execute(stmt)).all():
+            values = row._asdict()
+            result[values.pop("user_id")] = to_floats(values)
+        return result
+
+    async def values(self, user_id: UUID, start: datetime, end: Optional[datetime] = None) -> List[tuple]:
+        """(timestamp, value) pairs only, for building arrays without loading ORM objects."""
+        stmt = select(GlucoseReading.reading_timestamp, GlucoseReading.glucose_value) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .order_by(GlucoseReading.reading_timestamp)
+        return [tuple(row) for row in (await self.session.execute(stmt)).all()]
+
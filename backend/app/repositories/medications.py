@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app.models.health import InsulinIntakeLog, MedicationLog
+from app.models.lookups import InsulinType, Medication
+from app.repositories.base import TimeSeriesRepository, to_floats
+
+
+class MedicationLogRepository(TimeSeriesRepository[MedicationLog]):
+    model = MedicationLog
+    timestamp_column = "log_timestamp"
+
+    async def window_with_medications(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Sequence[MedicationLog]:
+        """Medication logs within [start, end) with their medication loaded in the same query."""
+        stmt = select(MedicationLog) \
+            .options(joinedload(MedicationLog.medication)) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .order_by(MedicationLog.log_timestamp)
+        return (await self.session.scalars(stmt)).all()
+
+    async def counts_by_medication(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Number of doses and last dose time per medication."""
+        stmt = select(
+            Medication.medication_name,
+            func.count().label("count"),
+            func.max(MedicationLog.log_timestamp).label("last_taken"),
+        ).join(Medication, MedicationLog.medication_id == Medication.medication_id) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .group_by(Medication.medication_name) \
+            .order_by(func.count().desc())
+        return [to_floats(row._asdict()) for row in (await self.session.execute(stmt)).all()]
+
+
+class InsulinLogRepository(TimeSeriesRepository[InsulinIntakeLog]):
+    model = InsulinIntakeLog
+    timestamp_column = "log_timestamp"
+
+    async def daily_units(
+        self,
+        user_id: UUID,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Total insulin units per day and insulin type."""
+        day = self._bucket("day")
+        stmt = select(
+            day,
+            InsulinType.type_name.label("insulin_type"),
+            func.count().label("count"),
+            func.sum(InsulinIntakeLog.dosage_units).label("total_units"),
+        ).join(InsulinType, InsulinIntakeLog.insulin_type_id == InsulinType.insulin_type_id) \
+            .where(*self._window_filter(user_id, start, end)) \
+            .group_by(day, InsulinType.type_name) \
+            .order_by(day)
+        return [to_floats(row._asdict()) for row in (await self.session.execute(stmt)).all()]
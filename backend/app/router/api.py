@@ -0,0 +1,6 @@
+from fastapi import APIRouter
+
+from app.router.v1 import glucose
+
+api_router = APIRouter(prefix="/api/v1")
+api_router.include_router(glucose.router)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import Annotated
+
+from app.core.db import get_db
+from app.schemas.glucose import GlucoseBatchIn, GlucoseIngestionResult
+from app.services.glucose_ingestion import UnknownUserError, ingest_glucose_readings
+
+router = APIRouter(prefix="/glucose", tags=["Health Data"])
+
+
+@router.post("/readings/bulk", response_model=GlucoseIngestionResult)
+async def bulk_ingest_glucose_readings(
+    batch: GlucoseBatchIn,
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Stores a batch of CGM readings for one user.
+
+    Readings outside the plausible range or in the future are rejected per
+    row; readings already stored for the same timestamp are skipped.
+    """
+    try:
+        result = await ingest_glucose_readings(
+            db, batch.user_id, batch.readings, batch.reading_source, batch.method
+        )
+        await db.commit()
+    except UnknownUserError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return result
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+# Upper bound on readings per request (two weeks of 1-minute CGM data)
+MAX_BATCH_SIZE = 20_000
+
+
+class GlucoseReadingIn(BaseModel):
+    reading_timestamp: datetime
+    glucose_value: float
+    reading_source: Optional[str] = Field(default=None, max_length=50)
+
+
+class GlucoseBatchIn(BaseModel):
+    user_id: UUID
+    readings: List[GlucoseReadingIn] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    # Applied to readings that do not name their own source
+    reading_source: Optional[str] = Field(default=None, max_length=50)
+    method: Literal["insert", "copy"] = "insert"
+
+
+class RejectedReading(BaseModel):
+    index: int
+    reason: str
+
+
+class GlucoseIngestionResult(BaseModel):
+    received: int
+    rejected: int
+    duplicates_in_batch: int
+    inserted: int
+    already_stored: int
+    method: str
+    elapsed_ms: float
+    rows_per_second: float
+    errors: List[RejectedReading] = []
@@ -0,0 +1,422 @@
+"""
+Background sync of Fitbit data into biometric_data and fitbit_intraday.
+
+For every user with is_fitbit_activated and a stored access token, each run
+copies what the user's tracker uploaded since the last run:
+
+- 1-minute heart rate and steps, as packed days in fitbit_intraday (see
+  debie_agent/utils/intraday.py); a day is rewritten whole while it fills up
+- the step total ("Steps") and resting heart rate ("Resting Heart Rate") of
+  every completed day, in biometric_data at 00:00 UTC of the local date
+- sleep logs ("Sleep Minutes", "Sleep Efficiency", stamped at sleep start),
+  in biometric_data
+
+biometric_data rows are written with source='Fitbit' in chunked multi-row
+INSERTs. Progress is kept per user and resource in fitbit_sync_cursors: a
+run only asks Fitbit for the days between the cursor and the device's last
+sync time, and moves the cursor to that sync time in the same transaction as
+the rows, so a failed run is simply repeated. Fitbit reports intraday data in the user's
+local time; it is converted to UTC with the profile's offset.
+
+The agent reads the synced data (and its rollups) from the database instead
+of calling Fitbit while building its context.
+
+Runs inside the API process when FITBIT_SYNC_ENABLED is set, or by hand:
+
+    python -m app.services.fitbit_sync
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings
+from app.core.dependencies import get_settings
+from app.models.health import BiometricData, FitbitIntradayDay
+from app.models.lookups import BiometricType
+from app.models.sync import FITBIT_BIOMETRIC_TYPES, FitbitSyncCursor
+from app.models.users import User
+from debie_agent.utils.fitbit import FitbitAPIError, FitbitClient, FitbitRateLimitError
+from debie_agent.utils.intraday import pack_day
+
+logger = logging.getLogger(__name__)
+
+FITBIT_SOURCE = "Fitbit"
+RESOURCES = ("heart_rate", "steps", "sleep")
+# Fitbit path segment of the intraday resources
+INTRADAY_RESOURCES = {"heart_rate": "heart", "steps": "steps"}
+# 5 bind parameters per row keeps a chunk well under the 32767 parameter limit
+INSERT_CHUNK_SIZE = 5000
+# How long a user's UTC offset is reused before the profile is read again
+PROFILE_TTL = timedelta(hours=12)
+# Wait after a failed sync when Fitbit gives no reset time
+ERROR_RETRY_DELAY = timedelta(minutes=30)
+
+# (resource, biometric type name, UTC timestamp, value)
+Point = Tuple[str, str, datetime, float]
+# (resource, local date, UTC offset in minutes, packed samples, minutes with data)
+IntradayDay = Tuple[str, date, int, bytes, int]
+
+
+@dataclass
+class FitbitFetch:
+    """What one user's sync read from Fitbit."""
+    # Resource -> new cursor position (resources with nothing new are absent)
+    synced_through: Dict[str, datetime] = field(default_factory=dict)
+    points: List[Point] = field(default_factory=list)
+    intraday_days: List[IntradayDay] = field(default_factory=list)
+    requests: int = 0
+
+
+def local_to_utc(value: str, offset: timedelta) -> datetime:
+    """Convert a Fitbit local timestamp ("YYYY-MM-DDTHH:MM:SS[.fff]") to UTC."""
+    local = datetime.fromisoformat(value[:19])
+    return (local - offset).replace(tzinfo=timezone.utc)
+
+
+def local_date(instant: datetime, offset: timedelta) -> date:
+    return (instant + offset).date()
+
+
+def last_device_sync(devices: List[Dict[str, Any]], offset: timedelta) -> Optional[datetime]:
+    """Latest upload of any of the user's devices, in UTC."""
+    synced = [local_to_utc(device["lastSyncTime"], offset) for device in devices if device.get("lastSyncTime")]
+    return max(synced) if synced else None
+
+
+def fetch_user_data(
+    client: FitbitClient,
+    credentials: Dict[str, Any],
+    cursors: Dict[str, Optional[datetime]],
+    offset: timedelta,
+    backfill_days: int,
+    now: Optional[datetime] = None
+) -> FitbitFetch:
+    """
+    Read everything a user's devices uploaded after their cursors (blocking).
+
+    Args:
+        client: Fitbit client
+        credentials: {"access_token", "user_id"}
+        cursors: Resource -> synced_through (None: never synced)
+        offset: The user's UTC offset
+        backfill_days: How far back to start without (or with a very old) cursor
+
+    Returns:
+        FitbitFetch with the points after each cursor up to the device sync
+        time and the intraday days they fall on
+    """
+    now = now or datetime.now(timezone.utc)
+    fetch = FitbitFetch()
+    last_sync = last_device_sync(client.devices(credentials), offset)
+    fetch.requests += 1
+    if last_sync is None:
+        return fetch
+    last_sync = min(last_sync, now)
+    last_day = local_date(last_sync, offset)
+    offset_minutes = int(offset.total_seconds() // 60)
+    floor = now - timedelta(days=backfill_days)
+
+    for resource in RESOURCES:
+        start = max(cursors.get(resource) or floor, floor)
+        if start >= last_sync:
+            continue
+        first_day = local_date(start, offset)
+
+        if resource == "sleep":
+            # One request for the whole range; a log is new once it ends after the cursor
+            payload = client.sleep_range(credentials, first_day.isoformat(), last_day.isoformat())
+            fetch.requests += 1
+            for log in payload.get("sleep", []):
+                ended = local_to_utc(log["endTime"], offset)
+                if not start < ended <= last_sync:
+                    continue
+                started = local_to_utc(log["startTime"], offset)
+                fetch.points.append((resource, "Sleep Minutes", started, float(log.get("minutesAsleep", 0))))
+                if log.get("efficiency") is not None:
+                    fetch.points.append((resource, "Sleep Efficiency", started, float(log["efficiency"])))
+        else:
+            day = first_day
+            while day <= last_day:
+                payload = client.intraday(credentials, INTRADAY_RESOURCES[resource], day.isoformat())
+                fetch.requests += 1
+                # Fitbit returns the whole day so far: the packed day replaces the stored one
+                dataset = (payload.get(f"activities-{INTRADAY_RESOURCES[resource]}-intraday") or {}).get("dataset", [])
+                samples, sample_count = pack_day(dataset)
+                fetch.intraday_days.append((resource, day, offset_minutes, samples, sample_count))
+                if day < last_day:
+                    # Days before the last sync's are complete: their totals are final.
+                    # Day-level values are stamped at 00:00 UTC of their local date,
+                    # so the daily rollup buckets line up with the user's days
+                    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+                    if resource == "steps":
+                        steps = sum(int(point["value"]) for point in dataset)
+                        fetch.points.append((resource, "Steps", midnight, float(steps)))
+                    else:
+                        summary = (payload.get("activities-heart") or [{}])[0].get("value") or {}
+                        if summary.get("restingHeartRate"):
+                            fetch.points.append((resource, "Resting Heart Rate", midnight, float(summary["restingHeartRate"])))
+                day += timedelta(days=1)
+        fetch.synced_through[resource] = last_sync
+    return fetch
+
+
+async def biometric_type_ids(session: AsyncSession) -> Dict[str, int]:
+    """Ids of the Fitbit biometric types, creating any that are missing."""
+    await session.execute(
+        insert(BiometricType)
+        .values([{"type_name": name} for name in FITBIT_BIOMETRIC_TYPES])
+        .on_conflict_do_nothing(index_elements=["type_name"])
+    )
+    rows = await session.execute(
+        select(BiometricType.type_name, BiometricType.biometric_type_id)
+        .where(BiometricType.type_name.in_(FITBIT_BIOMETRIC_TYPES))
+    )
+    return dict(rows.all())
+
+
+async def due_users(session: AsyncSession, now: datetime) -> Dict[UUID, Dict[str, Any]]:
+    """
+    Users to sync: Fitbit activated, with a token, and not backing off.
+
+    Returns:
+        Dictionary mapping user_id to {"access_token", "cursors"}
+    """
+    rows = await session.execute(
+        select(User.user_id, User.fitbit_access_token)
+        .where(User.is_fitbit_activated.is_(True), User.fitbit_access_token.is_not(None))
+    )
+    users = {user_id: {"access_token": token, "cursors": {}} for user_id, token in rows.all()}
+    if not users:
+        return users
+    cursors = await session.execute(select(FitbitSyncCursor).where(FitbitSyncCursor.user_id.in_(list(users))))
+    for cursor in cursors.scalars().all():
+        if cursor.retry_after is not None and cursor.retry_after > now:
+            users.pop(cursor.user_id, None)
+        elif cursor.user_id in users:
+            users[cursor.user_id]["cursors"][cursor.resource] = cursor.synced_through
+    return users
+
+
+async def store_fetch(
+    session: AsyncSession,
+    user_id: UUID,
+    read_cursors: Dict[str, Optional[datetime]],
+    fetch: FitbitFetch,
+    type_ids: Dict[str, int],
+    now: datetime
+) -> int:
+    """
+    Write a user's points and intraday days and move the cursors in the
+    caller's transaction.
+
+    The cursor rows are locked first; a resource whose cursor moved since it
+    was read (another worker synced it meanwhile) is skipped.
+
+    Returns:
+        Rows inserted
+    """
+    locked = await session.execute(
+        select(FitbitSyncCursor.resource, FitbitSyncCursor.synced_through)
+        .where(FitbitSyncCursor.user_id == user_id)
+        .with_for_update()
+    )
+    current = dict(locked.all())
+    resources = [
+        resource for resource in fetch.synced_through
+        if current.get(resource) == read_cursors.get(resource)
+    ]
+
+    rows = [
+        {
+            "user_id": user_id,
+            "reading_timestamp": timestamp,
+            "biometric_type_id": type_ids[type_name],
+            "value": Decimal(f"{value:.2f}"),
+            "source": FITBIT_SOURCE,
+        }
+        for resource, type_name, timestamp, value in fetch.points
+        if resource in resources
+    ]
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        await session.execute(insert(BiometricData).values(rows[start:start + INSERT_CHUNK_SIZE]))
+
+    days = [
+        {
+            "user_id": user_id,
+            "metric": resource,
+            "day": day,
+            "utc_offset_minutes": offset_minutes,
+            "samples": samples,
+            "sample_count": sample_count,
+        }
+        for resource, day, offset_minutes, samples, sample_count in fetch.intraday_days
+        if resource in resources
+    ]
+    if days:
+        stmt = insert(FitbitIntradayDay).values(days)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "metric", "day"],
+            set_={
+                "utc_offset_minutes": stmt.excluded.utc_offset_minutes,
+                "samples": stmt.excluded.samples,
+                "sample_count": stmt.excluded.sample_count,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ))
+
+    for resource in resources:
+        await _upsert_cursor(session, user_id, resource, {
+            "synced_through": fetch.synced_through[resource],
+            "last_synced_at": now,
+            "retry_after": None,
+            "last_error": None,
+        })
+    return len(rows)
+
+
+async def record_failure(session: AsyncSession, user_id: UUID, error: str, retry_after: datetime) -> None:
+    """Keep a user's cursors but back off until retry_after."""
+    for resource in RESOURCES:
+        await _upsert_cursor(session, user_id, resource, {"retry_after": retry_after, "last_error": error[:1000]})
+
+
+async def _upsert_cursor(session: AsyncSession, user_id: UUID, resource: str, values: Dict[str, Any]) -> None:
+    stmt = insert(FitbitSyncCursor).values(user_id=user_id, resource=resource, **values)
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "resource"],
+        set_={**values, "updated_at": stmt.excluded.updated_at}
+    ))
+
+
+class FitbitSyncWorker:
+    """
+    Syncs all due users, a few at a time.
+
+    Fitbit calls are blocking and run in worker threads; the database work
+    runs on the event loop, one short transaction per user after its data
+    has been fetched.
+
+    Args:
+        client: Fitbit client (default: a dedicated one that fails fast on an exhausted quota)
+        settings: Application settings (default: get_settings())
+        session_factory: Async context manager yielding a session that commits on exit
+    """
+
+    def __init__(
+        self,
+        client: Optional[FitbitClient] = None,
+        settings: Optional[Settings] = None,
+        session_factory: Optional[Callable[[], Any]] = None
+    ):
+        self.settings = settings or get_settings()
+        # No waiting for a quota reset inside a sync: the user is retried after it
+        self.client = client or FitbitClient(max_quota_wait=0)
+        if session_factory is None:
+            from app.repositories.base import session_scope
+            session_factory = session_scope
+        self.session_factory = session_factory
+        # user_id -> (UTC offset, when it was read)
+        self._offsets: Dict[UUID, Tuple[timedelta, datetime]] = {}
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        Sync every due user once.
+
+        Returns:
+            Dictionary with users synced/failed, rows written, Fitbit requests and elapsed_ms
+        """
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as session:
+            users = await due_users(session, now)
+            type_ids = await biometric_type_ids(session) if users else {}
+
+        semaphore = asyncio.Semaphore(max(self.settings.FITBIT_SYNC_CONCURRENCY, 1))
+
+        async def sync(user_id: UUID, user: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.sync_user(user_id, user, type_ids)
+
+        outcomes = await asyncio.gather(*(sync(user_id, user) for user_id, user in users.items()))
+        summary = {
+            "users": len(users),
+            "synced": sum(1 for outcome in outcomes if outcome["status"] == "success"),
+            "failed": sum(1 for outcome in outcomes if outcome["status"] == "error"),
+            "rows": sum(outcome.get("rows", 0) for outcome in outcomes),
+            "requests": sum(outcome.get("requests", 0) for outcome in outcomes),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        logger.info(
+            f"Fitbit sync: {summary['synced']}/{summary['users']} users, {summary['rows']} rows, "
+            f"{summary['requests']} requests in {summary['elapsed_ms']:.0f} ms"
+        )
+        return summary
+
+    async def sync_user(self, user_id: UUID, user: Dict[str, Any], type_ids: Dict[str, int]) -> Dict[str, Any]:
+        """Fetch and store one user's new data; failures are recorded on the user's cursors."""
+        credentials = {"access_token": user["access_token"], "user_id": str(user_id)}
+        now = datetime.now(timezone.utc)
+        try:
+            offset = await asyncio.to_thread(self._utc_offset, user_id, credentials, now)
+            fetch = await asyncio.to_thread(
+                fetch_user_data, self.client, credentials, user["cursors"], offset,
+                self.settings.FITBIT_SYNC_BACKFILL_DAYS, now
+            )
+            async with self.session_factory() as session:
+                rows = await store_fetch(session, user_id, user["cursors"], fetch, type_ids, now)
+            return {"status": "success", "rows": rows, "requests": fetch.requests}
+        except Exception as e:
+            if isinstance(e, FitbitRateLimitError):
+                retry_after = now + timedelta(seconds=e.retry_after)
+            elif isinstance(e, FitbitAPIError) and e.status_code in (401, 403):
+                # Expired or revoked token: tried again on the next run, after a refresh
+                retry_after = now
+            else:
+                retry_after = now + ERROR_RETRY_DELAY
+            logger.warning(f"Fitbit sync of user {user_id} failed: {e}")
+            try:
+                async with self.session_factory() as session:
+                    await record_failure(session, user_id, str(e), retry_after)
+            except Exception as record_error:
+                logger.error(f"Could not record the Fitbit sync failure of user {user_id}: {record_error}")
+            return {"status": "error", "message": str(e)}
+
+    async def run_forever(self, interval_seconds: Optional[int] = None) -> None:
+        """Run a sync every interval_seconds until cancelled."""
+        interval = interval_seconds or self.settings.FITBIT_SYNC_INTERVAL_SECONDS
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Fitbit sync run failed: {e}")
+            await asyncio.sleep(interval)
+
+    def _utc_offset(self, user_id: UUID, credentials: Dict[str, Any], now: datetime) -> timedelta:
+        cached = self._offsets.get(user_id)
+        if cached and now - cached[1] < PROFILE_TTL:
+            return cached[0]
+        profile = self.client.profile(credentials).get("user", {})
+        offset = timedelta(milliseconds=profile.get("offsetFromUTCMillis", 0))
+        self._offsets[user_id] = (offset, now)
+        return offset
+
+
+async def _main() -> None:
+    print(await FitbitSyncWorker().run_once())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
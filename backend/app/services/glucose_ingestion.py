@@ -0,0 +1,184 @@
+"""
+Bulk glucose ingestion.
+
+Batches of CGM readings are checked in one pass, de-duplicated on
+reading_timestamp and written either with chunked multi-row
+INSERT ... ON CONFLICT DO NOTHING statements or with asyncpg COPY into a
+staging table followed by a single INSERT ... SELECT. Readings that are
+already stored are skipped by the (user_id, reading_timestamp) unique
+constraint, so re-sending an overlapping window is safe.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.health import GlucoseReading
+from app.models.users import User
+from app.schemas.glucose import GlucoseReadingIn
+
+logger = logging.getLogger(__name__)
+
+# Plausible sensor/meter range (mg/dL); values outside it are device errors
+MIN_GLUCOSE_VALUE = 20
+MAX_GLUCOSE_VALUE = 600
+# Allowed clock skew for readings stamped in the future
+MAX_FUTURE_SKEW = timedelta(minutes=5)
+# 4 bind parameters per row keeps a chunk well under the 32767 parameter limit
+INSERT_CHUNK_SIZE = 2000
+
+UNIQUE_CONSTRAINT = "uq_glucose_readings_user_timestamp"
+STAGING_TABLE = "glucose_readings_staging"
+COLUMNS = ("user_id", "reading_timestamp", "glucose_value", "reading_source")
+
+Row = Tuple[UUID, datetime, Decimal, Optional[str]]
+
+
+class UnknownUserError(LookupError):
+    """Raised when readings are sent for a user that does not exist."""
+
+
+def prepare_glucose_readings(
+    user_id: UUID,
+    readings: Iterable[GlucoseReadingIn],
+    default_source: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> Tuple[List[Row], List[Dict[str, Any]], int]:
+    """
+    Check and de-duplicate a batch of readings.
+
+    Naive timestamps are taken as UTC. When a timestamp occurs more than once
+    in the batch the last reading wins.
+
+    Returns:
+        Tuple of (rows sorted by timestamp, rejected readings as
+        {"index", "reason"}, number of in-batch duplicates dropped)
+    """
+    latest_allowed = (now or datetime.now(timezone.utc)) + MAX_FUTURE_SKEW
+    by_timestamp: Dict[datetime, Row] = {}
+    errors: List[Dict[str, Any]] = []
+    accepted = 0
+
+    for index, reading in enumerate(readings):
+        value = reading.glucose_value
+        if not MIN_GLUCOSE_VALUE <= value <= MAX_GLUCOSE_VALUE:
+            errors.append({"index": index, "reason": f"glucose_value {value} outside {MIN_GLUCOSE_VALUE}-{MAX_GLUCOSE_VALUE}"})
+            continue
+        timestamp = reading.reading_timestamp
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        if timestamp > latest_allowed:
+            errors.append({"index": index, "reason": "reading_timestamp is in the future"})
+            continue
+        accepted += 1
+        by_timestamp[timestamp] = (
+            user_id,
+            timestamp,
+            Decimal(f"{value:.2f}"),
+            reading.reading_source or default_source,
+        )
+
+    rows = sorted(by_timestamp.values(), key=lambda row: row[1])
+    return rows, errors, accepted - len(rows)
+
+
+async def user_exists(session: AsyncSession, user_id: UUID) -> bool:
+    return (await session.execute(select(User.user_id).where(User.user_id == user_id))).first() is not None
+
+
+async def insert_rows(session: AsyncSession, rows: List[Row], chunk_size: int = INSERT_CHUNK_SIZE) -> int:
+    """Write rows with chunked multi-row INSERT ... ON CONFLICT DO NOTHING. Returns rows inserted."""
+    inserted = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = [dict(zip(COLUMNS, row)) for row in rows[start:start + chunk_size]]
+        stmt = insert(GlucoseReading).values(chunk).on_conflict_do_nothing(constraint=UNIQUE_CONSTRAINT)
+        result = await session.execute(stmt)
+        inserted += max(result.rowcount, 0)
+    return inserted
+
+
+async def copy_rows(session: AsyncSession, rows: List[Row]) -> int:
+    """
+    Write rows with COPY into a temporary staging table and one INSERT ... SELECT.
+
+    Requires the asyncpg driver. Returns rows inserted.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver = raw_connection.driver_connection
+
+    await driver.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ("
+        "user_id uuid NOT NULL, reading_timestamp timestamptz NOT NULL, "
+        "glucose_value numeric(6, 2) NOT NULL, reading_source varchar(50)"
+        ") ON COMMIT DROP"
+    )
+    await driver.copy_records_to_table(STAGING_TABLE, records=rows, columns=list(COLUMNS))
+    status = await driver.execute(
+        f"INSERT INTO glucose_readings ({', '.join(COLUMNS)}) "
+        f"SELECT {', '.join(COLUMNS)} FROM {STAGING_TABLE} "
+        f"ON CONFLICT ON CONSTRAINT {UNIQUE_CONSTRAINT} DO NOTHING"
+    )
+    await driver.execute(f"TRUNCATE {STAGING_TABLE}")
+    # Command tag is "INSERT 0 <rows>"
+    return int(status.rsplit(" ", 1)[-1])
+
+
+async def ingest_glucose_readings(
+    session: AsyncSession,
+    user_id: UUID,
+    readings: List[GlucoseReadingIn],
+    default_source: Optional[str] = None,
+    method: str = "insert"
+) -> Dict[str, Any]:
+    """
+    Check, de-duplicate and store a batch of glucose readings.
+
+    The caller owns the transaction and commits it.
+
+    Args:
+        session: Database session
+        user_id: Owner of the readings
+        readings: Readings in any order
+        default_source: reading_source for readings that do not set one
+        method: "insert" (multi-row INSERT) or "copy" (asyncpg COPY + staging table)
+
+    Returns:
+        Dictionary matching GlucoseIngestionResult, including rows_per_second
+    """
+    started = time.perf_counter()
+    if not await user_exists(session, user_id):
+        raise UnknownUserError(f"User {user_id} not found")
+
+    rows, errors, duplicates = prepare_glucose_readings(user_id, readings, default_source)
+    if not rows:
+        inserted = 0
+    elif method == "copy":
+        inserted = await copy_rows(session, rows)
+    else:
+        inserted = await insert_rows(session, rows)
+
+    elapsed = time.perf_counter() - started
+    rows_per_second = round(len(rows) / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info(
+        f"Ingested {inserted}/{len(readings)} glucose readings for {user_id} via {method} "
+        f"in {elapsed * 1000:.1f} ms ({rows_per_second:.0f} rows/s)"
+    )
+    return {
+        "received": len(readings),
+        "rejected": len(errors),
+        "duplicates_in_batch": duplicates,
+        "inserted": inserted,
+        "already_stored": len(rows) - inserted,
+        "method": method,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "rows_per_second": rows_per_second,
+        "errors": errors,
+    }
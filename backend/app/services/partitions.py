@@ -0,0 +1,122 @@
+"""
+Maintenance of the monthly partitions of glucose_readings and biometric_data.
+
+The tables are range-partitioned by month (migration 0003). Upcoming months
+must exist before rows arrive; rows without a month land in the DEFAULT
+partition and are moved out when their month is created. Months older than
+the retention period are detached and moved to an archive schema (or
+dropped); their aggregates stay in the rollup tables.
+
+Run it nightly (pg_cron does when installed, see migration 0003), at
+application startup, or by hand:
+
+    python -m app.services.partitions
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings
+from app.core.dependencies import get_settings
+from app.models.partitions import PARTITIONED_TABLES
+
+logger = logging.getLogger(__name__)
+
+
+async def ensure_partitions(session: AsyncSession, months_ahead: int) -> Dict[str, List[str]]:
+    """
+    Create the monthly partitions from the current month to months_ahead.
+
+    Returns:
+        Dictionary mapping each table to the partitions created
+    """
+    created = {}
+    for table, column in PARTITIONED_TABLES.items():
+        result = await session.execute(
+            text("SELECT create_monthly_partitions(:table, :column, now(), :months_ahead)"),
+            {"table": table, "column": column, "months_ahead": months_ahead}
+        )
+        created[table] = list(result.scalars().all())
+    return created
+
+
+async def expire_partitions(
+    session: AsyncSession,
+    keep_months: int,
+    archive_schema: Optional[str]
+) -> Dict[str, List[str]]:
+    """
+    Detach the months older than keep_months and move them to archive_schema
+    (dropped when archive_schema is empty).
+
+    Returns:
+        Dictionary mapping each table to the partitions detached
+    """
+    detached = {}
+    for table in PARTITIONED_TABLES:
+        result = await session.execute(
+            text("SELECT detach_expired_partitions(:table, :keep_months, :archive_schema)"),
+            {"table": table, "keep_months": keep_months, "archive_schema": archive_schema or None}
+        )
+        detached[table] = list(result.scalars().all())
+    return detached
+
+
+async def partition_sizes(session: AsyncSession) -> List[Dict[str, Any]]:
+    """Estimated rows and heap/index size of every partition, oldest first."""
+    result = await session.execute(
+        text("""
+            SELECT parent.relname AS table_name, child.relname AS partition_name,
+                child.reltuples::bigint AS estimated_rows,
+                pg_table_size(child.oid) AS table_bytes,
+                pg_indexes_size(child.oid) AS index_bytes
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = ANY(:tables)
+            ORDER BY parent.relname, child.relname
+        """),
+        {"tables": list(PARTITIONED_TABLES)}
+    )
+    return [dict(row._mapping) for row in result.all()]
+
+
+async def run_partition_maintenance(session: AsyncSession, settings: Optional[Settings] = None) -> Dict[str, Any]:
+    """
+    Create upcoming partitions and, when a retention period is set, expire old ones.
+
+    Returns:
+        Dictionary with the partitions created and detached per table
+    """
+    settings = settings or get_settings()
+    created = await ensure_partitions(session, settings.PARTITION_MONTHS_AHEAD)
+    detached = {}
+    if settings.PARTITION_RETENTION_MONTHS > 0:
+        detached = await expire_partitions(
+            session, settings.PARTITION_RETENTION_MONTHS, settings.PARTITION_ARCHIVE_SCHEMA
+        )
+    await session.commit()
+
+    for table, names in created.items():
+        if names:
+            logger.info(f"Created partitions of {table}: {', '.join(names)}")
+    for table, names in detached.items():
+        if names:
+            logger.info(f"Detached partitions of {table}: {', '.join(names)}")
+    return {"created": created, "detached": detached}
+
+
+async def _main() -> None:
+    from app.repositories.base import session_scope
+
+    async with session_scope() as session:
+        print(await run_partition_maintenance(session))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,129 @@
+"""
+Backfill and reads for the glucose and biometric rollup tables.
+
+The rollups are kept current by the triggers defined in app/models/rollups.py.
+rebuild_* recomputes them from the raw rows for existing data or after the
+thresholds change.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.rollups import GlucoseRollup, ROLLUP_GRANULARITIES
+
+_GLUCOSE_REBUILD = """
+INSERT INTO glucose_rollups AS r (
+    user_id, granularity, bucket_start, reading_count, value_sum, value_sum_squares,
+    min_value, max_value, very_low_count, low_count, in_range_count, high_count, very_high_count
+)
+SELECT s.user_id, g.granularity, date_trunc(g.granularity, s.reading_timestamp, 'UTC'),
+    count(*), sum(s.glucose_value), sum(s.glucose_value * s.glucose_value),
+    min(s.glucose_value), max(s.glucose_value),
+    count(*) FILTER (WHERE s.glucose_value < 54),
+    count(*) FILTER (WHERE s.glucose_value >= 54 AND s.glucose_value < 70),
+    count(*) FILTER (WHERE s.glucose_value >= 70 AND s.glucose_value <= 180),
+    count(*) FILTER (WHERE s.glucose_value > 180 AND s.glucose_value <= 250),
+    count(*) FILTER (WHERE s.glucose_value > 250)
+FROM glucose_readings s CROSS JOIN unnest(CAST(:granularities AS text[])) AS g(granularity)
+WHERE {where}
+GROUP BY s.user_id, g.granularity, date_trunc(g.granularity, s.reading_timestamp, 'UTC')
+ON CONFLICT (user_id, granularity, bucket_start) DO UPDATE SET
+    reading_count = EXCLUDED.reading_count,
+    value_sum = EXCLUDED.value_sum,
+    value_sum_squares = EXCLUDED.value_sum_squares,
+    min_value = EXCLUDED.min_value,
+    max_value = EXCLUDED.max_value,
+    very_low_count = EXCLUDED.very_low_count,
+    low_count = EXCLUDED.low_count,
+    in_range_count = EXCLUDED.in_range_count,
+    high_count = EXCLUDED.high_count,
+    very_high_count = EXCLUDED.very_high_count,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+_BIOMETRIC_REBUILD = """
+INSERT INTO biometric_rollups AS r (
+    user_id, biometric_type_id, granularity, bucket_start, reading_count, value_sum,
+    value_sum_squares, min_value, max_value
+)
+SELECT s.user_id, s.biometric_type_id, g.granularity, date_trunc(g.granularity, s.reading_timestamp, 'UTC'),
+    count(*), sum(s.value), sum(s.value * s.value), min(s.value), max(s.value)
+FROM biometric_data s CROSS JOIN unnest(CAST(:granularities AS text[])) AS g(granularity)
+WHERE {where}
+GROUP BY s.user_id, s.biometric_type_id, g.granularity, date_trunc(g.granularity, s.reading_timestamp, 'UTC')
+ON CONFLICT (user_id, biometric_type_id, granularity, bucket_start) DO UPDATE SET
+    reading_count = EXCLUDED.reading_count,
+    value_sum = EXCLUDED.value_sum,
+    value_sum_squares = EXCLUDED.value_sum_squares,
+    min_value = EXCLUDED.min_value,
+    max_value = EXCLUDED.max_value,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def _rebuild_filter(user_id: Optional[UUID], start: Optional[datetime]) -> tuple:
+    conditions, params = ["true"], {"granularities": list(ROLLUP_GRANULARITIES)}
+    if user_id is not None:
+        conditions.append("s.user_id = :user_id")
+        params["user_id"] = user_id
+    if start is not None:
+        # Start of the enclosing day, so partially covered buckets are recomputed whole
+        conditions.append("s.reading_timestamp >= date_trunc('day', CAST(:start AS timestamptz), 'UTC')")
+        params["start"] = start
+    return " AND ".join(conditions), params
+
+
+async def rebuild_glucose_rollups(
+    session: AsyncSession,
+    user_id: Optional[UUID] = None,
+    start: Optional[datetime] = None
+) -> int:
+    """
+    Recompute glucose rollups from glucose_readings.
+
+    Args:
+        session: Database session (the caller commits)
+        user_id: Limit to one user (default: all users)
+        start: Only rebuild buckets from this day on (default: all history)
+
+    Returns:
+        Number of rollup rows written
+    """
+    where, params = _rebuild_filter(user_id, start)
+    result = await session.execute(text(_GLUCOSE_REBUILD.format(where=where)), params)
+    return result.rowcount
+
+
+async def rebuild_biometric_rollups(
+    session: AsyncSession,
+    user_id: Optional[UUID] = None,
+    start: Optional[datetime] = None
+) -> int:
+    """Recompute biometric rollups from biometric_data (see rebuild_glucose_rollups)."""
+    where, params = _rebuild_filter(user_id, start)
+    result = await session.execute(text(_BIOMETRIC_REBUILD.format(where=where)), params)
+    return result.rowcount
+
+
+async def glucose_rollups(
+    session: AsyncSession,
+    user_id: UUID,
+    start: datetime,
+    end: Optional[datetime] = None,
+    granularity: str = "day"
+) -> List[GlucoseRollup]:
+    """Rollup rows of one user whose bucket starts within [start, end), oldest first."""
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Unsupported granularity '{granularity}', expected one of {', '.join(ROLLUP_GRANULARITIES)}")
+    stmt = select(GlucoseRollup).where(
+        GlucoseRollup.user_id == user_id,
+        GlucoseRollup.granularity == granularity,
+        GlucoseRollup.bucket_start >= start
+    )
+    if end is not None:
+        stmt = stmt.where(GlucoseRollup.bucket_start < end)
+    return (await session.scalars(stmt.order_by(GlucoseRollup.bucket_start))).all()
@@ -0,0 +1,98 @@
+"""
+Benchmark: per-value biometric writes vs. the buffered multi-row writer.
+
+Records a turn's worth of biometric values for one user three ways:
+
+- legacy: a biometric_types lookup, then a one-row insert per value (the
+  original save_biometric_data code)
+- per call: save_biometric_data per value, with type ids from the lookup
+  registry (one insert per value)
+- batched: save_biometric_data_batch, one multi-row insert for the turn
+
+Usage (from the backend directory):
+    python -m benchmarks.batched_writes --latency-ms 40 --values 6 --runs 5
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+
+from benchmarks.fakes import BIOMETRIC_TYPE_NAMES, LatencySupabaseClient
+
+from debie_agent.utils import tools
+
+USER_ID = "benchmark-user"
+
+
+def legacy_save(user_id: str, biometric_type: str, value: float) -> dict:
+    type_response = tools.supabase_client.table("biometric_types") \
+        .select("biometric_type_id") \
+        .eq("type_name", biometric_type) \
+        .execute()
+    data = {
+        "user_id": user_id,
+        "reading_timestamp": datetime.datetime.now().isoformat(),
+        "biometric_type_id": type_response.data[0]["biometric_type_id"],
+        "value": value,
+        "source": "Manual"
+    }
+    response = tools.supabase_client.table("biometric_data").insert(data).execute()
+    return {"status": "success", "data": response.data[0] if response.data else {}}
+
+
+def run_legacy(readings: list) -> None:
+    for reading in readings:
+        legacy_save(USER_ID, reading["biometric_type"], reading["value"])
+
+
+def run_per_call(readings: list) -> None:
+    for reading in readings:
+        result = tools.save_biometric_data(USER_ID, reading["biometric_type"], reading["value"])
+        assert result["status"] == "success", result
+
+
+def run_batched(readings: list) -> None:
+    result = tools.save_biometric_data_batch(USER_ID, readings)
+    assert result["saved"] == len(readings), result
+
+
+def measure(client: LatencySupabaseClient, fn, readings: list, runs: int) -> dict:
+    timings = []
+    client.reset()
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(readings)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "round_trips_per_turn": client.round_trips / runs
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--values", type=int, default=6, help="Biometric values recorded per turn")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    client = LatencySupabaseClient(latency_ms=args.latency_ms)
+    tools.supabase_client = client
+    tools.lookup_registry.client = client
+    tools.write_buffer.client = client
+    tools.lookup_registry.preload(["biometric_types"])
+
+    readings = [
+        {"biometric_type": BIOMETRIC_TYPE_NAMES[i % len(BIOMETRIC_TYPE_NAMES)], "value": 100 + i}
+        for i in range(args.values)
+    ]
+
+    print(f"{args.values} values per turn, {args.latency_ms:.0f} ms per round trip, {args.runs} runs")
+    for name, fn in (("legacy", run_legacy), ("per call", run_per_call), ("batched", run_batched)):
+        result = measure(client, fn, readings, args.runs)
+        print(f"  {name:<9} {result['median_ms']:8.1f} ms  {result['round_trips_per_turn']:5.1f} round trips")
+
+
+if __name__ == "__main__":
+    main()
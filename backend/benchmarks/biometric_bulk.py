@@ -0,0 +1,97 @@
+"""
+Benchmark: per-type biometric loop vs. the single-query bulk reader.
+
+Compares Supabase round trips and latency for fetching the comprehensive
+context's biometric types:
+
+- legacy loop: one type lookup plus one data query per type (the original
+  get_comprehensive_user_data code)
+- cached loop: one data query per type, with ids from the lookup registry
+- bulk: one in_-filtered query joined to biometric_types
+
+Usage (from the backend directory):
+    python -m benchmarks.biometric_bulk --latency-ms 40 --runs 5
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+
+from benchmarks.fakes import LatencySupabaseClient
+
+from debie_agent.utils import tools
+
+
+def legacy_loop(user_id: str, biometric_types: list, start_date: str) -> dict:
+    biometric_data = {}
+    for biometric_type in biometric_types:
+        type_response = tools.supabase_client.table("biometric_types") \
+            .select("biometric_type_id") \
+            .eq("type_name", biometric_type) \
+            .execute()
+
+        if type_response.data:
+            type_id = type_response.data[0]['biometric_type_id']
+            response = tools.supabase_client.table("biometric_data") \
+                .select("*") \
+                .eq("user_id", user_id) \
+                .eq("biometric_type_id", type_id) \
+                .gte("reading_timestamp", start_date) \
+                .order("reading_timestamp", desc=False) \
+                .execute()
+            biometric_data[biometric_type.lower().replace(" ", "_")] = response.data
+    return biometric_data
+
+
+def cached_loop(user_id: str, biometric_types: list, start_date: str) -> dict:
+    biometric_data = {}
+    for biometric_type in biometric_types:
+        type_id = tools.lookup_registry.get_id("biometric_types", biometric_type)
+        if type_id is not None:
+            response = tools.supabase_client.table("biometric_data") \
+                .select("*") \
+                .eq("user_id", user_id) \
+                .eq("biometric_type_id", type_id) \
+                .gte("reading_timestamp", start_date) \
+                .order("reading_timestamp", desc=False) \
+                .execute()
+            biometric_data[biometric_type.lower().replace(" ", "_")] = response.data
+    return biometric_data
+
+
+STRATEGIES = {
+    "legacy loop": legacy_loop,
+    "cached loop": cached_loop,
+    "bulk": tools._get_biometric_data_bulk,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    client = LatencySupabaseClient(latency_ms=args.latency_ms)
+    tools.supabase_client = client
+    tools.lookup_registry.client = client
+    # Warm the registry so the steady state is measured
+    tools.lookup_registry.preload(["biometric_types"])
+
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=7)).isoformat()
+
+    print(f"{'strategy':>12} {'round trips':>11} {'median ms':>10} {'min ms':>8}")
+    for name, strategy in STRATEGIES.items():
+        timings = []
+        for _ in range(args.runs):
+            client.reset()
+            started = time.perf_counter()
+            result = strategy("benchmark-user", tools.COMPREHENSIVE_BIOMETRIC_TYPES, start_date)
+            timings.append((time.perf_counter() - started) * 1000)
+        assert set(result) == {"steps", "heart_rate", "exercise", "weight"}, result
+        print(f"{name:>12} {client.round_trips:>11} {statistics.median(timings):>10.1f} {min(timings):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
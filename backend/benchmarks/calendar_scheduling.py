@@ -0,0 +1,148 @@
+"""
+Benchmark: scheduling throughput of calendar_integration against a local Calendar API.
+
+Runs the real scheduling functions against the fake Calendar v3 server
+(benchmarks/fake_calendar_server.py) and reports, per schedule:
+
+- medication: a month of reminders for four daily doses with logging
+  prompts (schedule_medication_reminder)
+- workouts: a weekly plan of five workouts (create_workout_events)
+- glucose checks: before/during/after checks around those workouts
+  (schedule_glucose_checks)
+- weekly plan: workouts plus logging reminders and glucose checks, as the
+  fitness coach's schedule_workouts does it
+
+with the events created, HTTP calls, events/sec and median/p95 latency.
+HTTP calls are deterministic, so a schedule that needs more calls than
+EXPECTED_MAX_CALLS fails the run (exit status 1).
+
+Usage (from the backend directory):
+    python -m benchmarks.calendar_scheduling --latency-ms 80 --runs 10
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import benchmarks.fakes  # noqa: F401  (Supabase env defaults for the package import)
+from benchmarks.fake_calendar_server import FakeCalendarServer
+
+from debie_agent.utils import calendar_integration, calendar_service
+
+# Upper bound of HTTP calls per schedule; a higher count is a regression
+EXPECTED_MAX_CALLS = {
+    "medication": 2,
+    "workouts": 1,
+    "glucose checks": 1,
+    "weekly plan": 2,
+}
+
+USER_CREDENTIALS = {
+    "token": "benchmark-token",
+    "refresh_token": "benchmark-refresh-token",
+    "client_id": "benchmark-client",
+    "client_secret": "benchmark-secret",
+    "scopes": ["https://www.googleapis.com/auth/calendar"],
+    "expiry": "2099-01-01T00:00:00Z"
+}
+
+EXERCISE_PLAN = {
+    "weekly_schedule": [
+        {"day": "Monday", "activity": "Brisk Walk", "duration": "30 min", "intensity": "Moderate"},
+        {"day": "Tuesday", "activity": "Strength", "duration": "45 min", "intensity": "Moderate"},
+        {"day": "Wednesday", "activity": "Rest", "duration": "0 min", "intensity": "None"},
+        {"day": "Thursday", "activity": "Cycling", "duration": "60 min", "intensity": "Vigorous"},
+        {"day": "Friday", "activity": "Yoga", "duration": "30 min", "intensity": "Light"},
+        {"day": "Saturday", "activity": "Swim", "duration": "45 min", "intensity": "Moderate"},
+        {"day": "Sunday", "activity": "Rest", "duration": "0 min", "intensity": "None"},
+    ],
+    "glucose_management": ["Check glucose before and after exercise", "Carry fast-acting carbs"]
+}
+
+
+def medication() -> int:
+    result = calendar_integration.schedule_medication_reminder(
+        USER_CREDENTIALS, "Metformin", "500 mg", "four times daily",
+        ["8:00 AM", "12:00 PM", "6:00 PM", "10:00 PM"]
+    )
+    return result["total_reminders"] + result["total_logging_prompts"]
+
+
+def workouts() -> int:
+    result = calendar_integration.create_workout_events(USER_CREDENTIALS, EXERCISE_PLAN, "2026-10-19")
+    return len(result["events_created"])
+
+
+def glucose_checks(workout_events: List[Dict[str, Any]]) -> int:
+    result = calendar_integration.schedule_glucose_checks(
+        USER_CREDENTIALS, workout_events, ["before", "during", "after"]
+    )
+    return len(result["checks_created"])
+
+
+def weekly_plan() -> int:
+    created = calendar_integration.create_workout_events(USER_CREDENTIALS, EXERCISE_PLAN, "2026-10-19")
+    follow_ups = calendar_integration.create_workout_follow_ups(USER_CREDENTIALS, created["events_created"])
+    return len(created["events_created"]) + len(follow_ups["reminders_created"]) + len(follow_ups["checks_created"])
+
+
+def run(server: FakeCalendarServer, case: Callable[[], int], runs: int) -> Dict[str, Any]:
+    timings, calls, events = [], set(), 0
+    for _ in range(runs):
+        server.reset_counters()
+        started = time.perf_counter()
+        events = case()
+        timings.append(time.perf_counter() - started)
+        calls.add(server.http_requests)
+    timings.sort()
+    return {
+        "events": events,
+        "http_calls": max(calls),
+        "events_per_sec": events / statistics.median(timings),
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))] * 1000
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with FakeCalendarServer(latency_ms=args.latency_ms, error_rate=args.error_rate, seed=7) as server:
+        calendar_service.CALENDAR_API_ROOT_URL = server.base_url
+        calendar_service.calendar_services.invalidate()
+        # Warm the service cache; schedules then measure only API traffic
+        calendar_integration.get_user_calendar_service(USER_CREDENTIALS)
+        workout_events = calendar_integration.create_workout_events(
+            USER_CREDENTIALS, EXERCISE_PLAN, "2026-10-19"
+        )["events_created"]
+
+        cases = {
+            "medication": medication,
+            "workouts": workouts,
+            "glucose checks": lambda: glucose_checks(workout_events),
+            "weekly plan": weekly_plan,
+        }
+        regressions = []
+        print(f"{'schedule':>15} {'events':>7} {'http calls':>10} {'events/s':>9} {'median ms':>10} {'p95 ms':>8}")
+        for name, case in cases.items():
+            row = run(server, case, args.runs)
+            print(
+                f"{name:>15} {row['events']:>7} {row['http_calls']:>10} {row['events_per_sec']:>9.1f} "
+                f"{row['median_ms']:>10.1f} {row['p95_ms']:>8.1f}"
+            )
+            if row["http_calls"] > EXPECTED_MAX_CALLS[name]:
+                regressions.append(f"{name}: {row['http_calls']} HTTP calls (expected at most {EXPECTED_MAX_CALLS[name]})")
+
+    if regressions:
+        print("\n".join(["HTTP call count regressions:"] + regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
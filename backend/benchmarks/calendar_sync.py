@@ -0,0 +1,152 @@
+"""
+Benchmark: calendar context from the synced calendar_events copy vs listing Google.
+
+Fills a calendar on the fake Calendar v3 server
+(benchmarks/fake_calendar_server.py) with single events and daily
+medication series, then measures per context build:
+
+- re-list: tools.get_calendar_events, listing the window from the API
+- full sync: the first CalendarEventStore.sync of the calendar
+- incremental sync: a sync after a few events changed (syncToken)
+- local read: tools.get_calendar_events by user_id, reading the synced
+  rows (CalendarEventStore.upcoming) with series expanded locally
+
+with the Calendar API and Supabase round trips each takes and its median
+latency. A local read that calls the API, or an incremental sync that needs
+more than one list request, fails the run (exit status 1).
+
+Usage (from the backend directory):
+    python -m benchmarks.calendar_sync --events 400 --latency-ms 80 --runs 10
+"""
+
+import argparse
+import datetime
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import benchmarks.fakes  # noqa: F401  (Supabase env defaults for the package import)
+from benchmarks.fake_calendar_server import FakeCalendarServer
+from benchmarks.fakes import RowStoreSupabaseClient
+
+from debie_agent.utils import calendar_service, tools
+from debie_agent.utils.calendar_batch import execute_batch
+
+USER_ID = "benchmark-user"
+
+USER_CREDENTIALS = {
+    "token": "benchmark-token",
+    "refresh_token": "benchmark-refresh-token",
+    "client_id": "benchmark-client",
+    "client_secret": "benchmark-secret",
+    "scopes": ["https://www.googleapis.com/auth/calendar"],
+    "expiry": "2099-01-01T00:00:00Z"
+}
+
+SUMMARIES = ["Lunch with team", "Gym workout", "Glucose check", "Project meeting", "Dinner", "Evening walk"]
+DOSES = [("Metformin 500 mg", "08:00:00"), ("Metformin 500 mg", "20:00:00"), ("Insulin glargine", "22:00:00")]
+
+
+class StaticCredentials:
+    """Credential store stand-in that always serves the benchmark grant."""
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        return USER_CREDENTIALS
+
+
+def fill_calendar(service: Any, events: int, now: datetime.datetime) -> List[str]:
+    """Insert single events over the next 30 days and daily medication series."""
+    requests = []
+    for i in range(events):
+        start = now + datetime.timedelta(hours=(i * 30 * 24) // max(events, 1))
+        requests.append(service.events().insert(calendarId="primary", body={
+            "summary": SUMMARIES[i % len(SUMMARIES)],
+            "start": {"dateTime": start.isoformat(), "timeZone": "UTC"},
+            "end": {"dateTime": (start + datetime.timedelta(minutes=45)).isoformat(), "timeZone": "UTC"}
+        }))
+    for summary, at in DOSES:
+        requests.append(service.events().insert(calendarId="primary", body={
+            "summary": f"Take {summary}",
+            "start": {"dateTime": f"{now.date().isoformat()}T{at}", "timeZone": "America/New_York"},
+            "end": {"dateTime": f"{now.date().isoformat()}T{at[:3]}15:00", "timeZone": "America/New_York"},
+            "recurrence": ["RRULE:FREQ=DAILY"]
+        }))
+    return [response["id"] for response, error in execute_batch(service, requests) if response]
+
+
+def run(server: FakeCalendarServer, client: RowStoreSupabaseClient, case: Callable[[], Any], runs: int,
+        before: Callable[[], Any] = lambda: None) -> Dict[str, Any]:
+    timings, http_calls, round_trips, size = [], set(), set(), 0
+    for _ in range(runs):
+        before()
+        server.reset_counters()
+        client.reset()
+        started = time.perf_counter()
+        result = case()
+        timings.append(time.perf_counter() - started)
+        http_calls.add(server.http_requests)
+        round_trips.add(client.round_trips)
+        if isinstance(result, list):
+            size = len(result)
+        else:
+            size = result.get("count", result.get("written", 0) + result.get("deleted", 0))
+    return {
+        "events": size,
+        "http_calls": max(http_calls),
+        "db_round_trips": max(round_trips),
+        "median_ms": statistics.median(timings) * 1000
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--db-latency-ms", type=float, default=20.0)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    with FakeCalendarServer(latency_ms=args.latency_ms, seed=7) as server:
+        calendar_service.CALENDAR_API_ROOT_URL = server.base_url
+        calendar_service.calendar_services.invalidate()
+        service = calendar_service.get_user_calendar_service(USER_CREDENTIALS)
+        event_ids = fill_calendar(service, args.events, now)
+
+        client = RowStoreSupabaseClient({}, max_rows=1000, latency_ms=args.db_latency_ms)
+        # The tools' store, with no background syncs: every sync below is explicit
+        store = tools.calendar_event_store
+        store.client, store.credentials, store.sync_interval = client, StaticCredentials(), float("inf")
+
+        def forget_cursor() -> None:
+            client.tables["calendar_sync_cursors"] = []
+
+        def change_events() -> None:
+            for event_id in event_ids[:5]:
+                service.events().delete(calendarId="primary", eventId=event_id).execute()
+            del event_ids[:5]
+
+        rows = []
+        rows.append(("re-list", run(server, client, lambda: tools.get_calendar_events(USER_CREDENTIALS, 7), args.runs)))
+        rows.append(("full sync", run(server, client, lambda: store.sync(USER_ID), args.runs, before=forget_cursor)))
+        rows.append(("incremental sync", run(server, client, lambda: store.sync(USER_ID), args.runs, before=change_events)))
+        rows.append(("local read", run(server, client, lambda: tools.get_calendar_events(user_id=USER_ID, days=7), args.runs)))
+
+    print(f"{'case':>17} {'events':>7} {'http calls':>10} {'db trips':>9} {'median ms':>10}")
+    for name, row in rows:
+        print(f"{name:>17} {row['events']:>7} {row['http_calls']:>10} {row['db_round_trips']:>9} {row['median_ms']:>10.1f}")
+
+    results = dict(rows)
+    regressions = []
+    if results["local read"]["http_calls"]:
+        regressions.append(f"local read: {results['local read']['http_calls']} Calendar API calls (expected none)")
+    if results["incremental sync"]["http_calls"] > 1:
+        regressions.append(f"incremental sync: {results['incremental sync']['http_calls']} list requests (expected 1)")
+    if regressions:
+        print("\n".join(["Calendar sync regressions:"] + regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: sequential vs. concurrent fan-out for get_comprehensive_user_data.
+
+Runs the real tool against a local Supabase stand-in with injected
+latency and reports the cold-context wall-clock time per concurrency limit.
+
+Usage (from the backend directory):
+    python -m benchmarks.comprehensive_fanout --latency-ms 40 --runs 5
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.fakes import LatencySupabaseClient
+
+from debie_agent.utils import tools
+
+
+def run(concurrency: int, latency_ms: float, runs: int) -> dict:
+    client = LatencySupabaseClient(latency_ms=latency_ms)
+    # Every store the tool reads through holds its own reference to the client
+    tools.supabase_client = client
+    tools.lookup_registry.client = client
+    tools.lookup_registry.invalidate()
+    tools.calendar_credentials.client = client
+    tools.calendar_event_store.client = client
+    tools.write_buffer.client = client
+    tools.FANOUT_MAX_CONCURRENCY = concurrency
+
+    timings = []
+    for _ in range(runs):
+        client.reset()
+        # Measure cold context builds
+        tools.tool_cache.store.clear()
+        started = time.perf_counter()
+        result = tools.get_comprehensive_user_data("benchmark-user", tool_context=None, days=7)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert result["status"] == "success", result
+
+    return {
+        "concurrency": concurrency,
+        "round_trips": client.round_trips,
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'concurrency':>11} {'supabase calls':>14} {'median ms':>10} {'min ms':>8} {'speedup':>8}")
+    for concurrency in args.concurrency:
+        row = run(concurrency, args.latency_ms, args.runs)
+        baseline = baseline or row["median_ms"]
+        print(
+            f"{row['concurrency']:>11} {row['round_trips']:>14} {row['median_ms']:>10.1f} "
+            f"{row['min_ms']:>8.1f} {baseline / row['median_ms']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
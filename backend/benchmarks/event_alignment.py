@@ -0,0 +1,89 @@
+"""
+Benchmark: event/glucose alignment with the searchsorted index vs. a per-event scan.
+
+Aligns meal logs against 90 days of 5-minute CGM data and compares the
+batched EventAlignmentIndex with scanning every reading for every event.
+
+Usage (from the backend directory):
+    python -m benchmarks.event_alignment --days 90 --meals-per-day 4 --runs 5
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.glucose_metrics import cgm_rows
+
+from debie_agent.subagents.health_analyst.health_analyst_agent import correlate_factors
+from debie_agent.utils.event_alignment import EventAlignmentIndex
+from debie_agent.utils.glucose_metrics import GlucoseSeries
+
+
+def meal_rows(days: int, meals_per_day: int, seed: int = 11) -> list:
+    rng = np.random.default_rng(seed)
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    rows = []
+    for day in range(days):
+        for hour in np.linspace(7, 20, meals_per_day):
+            minutes = int(hour * 60 + rng.integers(-30, 30))
+            rows.append({
+                "food_log_id": len(rows),
+                "log_timestamp": (start + datetime.timedelta(days=day, minutes=minutes)).isoformat(),
+                "estimated_carbs": float(rng.integers(10, 90)),
+                "meal_types": {"type_name": ["Breakfast", "Lunch", "Snack", "Dinner"][len(rows) % 4]}
+            })
+    return rows
+
+
+def per_event_scan(series: GlucoseSeries, events: np.ndarray, window: int) -> list:
+    """Reference implementation: scan every reading for every event."""
+    peaks = []
+    for event in events:
+        in_window = [v for t, v in zip(series.timestamps.tolist(), series.values.tolist()) if event < t <= event + window]
+        peaks.append(max(in_window) if in_window else None)
+    return peaks
+
+
+def timed(case, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        case()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--meals-per-day", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    readings = cgm_rows(args.days)
+    meals = meal_rows(args.days, args.meals_per_day)
+    series = GlucoseSeries.from_readings(readings)
+    index = EventAlignmentIndex(series)
+    events = np.array([int(datetime.datetime.fromisoformat(m["log_timestamp"]).timestamp()) for m in meals])
+
+    batched = index.responses(events)
+    reference = per_event_scan(series, events[:50], index.window_seconds)
+    assert np.allclose(batched.peak[:50], np.array(reference, dtype=float), equal_nan=True)
+
+    cases = {
+        "per-event scan (50 events)": lambda: per_event_scan(series, events[:50], index.window_seconds),
+        f"index responses ({events.size} events)": lambda: index.responses(events),
+        "correlate_factors (rows)": lambda: correlate_factors("benchmark-user", readings, meals, [], []),
+    }
+    print(f"{len(readings)} readings, {len(meals)} meals")
+    print(f"{'case':>32} {'median ms':>10} {'min ms':>8}")
+    for name, case in cases.items():
+        timings = timed(case, args.runs)
+        print(f"{name:>32} {statistics.median(timings):>10.2f} {min(timings):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Local fake of the Google Calendar v3 API endpoints used by the agent.
+
+Serves events insert/get/list/delete on any calendar and the batch
+endpoint (multipart/mixed, at most 50 parts), keeps the events in memory,
+adds an injected latency per HTTP request and answers an optional fraction
+of operations with 503 (per part inside a batch, like Google does).
+
+events.list supports timeMin/timeMax, pageToken/maxResults, showDeleted
+and syncToken: every change gets a sequence number, a list's last page
+carries nextSyncToken, and a syncToken list returns the events changed
+since (deleted ones as status "cancelled"). Tokens older than the
+server's retention answer 410 Gone.
+
+Run it standalone and point the agent at it:
+    python -m benchmarks.fake_calendar_server --port 8766 --latency-ms 80
+    CALENDAR_API_ROOT_URL=http://127.0.0.1:8766 python -m debie_agent ...
+
+or start it in-process with FakeCalendarServer(...).start().
+"""
+
+import argparse
+import datetime
+import email.parser
+import email.policy
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote_plus
+
+EVENTS_PATH = re.compile(r"^/calendar/v3/calendars/(?P<calendar>[^/]+)/events(?:/(?P<event>[^/]+))?$")
+BATCH_PATH = "/batch/calendar/v3"
+# The Calendar API rejects larger batches
+MAX_BATCH_PARTS = 50
+DEFAULT_PAGE_SIZE = 250
+
+# (status, body)
+Reply = Tuple[int, Any]
+
+
+def _error(status: int, reason: str, message: str) -> Reply:
+    return status, {"error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}}
+
+
+def _parse_time(value: str) -> datetime.datetime:
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+def _event_start(event: Dict[str, Any]) -> datetime.datetime:
+    start = event.get("start") or {}
+    if "dateTime" in start:
+        return _parse_time(start["dateTime"])
+    return _parse_time(start.get("date", "1970-01-01") + "T00:00:00")
+
+
+class FakeCalendarServer:
+    """
+    In-process fake Calendar API on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency_ms: Delay added to every HTTP request (a batch counts once)
+        error_rate: Fraction of operations answered with HTTP 503
+        sync_token_retention: Changes a syncToken may lag behind before 410 Gone
+        seed: Seed of the injected failures
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency_ms: float = 80.0,
+        error_rate: float = 0.0,
+        sync_token_retention: int = 100000,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.sync_token_retention = sync_token_retention
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # calendar -> event id -> event (with the private "_seq" of its last change)
+        self.calendars: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._seq = itertools.count(1)
+        self.last_seq = 0
+        self.http_requests = 0
+        self.operations = 0
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeCalendarServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeCalendarServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.http_requests = 0
+            self.operations = 0
+
+    def events(self, calendar_id: str = "primary") -> List[Dict[str, Any]]:
+        """Stored events of a calendar (cancelled ones included)."""
+        with self._lock:
+            return [dict(event) for event in self.calendars.get(calendar_id, {}).values()]
+
+    # Operations
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Optional[Dict[str, Any]]) -> Reply:
+        """Serve one API operation (a plain request or one part of a batch)."""
+        with self._lock:
+            self.operations += 1
+            failed = self.error_rate and self._random.random() < self.error_rate
+        if failed:
+            return _error(503, "backendError", "injected failure")
+        match = EVENTS_PATH.match(path)
+        if not match:
+            return _error(404, "notFound", path)
+        calendar_id, event_id = match.group("calendar"), match.group("event")
+        if method == "POST" and event_id is None:
+            return self.insert(calendar_id, body or {})
+        if method == "GET" and event_id is None:
+            return self.list(calendar_id, query)
+        if method == "GET":
+            return self.get(calendar_id, event_id)
+        if method == "DELETE":
+            return self.delete(calendar_id, event_id)
+        return _error(405, "methodNotAllowed", method)
+
+    def _public(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in event.items() if not key.startswith("_")}
+
+    def insert(self, calendar_id: str, body: Dict[str, Any]) -> Reply:
+        if "start" not in body or "end" not in body:
+            return _error(400, "required", "Missing start or end")
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+        with self._lock:
+            seq = next(self._seq)
+            self.last_seq = seq
+            event = {
+                **body,
+                "kind": "calendar#event",
+                "id": body.get("id") or uuid.uuid4().hex,
+                "status": body.get("status", "confirmed"),
+                "etag": f'"{seq}"',
+                "created": now,
+                "updated": now,
+                "htmlLink": "https://calendar.google.com/event",
+                "_seq": seq
+            }
+            self.calendars.setdefault(calendar_id, {})[event["id"]] = event
+        return 200, self._public(event)
+
+    def get(self, calendar_id: str, event_id: str) -> Reply:
+        with self._lock:
+            event = self.calendars.get(calendar_id, {}).get(event_id)
+        if event is None:
+            return _error(404, "notFound", "Not Found")
+        return 200, self._public(event)
+
+    def delete(self, calendar_id: str, event_id: str) -> Reply:
+        """Cancel an event (kept, so incremental syncs report the deletion)."""
+        with self._lock:
+            event = self.calendars.get(calendar_id, {}).get(event_id)
+            if event is None or event["status"] == "cancelled":
+                return _error(410 if event else 404, "deleted" if event else "notFound", "Not Found")
+            seq = next(self._seq)
+            self.last_seq = seq
+            event.update(status="cancelled", etag=f'"{seq}"', _seq=seq,
+                         updated=datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z"))
+        return 204, None
+
+    def list(self, calendar_id: str, query: Dict[str, str]) -> Reply:
+        with self._lock:
+            events = sorted(self.calendars.get(calendar_id, {}).values(), key=lambda event: event["_seq"])
+            last_seq = self.last_seq
+        sync_token = query.get("syncToken")
+        if sync_token:
+            since = int(sync_token)
+            if last_seq - since > self.sync_token_retention:
+                return _error(410, "fullSyncRequired", "Sync token is no longer valid, a full sync is required.")
+            # Incremental: every change since the token, deletions included
+            events = [event for event in events if event["_seq"] > since]
+        else:
+            if query.get("showDeleted", "false") != "true":
+                events = [event for event in events if event["status"] != "cancelled"]
+            if query.get("timeMin"):
+                time_min = _parse_time(query["timeMin"])
+                events = [event for event in events if _event_start(event) >= time_min or event.get("recurrence")]
+            if query.get("timeMax"):
+                time_max = _parse_time(query["timeMax"])
+                events = [event for event in events if _event_start(event) < time_max]
+            if query.get("orderBy") == "startTime":
+                events = sorted(events, key=_event_start)
+
+        offset = int(query.get("pageToken") or 0)
+        page_size = min(int(query.get("maxResults") or DEFAULT_PAGE_SIZE), 2500)
+        page = events[offset:offset + page_size]
+        body = {"kind": "calendar#events", "items": [self._public(event) for event in page]}
+        if offset + page_size < len(events):
+            body["nextPageToken"] = str(offset + page_size)
+        else:
+            body["nextSyncToken"] = str(last_seq)
+        return 200, body
+
+    def batch(self, content_type: str, payload: bytes) -> Tuple[int, str, bytes]:
+        """Serve a multipart/mixed batch; returns (status, content type, body)."""
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + payload
+        )
+        parts = list(message.iter_parts())
+        if len(parts) > MAX_BATCH_PARTS:
+            status, body = _error(400, "batchSizeTooLarge", f"A batch can hold at most {MAX_BATCH_PARTS} requests")
+            return status, "application/json", json.dumps(body).encode()
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        out = []
+        for part in parts:
+            request = part.get_payload(decode=True) or part.get_content().encode()
+            head, _, raw_body = request.partition(b"\r\n\r\n")
+            if not raw_body and b"\n\n" in request:
+                head, _, raw_body = request.partition(b"\n\n")
+            request_line = head.decode().splitlines()[0]
+            method, target = request_line.split(" ")[:2]
+            path, _, query_string = target.partition("?")
+            query = dict(pair.split("=", 1) for pair in query_string.split("&") if "=" in pair)
+            body = json.loads(raw_body) if raw_body.strip() else None
+            status, reply = self.handle(method, path, _unquote(query), body)
+            reply_body = json.dumps(reply) if reply is not None else ""
+            content_id = part.get("Content-ID", "").strip("<>")
+            out.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(reply_body.encode())}\r\n\r\n"
+                f"{reply_body}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return 200, f"multipart/mixed; boundary={boundary}", "".join(out).encode()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _begin(self) -> Tuple[str, Dict[str, str]]:
+                time.sleep(server.latency_ms / 1000)
+                with server._lock:
+                    server.http_requests += 1
+                path, _, query_string = self.path.partition("?")
+                query = dict(pair.split("=", 1) for pair in query_string.split("&") if "=" in pair)
+                return path, _unquote(query)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_GET(self):
+                path, query = self._begin()
+                self.reply(*server.handle("GET", path, query, None))
+
+            def do_DELETE(self):
+                path, query = self._begin()
+                self.reply(*server.handle("DELETE", path, query, None))
+
+            def do_POST(self):
+                path, query = self._begin()
+                payload = self._body()
+                if path == BATCH_PATH:
+                    status, content_type, body = server.batch(self.headers.get("Content-Type", ""), payload)
+                    return self.send(status, content_type, body)
+                self.reply(*server.handle("POST", path, query, json.loads(payload) if payload else None))
+
+            def reply(self, status: int, body: Any):
+                self.send(status, "application/json; charset=UTF-8", json.dumps(body).encode() if body is not None else b"")
+
+            def send(self, status: int, content_type: str, payload: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def _unquote(query: Dict[str, str]) -> Dict[str, str]:
+    return {key: unquote_plus(value) for key, value in query.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeCalendarServer(args.port, args.latency_ms, args.error_rate)
+    print(f"Fake Calendar API on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Local fake of the Fitbit Web API endpoints used by the agent.
+
+Serves the daily activity, heart rate and sleep endpoints, their intraday
+variants, sleep ranges, the profile and the device list with synthetic
+data, an injected latency per request, a per-token hourly quota reported
+through the Fitbit-Rate-Limit-* headers (429 with Retry-After once
+exhausted) and an optional rate of 500 errors.
+
+Run it standalone and point the client at it:
+    python -m benchmarks.fake_fitbit_server --port 8765 --latency-ms 80
+    FITBIT_API_BASE=http://127.0.0.1:8765 python -m debie_agent ...
+
+or start it in-process with FakeFitbitServer(...).start().
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+ROUTES = [
+    (re.compile(r"^/1/user/-/activities/date/(?P<date>[\d-]+)\.json$"), "activity"),
+    (re.compile(r"^/1/user/-/activities/heart/date/(?P<date>[\d-]+)/1d(?:/1min)?\.json$"), "heart_rate"),
+    (re.compile(r"^/1/user/-/activities/steps/date/(?P<date>[\d-]+)/1d(?:/1min)?\.json$"), "steps"),
+    (re.compile(r"^/1\.2/user/-/sleep/date/(?P<date>[\d-]+)\.json$"), "sleep"),
+    (re.compile(r"^/1\.2/user/-/sleep/date/(?P<start>[\d-]+)/(?P<date>[\d-]+)\.json$"), "sleep"),
+    (re.compile(r"^/1/user/-/profile\.json$"), "profile"),
+    (re.compile(r"^/1/user/-/devices\.json$"), "devices"),
+]
+
+
+def activity_payload(date: str) -> Dict[str, Any]:
+    return {
+        "activities": [],
+        "summary": {
+            "steps": 8412, "caloriesOut": 2290, "distances": [{"activity": "total", "distance": 6.1}],
+            "fairlyActiveMinutes": 21, "veryActiveMinutes": 14, "sedentaryMinutes": 702
+        }
+    }
+
+
+def intraday_dataset(low: int, high: int) -> list:
+    return [
+        {"time": f"{minute // 60:02d}:{minute % 60:02d}:00", "value": random.randint(low, high)}
+        for minute in range(1440)
+    ]
+
+
+def heart_rate_payload(date: str) -> Dict[str, Any]:
+    return {
+        "activities-heart": [{"dateTime": date, "value": {"restingHeartRate": 62, "heartRateZones": []}}],
+        "activities-heart-intraday": {"dataset": intraday_dataset(55, 140), "datasetInterval": 1, "datasetType": "minute"}
+    }
+
+
+def steps_payload(date: str) -> Dict[str, Any]:
+    return {
+        "activities-steps": [{"dateTime": date, "value": "8412"}],
+        "activities-steps-intraday": {"dataset": intraday_dataset(0, 120), "datasetInterval": 1, "datasetType": "minute"}
+    }
+
+
+def sleep_payload(date: str) -> Dict[str, Any]:
+    return {
+        "sleep": [{
+            "logId": int(date.replace("-", "")), "dateOfSleep": date, "isMainSleep": True,
+            "startTime": f"{date}T00:10:00.000", "endTime": f"{date}T07:45:00.000",
+            "minutesAsleep": 412, "timeInBed": 455, "efficiency": 91
+        }],
+        "summary": {"totalMinutesAsleep": 412, "totalTimeInBed": 455, "stages": {"deep": 71, "light": 220, "rem": 96, "wake": 68}}
+    }
+
+
+def profile_payload(date: Optional[str]) -> Dict[str, Any]:
+    return {"user": {"encodedId": "FAKE01", "timezone": "UTC", "offsetFromUTCMillis": 0}}
+
+
+def devices_payload(date: Optional[str]) -> list:
+    # Synced a minute ago, in the user's local time (UTC here)
+    last_sync = time.strftime("%Y-%m-%dT%H:%M:%S.000", time.gmtime(time.time() - 60))
+    return [{"id": "1", "type": "TRACKER", "deviceVersion": "Charge 6", "lastSyncTime": last_sync}]
+
+
+PAYLOADS = {
+    "activity": activity_payload,
+    "heart_rate": heart_rate_payload,
+    "steps": steps_payload,
+    "sleep": sleep_payload,
+    "profile": profile_payload,
+    "devices": devices_payload,
+}
+
+
+class FakeFitbitServer:
+    """
+    In-process fake Fitbit API on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency_ms: Delay added to every request
+        quota: Requests allowed per token per window
+        window_seconds: Length of the quota window
+        error_rate: Fraction of requests answered with HTTP 500
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency_ms: float = 80.0,
+        quota: int = 150,
+        window_seconds: float = 3600.0,
+        error_rate: float = 0.0
+    ):
+        self.latency_ms = latency_ms
+        self.quota = quota
+        self.window_seconds = window_seconds
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        # token -> (window start, requests used)
+        self._usage: Dict[str, Tuple[float, int]] = {}
+        self.requests = 0
+        self.connections = 0
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeFitbitServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeFitbitServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def take(self, token: str) -> Tuple[bool, int, float]:
+        """Count a request against a token; returns (allowed, remaining, seconds to reset)."""
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            start, used = self._usage.get(token, (now, 0))
+            if now - start >= self.window_seconds:
+                start, used = now, 0
+            allowed = used < self.quota
+            if allowed:
+                used += 1
+            self._usage[token] = (start, used)
+            return allowed, self.quota - used, max(self.window_seconds - (now - start), 0.0)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                time.sleep(server.latency_ms / 1000)
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                allowed, remaining, reset = server.take(token)
+                headers = {
+                    "Fitbit-Rate-Limit-Limit": str(server.quota),
+                    "Fitbit-Rate-Limit-Remaining": str(remaining),
+                    "Fitbit-Rate-Limit-Reset": str(int(reset) + 1),
+                }
+                if not allowed:
+                    headers["Retry-After"] = headers["Fitbit-Rate-Limit-Reset"]
+                    return self.reply(429, {"errors": [{"errorType": "system", "message": "Too Many Requests"}]}, headers)
+                if random.random() < server.error_rate:
+                    return self.reply(500, {"errors": [{"errorType": "system", "message": "injected failure"}]}, headers)
+                path = self.path.split("?", 1)[0]
+                for pattern, name in ROUTES:
+                    match = pattern.match(path)
+                    if match:
+                        return self.reply(200, PAYLOADS[name](match.groupdict().get("date")), headers)
+                return self.reply(404, {"errors": [{"errorType": "not_found", "message": path}]}, headers)
+
+            def reply(self, status: int, body: Any, headers: Dict[str, str]):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--quota", type=int, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeFitbitServer(args.port, args.latency_ms, args.quota, error_rate=args.error_rate)
+    print(f"Fake Fitbit API on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Local stand-ins for the external services used by the agent tools.
+
+The fakes mimic just enough of each client's surface for the benchmarks to
+drive the real tool code, and inject a fixed latency per round trip.
+"""
+
+import itertools
+import re
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# The tools module builds its Supabase client at import time, so a well-formed
+# URL and key must be present before it is imported by a benchmark
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark.benchmark.benchmark")
+# Benchmarks load lookup tables from their fake clients, not in the background
+os.environ.setdefault("DEBIE_LOOKUP_PRELOAD", "0")
+
+
+class FakeResponse:
+    """Minimal stand-in for a PostgREST ``APIResponse``."""
+
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class FakeQuery:
+    """Chainable query builder that records filters and sleeps on execute()."""
+
+    def __init__(self, client: "LatencySupabaseClient", table: str):
+        self._client = client
+        self.table = table
+        self.operations: List[tuple] = []
+
+    def __getattr__(self, name: str) -> Callable[..., "FakeQuery"]:
+        def record(*args, **kwargs):
+            self.operations.append((name, args, kwargs))
+            return self
+        return record
+
+    def execute(self) -> FakeResponse:
+        return self._client.round_trip(self)
+
+
+class LatencySupabaseClient:
+    """
+    Supabase client stand-in with an injected latency per round trip.
+
+    Args:
+        latency_ms: Simulated network + query latency for every execute()
+        rows: Optional callable mapping a FakeQuery to the rows it returns
+    """
+
+    def __init__(self, latency_ms: float = 40.0, rows: Optional[Callable[[FakeQuery], List[Dict[str, Any]]]] = None):
+        self.latency_ms = latency_ms
+        self._rows = rows or default_rows
+        self._lock = threading.Lock()
+        self.round_trips = 0
+        self.round_trips_by_table: Dict[str, int] = {}
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def round_trip(self, query: FakeQuery) -> FakeResponse:
+        with self._lock:
+            self.round_trips += 1
+            self.round_trips_by_table[query.table] = self.round_trips_by_table.get(query.table, 0) + 1
+        time.sleep(self.latency_ms / 1000)
+        return FakeResponse(self._rows(query))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.round_trips = 0
+            self.round_trips_by_table = {}
+
+
+_ids = itertools.count(1)
+
+BIOMETRIC_TYPE_NAMES = ["Steps", "Heart Rate", "Exercise", "Weight"]
+
+
+def default_rows(query: FakeQuery) -> List[Dict[str, Any]]:
+    """Small, schema-shaped fixture rows for every table the tools read."""
+    for name, args, _ in query.operations:
+        if name == "insert":
+            # Echo inserted rows back with a generated primary key
+            inserted = args[0] if isinstance(args[0], list) else [args[0]]
+            return [{f"{query.table.rstrip('s')}_id": next(_ids), **row} for row in inserted]
+    if query.table == "users":
+        return [{
+            "user_id": "benchmark-user",
+            "username": "bench",
+            "diabetes_type": "Type 1",
+            "is_cgm_activated": True,
+            "is_fitbit_activated": True
+        }]
+    if query.table == "biometric_types":
+        return [
+            {"biometric_type_id": type_id, "type_name": name}
+            for type_id, name in enumerate(BIOMETRIC_TYPE_NAMES, start=1)
+        ]
+    if query.table == "biometric_data":
+        return [
+            {"biometric_data_id": next(_ids), "biometric_type_id": 1, "value": 1000, "biometric_types": {"type_name": "Steps"}}
+        ]
+    if query.table == "glucose_readings":
+        return [
+            {
+                "glucose_reading_id": next(_ids),
+                "reading_timestamp": f"2025-01-01T{hour:02d}:00:00+00:00",
+                "glucose_value": 100 + hour * 3
+            }
+            for hour in range(24)
+        ]
+    if query.table == "user_settings":
+        return [{"user_id": "benchmark-user", "food_log_reminder_enabled": True}]
+    return []
+
+
+class RowStoreQuery(FakeQuery):
+    """FakeQuery that applies the filters the paginated readers use to stored rows."""
+
+    _OR_KEYSET = re.compile(r'^(\w+)\.gt\."([^"]*)",and\(\1\.eq\."([^"]*)",(\w+)\.gt\."([^"]*)"\)$')
+    _OR_NULL_OR_NEQ = re.compile(r'^(\w+)\.is\.null,\1\.neq\.(.*)$')
+    _OR_NULL_OR_GTE = re.compile(r'^(\w+)\.is\.null,\1\.gte\.(.*)$')
+
+    def execute(self) -> FakeResponse:
+        for name, args, kwargs in self.operations:
+            if name == "upsert":
+                return self._client.round_trip_rows(self, self._upsert(args[0], kwargs.get("on_conflict", "")))
+        rows = self._client.tables.get(self.table, [])
+        limit = None
+        order = []
+        for name, args, kwargs in self.operations:
+            if name == "eq":
+                rows = [r for r in rows if str(r.get(args[0])) == str(args[1])]
+            elif name == "gte":
+                rows = [r for r in rows if str(r.get(args[0])) >= str(args[1])]
+            elif name == "lte":
+                rows = [r for r in rows if str(r.get(args[0])) <= str(args[1])]
+            elif name == "lt":
+                rows = [r for r in rows if str(r.get(args[0])) < str(args[1])]
+            elif name == "in_":
+                rows = [r for r in rows if r.get(args[0]) in args[1]]
+            elif name == "or_" and self._OR_NULL_OR_NEQ.match(args[0]):
+                column, value = self._OR_NULL_OR_NEQ.match(args[0]).groups()
+                rows = [r for r in rows if r.get(column) is None or str(r[column]) != value]
+            elif name == "or_" and self._OR_NULL_OR_GTE.match(args[0]):
+                column, value = self._OR_NULL_OR_GTE.match(args[0]).groups()
+                rows = [r for r in rows if r.get(column) is None or str(r[column]) >= value]
+            elif name == "or_":
+                ts_col, ts_value, _, id_col, id_value = self._OR_KEYSET.match(args[0]).groups()
+                rows = [
+                    r for r in rows
+                    if str(r[ts_col]) > ts_value or (str(r[ts_col]) == ts_value and str(r[id_col]) > id_value)
+                ]
+            elif name == "order":
+                order.append(args[0])
+            elif name == "limit":
+                limit = args[0]
+        if any(name == "delete" for name, _, _ in self.operations):
+            deleted = {id(row) for row in rows}
+            self._client.tables[self.table] = [
+                row for row in self._client.tables.get(self.table, []) if id(row) not in deleted
+            ]
+            return self._client.round_trip_rows(self, [dict(row) for row in rows])
+        if order:
+            rows = sorted(rows, key=lambda r: tuple(str(r[column]) for column in order))
+        # PostgREST caps every response at max-rows
+        cap = min(limit or self._client.max_rows, self._client.max_rows)
+        # Fresh dicts per response, as if decoded from JSON
+        return self._client.round_trip_rows(self, [dict(row) for row in rows[:cap]])
+
+    def _upsert(self, values: Any, on_conflict: str) -> List[Dict[str, Any]]:
+        """Insert rows, merging into stored rows with the same on_conflict key."""
+        key_columns = [column.strip() for column in on_conflict.split(",") if column.strip()]
+        table = self._client.tables.setdefault(self.table, [])
+        stored = {tuple(str(row.get(column)) for column in key_columns): row for row in table}
+        upserted = []
+        for row in values if isinstance(values, list) else [values]:
+            existing = stored.get(tuple(str(row.get(column)) for column in key_columns)) if key_columns else None
+            if existing is not None:
+                existing.update(row)
+            else:
+                existing = dict(row)
+                table.append(existing)
+                if key_columns:
+                    stored[tuple(str(existing.get(column)) for column in key_columns)] = existing
+            upserted.append(dict(existing))
+        return upserted
+
+
+class RowStoreSupabaseClient(LatencySupabaseClient):
+    """
+    Supabase client stand-in backed by in-memory tables.
+
+    Supports the eq/gte/lte/lt/in_/or_ (keyset, null-or-neq and null-or-gte)/
+    order/limit chain used by the paginated readers, upsert (merging on the
+    on_conflict columns) and filtered delete, and, like PostgREST, caps every
+    response at max_rows.
+
+    Args:
+        tables: Rows per table name
+        max_rows: Server-side cap on rows per response
+        latency_ms: Simulated latency per round trip
+    """
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]], max_rows: int = 1000, latency_ms: float = 0.0):
+        super().__init__(latency_ms=latency_ms)
+        self.tables = tables
+        self.max_rows = max_rows
+
+    def table(self, name: str) -> RowStoreQuery:
+        return RowStoreQuery(self, name)
+
+    def round_trip_rows(self, query: FakeQuery, rows: List[Dict[str, Any]]) -> FakeResponse:
+        self.round_trip(query)
+        return FakeResponse(rows)
@@ -0,0 +1,88 @@
+"""
+Benchmark: Fitbit daily fetch with bare requests.get vs. the pooled FitbitClient.
+
+Runs against the local fake Fitbit API (benchmarks/fake_fitbit_server.py):
+
+- legacy: activity, heart rate and sleep one after another with bare
+  requests.get (a new connection per request, no timeout, no retry)
+- client: FitbitClient.daily, the three endpoints concurrently over the
+  pooled keep-alive session, with 5xx retries
+
+Then drains a small per-user quota to show the client stopping on the
+Fitbit-Rate-Limit-* headers instead of hammering the API with 429s.
+
+Usage (from the backend directory):
+    python -m benchmarks.fitbit_client --users 10 --latency-ms 80 --error-rate 0.05
+"""
+
+import argparse
+import time
+
+import requests
+
+import benchmarks.fakes  # noqa: F401  (Supabase env defaults for the package import)
+from benchmarks.fake_fitbit_server import FakeFitbitServer
+from debie_agent.utils.fitbit import FitbitClient, FitbitRateLimitError
+
+DATE = "2026-10-16"
+PATHS = [
+    f"/1/user/-/activities/date/{DATE}.json",
+    f"/1/user/-/activities/heart/date/{DATE}/1d.json",
+    f"/1.2/user/-/sleep/date/{DATE}.json",
+]
+
+
+def legacy_daily(base_url: str, token: str) -> int:
+    """The pre-client tools: sequential bare requests.get; returns the failures."""
+    failures = 0
+    for path in PATHS:
+        response = requests.get(f"{base_url}{path}", headers={"Authorization": f"Bearer {token}"})
+        failures += response.status_code != 200
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with FakeFitbitServer(latency_ms=args.latency_ms, error_rate=args.error_rate) as server:
+        tokens = [f"user-{i}" for i in range(args.users)]
+
+        start = time.perf_counter()
+        legacy_failures = sum(legacy_daily(server.base_url, token) for token in tokens)
+        legacy_seconds = time.perf_counter() - start
+        legacy_connections = server.connections
+
+        client = FitbitClient(base_url=server.base_url, backoff_seconds=0.05)
+        start = time.perf_counter()
+        client_failures = 0
+        for token in tokens:
+            results = client.daily({"access_token": f"pooled-{token}"}, DATE)
+            client_failures += sum(isinstance(value, Exception) for value in results.values())
+        client_seconds = time.perf_counter() - start
+        client_connections = server.connections - legacy_connections
+
+        print(f"{args.users} users x 3 endpoints, {args.latency_ms:.0f} ms latency, {args.error_rate:.0%} injected 5xx")
+        print(f"  legacy: {legacy_seconds * 1000:8.1f} ms  {legacy_connections:3} connections  {legacy_failures} failed")
+        print(f"  client: {client_seconds * 1000:8.1f} ms  {client_connections:3} connections  "
+              f"{client_failures} failed ({client.retries} retries)")
+
+    with FakeFitbitServer(latency_ms=5, quota=20) as server:
+        client = FitbitClient(base_url=server.base_url, max_quota_wait=1)
+        credentials = {"access_token": "quota-user"}
+        sent = 0
+        try:
+            for _ in range(100):
+                client.activity_summary(credentials, DATE)
+                sent += 1
+        except FitbitRateLimitError as e:
+            print(f"\nQuota of 20/hour: {sent} requests served, stopped locally "
+                  f"({e.message}); {server.requests} requests reached the server")
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: glucose metric panel on 90 days of 5-minute CGM data.
+
+Times building a GlucoseSeries from Supabase-shaped rows and computing the
+full metric panel, against the original three generator passes.
+
+Usage (from the backend directory):
+    python -m benchmarks.glucose_metrics --days 90 --runs 10
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+
+import numpy as np
+
+import benchmarks.fakes  # noqa: F401  (Supabase env defaults for the package import)
+
+from debie_agent.utils.glucose_metrics import GlucoseSeries, compute_glucose_metrics
+
+
+def cgm_rows(days: int, seed: int = 7) -> list:
+    """Synthetic 5-minute CGM rows with a daily cycle, meal spikes and noise."""
+    rng = np.random.default_rng(seed)
+    n = days * 288
+    minutes = np.arange(n) * 5
+    values = 140 + 35 * np.sin(minutes / 1440 * 2 * np.pi) + 25 * np.sin(minutes / 240 * 2 * np.pi)
+    values += rng.normal(0, 8, n)
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        {
+            "glucose_reading_id": i,
+            "reading_timestamp": (start + datetime.timedelta(minutes=int(m))).isoformat(),
+            "glucose_value": round(float(v), 1)
+        }
+        for i, (m, v) in enumerate(zip(minutes, np.clip(values, 40, 400)))
+    ]
+
+
+def generator_passes(readings: list) -> dict:
+    """The original average/maximum/minimum statistics."""
+    return {
+        "average": round(sum(r['glucose_value'] for r in readings) / len(readings), 2),
+        "maximum": max(r['glucose_value'] for r in readings),
+        "minimum": min(r['glucose_value'] for r in readings)
+    }
+
+
+def full_panel(readings: list) -> dict:
+    return compute_glucose_metrics(GlucoseSeries.from_readings(readings))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    readings = cgm_rows(args.days)
+    series = GlucoseSeries.from_readings(readings)
+    print(f"{len(readings)} readings over {args.days} days")
+
+    cases = {
+        "3 generator passes (avg/max/min)": lambda: generator_passes(readings),
+        "rows -> series": lambda: GlucoseSeries.from_readings(readings),
+        "metric panel (series ready)": lambda: compute_glucose_metrics(series),
+        "rows -> full panel": lambda: full_panel(readings),
+    }
+    print(f"{'case':>34} {'median ms':>10} {'min ms':>8}")
+    for name, case in cases.items():
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            case()
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"{name:>34} {statistics.median(timings):>10.2f} {min(timings):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
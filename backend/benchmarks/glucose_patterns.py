@@ -0,0 +1,62 @@
+"""
+Benchmark: identify_glucose_patterns on 30-day CGM windows, single and batched.
+
+Usage (from the backend directory):
+    python -m benchmarks.glucose_patterns --days 30 --users 100 --runs 5
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.glucose_metrics import cgm_rows
+
+from debie_agent.subagents.health_analyst.health_analyst_agent import identify_glucose_patterns
+from debie_agent.utils.glucose_metrics import GlucoseSeries
+from debie_agent.utils.glucose_patterns import ambulatory_glucose_profile, batch_ambulatory_glucose_profiles
+
+
+def timed(case, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        case()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    readings = cgm_rows(args.days)
+    series = GlucoseSeries.from_readings(readings)
+
+    # Batch input: every user gets a differently seeded window
+    user_series = [GlucoseSeries.from_readings(cgm_rows(args.days, seed=user)) for user in range(args.users)]
+    user_index = np.repeat(np.arange(args.users), [len(s) for s in user_series])
+    combined = GlucoseSeries(
+        np.concatenate([s.timestamps for s in user_series]),
+        np.concatenate([s.values for s in user_series])
+    )
+
+    cases = {
+        "identify_glucose_patterns (rows)": lambda: identify_glucose_patterns("benchmark-user", readings),
+        "AGP, one user": lambda: ambulatory_glucose_profile(series),
+        f"AGP, {args.users} users, per-user loop": lambda: [ambulatory_glucose_profile(s) for s in user_series],
+        f"AGP, {args.users} users, batched": lambda: batch_ambulatory_glucose_profiles(user_index, combined, args.users),
+    }
+    print(f"{len(readings)} readings per user over {args.days} days")
+    print(f"{'case':>38} {'median ms':>10} {'min ms':>8}")
+    for name, case in cases.items():
+        timings = timed(case, args.runs)
+        print(f"{name:>38} {statistics.median(timings):>10.2f} {min(timings):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
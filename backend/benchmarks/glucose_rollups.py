@@ -0,0 +1,97 @@
+"""
+Benchmark: glucose statistics from raw readings vs. the daily rollups.
+
+Loads a 5-minute CGM history and its daily glucose_rollups rows (aggregated
+here the way the insert trigger does) into the in-memory PostgREST stand-in
+and compares get_glucose_readings over the window:
+
+- readings: every reading is paged in and summarized
+- rollups: include_readings=False reads one rollup row per day
+
+Usage (from the backend directory):
+    python -m benchmarks.glucose_rollups --days 90 --latency-ms 20
+"""
+
+import argparse
+import datetime
+import time
+from collections import defaultdict
+
+from benchmarks.fakes import RowStoreSupabaseClient
+from benchmarks.glucose_metrics import cgm_rows
+
+from debie_agent.utils import tools
+
+USER_ID = "benchmark-user"
+
+
+def glucose_rows(days: int) -> list:
+    rows = cgm_rows(days, seed=7)
+    # cgm_rows ends at a fixed date; shift the history to end now
+    shift = datetime.datetime.now(datetime.timezone.utc) - datetime.datetime.fromisoformat(rows[-1]["reading_timestamp"])
+    for i, row in enumerate(rows):
+        timestamp = datetime.datetime.fromisoformat(row["reading_timestamp"]) + shift
+        row.update(user_id=USER_ID, glucose_reading_id=f"{i:08d}", reading_timestamp=timestamp.isoformat())
+    return rows
+
+
+def daily_rollups(readings: list) -> list:
+    buckets = defaultdict(list)
+    for row in readings:
+        timestamp = datetime.datetime.fromisoformat(row["reading_timestamp"]).astimezone(datetime.timezone.utc)
+        buckets[timestamp.replace(hour=0, minute=0, second=0, microsecond=0)].append(float(row["glucose_value"]))
+    return [
+        {
+            "user_id": USER_ID,
+            "granularity": "day",
+            "bucket_start": start.isoformat(),
+            "reading_count": len(values),
+            "value_sum": sum(values),
+            "value_sum_squares": sum(v * v for v in values),
+            "min_value": min(values),
+            "max_value": max(values),
+            "very_low_count": sum(v < 54 for v in values),
+            "low_count": sum(54 <= v < 70 for v in values),
+            "in_range_count": sum(70 <= v <= 180 for v in values),
+            "high_count": sum(180 < v <= 250 for v in values),
+            "very_high_count": sum(v > 250 for v in values)
+        }
+        for start, values in sorted(buckets.items())
+    ]
+
+
+def measure(name: str, client: RowStoreSupabaseClient, days: int, include_readings: bool) -> dict:
+    tools.tool_cache.store.clear()
+    client.reset()
+    started = time.perf_counter()
+    result = tools.get_glucose_readings(USER_ID, days=days, include_readings=include_readings)
+    elapsed = (time.perf_counter() - started) * 1000
+    transferred = len(result.get("data") or []) + len(result.get("rollups") or [])
+    stats = result["statistics"]
+    print(
+        f"{name:>9} {transferred:>8} {client.round_trips:>11} {elapsed:>9.1f}"
+        f" {stats['mean']:>8} {stats['standard_deviation']:>6} {stats['time_in_ranges']['in_range_pct']:>6}"
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    readings = glucose_rows(args.days)
+    client = RowStoreSupabaseClient(
+        {"glucose_readings": readings, "glucose_rollups": daily_rollups(readings)},
+        latency_ms=args.latency_ms
+    )
+    tools.supabase_client = client
+
+    print(f"{'source':>9} {'rows':>8} {'round trips':>11} {'ms':>9} {'mean':>8} {'sd':>6} {'tir%':>6}")
+    measure("readings", client, args.days + 1, include_readings=True)
+    measure("rollups", client, args.days + 1, include_readings=False)
+
+
+if __name__ == "__main__":
+    main()
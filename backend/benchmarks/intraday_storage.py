@@ -0,0 +1,160 @@
+"""
+Benchmark: a week of 1-minute Fitbit heart rate and steps joined with glucose.
+
+Compares the per-minute biometric_data rows the sync used to write with
+packed fitbit_intraday days: rows fetched, payload size, peak memory and
+the time to load the week and give every glucose reading the mean heart
+rate and step count of the 15 minutes before it.
+
+Usage (from the backend directory):
+    python -m benchmarks.intraday_storage --days 7 --runs 5
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+import benchmarks.fakes  # noqa: F401  (Supabase env defaults for the package import)
+from benchmarks.fakes import RowStoreSupabaseClient
+from benchmarks.glucose_metrics import cgm_rows
+
+from debie_agent.utils.glucose_metrics import GlucoseSeries
+from debie_agent.utils.intraday import MINUTES_PER_DAY, load_intraday, pack_day
+
+USER_ID = "benchmark-user"
+WINDOW_SECONDS = 15 * 60
+START = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def minute_values(days: int, seed: int = 11) -> dict:
+    """Synthetic heart rate and steps per minute, with gaps where the tracker was off."""
+    rng = np.random.default_rng(seed)
+    n = days * MINUTES_PER_DAY
+    worn = rng.random(n) > 0.1
+    heart_rate = np.clip(70 + 15 * np.sin(np.arange(n) / 180) + rng.normal(0, 5, n), 40, 200).round()
+    steps = np.where(rng.random(n) > 0.7, rng.integers(0, 120, n), 0)
+    return {"heart_rate": np.where(worn, heart_rate, -1), "steps": np.where(worn, steps, -1)}
+
+
+def biometric_rows(values: dict) -> list:
+    """One biometric_data row per minute with data, as the sync used to write them."""
+    names = {"heart_rate": "Heart Rate", "steps": "Steps"}
+    rows = []
+    for metric, samples in values.items():
+        for minute, value in enumerate(samples):
+            if value >= 0:
+                rows.append({
+                    "reading_timestamp": (START + datetime.timedelta(minutes=minute)).isoformat(),
+                    "value": float(value),
+                    "biometric_types": {"type_name": names[metric]}
+                })
+    return rows
+
+
+def intraday_rows(values: dict) -> list:
+    """One fitbit_intraday row per metric and day, bytea as PostgREST's hex text."""
+    rows = []
+    for metric, samples in values.items():
+        for day_index in range(len(samples) // MINUTES_PER_DAY):
+            day = samples[day_index * MINUTES_PER_DAY:(day_index + 1) * MINUTES_PER_DAY]
+            dataset = [
+                {"time": f"{minute // 60:02d}:{minute % 60:02d}:00", "value": int(value)}
+                for minute, value in enumerate(day) if value >= 0
+            ]
+            blob, _ = pack_day(dataset)
+            rows.append({
+                "user_id": USER_ID,
+                "metric": metric,
+                "day": (START.date() + datetime.timedelta(days=day_index)).isoformat(),
+                "utc_offset_minutes": 0,
+                "samples": "\\x" + blob.hex()
+            })
+    return rows
+
+
+def join_rows(rows: list, glucose: list) -> list:
+    """Per-minute rows: parse, split by type, then bisect a window per reading."""
+    series = {}
+    for row in rows:
+        name = row["biometric_types"]["type_name"]
+        timestamp = datetime.datetime.fromisoformat(row["reading_timestamp"]).timestamp()
+        series.setdefault(name, ([], []))
+        series[name][0].append(timestamp)
+        series[name][1].append(row["value"])
+    joined = []
+    for reading in glucose:
+        t = datetime.datetime.fromisoformat(reading["reading_timestamp"]).timestamp()
+        point = {"glucose": reading["glucose_value"]}
+        for name, (timestamps, values) in series.items():
+            window = values[bisect.bisect_left(timestamps, t - WINDOW_SECONDS):bisect.bisect_left(timestamps, t)]
+            point[name] = sum(window) / len(window) if window else None
+        joined.append(point)
+    return joined
+
+
+def join_packed(client: RowStoreSupabaseClient, glucose: list, days: int) -> tuple:
+    """Packed days: one request, NumPy series, prefix-sum windows."""
+    end_day = START.date() + datetime.timedelta(days=days - 1)
+    series = load_intraday(client, USER_ID, days=days, end_day=end_day)
+    glucose_series = GlucoseSeries.from_readings(glucose)
+    return (
+        series["heart_rate"].window_mean(glucose_series.timestamps, WINDOW_SECONDS),
+        series["steps"].window_mean(glucose_series.timestamps, WINDOW_SECONDS)
+    )
+
+
+def peak_bytes(case) -> int:
+    """Peak memory allocated while running a case."""
+    tracemalloc.start()
+    case()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    values = minute_values(args.days)
+    glucose = cgm_rows(args.days)
+    rows = biometric_rows(values)
+    packed = intraday_rows(values)
+    client = RowStoreSupabaseClient({"fitbit_intraday": packed})
+
+    # Same windows either way (up to float rounding)
+    legacy = join_rows(rows, glucose)
+    heart_rate, _ = join_packed(client, glucose, args.days)
+    expected = np.array([np.nan if p["Heart Rate"] is None else p["Heart Rate"] for p in legacy])
+    assert np.allclose(expected, heart_rate, equal_nan=True)
+
+    cases = {
+        "per-minute biometric_data rows": (rows, lambda: join_rows(json.loads(json.dumps(rows)), glucose)),
+        "packed fitbit_intraday days": (packed, lambda: join_packed(client, glucose, args.days)),
+    }
+    print(f"{len(glucose)} glucose readings, {args.days} days of heart rate and steps")
+    print(f"{'storage':>32} {'rows':>7} {'payload KiB':>12} {'peak KiB':>9} {'median ms':>10} {'min ms':>8}")
+    for name, (stored, case) in cases.items():
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            case()
+            timings.append((time.perf_counter() - started) * 1000)
+        payload = len(json.dumps(stored)) / 1024
+        peak = peak_bytes(case) / 1024
+        print(
+            f"{name:>32} {len(stored):>7} {payload:>12.0f} {peak:>9.0f} "
+            f"{statistics.median(timings):>10.1f} {min(timings):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
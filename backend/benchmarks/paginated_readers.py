@@ -0,0 +1,89 @@
+"""
+Benchmark: single-query vs. keyset-paginated glucose reads over long windows.
+
+Loads a 90-day, 5-minute CGM history into an in-memory PostgREST stand-in
+that caps responses at 1000 rows (like Supabase) and compares:
+
+- single query: the original .execute() read, silently truncated by the cap
+- paginated: iter_glucose_reading_pages, collected into a list
+- streamed: pages folded straight into a GlucoseSeries
+
+Peak memory is what each strategy allocates on top of the stored rows;
+wall-clock times are dominated by the stand-in's pure-Python filtering.
+
+Usage (from the backend directory):
+    python -m benchmarks.paginated_readers --days 90
+"""
+
+import argparse
+import datetime
+import time
+import tracemalloc
+
+from benchmarks.fakes import RowStoreSupabaseClient
+
+from debie_agent.utils import tools
+from debie_agent.utils.glucose_metrics import GlucoseSeries, compute_glucose_metrics
+
+
+def glucose_rows(days: int) -> list:
+    now = datetime.datetime.now()
+    start = now - datetime.timedelta(days=days)
+    return [
+        {
+            "glucose_reading_id": f"{i:08d}",
+            "user_id": "benchmark-user",
+            "reading_timestamp": (start + datetime.timedelta(minutes=5 * i)).isoformat(),
+            "glucose_value": 100 + (i % 120),
+            "reading_source": "CGM"
+        }
+        for i in range(days * 288 - 1)
+    ]
+
+
+def single_query(days: int) -> list:
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=days + 1)).isoformat()
+    return tools.supabase_client.table("glucose_readings") \
+        .select(tools.GLUCOSE_READING_COLUMNS) \
+        .eq("user_id", "benchmark-user") \
+        .gte("reading_timestamp", start_date) \
+        .order("reading_timestamp", desc=False) \
+        .execute() \
+        .data
+
+
+def measure(name: str, case, client) -> None:
+    client.reset()
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = case()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>14} {rows:>8} {client.round_trips:>11} {elapsed:>10.1f} {peak / 1e6:>11.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--max-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    client = RowStoreSupabaseClient({"glucose_readings": glucose_rows(args.days)}, max_rows=args.max_rows)
+    tools.supabase_client = client
+    tools.READER_PAGE_SIZE = args.max_rows
+
+    print(f"{'strategy':>14} {'rows':>8} {'round trips':>11} {'ms':>10} {'peak MB':>11}")
+    measure("single query", lambda: len(single_query(args.days)), client)
+    measure("paginated", lambda: len(list(tools.iter_rows(tools.iter_glucose_reading_pages("benchmark-user", args.days + 1)))), client)
+    measure(
+        "streamed",
+        lambda: compute_glucose_metrics(
+            GlucoseSeries.from_pages(tools.iter_glucose_reading_pages("benchmark-user", args.days + 1))
+        )["count"],
+        client
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: rolling glucose statistics recomputed vs. updated incrementally.
+
+Loads a 5-minute CGM history into the in-memory PostgREST stand-in, then
+simulates a stream of polls where one new reading arrives before each poll
+(every fifth poll also backfills a reading from earlier in the window):
+
+- recompute: get_glucose_readings with an expired cache pages in and
+  summarizes the whole window every time
+- running: get_glucose_statistics folds only the new reading into the
+  per-user accumulators (a backfilled one makes it rebuild them)
+
+Usage (from the backend directory):
+    python -m benchmarks.running_stats --window 7d --polls 20 --latency-ms 20
+"""
+
+import argparse
+import datetime
+import time
+
+from benchmarks.fakes import RowStoreSupabaseClient
+from benchmarks.glucose_rollups import USER_ID, glucose_rows
+
+from debie_agent.utils import tools
+from debie_agent.utils.running_stats import WINDOWS
+
+
+def append_reading(rows: list, value: float, age: datetime.timedelta = datetime.timedelta()) -> None:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    rows.append({
+        "user_id": USER_ID,
+        "glucose_reading_id": f"{len(rows):08d}",
+        "reading_timestamp": (now - age).isoformat(),
+        "glucose_value": value,
+        "reading_source": "CGM",
+        "created_at": now.isoformat()
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--window", choices=list(WINDOWS), default="7d")
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    days = WINDOWS[args.window] // 86400
+    rows = glucose_rows(30)
+    for row in rows:
+        row["created_at"] = row["reading_timestamp"]
+    client = RowStoreSupabaseClient({"glucose_readings": rows}, latency_ms=args.latency_ms)
+    tools.supabase_client = client
+    tools.running_glucose_stats.refresh_interval_seconds = 0
+
+    # Seed the accumulators once (loads the longest window)
+    client.reset()
+    started = time.perf_counter()
+    tools.get_glucose_statistics(USER_ID, args.window)
+    print(f"seed: {client.round_trips} round trips, {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    totals = {"recompute": [0, 0.0], "running": [0, 0.0]}
+    for poll in range(args.polls):
+        append_reading(rows, 100 + poll)
+        if poll % 5 == 4:
+            append_reading(rows, 250, age=datetime.timedelta(hours=3, seconds=poll))
+
+        tools.tool_cache.store.clear()
+        client.reset()
+        started = time.perf_counter()
+        recomputed = tools.get_glucose_readings(USER_ID, days=days)["statistics"]
+        totals["recompute"][0] += client.round_trips
+        totals["recompute"][1] += (time.perf_counter() - started) * 1000
+
+        client.reset()
+        started = time.perf_counter()
+        running = tools.get_glucose_statistics(USER_ID, args.window)["statistics"]
+        totals["running"][0] += client.round_trips
+        totals["running"][1] += (time.perf_counter() - started) * 1000
+
+    print(f"{'method':>9} {'round trips/poll':>16} {'ms/poll':>9}")
+    for name, (round_trips, elapsed) in totals.items():
+        print(f"{name:>9} {round_trips / args.polls:>16.1f} {elapsed / args.polls:>9.2f}")
+    print(
+        f"last poll: recompute n={recomputed['count']} mean={recomputed['mean']} sd={recomputed['standard_deviation']}"
+        f" | running n={running['count']} mean={running['mean']} sd={running['standard_deviation']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,18 @@
-from .agent import root_agent
+"""
+The Debie agent package.
 
-# Re-export the root agent as debie_agent for clearer naming
-debie_agent = root_agent
+The root agent is imported on first access, so modules that only need the
+utilities (e.g. the app's Fitbit sync importing debie_agent.utils.fitbit)
+don't build the agent and its Supabase client at import time.
+"""
+
+import importlib
+
+
+def __getattr__(name):
+    if name in ("agent", "root_agent", "debie_agent"):
+        agent = importlib.import_module(f"{__name__}.agent")
+        # Re-export the root agent as debie_agent for clearer naming
+        globals().update(agent=agent, root_agent=agent.root_agent, debie_agent=agent.root_agent)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
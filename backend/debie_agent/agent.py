@@ -15,7 +15,12 @@ from .utils.tools import (
     get_user_info, 
     get_comprehensive_user_data,
     get_glucose_readings,
-    enrich_with_user_context
+    get_glucose_statistics,
+    enrich_with_user_context,
+    save_biometric_data,
+    save_biometric_data_batch,
+    save_insight,
+    flush_pending_writes
 )
 
 # Configure logging
@@ -75,7 +80,13 @@ root_agent = Agent(
     - get_user_info: Fetch basic user profile data
     - get_comprehensive_user_data: Get detailed user health data
     - get_glucose_readings: Access glucose monitoring data
+    - get_glucose_statistics: Current glucose statistics over the last 24h, 7d or 30d
     - enrich_with_user_context: Add user context to responses
+    - save_biometric_data: Log a biometric reading (steps, heart rate, blood pressure, ...)
+    - save_biometric_data_batch: Log several biometric readings at once
+    - save_insight: Store an insight about the user's data
+    - flush_pending_writes: Save the readings and insights queued with buffered=True;
+      call it before ending a turn that queued any, and report failed rows to the user
     - transfer_to_agent: Transfer control to a specialized agent
 
     DELEGATION RULES:
@@ -110,7 +121,12 @@ root_agent = Agent(
         get_user_info,
         get_comprehensive_user_data,
         get_glucose_readings,
+        get_glucose_statistics,
         enrich_with_user_context,
+        save_biometric_data,
+        save_biometric_data_batch,
+        save_insight,
+        flush_pending_writes,
         transfer_to_agent
     ]
 )
\ No newline at end of file
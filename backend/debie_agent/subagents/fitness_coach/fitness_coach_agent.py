@@ -6,12 +6,35 @@ import datetime
 import sys
 import os
 
+import numpy as np
+
 from debie_agent.utils.calendar_integration import (
     create_workout_events,
-    create_exercise_logging_reminders,
-    schedule_glucose_checks,
+    create_workout_follow_ups,
     schedule_workout
 )
+from debie_agent.utils.event_alignment import (
+    EventAlignmentIndex,
+    event_rows,
+    event_times,
+    grouped_summary,
+    numeric_column,
+    row_label,
+    share_below
+)
+from debie_agent.utils.glucose_metrics import GlucoseSeries
+
+# Exercise duration buckets (minutes) for analyze_exercise_impact
+DURATION_EDGES = [15, 30, 60]
+DURATION_BUCKETS = ["<15 minutes", "15-30 minutes", "30-60 minutes", ">60 minutes"]
+
+# Time-of-day buckets (local hours) for analyze_exercise_impact
+TIME_OF_DAY_EDGES = [5, 12, 17, 22]
+TIME_OF_DAY_BUCKETS = ["Night", "Morning", "Afternoon", "Evening", "Night"]
+
+def _mean_delta(values: np.ndarray) -> Optional[str]:
+    values = values[~np.isnan(values)]
+    return f"{round(float(values.mean()), 1):+} mg/dL" if values.size else None
 
 # Tools for the fitness coach agent
 def create_exercise_plan(
@@ -141,7 +164,8 @@ def schedule_workouts(
     exercise_plan: Dict[str, Any],
     start_date: str,  # Required ISO format date string "YYYY-MM-DD"
     preferred_times: str = "",  # JSON string of day-to-time mappings
-    create_glucose_checks: bool = True
+    create_glucose_checks: bool = True,
+    user_id: str = ""
 ) -> Dict[str, Any]:
     """
     Schedules workouts in Google Calendar with post-exercise logging prompts.
@@ -152,6 +176,7 @@ def schedule_workouts(
         start_date: Start date in ISO format (YYYY-MM-DD)
         preferred_times: JSON string of preferred times (e.g., '{"Monday": "09:00 AM"}')
         create_glucose_checks: Whether to create glucose check reminders
+        user_id: The user's ID, so their calendar context includes the new events
         
     Returns:
         Confirmation of calendar events creation
@@ -184,7 +209,8 @@ def schedule_workouts(
         calendar_result = create_workout_events(
             user_credentials=user_credentials,
             exercise_plan=exercise_plan,
-            start_date=start_date
+            start_date=start_date,
+            user_id=user_id
         )
         
         # Check if workout events were created successfully
@@ -198,27 +224,21 @@ def schedule_workouts(
         # Get the created events
         created_events = calendar_result.get("events_created", [])
         
-        # Create logging reminders for each event
-        logging_result = create_exercise_logging_reminders(
+        # Create logging reminders and, if requested, glucose check reminders
+        # for each event in a single batch request
+        follow_ups = create_workout_follow_ups(
             user_credentials=user_credentials,
-            workout_events=created_events
+            workout_events=created_events,
+            check_times=["before", "after"] if create_glucose_checks else [],
+            user_id=user_id
         )
         
-        # Create glucose check reminders if requested
-        glucose_checks_result = None
-        if create_glucose_checks and created_events:
-            glucose_checks_result = schedule_glucose_checks(
-                user_credentials=user_credentials,
-                exercise_events=created_events,
-                check_times=["before", "after"]
-            )
-        
         # Compile the complete result
         result = {
             "status": "success",
             "events_created": created_events,
-            "logging_reminders": logging_result.get("reminders_created", []) if logging_result else [],
-            "glucose_checks": glucose_checks_result.get("checks_created", []) if glucose_checks_result else []
+            "logging_reminders": follow_ups.get("reminders_created", []),
+            "glucose_checks": follow_ups.get("checks_created", [])
         }
         
         # Provide a summary for easy consumption
@@ -561,7 +581,12 @@ def suggest_workout_nutrition(
         ]
     }
 
-def analyze_exercise_impact(user_id: str, exercise_logs: List[Dict[str, Any]], glucose_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_exercise_impact(
+    user_id: str,
+    exercise_logs: List[Dict[str, Any]],
+    glucose_data: List[Dict[str, Any]],
+    utc_offset_minutes: int = 0
+) -> Dict[str, Any]:
     """
     Analyzes the impact of different exercises on glucose levels for personalized recommendations.
     
@@ -569,46 +594,81 @@ def analyze_exercise_impact(user_id: str, exercise_logs: List[Dict[str, Any]], g
         user_id: The user's ID
         exercise_logs: Historical exercise logs with details
         glucose_data: Glucose readings before and after exercise
+        utc_offset_minutes: User's UTC offset so time-of-day buckets follow local time
         
     Returns:
         Analysis of exercise impact on glucose levels with recommendations
     """
-    # This would contain detailed analysis in a real implementation
+    series = GlucoseSeries.from_readings(event_rows(glucose_data, "reading_timestamp"))
+    sessions = event_rows(exercise_logs)
+    if len(series) == 0 or not sessions:
+        return {
+            "status": "error",
+            "message": "Exercise logs and glucose readings are both needed to analyze exercise impact"
+        }
+
+    responses = EventAlignmentIndex(series).responses(event_times(sessions))
+    change = responses.mean - responses.baseline
+    types = [row_label(session, "exercise_type", "exercise_types", "type_name") for session in sessions]
+    intensities = [str(session.get("intensity") or "Unspecified") for session in sessions]
+
+    by_type = grouped_summary(types, change)
+    for entry in by_type:
+        type_change = change[np.asarray(types) == entry["label"]]
+        type_change = type_change[~np.isnan(type_change)]
+        entry["consistency"] = f"{round(float(np.mean(type_change < 0)) * 100, 1)}%"
+
+    # Duration and time-of-day buckets
+    duration = numeric_column(sessions, "duration_minutes")
+    duration_labels = np.array(DURATION_BUCKETS, dtype=object)[np.digitize(np.nan_to_num(duration), DURATION_EDGES)]
+    duration_labels[np.isnan(duration)] = "Unknown duration"
+    local_hours = ((responses.event_times + utc_offset_minutes * 60) % 86400) // 3600
+    time_labels = np.array(TIME_OF_DAY_BUCKETS, dtype=object)[np.digitize(local_hours, TIME_OF_DAY_EDGES)]
+    by_time_of_day = grouped_summary(time_labels, change)
+
+    usable = ~np.isnan(change)
+    post_exercise_lows = share_below(responses.nadir)
+    best_type = min(by_type, key=lambda entry: entry["mean"]) if by_type else None
+    best_time = min(by_time_of_day, key=lambda entry: entry["mean"]) if by_time_of_day else None
+
     return {
+        "sessions_analyzed": int(usable.sum()),
+        "sessions_logged": len(sessions),
         "optimal_exercise_types": [
-            {"type": "Walking", "glucose_impact": "-20 mg/dL average", "consistency": "85%"},
-            {"type": "Swimming", "glucose_impact": "-25 mg/dL average", "consistency": "80%"},
-            {"type": "Strength Training", "glucose_impact": "+5 mg/dL initially, -15 mg/dL after 2 hours", "consistency": "70%"}
+            {
+                "type": entry["label"],
+                "glucose_impact": f"{entry['mean']:+} mg/dL average",
+                "sessions": entry["count"],
+                "consistency": entry["consistency"]
+            }
+            for entry in sorted(by_type, key=lambda entry: entry["mean"])
         ],
         "optimal_timing": {
-            "time_of_day": "Morning (6-9 AM)",
-            "relation_to_meals": "1-2 hours after breakfast",
-            "glucose_stability": "22% improvement in time-in-range on exercise days"
+            "time_of_day": best_time["label"] if best_time else "Not enough data",
+            "by_time_of_day": by_time_of_day
         },
         "duration_effects": [
-            {"duration": "15-30 minutes", "glucose_impact": "-15 mg/dL", "recovery_time": "1-2 hours"},
-            {"duration": "30-60 minutes", "glucose_impact": "-30 mg/dL", "recovery_time": "2-4 hours"},
-            {"duration": ">60 minutes", "glucose_impact": "-45 mg/dL", "recovery_time": "4-6 hours"}
+            {"duration": entry["label"], "glucose_impact": f"{entry['mean']:+} mg/dL", "sessions": entry["count"]}
+            for entry in grouped_summary(duration_labels, change)
         ],
-        "intensity_analysis": {
-            "low_intensity": {"glucose_impact": "Gradual decrease", "duration": "Longer lasting", "risk": "Low hypoglycemia risk"},
-            "moderate_intensity": {"glucose_impact": "Moderate decrease", "duration": "Medium lasting", "risk": "Medium hypoglycemia risk"},
-            "high_intensity": {"glucose_impact": "Initial increase, then significant decrease", "duration": "Longest lasting", "risk": "Delayed hypoglycemia risk"}
-        },
+        "intensity_analysis": grouped_summary(intensities, change),
         "pattern_recognition": {
-            "identified_patterns": [
-                "Evening exercise improves overnight glucose stability",
-                "High-intensity intervals cause short glucose spikes followed by prolonged drops",
-                "Exercise benefits persist for approximately 24-48 hours"
-            ]
+            "average_lowest_glucose_change": _mean_delta(responses.nadir_delta),
+            "change_after_1h": _mean_delta(responses.checkpoint_delta(3600)),
+            "change_after_2h": _mean_delta(responses.checkpoint_delta(2 * 3600)),
+            "change_after_4h": _mean_delta(responses.checkpoint_delta(4 * 3600)),
+            "sessions_followed_by_low_pct": post_exercise_lows
         },
         "recommendations": {
-            "optimal_routine": "30-45 minute moderate intensity sessions, 4-5 times weekly",
+            "optimal_routine": f"{best_type['label']} sessions, ideally in the {best_time['label'].lower()}"
+                               if best_type and best_time else "Log more exercise sessions with glucose readings",
             "glucose_management": "Pre-exercise target: 120-180 mg/dL; have 15g carbs if below 120 mg/dL",
             "schedule_adjustments": "Consider splitting longer sessions into multiple shorter ones if hypoglycemia is a concern"
+                                    if post_exercise_lows else "Current exercise schedule shows no post-exercise lows"
         }
     }
 
+
 # Initialize the fitness coach agent
 fitness_coach_agent = Agent(
     name="FitnessCoach",
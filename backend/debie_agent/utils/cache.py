@@ -0,0 +1,286 @@
+"""
+Shared caching layer for the agent's data readers.
+
+Results are cached at two levels:
+
+- per session, inside ``tool_context.state`` under ``temp:cache:*`` keys with
+  an epoch expiry, so a conversation re-reads its own data for free
+- per process, in an LRU + TTL cache with an entry and memory cap, so
+  sessions for the same user share fetches
+
+Concurrent misses for the same key are coalesced (single-flight): when
+several sub-agents ask for the same data at once only one fetch runs and the
+others wait for its result.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Process-level cache limits
+CACHE_MAX_ENTRIES = int(os.getenv("DEBIE_CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("DEBIE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Caching rules for one reader."""
+    ttl_seconds: float
+    # Whether results may be shared across sessions via the process cache.
+    # Results that depend on session state must stay session-local.
+    shared: bool = True
+
+
+# Per-reader cache policies
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "glucose_readings": CachePolicy(ttl_seconds=300),
+    "glucose_rollups": CachePolicy(ttl_seconds=300),
+    "food_logs": CachePolicy(ttl_seconds=300),
+    "medication_logs": CachePolicy(ttl_seconds=300),
+    "exercise_logs": CachePolicy(ttl_seconds=300),
+    # The whole context build: upcoming events from calendar_event_store and
+    # Fitbit data from the synced rollup/intraday tables. Session-local since
+    # a user without a synced calendar gets the session state's events
+    "comprehensive_data": CachePolicy(ttl_seconds=1800, shared=False),
+}
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate the memory held by a cached value from its JSON size."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and an entry/memory cap.
+
+    Args:
+        max_entries: Maximum number of entries kept
+        max_bytes: Approximate memory budget for all entries
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Any, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Any) -> Tuple[bool, Any, float]:
+        """
+        Look up a key, dropping it if it has expired.
+
+        Returns:
+            Tuple of (found, value, expires_at epoch seconds)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None, 0.0
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                return False, None, 0.0
+            self._entries.move_to_end(key)
+            return True, entry.value, entry.expires_at
+
+    def set(self, key: Any, value: Any, ttl_seconds: float) -> None:
+        """Store a value, evicting least recently used entries to stay within the caps."""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, time.time() + ttl_seconds, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def _remove(self, key: Any) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+class _Flight:
+    """An in-progress load that concurrent callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _is_success(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("status") == "success"
+
+
+class ToolCache:
+    """
+    Two-level (session state + process) cache with per-reader policies.
+
+    Args:
+        policies: Cache policy per reader name (default: CACHE_POLICIES)
+        store: Process-level TTLCache shared by every session
+    """
+
+    def __init__(self, policies: Optional[Dict[str, CachePolicy]] = None, store: Optional[TTLCache] = None):
+        self.policies = policies or CACHE_POLICIES
+        self.store = store or TTLCache()
+        self._lock = threading.Lock()
+        self._flights: Dict[Tuple, _Flight] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def get_or_load(
+        self,
+        name: str,
+        key: str,
+        loader: Callable[[], Any],
+        tool_context=None,
+        cache_if: Callable[[Any], bool] = _is_success
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Return a cached value or load it once.
+
+        Args:
+            name: Reader name selecting the cache policy
+            key: Cache key within the reader (e.g., "<user_id>:<days>")
+            loader: Callable producing a fresh value on a miss
+            tool_context: Optional ToolContext whose state holds the session cache
+            cache_if: Predicate deciding whether a loaded value is cached
+
+        Returns:
+            Tuple of (value, source) where source is "state_cache",
+            "process_cache" or None for a fresh load
+        """
+        policy = self.policies[name]
+        state = tool_context.state if tool_context else None
+        state_key = f"temp:cache:{name}:{key}"
+
+        # Session-level cache
+        if state is not None:
+            entry = state.get(state_key)
+            if isinstance(entry, dict) and entry.get("expires_at", 0) > time.time():
+                self._count(name, "state_hits")
+                return entry.get("value"), "state_cache"
+
+        # Process-level cache
+        if policy.shared:
+            found, value, expires_at = self.store.get((name, key))
+            if found:
+                self._count(name, "process_hits")
+                self._store_in_state(state, state_key, value, expires_at)
+                return value, "process_cache"
+
+        self._count(name, "misses")
+
+        # Single-flight: session-local results are only coalesced within a session
+        flight_key = (name, key) if policy.shared else (name, key, id(state))
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+
+        if not leader:
+            self._count(name, "coalesced")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            if cache_if(flight.value):
+                self._store_in_state(state, state_key, flight.value, time.time() + policy.ttl_seconds)
+            return flight.value, None
+
+        try:
+            flight.value = loader()
+            self._count(name, "loads")
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(flight_key, None)
+            flight.done.set()
+
+        if cache_if(flight.value):
+            if policy.shared:
+                self.store.set((name, key), flight.value, policy.ttl_seconds)
+            self._store_in_state(state, state_key, flight.value, time.time() + policy.ttl_seconds)
+        return flight.value, None
+
+    def invalidate(self, name: str, key: str, tool_context=None) -> None:
+        """Drop a cached value from the process cache and the session state."""
+        self.store.delete((name, key))
+        if tool_context:
+            tool_context.state[f"temp:cache:{name}:{key}"] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics per reader plus process-cache totals.
+
+        Returns:
+            Dictionary with per-reader counters and the process cache usage
+        """
+        with self._lock:
+            readers = {name: dict(counters) for name, counters in self._counters.items()}
+            in_flight = len(self._flights)
+        return {
+            "readers": readers,
+            "in_flight": in_flight,
+            "process_cache": self.store.stats()
+        }
+
+    def _store_in_state(self, state, state_key: str, value: Any, expires_at: float) -> None:
+        if state is not None:
+            state[state_key] = {"value": value, "expires_at": expires_at}
+
+    def _count(self, name: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[counter] = counters.get(counter, 0) + 1
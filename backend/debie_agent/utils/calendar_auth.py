@@ -0,0 +1,358 @@
+"""
+Google Calendar credentials per user, kept in memory and backed by the
+google_calendar_credentials table.
+
+Calendar tools used to read token.json from the working directory on every
+call, and fall back to an interactive browser flow that blocked the serving
+process. Instead:
+
+- a user's credentials are read from the database once and then served
+  from memory
+- a background thread refreshes access tokens that expire within
+  CALENDAR_TOKEN_REFRESH_MARGIN_SECONDS and writes them back, so requests
+  find a valid token
+- each user's refresh runs under that user's lock: concurrent requests for
+  an expired token wait for one refresh instead of each starting their own
+- a user without a (working) authorization gets CalendarAuthRequired; they
+  connect their calendar through the app's OAuth flow, which stores the
+  grant with CalendarCredentialStore.save()
+
+The process-wide store is calendar_credentials. It connects to Supabase on
+first use (tools.py hands it the agent's client), so importing the calendar
+modules doesn't require a configured Supabase.
+"""
+
+import datetime
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
+GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
+GOOGLE_TOKEN_URI = os.getenv("GOOGLE_TOKEN_URI", "https://oauth2.googleapis.com/token")
+CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+# Refresh access tokens this long before they expire
+CALENDAR_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("CALENDAR_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+# How often the background refresher looks for expiring tokens
+CALENDAR_TOKEN_REFRESH_INTERVAL_SECONDS = float(os.getenv("CALENDAR_TOKEN_REFRESH_INTERVAL_SECONDS", "60"))
+# How long a user without stored credentials is remembered as such
+CALENDAR_MISSING_CREDENTIALS_TTL_SECONDS = 60
+
+CREDENTIAL_COLUMNS = "user_id, access_token, refresh_token, token_expiry, scopes"
+
+
+def supabase_client_from_env() -> Any:
+    """Supabase client from SUPABASE_URL/SUPABASE_KEY, for stores used without tools.py."""
+    from supabase import create_client
+    return create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+
+
+class CalendarAuthRequired(Exception):
+    """The user has no usable Google Calendar authorization and must (re)connect their calendar."""
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime.datetime):
+        parsed = value
+    else:
+        parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+@dataclass
+class UserCalendarCredentials:
+    """A user's Google OAuth grant as held in memory."""
+    user_id: str
+    token: Optional[str]
+    refresh_token: str
+    expiry: Optional[datetime.datetime]
+    scopes: List[str]
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def expires_within(self, seconds: float, now: Optional[datetime.datetime] = None) -> bool:
+        if not self.token or self.expiry is None:
+            return True
+        return self.expiry - (now or _utcnow()) <= datetime.timedelta(seconds=seconds)
+
+
+class CalendarCredentialStore:
+    """
+    Thread-safe in-memory store of users' Google Calendar credentials.
+
+    Args:
+        client: Supabase client for the google_calendar_credentials table
+            (default: one from the environment, created on first use)
+        client_id: OAuth client ID of the app
+        client_secret: OAuth client secret of the app
+        token_uri: Google's token endpoint
+        refresh_margin: Seconds before expiry at which tokens are refreshed
+        refresh_interval: Seconds between background refresh passes
+        refresh: Refreshes a Credentials object in place (default: over HTTP)
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        client_id: str = GOOGLE_CLIENT_ID,
+        client_secret: str = GOOGLE_CLIENT_SECRET,
+        token_uri: str = GOOGLE_TOKEN_URI,
+        refresh_margin: float = CALENDAR_TOKEN_REFRESH_MARGIN_SECONDS,
+        refresh_interval: float = CALENDAR_TOKEN_REFRESH_INTERVAL_SECONDS,
+        refresh: Optional[Callable[[Credentials], None]] = None
+    ):
+        self._client = client
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_uri = token_uri
+        self.refresh_margin = refresh_margin
+        self.refresh_interval = refresh_interval
+        self._refresh_credentials = refresh or (lambda credentials: credentials.refresh(Request()))
+        self._entries: Dict[str, UserCalendarCredentials] = {}
+        # user_id -> when the database had no credentials for them
+        self._missing: Dict[str, datetime.datetime] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = supabase_client_from_env()
+        return self._client
+
+    @client.setter
+    def client(self, client: Any) -> None:
+        self._client = client
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """
+        A user's credentials as authorized-user info for Credentials /
+        the Calendar service cache.
+
+        Only an already expired token is refreshed on the calling thread;
+        tokens about to expire are left to the background refresher.
+
+        Raises:
+            CalendarAuthRequired: No stored grant, or Google rejected it
+        """
+        self._ensure_refresher()
+        entry = self._entry(user_id)
+        if entry.expires_within(0):
+            self._refresh(entry, margin=0)
+        return self._authorized_user_info(entry)
+
+    def save(self, user_id: str, authorized_user_info: Dict[str, Any]) -> None:
+        """
+        Store a user's grant (from the OAuth callback) in the database and in memory.
+
+        Args:
+            user_id: The user's ID
+            authorized_user_info: Credentials.to_json()-style dict with at
+                least refresh_token
+        """
+        if not authorized_user_info.get("refresh_token"):
+            raise ValueError("A refresh token is required to store calendar credentials")
+        scopes = authorized_user_info.get("scopes") or CALENDAR_SCOPES
+        entry = UserCalendarCredentials(
+            user_id=user_id,
+            token=authorized_user_info.get("token"),
+            refresh_token=authorized_user_info["refresh_token"],
+            expiry=_parse_timestamp(authorized_user_info.get("expiry")),
+            scopes=scopes.split() if isinstance(scopes, str) else list(scopes)
+        )
+        self.client.table("google_calendar_credentials").upsert({
+            "user_id": user_id,
+            **self._row(entry),
+            "last_error": None
+        }).execute()
+        with self._lock:
+            self._entries[user_id] = entry
+            self._missing.pop(user_id, None)
+
+    def forget(self, user_id: str) -> None:
+        """Drop a user's credentials from memory (the database row is kept)."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._missing.pop(user_id, None)
+
+    def refresh_due(self, now: Optional[datetime.datetime] = None) -> int:
+        """
+        Refresh every token expiring within the refresh margin.
+
+        Users whose refresh is already running on another thread are skipped.
+
+        Returns:
+            Number of tokens refreshed
+        """
+        with self._lock:
+            due = [entry for entry in self._entries.values() if entry.expires_within(self.refresh_margin, now)]
+        refreshed = 0
+        for entry in due:
+            try:
+                if self._refresh(entry, margin=self.refresh_margin, wait=False, now=now):
+                    refreshed += 1
+            except CalendarAuthRequired as e:
+                logger.warning(f"Calendar token refresh for {entry.user_id} failed: {str(e)}")
+        return refreshed
+
+    def start(self) -> None:
+        """Start the background refresher (a daemon thread)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="calendar-token-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresher."""
+        self._stop.set()
+
+    def _ensure_refresher(self) -> None:
+        if self._thread is None and self.refresh_interval > 0:
+            self.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh_due()
+            except Exception as e:
+                logger.error(f"Calendar token refresher: {str(e)}")
+
+    def _entry(self, user_id: str) -> UserCalendarCredentials:
+        now = _utcnow()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                return entry
+            missing_since = self._missing.get(user_id)
+            if missing_since and now - missing_since < datetime.timedelta(seconds=CALENDAR_MISSING_CREDENTIALS_TTL_SECONDS):
+                raise CalendarAuthRequired("Google Calendar is not connected")
+
+        rows = self.client.table("google_calendar_credentials") \
+            .select(CREDENTIAL_COLUMNS) \
+            .eq("user_id", user_id) \
+            .limit(1) \
+            .execute() \
+            .data
+        if not rows or not rows[0].get("refresh_token"):
+            with self._lock:
+                self._missing[user_id] = now
+            raise CalendarAuthRequired("Google Calendar is not connected")
+
+        row = rows[0]
+        entry = UserCalendarCredentials(
+            user_id=user_id,
+            token=row.get("access_token"),
+            refresh_token=row["refresh_token"],
+            expiry=_parse_timestamp(row.get("token_expiry")),
+            scopes=(row.get("scopes") or " ".join(CALENDAR_SCOPES)).split()
+        )
+        with self._lock:
+            # Another thread may have loaded it meanwhile: keep the first
+            return self._entries.setdefault(user_id, entry)
+
+    def _refresh(
+        self,
+        entry: UserCalendarCredentials,
+        margin: float,
+        wait: bool = True,
+        now: Optional[datetime.datetime] = None
+    ) -> bool:
+        """
+        Refresh a user's access token unless another thread just did.
+
+        Returns:
+            Whether this call refreshed the token
+        """
+        if not entry.lock.acquire(blocking=wait):
+            return False
+        try:
+            # A concurrent refresh may have finished while we waited for the lock
+            if not entry.expires_within(margin, now):
+                return False
+            credentials = Credentials(
+                token=entry.token,
+                refresh_token=entry.refresh_token,
+                token_uri=self.token_uri,
+                client_id=self.client_id,
+                client_secret=self.client_secret,
+                scopes=entry.scopes
+            )
+            try:
+                self._refresh_credentials(credentials)
+            except RefreshError as e:
+                # Revoked or expired grant: only the user can fix it
+                self._record_failure(entry.user_id, str(e))
+                raise CalendarAuthRequired(f"Google Calendar authorization expired: {str(e)}") from e
+            entry.token = credentials.token
+            entry.expiry = credentials.expiry.replace(tzinfo=datetime.timezone.utc) if credentials.expiry else None
+            if credentials.refresh_token:
+                entry.refresh_token = credentials.refresh_token
+            self.refreshes += 1
+            try:
+                self.client.table("google_calendar_credentials") \
+                    .update({**self._row(entry), "last_refreshed_at": _utcnow().isoformat()}) \
+                    .eq("user_id", entry.user_id) \
+                    .execute()
+            except Exception as e:
+                # The in-memory token is valid either way
+                logger.error(f"Error storing refreshed calendar token for {entry.user_id}: {str(e)}")
+            return True
+        finally:
+            entry.lock.release()
+
+    def _record_failure(self, user_id: str, error: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._missing[user_id] = _utcnow()
+        try:
+            self.client.table("google_calendar_credentials") \
+                .update({"access_token": None, "token_expiry": None, "last_error": error[:1000]}) \
+                .eq("user_id", user_id) \
+                .execute()
+        except Exception as e:
+            logger.error(f"Error recording calendar auth failure for {user_id}: {str(e)}")
+
+    @staticmethod
+    def _row(entry: UserCalendarCredentials) -> Dict[str, Any]:
+        return {
+            "access_token": entry.token,
+            "refresh_token": entry.refresh_token,
+            "token_expiry": entry.expiry.isoformat() if entry.expiry else None,
+            "scopes": " ".join(entry.scopes)
+        }
+
+    def _authorized_user_info(self, entry: UserCalendarCredentials) -> Dict[str, Any]:
+        return {
+            "token": entry.token,
+            "refresh_token": entry.refresh_token,
+            "token_uri": self.token_uri,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "scopes": entry.scopes,
+            # google.oauth2 parses naive UTC "YYYY-MM-DDTHH:MM:SSZ"
+            "expiry": entry.expiry.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if entry.expiry else None
+        }
+
+
+# Process-wide store shared by the calendar tools and the calendar sync
+calendar_credentials = CalendarCredentialStore()
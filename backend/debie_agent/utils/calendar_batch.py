@@ -0,0 +1,56 @@
+"""
+Batched Google Calendar API requests.
+
+Scheduling a weekly plan creates dozens of events (workouts, logging
+reminders, glucose checks, medication doses). Sent one by one, each is a
+full HTTPS round trip; the Calendar API's batch endpoint takes up to 50
+operations in a single multipart request and answers each one separately,
+so a failed item doesn't fail the rest.
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The Calendar API accepts at most 50 operations per batch
+CALENDAR_BATCH_SIZE = min(int(os.getenv("CALENDAR_BATCH_SIZE", "50")), 50)
+
+# (response, error message) per request, in the order the requests were given
+BatchResult = Tuple[Optional[Dict[str, Any]], Optional[str]]
+
+
+def execute_batch(service: Any, requests: Sequence[Any], batch_size: int = CALENDAR_BATCH_SIZE) -> List[BatchResult]:
+    """
+    Execute Calendar API requests through the batch endpoint.
+
+    Args:
+        service: Calendar API service (googleapiclient resource)
+        requests: Unexecuted requests, e.g. service.events().insert(...)
+        batch_size: Operations per batch request (at most 50)
+
+    Returns:
+        List of (response, None) or (None, error message), one per request
+    """
+    results: List[Optional[BatchResult]] = [None] * len(requests)
+
+    def collect(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        index = int(request_id)
+        results[index] = (None, str(exception)) if exception is not None else (response, None)
+
+    for offset in range(0, len(requests), batch_size):
+        chunk = requests[offset:offset + batch_size]
+        batch = service.new_batch_http_request(callback=collect)
+        for index, request in enumerate(chunk, start=offset):
+            batch.add(request, request_id=str(index))
+        try:
+            batch.execute()
+        except Exception as e:
+            # The batch request itself failed (auth, network): items without a
+            # response didn't run
+            logger.error(f"Calendar batch of {len(chunk)} requests failed: {str(e)}")
+            for index in range(offset, offset + len(chunk)):
+                if results[index] is None:
+                    results[index] = (None, str(e))
+    return [result or (None, "No response in batch") for result in results]
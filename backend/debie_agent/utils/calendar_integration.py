@@ -3,40 +3,36 @@ Calendar integration utilities for the DiaBeatThis platform.
 Handles all Google Calendar operations with simplified date handling.
 """
 
-from typing import Dict, List, Optional
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-import os
-import json
+from typing import Any, Dict, List, Optional
 import logging
-from datetime import datetime, timedelta
+import datetime
 
-logger = logging.getLogger(__name__)
+from .calendar_auth import calendar_credentials
+from .calendar_batch import execute_batch
+from .calendar_service import get_user_calendar_service
+from .calendar_sync import calendar_event_store
 
-SCOPES = ['https://www.googleapis.com/auth/calendar']
+logger = logging.getLogger(__name__)
 
-def get_calendar_service():
-    """Get an authorized Google Calendar service instance."""
-    creds = None
-    if os.path.exists('token.json'):
-        with open('token.json', 'r') as token:
-            creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
+def get_calendar_service(user_id: str):
+    """
+    Get an authorized Google Calendar service instance for a user.
+    
+    Credentials come from the in-memory credential store (never from disk
+    or an interactive flow on the request path).
+    
+    Raises:
+        CalendarAuthRequired: The user hasn't connected Google Calendar
+    """
+    return get_user_calendar_service(calendar_credentials.get(user_id))
 
-    return build('calendar', 'v3', credentials=creds)
+def _calendar_changed(user_id: Optional[str]) -> None:
+    """Have the next calendar read sync the user's calendar, so it includes the events just created."""
+    if user_id:
+        calendar_event_store.mark_stale(user_id)
 
 def schedule_workout(
+    user_id: str,
     title: str,
     start_time: str,  # ISO format string: "2024-03-20T09:00:00"
     duration_minutes: int,
@@ -48,6 +44,7 @@ def schedule_workout(
     Schedule a workout event in Google Calendar.
     
     Args:
+        user_id: The user's ID
         title: Event title
         start_time: ISO format datetime string
         duration_minutes: Duration in minutes
@@ -59,11 +56,11 @@ def schedule_workout(
         Dict containing event ID and status
     """
     try:
-        service = get_calendar_service()
+        service = get_calendar_service(user_id)
         
         # Parse start time and calculate end time
-        start_dt = datetime.fromisoformat(start_time)
-        end_dt = start_dt + timedelta(minutes=duration_minutes)
+        start_dt = datetime.datetime.fromisoformat(start_time)
+        end_dt = start_dt + datetime.timedelta(minutes=duration_minutes)
         
         event = {
             'summary': title,
@@ -100,6 +97,7 @@ def schedule_workout(
             calendarId='primary',
             body=event
         ).execute()
+        _calendar_changed(user_id)
         
         return {
             'status': 'success',
@@ -115,6 +113,7 @@ def schedule_workout(
         }
 
 def schedule_meal(
+    user_id: str,
     title: str,
     start_time: str,  # ISO format string
     duration_minutes: int = 30,
@@ -123,10 +122,10 @@ def schedule_meal(
 ) -> Dict[str, str]:
     """Schedule a meal event in Google Calendar."""
     try:
-        service = get_calendar_service()
+        service = get_calendar_service(user_id)
         
-        start_dt = datetime.fromisoformat(start_time)
-        end_dt = start_dt + timedelta(minutes=duration_minutes)
+        start_dt = datetime.datetime.fromisoformat(start_time)
+        end_dt = start_dt + datetime.timedelta(minutes=duration_minutes)
         
         event = {
             'summary': title,
@@ -154,6 +153,7 @@ def schedule_meal(
             calendarId='primary',
             body=event
         ).execute()
+        _calendar_changed(user_id)
         
         return {
             'status': 'success',
@@ -169,6 +169,7 @@ def schedule_meal(
         }
 
 def schedule_medication(
+    user_id: str,
     title: str,
     start_time: str,  # ISO format string
     dosage: str,
@@ -177,10 +178,10 @@ def schedule_medication(
 ) -> Dict[str, str]:
     """Schedule a medication reminder in Google Calendar."""
     try:
-        service = get_calendar_service()
+        service = get_calendar_service(user_id)
         
-        start_dt = datetime.fromisoformat(start_time)
-        end_dt = start_dt + timedelta(minutes=15)  # Default 15-min duration
+        start_dt = datetime.datetime.fromisoformat(start_time)
+        end_dt = start_dt + datetime.timedelta(minutes=15)  # Default 15-min duration
         
         description = (
             f"Medication: {title}\n"
@@ -215,6 +216,7 @@ def schedule_medication(
             calendarId='primary',
             body=event
         ).execute()
+        _calendar_changed(user_id)
         
         return {
             'status': 'success',
@@ -230,16 +232,17 @@ def schedule_medication(
         }
 
 def schedule_glucose_check(
+    user_id: str,
     start_time: str,  # ISO format string
     context: str = "Regular check",
     reminders: Optional[List[int]] = None
 ) -> Dict[str, str]:
     """Schedule a glucose check reminder in Google Calendar."""
     try:
-        service = get_calendar_service()
+        service = get_calendar_service(user_id)
         
-        start_dt = datetime.fromisoformat(start_time)
-        end_dt = start_dt + timedelta(minutes=5)  # Short duration for checks
+        start_dt = datetime.datetime.fromisoformat(start_time)
+        end_dt = start_dt + datetime.timedelta(minutes=5)  # Short duration for checks
         
         event = {
             'summary': "Glucose Check",
@@ -270,6 +273,7 @@ def schedule_glucose_check(
             calendarId='primary',
             body=event
         ).execute()
+        _calendar_changed(user_id)
         
         return {
             'status': 'success',
@@ -288,7 +292,8 @@ def create_workout_events(
     user_credentials: Dict[str, Any],
     exercise_plan: Dict[str, Any],
     start_date: Optional[str] = None,  # ISO format date string "YYYY-MM-DD"
-    calendar_id: str = "primary"
+    calendar_id: str = "primary",
+    user_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Create workout events in Google Calendar based on a fitness plan.
@@ -298,14 +303,14 @@ def create_workout_events(
         exercise_plan: Dictionary containing workout schedule information
         start_date: Optional start date in ISO format (YYYY-MM-DD)
         calendar_id: Calendar ID to create events in (default: primary calendar)
+        user_id: The user's ID, to refresh their synced calendar (optional)
         
     Returns:
         Dictionary containing operation result and created events
     """
     try:
         # Initialize the Calendar API client
-        credentials = Credentials.from_authorized_user_info(user_credentials)
-        service = build('calendar', 'v3', credentials=credentials)
+        service = get_user_calendar_service(user_credentials)
         
         # Set default start date to next Monday if not provided
         if not start_date:
@@ -326,6 +331,8 @@ def create_workout_events(
         
         created_events = []
         errors = []
+        # (workout, time string, event body) of the events to insert
+        pending = []
         
         # Get the weekly schedule from the exercise plan
         weekly_schedule = exercise_plan.get("weekly_schedule", [])
@@ -407,18 +414,7 @@ def create_workout_events(
                     'recurrence': ['RRULE:FREQ=WEEKLY;COUNT=4']  # Repeat for 4 weeks
                 }
                 
-                # Create the event in Google Calendar
-                created_event = service.events().insert(calendarId=calendar_id, body=event).execute()
-                
-                # Store created event details
-                created_events.append({
-                    "id": created_event.get('id'),
-                    "activity": activity,
-                    "day": day_name,
-                    "time": time_str,
-                    "summary": created_event.get('summary'),
-                    "start": created_event.get('start')
-                })
+                pending.append((workout, time_str, event))
                 
             except Exception as e:
                 errors.append({
@@ -427,6 +423,33 @@ def create_workout_events(
                     "error": str(e)
                 })
         
+        # Create all events in Google Calendar in one batch request
+        results = execute_batch(service, [
+            service.events().insert(calendarId=calendar_id, body=event) for _, _, event in pending
+        ])
+        for (workout, time_str, _), (created_event, error) in zip(pending, results):
+            if error:
+                errors.append({
+                    "day": workout.get("day"),
+                    "activity": workout.get("activity"),
+                    "error": error
+                })
+                continue
+            
+            # Store created event details; end and recurrence let the
+            # follow-up reminders be built without fetching the event again
+            created_events.append({
+                "id": created_event.get('id'),
+                "activity": workout.get("activity"),
+                "day": workout.get("day"),
+                "time": time_str,
+                "summary": created_event.get('summary'),
+                "start": created_event.get('start'),
+                "end": created_event.get('end'),
+                "recurrence": created_event.get('recurrence')
+            })
+        
+        _calendar_changed(user_id)
         return {
             "status": "success" if created_events else "error",
             "events_created": created_events,
@@ -440,10 +463,294 @@ def create_workout_events(
             "message": f"Failed to create workout schedule: {str(e)}"
         }
 
+def _parse_event_time(boundary: Dict[str, Any], default_time: datetime.time) -> datetime.datetime:
+    """Start or end of an event; all-day events fall back to default_time on their date."""
+    if 'dateTime' in boundary:
+        return datetime.datetime.fromisoformat(boundary['dateTime'].replace('Z', '+00:00'))
+    event_date = datetime.datetime.fromisoformat(boundary['date'])
+    return datetime.datetime.combine(event_date.date(), default_time)
+
+def _resolve_events(service: Any, events: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Start, end and recurrence of each event.
+    
+    Events returned by create_workout_events carry them already; the others
+    are fetched with one batch of events().get() requests.
+    
+    Returns:
+        The event resource per event, or a dict with an "error" key
+    """
+    resolved = [
+        event if event.get("start") and event.get("end") else None
+        for event in events
+    ]
+    missing = [index for index, event in enumerate(resolved) if event is None]
+    results = execute_batch(service, [
+        service.events().get(calendarId='primary', eventId=events[index].get("id")) for index in missing
+    ])
+    for index, (original_event, error) in zip(missing, results):
+        resolved[index] = original_event if not error else {"error": error}
+    return resolved
+
+def _logging_reminder_event(original_event: Dict[str, Any], event_id: str, activity: str, minutes_after: int) -> Dict[str, Any]:
+    """Calendar event reminding the user to log a workout after it ends."""
+    # For all-day events, use noon as a default time
+    original_end_time = _parse_event_time(original_event['end'], datetime.time(12, 0))
+    
+    # Calculate reminder timing
+    reminder_start_time = original_end_time + datetime.timedelta(minutes=minutes_after)
+    reminder_end_time = reminder_start_time + datetime.timedelta(minutes=5)  # Brief reminder
+    
+    # Create reminder title and description
+    title = f"Log your {activity} workout"
+    description = (
+        f"Time to log your {activity} workout!\n\n"
+        f"Please record:\n"
+        f"• Duration\n"
+        f"• Intensity level\n"
+        f"• Pre/post glucose levels (if measured)\n"
+        f"• How you felt during/after\n\n"
+        f"This helps improve your personalized fitness recommendations."
+    )
+    
+    reminder_event = {
+        'summary': f"📝 {title}",
+        'description': description,
+        'start': {
+            'dateTime': reminder_start_time.isoformat(),
+            'timeZone': original_event['start'].get('timeZone', 'America/New_York'),
+        },
+        'end': {
+            'dateTime': reminder_end_time.isoformat(),
+            'timeZone': original_event['end'].get('timeZone', 'America/New_York'),
+        },
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'popup', 'minutes': 0}  # Immediate notification
+            ]
+        },
+        'colorId': '11',  # Bold Red for logging reminders
+        # Link to parent event
+        'extendedProperties': {
+            'private': {
+                'parentEventId': event_id,
+                'isLoggingReminder': 'true',
+                'activityType': 'exercise'
+            }
+        }
+    }
+    
+    # Add recurrence if original event has it
+    if original_event.get('recurrence'):
+        reminder_event['recurrence'] = original_event['recurrence']
+    return reminder_event
+
+def _glucose_check_event(original_event: Dict[str, Any], event_id: str, activity: str, check_time: str) -> Optional[Dict[str, Any]]:
+    """
+    Calendar event reminding the user to check glucose around a workout.
+    
+    Returns:
+        The event body, or None for a "during" check of a workout shorter
+        than 45 minutes
+    """
+    # Determine when to check glucose based on the exercise timing
+    if check_time.lower() == "before":
+        # Schedule before exercise (15 min before start); for all-day events, use 7 AM
+        check_start_time = _parse_event_time(original_event['start'], datetime.time(7, 0))
+        if 'dateTime' in original_event['start']:
+            check_start_time -= datetime.timedelta(minutes=15)
+        
+        title_prefix = "Before"
+        description_guidance = "Check glucose 15 minutes before exercise to ensure safe levels. If below 90 mg/dL, consider having a small snack before starting."
+        
+    elif check_time.lower() == "after":
+        # Schedule after exercise (right after end); for all-day events, use 6 PM
+        check_start_time = _parse_event_time(original_event['end'], datetime.time(18, 0))
+        
+        title_prefix = "After"
+        description_guidance = "Check glucose immediately after exercise to monitor for post-exercise changes. Be aware that effects on glucose can continue for hours after activity."
+        
+    else:  # during - not normally used but included for completeness
+        # Schedule during extended exercise (midway through)
+        if 'dateTime' in original_event['start'] and 'dateTime' in original_event['end']:
+            exercise_start = _parse_event_time(original_event['start'], datetime.time(12, 0))
+            exercise_end = _parse_event_time(original_event['end'], datetime.time(12, 0))
+            exercise_duration = (exercise_end - exercise_start).total_seconds() / 60  # in minutes
+            
+            # Only add during-exercise check for longer workouts (45+ minutes)
+            if exercise_duration < 45:
+                return None
+            check_start_time = exercise_start + (exercise_end - exercise_start) / 2
+        else:
+            # For all-day events, use noon
+            check_start_time = _parse_event_time(original_event['start'], datetime.time(12, 0))
+        
+        title_prefix = "During"
+        description_guidance = "For longer exercise sessions, it's important to check glucose midway to prevent hypoglycemia. Pause briefly to check your levels."
+    
+    # Add 5 minutes for the end time
+    check_end_time = check_start_time + datetime.timedelta(minutes=5)
+    
+    # Create title and description
+    title = f"{title_prefix} {activity} - Glucose Check"
+    description = (
+        f"Time to check your glucose {check_time.lower()} your {activity} session.\n\n"
+        f"{description_guidance}\n\n"
+        f"Target range for exercise:\n"
+        f"• Before: 90-180 mg/dL\n"
+        f"• During/After: Monitor for drops below 70 mg/dL\n\n"
+        f"Remember to log this reading!"
+    )
+    
+    check_event = {
+        'summary': f"🩸 {title}",
+        'description': description,
+        'start': {
+            'dateTime': check_start_time.isoformat(),
+            'timeZone': original_event['start'].get('timeZone', 'America/New_York'),
+        },
+        'end': {
+            'dateTime': check_end_time.isoformat(),
+            'timeZone': original_event['end'].get('timeZone', 'America/New_York'),
+        },
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'popup', 'minutes': 0}  # Immediate notification
+            ]
+        },
+        'colorId': '6',  # Orange for glucose checks
+        # Link to parent event
+        'extendedProperties': {
+            'private': {
+                'parentEventId': event_id,
+                'isGlucoseCheck': 'true',
+                'checkTime': check_time.lower(),
+                'activityType': 'exercise'
+            }
+        }
+    }
+    
+    # Add recurrence if original event has it
+    if original_event.get('recurrence'):
+        check_event['recurrence'] = original_event['recurrence']
+    return check_event
+
+def _create_workout_follow_ups(
+    service: Any,
+    workout_events: List[Dict[str, Any]],
+    minutes_after: Optional[int],
+    check_times: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Create logging reminders and glucose checks for workout events in one batch.
+    
+    Args:
+        service: Calendar API service
+        workout_events: Created workout events with IDs
+        minutes_after: Minutes after each workout for its logging reminder (None: no reminders)
+        check_times: Glucose checks per workout (before, during, after)
+        
+    Returns:
+        Dictionary with "reminders_created", "checks_created" and "errors"
+    """
+    reminders, checks, errors = [], [], []
+    # (kind, parent event id, activity, check time, event body) per event to insert
+    pending = []
+    
+    for workout, original_event in zip(workout_events, _resolve_events(service, workout_events)):
+        event_id = workout.get("id")
+        activity = workout.get("activity", "workout")
+        if "error" in original_event:
+            errors.append({"event_id": event_id, "activity": activity, "error": original_event["error"]})
+            continue
+        try:
+            if minutes_after is not None:
+                pending.append(("reminder", event_id, activity, None,
+                                _logging_reminder_event(original_event, event_id, activity, minutes_after)))
+            for check_time in check_times:
+                check_event = _glucose_check_event(original_event, event_id, activity, check_time)
+                if check_event:
+                    pending.append(("check", event_id, activity, check_time.lower(), check_event))
+        except Exception as e:
+            errors.append({"event_id": event_id, "activity": activity, "error": str(e)})
+    
+    results = execute_batch(service, [
+        service.events().insert(calendarId='primary', body=body) for *_, body in pending
+    ])
+    for (kind, event_id, activity, check_time, _), (created, error) in zip(pending, results):
+        if error:
+            failed = {"event_id": event_id, "activity": activity, "error": error}
+            if check_time:
+                failed["check_time"] = check_time
+            errors.append(failed)
+        elif kind == "reminder":
+            reminders.append({
+                "id": created.get('id'),
+                "summary": created.get('summary'),
+                "parent_event_id": event_id,
+                "parent_activity": activity
+            })
+        else:
+            checks.append({
+                "id": created.get('id'),
+                "summary": created.get('summary'),
+                "parent_event_id": event_id,
+                "check_time": check_time,
+                "parent_activity": activity
+            })
+    return {"reminders_created": reminders, "checks_created": checks, "errors": errors}
+
+def create_workout_follow_ups(
+    user_credentials: Dict[str, Any],
+    workout_events: List[Dict[str, Any]],
+    minutes_after: int = 15,
+    check_times: List[str] = ["before", "after"],
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create logging reminders and glucose checks for workout events together.
+    
+    Equivalent to create_exercise_logging_reminders followed by
+    schedule_glucose_checks, in a single batch request.
+    
+    Args:
+        user_credentials: Google OAuth credentials for the user
+        workout_events: List of created workout events with IDs
+        minutes_after: Minutes after workout to schedule reminder (default: 15)
+        check_times: When to schedule checks (before, during, after)
+        user_id: The user's ID, to refresh their synced calendar (optional)
+        
+    Returns:
+        Dictionary containing operation result
+    """
+    try:
+        service = get_user_calendar_service(user_credentials)
+        
+        result = _create_workout_follow_ups(service, workout_events, minutes_after, check_times)
+        created = len(result["reminders_created"]) + len(result["checks_created"])
+        _calendar_changed(user_id)
+        return {
+            "status": "success" if created else "error",
+            **result,
+            "message": (
+                f"Created {len(result['reminders_created'])} exercise logging reminders "
+                f"and {len(result['checks_created'])} glucose check reminders"
+            )
+        }
+    
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to create workout follow-ups: {str(e)}"
+        }
+
 def create_exercise_logging_reminders(
     user_credentials: Dict[str, Any],
     workout_events: List[Dict[str, Any]],
-    minutes_after: int = 15
+    minutes_after: int = 15,
+    user_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Create follow-up logging reminders for each workout event.
@@ -452,107 +759,23 @@ def create_exercise_logging_reminders(
         user_credentials: Google OAuth credentials for the user
         workout_events: List of created workout events with IDs
         minutes_after: Minutes after workout to schedule reminder (default: 15)
+        user_id: The user's ID, to refresh their synced calendar (optional)
         
     Returns:
         Dictionary containing operation result
     """
     try:
         # Initialize the Calendar API client
-        credentials = Credentials.from_authorized_user_info(user_credentials)
-        service = build('calendar', 'v3', credentials=credentials)
+        service = get_user_calendar_service(user_credentials)
         
-        created_reminders = []
-        errors = []
-        
-        # Create a reminder for each workout event
-        for workout in workout_events:
-            try:
-                event_id = workout.get("id")
-                activity = workout.get("activity", "workout")
-                
-                # Get the original event to determine when to schedule the reminder
-                original_event = service.events().get(calendarId='primary', eventId=event_id).execute()
-                
-                # Determine end time of the original event
-                if 'dateTime' in original_event['end']:
-                    original_end_time = datetime.datetime.fromisoformat(
-                        original_event['end']['dateTime'].replace('Z', '+00:00')
-                    )
-                else:
-                    # For all-day events, use noon as a default time
-                    original_end_time = datetime.datetime.fromisoformat(original_event['end']['date'])
-                    original_end_time = datetime.datetime.combine(original_end_time.date(), datetime.time(12, 0))
-                
-                # Calculate reminder timing
-                reminder_start_time = original_end_time + datetime.timedelta(minutes=minutes_after)
-                reminder_end_time = reminder_start_time + datetime.timedelta(minutes=5)  # Brief reminder
-                
-                # Create reminder title and description
-                title = f"Log your {activity} workout"
-                description = (
-                    f"Time to log your {activity} workout!\n\n"
-                    f"Please record:\n"
-                    f"• Duration\n"
-                    f"• Intensity level\n"
-                    f"• Pre/post glucose levels (if measured)\n"
-                    f"• How you felt during/after\n\n"
-                    f"This helps improve your personalized fitness recommendations."
-                )
-                
-                # Create the reminder event
-                reminder_event = {
-                    'summary': f"📝 {title}",
-                    'description': description,
-                    'start': {
-                        'dateTime': reminder_start_time.isoformat(),
-                        'timeZone': original_event['start'].get('timeZone', 'America/New_York'),
-                    },
-                    'end': {
-                        'dateTime': reminder_end_time.isoformat(),
-                        'timeZone': original_event['end'].get('timeZone', 'America/New_York'),
-                    },
-                    'reminders': {
-                        'useDefault': False,
-                        'overrides': [
-                            {'method': 'popup', 'minutes': 0}  # Immediate notification
-                        ]
-                    },
-                    'colorId': '11',  # Bold Red for logging reminders
-                    # Link to parent event
-                    'extendedProperties': {
-                        'private': {
-                            'parentEventId': event_id,
-                            'isLoggingReminder': 'true',
-                            'activityType': 'exercise'
-                        }
-                    }
-                }
-                
-                # Add recurrence if original event has it
-                if 'recurrence' in original_event:
-                    reminder_event['recurrence'] = original_event['recurrence']
-                
-                # Create the event
-                created_reminder = service.events().insert(calendarId='primary', body=reminder_event).execute()
-                
-                created_reminders.append({
-                    "id": created_reminder.get('id'),
-                    "summary": created_reminder.get('summary'),
-                    "parent_event_id": event_id,
-                    "parent_activity": activity
-                })
-                
-            except Exception as e:
-                errors.append({
-                    "event_id": workout.get("id", "Unknown"),
-                    "activity": workout.get("activity", "Unknown"),
-                    "error": str(e)
-                })
+        result = _create_workout_follow_ups(service, workout_events, minutes_after, [])
+        created_reminders = result["reminders_created"]
         
+        _calendar_changed(user_id)
         return {
             "status": "success" if created_reminders else "error",
             "reminders_created": created_reminders,
-            "errors": errors,
+            "errors": result["errors"],
             "message": f"Created {len(created_reminders)} exercise logging reminders"
         }
     
@@ -565,7 +788,8 @@ def create_exercise_logging_reminders(
 def schedule_glucose_checks(
     user_credentials: Dict[str, Any],
     exercise_events: List[Dict[str, Any]],
-    check_times: List[str] = ["before", "after"]
+    check_times: List[str] = ["before", "after"],
+    user_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Schedule glucose check reminders around exercise events.
@@ -574,164 +798,23 @@ def schedule_glucose_checks(
         user_credentials: Google OAuth credentials for the user
         exercise_events: List of created exercise events with IDs
         check_times: When to schedule checks (before, during, after)
+        user_id: The user's ID, to refresh their synced calendar (optional)
         
     Returns:
         Dictionary containing operation result
     """
     try:
         # Initialize the Calendar API client
-        credentials = Credentials.from_authorized_user_info(user_credentials)
-        service = build('calendar', 'v3', credentials=credentials)
-        
-        created_checks = []
-        errors = []
+        service = get_user_calendar_service(user_credentials)
         
-        # Create glucose check reminders for each exercise event
-        for exercise in exercise_events:
-            try:
-                event_id = exercise.get("id")
-                activity = exercise.get("activity", "workout")
-                
-                # Get the original event details
-                original_event = service.events().get(calendarId='primary', eventId=event_id).execute()
-                
-                # Process each check time (before, after)
-                for check_time in check_times:
-                    try:
-                        # Determine when to check glucose based on the exercise timing
-                        if check_time.lower() == "before":
-                            # Schedule before exercise (15 min before start)
-                            if 'dateTime' in original_event['start']:
-                                exercise_start = datetime.datetime.fromisoformat(
-                                    original_event['start']['dateTime'].replace('Z', '+00:00')
-                                )
-                                check_start_time = exercise_start - datetime.timedelta(minutes=15)
-                            else:
-                                # For all-day events, use 7 AM
-                                exercise_date = datetime.datetime.fromisoformat(original_event['start']['date'])
-                                check_start_time = datetime.datetime.combine(exercise_date.date(), datetime.time(7, 0))
-                            
-                            title_prefix = "Before"
-                            description_guidance = "Check glucose 15 minutes before exercise to ensure safe levels. If below 90 mg/dL, consider having a small snack before starting."
-                            
-                        elif check_time.lower() == "after":
-                            # Schedule after exercise (right after end)
-                            if 'dateTime' in original_event['end']:
-                                exercise_end = datetime.datetime.fromisoformat(
-                                    original_event['end']['dateTime'].replace('Z', '+00:00')
-                                )
-                                check_start_time = exercise_end
-                            else:
-                                # For all-day events, use 6 PM
-                                exercise_date = datetime.datetime.fromisoformat(original_event['end']['date'])
-                                check_start_time = datetime.datetime.combine(exercise_date.date(), datetime.time(18, 0))
-                            
-                            title_prefix = "After"
-                            description_guidance = "Check glucose immediately after exercise to monitor for post-exercise changes. Be aware that effects on glucose can continue for hours after activity."
-                            
-                        else:  # during - not normally used but included for completeness
-                            # Schedule during extended exercise (midway through)
-                            if 'dateTime' in original_event['start'] and 'dateTime' in original_event['end']:
-                                exercise_start = datetime.datetime.fromisoformat(
-                                    original_event['start']['dateTime'].replace('Z', '+00:00')
-                                )
-                                exercise_end = datetime.datetime.fromisoformat(
-                                    original_event['end']['dateTime'].replace('Z', '+00:00')
-                                )
-                                exercise_duration = (exercise_end - exercise_start).total_seconds() / 60  # in minutes
-                                
-                                # Only add during-exercise check for longer workouts (45+ minutes)
-                                if exercise_duration >= 45:
-                                    midpoint = exercise_start + (exercise_end - exercise_start) / 2
-                                    check_start_time = midpoint
-                                else:
-                                    # Skip "during" checks for shorter exercises
-                                    continue
-                            else:
-                                # For all-day events, use noon
-                                exercise_date = datetime.datetime.fromisoformat(original_event['start']['date'])
-                                check_start_time = datetime.datetime.combine(exercise_date.date(), datetime.time(12, 0))
-                            
-                            title_prefix = "During"
-                            description_guidance = "For longer exercise sessions, it's important to check glucose midway to prevent hypoglycemia. Pause briefly to check your levels."
-                        
-                        # Add 5 minutes for the end time
-                        check_end_time = check_start_time + datetime.timedelta(minutes=5)
-                        
-                        # Create title and description
-                        title = f"{title_prefix} {activity} - Glucose Check"
-                        description = (
-                            f"Time to check your glucose {check_time.lower()} your {activity} session.\n\n"
-                            f"{description_guidance}\n\n"
-                            f"Target range for exercise:\n"
-                            f"• Before: 90-180 mg/dL\n"
-                            f"• During/After: Monitor for drops below 70 mg/dL\n\n"
-                            f"Remember to log this reading!"
-                        )
-                        
-                        # Create the reminder event
-                        check_event = {
-                            'summary': f"🩸 {title}",
-                            'description': description,
-                            'start': {
-                                'dateTime': check_start_time.isoformat(),
-                                'timeZone': original_event['start'].get('timeZone', 'America/New_York'),
-                            },
-                            'end': {
-                                'dateTime': check_end_time.isoformat(),
-                                'timeZone': original_event['end'].get('timeZone', 'America/New_York'),
-                            },
-                            'reminders': {
-                                'useDefault': False,
-                                'overrides': [
-                                    {'method': 'popup', 'minutes': 0}  # Immediate notification
-                                ]
-                            },
-                            'colorId': '6',  # Orange for glucose checks
-                            # Link to parent event
-                            'extendedProperties': {
-                                'private': {
-                                    'parentEventId': event_id,
-                                    'isGlucoseCheck': 'true',
-                                    'checkTime': check_time.lower(),
-                                    'activityType': 'exercise'
-                                }
-                            }
-                        }
-                        
-                        # Add recurrence if original event has it
-                        if 'recurrence' in original_event:
-                            check_event['recurrence'] = original_event['recurrence']
-                        
-                        # Create the event
-                        created_check = service.events().insert(calendarId='primary', body=check_event).execute()
-                        
-                        created_checks.append({
-                            "id": created_check.get('id'),
-                            "summary": created_check.get('summary'),
-                            "parent_event_id": event_id,
-                            "check_time": check_time.lower(),
-                            "parent_activity": activity
-                        })
-                    
-                    except Exception as e:
-                        errors.append({
-                            "event_id": event_id,
-                            "check_time": check_time,
-                            "error": str(e)
-                        })
-            
-            except Exception as e:
-                errors.append({
-                    "event_id": exercise.get("id", "Unknown"),
-                    "activity": exercise.get("activity", "Unknown"),
-                    "error": str(e)
-                })
+        result = _create_workout_follow_ups(service, exercise_events, None, check_times)
+        created_checks = result["checks_created"]
         
+        _calendar_changed(user_id)
         return {
             "status": "success" if created_checks else "error",
             "checks_created": created_checks,
-            "errors": errors,
+            "errors": result["errors"],
             "message": f"Created {len(created_checks)} glucose check reminders"
         }
     
@@ -751,7 +834,8 @@ def schedule_medication_reminder(
     end_date: Optional[datetime.date] = None,
     with_meals: bool = False,
     special_instructions: Optional[str] = None,
-    create_logging_reminders: bool = True
+    create_logging_reminders: bool = True,
+    user_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Sets up medication reminders in Google Calendar with follow-up logging prompts.
@@ -767,14 +851,14 @@ def schedule_medication_reminder(
         with_meals: Whether the medication should be taken with food
         special_instructions: Any additional instructions for taking the medication
         create_logging_reminders: Whether to create follow-up reminders to log medication
+        user_id: The user's ID, to refresh their synced calendar (optional)
         
     Returns:
         Confirmation of calendar events creation with event details
     """
     try:
         # Initialize the Calendar API client
-        credentials = Credentials.from_authorized_user_info(user_credentials)
-        service = build('calendar', 'v3', credentials=credentials)
+        service = get_user_calendar_service(user_credentials)
         
         # Set default start date to tomorrow if not provided
         if not start_date:
@@ -797,6 +881,8 @@ def schedule_medication_reminder(
         
         created_events = []
         errors = []
+        # (time string, event body) of the events to insert
+        pending = []
         
         # Create medication events for each time
         for time_str in times:
@@ -853,20 +939,7 @@ def schedule_medication_reminder(
                     'recurrence': [f'RRULE:FREQ={recurrence_pattern}']
                 }
                 
-                # Create the event in Google Calendar
-                created_event = service.events().insert(calendarId='primary', body=event).execute()
-                
-                # Store created event details
-                created_events.append({
-                    "id": created_event.get('id'),
-                    "medication": medication_name,
-                    "dosage": dosage,
-                    "time": time_str,
-                    "summary": created_event.get('summary'),
-                    "start": created_event.get('start'),
-                    "with_meals": with_meals,
-                    "special_instructions": special_instructions
-                })
+                pending.append((time_str, event))
                 
             except Exception as e:
                 errors.append({
@@ -875,92 +948,116 @@ def schedule_medication_reminder(
                     "error": str(e)
                 })
         
-        # Create logging reminders if requested
+        # Create all doses in Google Calendar in one batch request
+        results = execute_batch(service, [
+            service.events().insert(calendarId='primary', body=event) for _, event in pending
+        ])
+        original_events = {}
+        for (time_str, _), (created_event, error) in zip(pending, results):
+            if error:
+                errors.append({
+                    "time": time_str,
+                    "medication": medication_name,
+                    "error": error
+                })
+                continue
+            
+            # Store created event details
+            original_events[created_event.get('id')] = created_event
+            created_events.append({
+                "id": created_event.get('id'),
+                "medication": medication_name,
+                "dosage": dosage,
+                "time": time_str,
+                "summary": created_event.get('summary'),
+                "start": created_event.get('start'),
+                "with_meals": with_meals,
+                "special_instructions": special_instructions
+            })
+        
+        # Create logging reminders if requested, timed from the inserted
+        # events (no need to fetch them again), in a second batch request
         logging_reminders = []
         if create_logging_reminders and created_events:
+            reminder_bodies = []
             for event in created_events:
-                try:
-                    event_id = event.get("id")
-                    medication = event.get("medication")
-                    
-                    # Get the original event to determine when to schedule the logging reminder
-                    original_event = service.events().get(calendarId='primary', eventId=event_id).execute()
-                    
-                    # Determine end time of the original event
-                    if 'dateTime' in original_event['end']:
-                        original_end_time = datetime.datetime.fromisoformat(
-                            original_event['end']['dateTime'].replace('Z', '+00:00')
-                        )
-                    else:
-                        # For all-day events, use noon as a default time
-                        original_end_time = datetime.datetime.fromisoformat(original_event['end']['date'])
-                        original_end_time = datetime.datetime.combine(original_end_time.date(), datetime.time(12, 0))
-                    
-                    # Calculate reminder timing (15 minutes after medication time)
-                    reminder_start_time = original_end_time + datetime.timedelta(minutes=15)
-                    reminder_end_time = reminder_start_time + datetime.timedelta(minutes=5)  # Brief reminder
-                    
-                    # Create reminder title and description
-                    title = f"Log {medication} medication"
-                    description = (
-                        f"Time to log your {medication} medication!\n\n"
-                        f"Please record:\n"
-                        f"• Whether you took the full dose\n"
-                        f"• Any side effects experienced\n"
-                        f"• Current glucose level (if available)\n\n"
-                        f"This helps track your medication adherence and any patterns with side effects."
-                    )
-                    
-                    # Create the reminder event
-                    reminder_event = {
-                        'summary': f"📝 {title}",
-                        'description': description,
-                        'start': {
-                            'dateTime': reminder_start_time.isoformat(),
-                            'timeZone': original_event['start'].get('timeZone', 'America/New_York'),
-                        },
-                        'end': {
-                            'dateTime': reminder_end_time.isoformat(),
-                            'timeZone': original_event['end'].get('timeZone', 'America/New_York'),
-                        },
-                        'reminders': {
-                            'useDefault': False,
-                            'overrides': [
-                                {'method': 'popup', 'minutes': 0}  # Immediate notification
-                            ]
-                        },
-                        'colorId': '11',  # Bold Red for logging reminders
-                        # Link to parent event
-                        'extendedProperties': {
-                            'private': {
-                                'parentEventId': event_id,
-                                'isLoggingReminder': 'true',
-                                'activityType': 'medication'
-                            }
+                event_id = event.get("id")
+                medication = event.get("medication")
+                
+                # The inserted event determines when to schedule the logging reminder
+                original_event = original_events[event_id]
+                
+                # Determine end time of the original event (noon for all-day events)
+                original_end_time = _parse_event_time(original_event['end'], datetime.time(12, 0))
+                
+                # Calculate reminder timing (15 minutes after medication time)
+                reminder_start_time = original_end_time + datetime.timedelta(minutes=15)
+                reminder_end_time = reminder_start_time + datetime.timedelta(minutes=5)  # Brief reminder
+                
+                # Create reminder title and description
+                title = f"Log {medication} medication"
+                description = (
+                    f"Time to log your {medication} medication!\n\n"
+                    f"Please record:\n"
+                    f"• Whether you took the full dose\n"
+                    f"• Any side effects experienced\n"
+                    f"• Current glucose level (if available)\n\n"
+                    f"This helps track your medication adherence and any patterns with side effects."
+                )
+                
+                # Create the reminder event
+                reminder_event = {
+                    'summary': f"📝 {title}",
+                    'description': description,
+                    'start': {
+                        'dateTime': reminder_start_time.isoformat(),
+                        'timeZone': original_event['start'].get('timeZone', 'America/New_York'),
+                    },
+                    'end': {
+                        'dateTime': reminder_end_time.isoformat(),
+                        'timeZone': original_event['end'].get('timeZone', 'America/New_York'),
+                    },
+                    'reminders': {
+                        'useDefault': False,
+                        'overrides': [
+                            {'method': 'popup', 'minutes': 0}  # Immediate notification
+                        ]
+                    },
+                    'colorId': '11',  # Bold Red for logging reminders
+                    # Link to parent event
+                    'extendedProperties': {
+                        'private': {
+                            'parentEventId': event_id,
+                            'isLoggingReminder': 'true',
+                            'activityType': 'medication'
                         }
                     }
-                    
-                    # Add recurrence if original event has it
-                    if 'recurrence' in original_event:
-                        reminder_event['recurrence'] = original_event['recurrence']
-                    
-                    # Create the event
-                    created_reminder = service.events().insert(calendarId='primary', body=reminder_event).execute()
-                    
-                    logging_reminders.append({
-                        "id": created_reminder.get('id'),
-                        "summary": created_reminder.get('summary'),
-                        "parent_event_id": event_id,
-                        "parent_medication": medication
-                    })
-                    
-                except Exception as e:
+                }
+                
+                # Add recurrence if original event has it
+                if 'recurrence' in original_event:
+                    reminder_event['recurrence'] = original_event['recurrence']
+                reminder_bodies.append(reminder_event)
+            
+            results = execute_batch(service, [
+                service.events().insert(calendarId='primary', body=body) for body in reminder_bodies
+            ])
+            for event, (created_reminder, error) in zip(created_events, results):
+                if error:
                     errors.append({
                         "event_id": event.get("id", "Unknown"),
                         "medication": event.get("medication", "Unknown"),
-                        "error": f"Error creating logging reminder: {str(e)}"
+                        "error": f"Error creating logging reminder: {error}"
                     })
+                    continue
+                logging_reminders.append({
+                    "id": created_reminder.get('id'),
+                    "summary": created_reminder.get('summary'),
+                    "parent_event_id": event.get("id"),
+                    "parent_medication": event.get("medication")
+                })
         
+        _calendar_changed(user_id)
         return {
             "status": "success" if created_events else "error",
             "events_created": created_events,
@@ -0,0 +1,197 @@
+"""
+Cached Google Calendar API services.
+
+Building a Calendar client (Credentials.from_authorized_user_info plus
+discovery.build) parses the ~200 KB discovery document, generates the
+resource classes and allocates an HTTP object with its own connection, on
+every tool call. Services are kept per user instead, keyed by a fingerprint
+of the OAuth grant, and built from the discovery document that ships with
+google-api-python-client, parsed once per process.
+
+httplib2 connections aren't thread-safe, so a cached service sends its
+requests through ThreadLocalHttp: each thread gets its own connection over
+the grant's shared credentials. Threads that come and go (a fan-out's
+executor, a background calendar sync) reuse the service and only open a
+connection.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_SERVICE_CACHE_SIZE = int(os.getenv("CALENDAR_SERVICE_CACHE_SIZE", "256"))
+CALENDAR_HTTP_TIMEOUT = float(os.getenv("CALENDAR_HTTP_TIMEOUT", "10"))
+# Alternative root URL of the API (e.g. a local stand-in); empty uses Google's
+CALENDAR_API_ROOT_URL = os.getenv("CALENDAR_API_ROOT_URL", "")
+
+_discovery_document: Optional[Dict[str, Any]] = None
+_discovery_lock = threading.Lock()
+
+
+def calendar_discovery_document() -> Dict[str, Any]:
+    """The Calendar v3 discovery document bundled with the client library, parsed once."""
+    global _discovery_document
+    if _discovery_document is None:
+        with _discovery_lock:
+            if _discovery_document is None:
+                _discovery_document = json.loads(get_static_doc("calendar", "v3"))
+    return _discovery_document
+
+
+def credential_fingerprint(user_credentials: Dict[str, Any]) -> str:
+    """
+    Identify the OAuth grant behind a set of stored credentials.
+
+    The refresh token (not the short-lived access token) identifies the
+    grant, so a refreshed access token maps to the same service.
+    """
+    scopes = user_credentials.get("scopes") or []
+    if isinstance(scopes, str):
+        scopes = scopes.split()
+    key = "|".join([
+        user_credentials.get("client_id") or "",
+        user_credentials.get("refresh_token") or user_credentials.get("token") or "",
+        " ".join(sorted(scopes))
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _build_http(credentials: Credentials) -> google_auth_httplib2.AuthorizedHttp:
+    """Authorized HTTP object; it refreshes expired access tokens itself."""
+    return google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=CALENDAR_HTTP_TIMEOUT))
+
+
+class ThreadLocalHttp:
+    """
+    Authorized HTTP object shared by a service across threads, backed by one
+    AuthorizedHttp (and connection) per thread over the same credentials.
+
+    Args:
+        credentials: The user's OAuth credentials
+    """
+
+    def __init__(self, credentials: Credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    def _http(self) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = _build_http(self.credentials)
+        return http
+
+    def request(self, *args: Any, **kwargs: Any) -> Any:
+        return self._http().request(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (timeout, close, ...) from this thread's AuthorizedHttp
+        return getattr(self._http(), name)
+
+
+def build_calendar_service(credentials: Credentials, root_url: Optional[str] = None) -> Any:
+    """
+    Calendar v3 service from the bundled discovery document.
+
+    Args:
+        credentials: The user's OAuth credentials
+        root_url: API root URL (default: CALENDAR_API_ROOT_URL, else Google's);
+            single and batch requests both go there
+    """
+    document = calendar_discovery_document()
+    root_url = root_url or CALENDAR_API_ROOT_URL
+    if root_url:
+        document = {**document, "rootUrl": root_url.rstrip("/") + "/"}
+    return build_from_document(document, http=ThreadLocalHttp(credentials))
+
+
+@dataclass
+class CachedService:
+    service: Any
+    credentials: Credentials
+    # Access token of the stored credentials the service was built from
+    source_token: Optional[str]
+
+
+class CalendarServiceCache:
+    """
+    LRU cache of Calendar services per OAuth grant, shared by all threads.
+
+    When the stored credentials carry a different access token than the
+    one an entry was built from (refreshed elsewhere, e.g. by the credential
+    store), the token is swapped into the entry's credentials instead of
+    rebuilding the service. Tokens the cached credentials refresh themselves
+    stay in the entry, so the stale stored token keeps mapping to it. An
+    entry whose credentials can no longer be refreshed is rebuilt.
+
+    Args:
+        max_entries: Services to keep before evicting the least recently used
+    """
+
+    def __init__(self, max_entries: int = CALENDAR_SERVICE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CachedService]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, user_credentials: Dict[str, Any]) -> Any:
+        """Calendar service for a user's stored credentials."""
+        key = credential_fingerprint(user_credentials)
+        source_token = user_credentials.get("token")
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and source_token != entry.source_token and source_token:
+                # Same grant with a newer access token (refreshed by the
+                # credential store): swap it into the cached credentials
+                refreshed = Credentials.from_authorized_user_info(user_credentials)
+                entry.credentials.token = refreshed.token
+                entry.credentials.expiry = refreshed.expiry
+                entry.source_token = source_token
+            if entry is not None and self._usable(entry):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry.service
+
+        credentials = Credentials.from_authorized_user_info(user_credentials)
+        entry = CachedService(build_calendar_service(credentials), credentials, source_token)
+        with self.lock:
+            self.builds += 1
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry.service
+
+    @staticmethod
+    def _usable(entry: CachedService) -> bool:
+        credentials = entry.credentials
+        return credentials.valid or bool(credentials.refresh_token)
+
+    def invalidate(self, user_credentials: Optional[Dict[str, Any]] = None) -> None:
+        """Drop a user's service (e.g. after the grant was revoked), or all of them."""
+        with self.lock:
+            if user_credentials is None:
+                self.entries.clear()
+                return
+            self.entries.pop(credential_fingerprint(user_credentials), None)
+
+
+calendar_services = CalendarServiceCache()
+
+
+def get_user_calendar_service(user_credentials: Dict[str, Any]) -> Any:
+    """Cached Calendar service for a user's stored Google OAuth credentials."""
+    return calendar_services.get(user_credentials)
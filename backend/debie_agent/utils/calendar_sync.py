@@ -0,0 +1,413 @@
+"""
+Incremental sync of users' Google Calendars into calendar_events.
+
+Listing a calendar window from Google on every context build costs a full
+API round trip (plus one per page) and returns the same events each time.
+Instead each user's calendar is copied into calendar_events once, and then
+kept current with Google's incremental sync:
+
+- the first (full) sync lists the calendar from CALENDAR_SYNC_BACKFILL_DAYS
+  back and keeps the nextSyncToken in calendar_sync_cursors
+- later syncs pass that token and receive only the events changed since,
+  deletions included; a token Google no longer accepts (410 Gone) makes
+  the next sync a full one again
+- a full sync writes the listing over the stored rows and only then drops
+  the rows it didn't write, so the stored calendar is never empty meanwhile
+- events are stored as Google returns them (recurring series unexpanded,
+  see recurrence.py), classified with helpers.categorize_event when written
+
+Calendar context is then an indexed read of the user's rows overlapping a
+window. A sync runs at most every CALENDAR_SYNC_INTERVAL_SECONDS per user,
+in a background thread, so a context build only waits for one on a user's
+first read in the process, or on its first read after the agent changed
+the calendar (CalendarEventStore.mark_stale).
+
+The process-wide store is calendar_event_store, shared by the calendar
+tools; like calendar_credentials it connects to Supabase on first use.
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from .calendar_auth import CalendarAuthRequired, CalendarCredentialStore, calendar_credentials, supabase_client_from_env
+from .calendar_service import get_user_calendar_service
+from .helpers import categorize_event
+from .recurrence import expand_events, parse_event_time, series_end
+
+logger = logging.getLogger(__name__)
+
+# Minimum time between two syncs of a user's calendar
+CALENDAR_SYNC_INTERVAL_SECONDS = float(os.getenv("CALENDAR_SYNC_INTERVAL_SECONDS", "300"))
+# How far back the first (full) sync copies events
+CALENDAR_SYNC_BACKFILL_DAYS = int(os.getenv("CALENDAR_SYNC_BACKFILL_DAYS", "30"))
+# Events per page of events.list (the API allows at most 2500)
+CALENDAR_SYNC_PAGE_SIZE = min(int(os.getenv("CALENDAR_SYNC_PAGE_SIZE", "250")), 2500)
+# Rows per upsert request
+CALENDAR_EVENT_WRITE_CHUNK = 500
+# Rows per page of a window read; PostgREST caps responses at 1000 rows
+CALENDAR_EVENT_READ_LIMIT = 1000
+# Series ids per query for their modified instances (keeps the URL short)
+CALENDAR_SERIES_CHUNK = 100
+
+EVENT_COLUMNS = "event_id, category, starts_at, event"
+
+
+class SyncTokenExpired(Exception):
+    """Google no longer accepts the stored sync token; a full sync is required."""
+
+
+@dataclass
+class CalendarChanges:
+    """What one events.list pass returned."""
+    # Event ID -> latest version of the event (cancelled ones included)
+    events: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    next_sync_token: Optional[str] = None
+    requests: int = 0
+
+
+def list_changes(
+    service: Any,
+    calendar_id: str,
+    sync_token: Optional[str],
+    time_min: Optional[datetime.datetime] = None,
+    page_size: int = CALENDAR_SYNC_PAGE_SIZE
+) -> CalendarChanges:
+    """
+    Page through events.list: the events changed since sync_token, or the
+    whole calendar from time_min when there is no token.
+
+    Raises:
+        SyncTokenExpired: Google answered 410 Gone to the sync token
+    """
+    changes = CalendarChanges()
+    params: Dict[str, Any] = {"calendarId": calendar_id, "maxResults": page_size, "singleEvents": False}
+    if sync_token:
+        # Google rejects timeMin/orderBy together with a sync token
+        params["syncToken"] = sync_token
+    elif time_min is not None:
+        params["timeMin"] = time_min.astimezone(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+
+    page_token = None
+    while True:
+        try:
+            page = service.events().list(**params, pageToken=page_token).execute()
+        except HttpError as e:
+            if sync_token and e.resp.status == 410:
+                raise SyncTokenExpired(str(e)) from e
+            raise
+        changes.requests += 1
+        for event in page.get("items", []):
+            changes.events[event["id"]] = event
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            changes.next_sync_token = page.get("nextSyncToken")
+            return changes
+
+
+def _utc(value: datetime.datetime) -> str:
+    return value.astimezone(datetime.timezone.utc).isoformat()
+
+
+def event_row(user_id: str, calendar_id: str, event: Dict[str, Any], now: str) -> Dict[str, Any]:
+    """
+    calendar_events row of an event (or of a cancelled instance of a series).
+
+    The row spans the event from its (first) start to the end of its (last)
+    occurrence, so window reads find series by range.
+    """
+    moment = event.get("start") or event["originalStartTime"]
+    starts_at, all_day = parse_event_time(moment)
+    if event.get("start"):
+        ends_at = series_end(event)
+    else:
+        # Cancelled instances only carry the time they used to start at
+        ends_at = starts_at
+    return {
+        "user_id": user_id,
+        "calendar_id": calendar_id,
+        "event_id": event["id"],
+        "recurring_event_id": event.get("recurringEventId"),
+        "status": event.get("status", "confirmed"),
+        "summary": event.get("summary"),
+        "category": categorize_event(event.get("summary") or ""),
+        "all_day": all_day,
+        "starts_at": _utc(starts_at),
+        "ends_at": _utc(ends_at) if ends_at else None,
+        "event_updated_at": event.get("updated"),
+        "event": event,
+        "updated_at": now
+    }
+
+
+class CalendarEventStore:
+    """
+    Users' Google Calendar events, synced into calendar_events and read from there.
+
+    Args:
+        client: Supabase client for calendar_events and calendar_sync_cursors
+            (default: one from SUPABASE_URL/SUPABASE_KEY, created on first use)
+        credentials: Store of the users' Google Calendar credentials
+        calendar_id: Calendar to sync (default: the user's primary calendar)
+        sync_interval: Seconds before a user's synced calendar is refreshed
+        backfill_days: How far back a full sync starts
+        service_for: Calendar service for a user's credentials
+            (default: the cached services of calendar_service)
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        credentials: CalendarCredentialStore = calendar_credentials,
+        calendar_id: str = "primary",
+        sync_interval: float = CALENDAR_SYNC_INTERVAL_SECONDS,
+        backfill_days: int = CALENDAR_SYNC_BACKFILL_DAYS,
+        service_for: Callable[[Dict[str, Any]], Any] = get_user_calendar_service
+    ):
+        self._client = client
+        self.credentials = credentials
+        self.calendar_id = calendar_id
+        self.sync_interval = sync_interval
+        self.backfill_days = backfill_days
+        self.service_for = service_for
+        # user_id -> monotonic time of the last sync attempt in this process
+        self._synced_at: Dict[str, float] = {}
+        self._user_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = supabase_client_from_env()
+        return self._client
+
+    @client.setter
+    def client(self, client: Any) -> None:
+        self._client = client
+
+    def sync(self, user_id: str) -> Dict[str, Any]:
+        """
+        Apply the changes in a user's calendar since the last sync (blocking).
+
+        Returns:
+            Dictionary with status, events written/deleted, whether it was a
+            full sync and the API requests it took
+        """
+        with self._user_lock(user_id):
+            return self._sync(user_id)
+
+    def refresh(self, user_id: str) -> None:
+        """
+        Make sure a user's calendar has been synced recently.
+
+        The first call for a user in the process waits for the sync; later
+        ones start it in the background once the data is older than
+        sync_interval and read what is stored meanwhile.
+        """
+        with self._lock:
+            synced_at = self._synced_at.get(user_id)
+            stale = synced_at is not None and time.monotonic() - synced_at >= self.sync_interval
+            if stale:
+                # Claimed here, so concurrent reads don't start more syncs
+                self._synced_at[user_id] = time.monotonic()
+        if synced_at is None:
+            self.sync(user_id)
+        elif stale:
+            threading.Thread(target=self._sync_in_background, args=(user_id,), name="calendar-sync", daemon=True).start()
+
+    def mark_stale(self, user_id: str) -> None:
+        """Have the next read wait for a sync of a user's calendar (e.g. after creating events in it)."""
+        with self._lock:
+            self._synced_at.pop(user_id, None)
+
+    def events(self, user_id: str, start: datetime.datetime, end: datetime.datetime) -> List[Dict[str, Any]]:
+        """
+        Stored events overlapping [start, end): single events, the recurring
+        series with occurrences in it and all of the series' modified
+        instances. Instances are stored at their current time, so one moved
+        out of the window is only found through its series; without it the
+        occurrence would be expanded at its original time.
+
+        Returns:
+            Event resources, each with its stored "category"
+        """
+        rows = self._read(user_id, lambda query: query
+                          .lt("starts_at", _utc(end))
+                          .or_(f"ends_at.is.null,ends_at.gte.{_utc(start)}"))
+        series_ids = [row["event_id"] for row in rows if row["event"].get("recurrence")]
+        seen = {row["event_id"] for row in rows}
+        for offset in range(0, len(series_ids), CALENDAR_SERIES_CHUNK):
+            chunk = series_ids[offset:offset + CALENDAR_SERIES_CHUNK]
+            for row in self._read(user_id, lambda query: query.in_("recurring_event_id", chunk)):
+                if row["event_id"] not in seen:
+                    seen.add(row["event_id"])
+                    rows.append(row)
+        return [{**row["event"], "category": row["category"]} for row in rows]
+
+    def upcoming(self, user_id: str, hours: float = 24, now: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
+        """
+        A user's event occurrences in the next `hours` hours, recurring
+        series expanded, from the synced copy of their calendar.
+
+        Returns:
+            List of events with id, summary, start, end, category,
+            description and location, in start order
+        """
+        self.refresh(user_id)
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        end = now + datetime.timedelta(hours=hours)
+        occurrences = expand_events(self.events(user_id, now, end), now, end)
+        upcoming = []
+        for occurrence in occurrences:
+            event = occurrence.to_event()
+            upcoming.append({
+                "id": event["id"],
+                "summary": event.get("summary", ""),
+                "start": event["start"].get("dateTime", event["start"].get("date")),
+                "end": event["end"].get("dateTime", event["end"].get("date")),
+                "category": event["category"],
+                "description": event.get("description", ""),
+                "location": event.get("location", "")
+            })
+        return upcoming
+
+    def _read(self, user_id: str, filters: Callable[[Any], Any]) -> List[Dict[str, Any]]:
+        """All of the user's rows matching filters, in pages keyed by (starts_at, event_id)."""
+        rows: List[Dict[str, Any]] = []
+        while True:
+            query = filters(self.client.table("calendar_events")
+                            .select(EVENT_COLUMNS)
+                            .eq("user_id", user_id)
+                            .eq("calendar_id", self.calendar_id))
+            if rows:
+                last = rows[-1]
+                query = query.or_(
+                    f'starts_at.gt."{last["starts_at"]}",'
+                    f'and(starts_at.eq."{last["starts_at"]}",event_id.gt."{last["event_id"]}")'
+                )
+            page = query \
+                .order("starts_at") \
+                .order("event_id") \
+                .limit(CALENDAR_EVENT_READ_LIMIT) \
+                .execute() \
+                .data
+            rows.extend(page)
+            if len(page) < CALENDAR_EVENT_READ_LIMIT:
+                return rows
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def _sync_in_background(self, user_id: str) -> None:
+        lock = self._user_lock(user_id)
+        # A sync of this user is already running
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            self._sync(user_id)
+        finally:
+            lock.release()
+
+    def _sync(self, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            self._synced_at[user_id] = time.monotonic()
+        try:
+            service = self.service_for(self.credentials.get(user_id))
+            sync_token = self._sync_token(user_id)
+            full = sync_token is None
+            try:
+                changes = list_changes(service, self.calendar_id, sync_token, self._backfill_start())
+            except SyncTokenExpired:
+                logger.info(f"Calendar sync token of {user_id} expired, running a full sync")
+                full = True
+                changes = list_changes(service, self.calendar_id, None, self._backfill_start())
+            written, deleted = self._apply(user_id, changes, replace=full)
+            self._save_cursor(user_id, {"sync_token": changes.next_sync_token, "last_error": None})
+            return {
+                "status": "success",
+                "written": written,
+                "deleted": deleted,
+                "full_sync": full,
+                "requests": changes.requests
+            }
+        except CalendarAuthRequired as e:
+            # Not connected: nothing to sync until the user connects their calendar
+            return {"status": "error", "message": str(e)}
+        except Exception as e:
+            logger.warning(f"Calendar sync of user {user_id} failed: {str(e)}")
+            try:
+                self._save_cursor(user_id, {"last_error": str(e)[:1000]})
+            except Exception as record_error:
+                logger.error(f"Could not record the calendar sync failure of user {user_id}: {str(record_error)}")
+            return {"status": "error", "message": str(e)}
+
+    def _backfill_start(self) -> datetime.datetime:
+        return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=self.backfill_days)
+
+    def _sync_token(self, user_id: str) -> Optional[str]:
+        rows = self.client.table("calendar_sync_cursors") \
+            .select("sync_token") \
+            .eq("user_id", user_id) \
+            .eq("calendar_id", self.calendar_id) \
+            .limit(1) \
+            .execute() \
+            .data
+        return rows[0].get("sync_token") if rows else None
+
+    def _apply(self, user_id: str, changes: CalendarChanges, replace: bool) -> Tuple[int, int]:
+        """
+        Write the changed events; a full sync replaces the user's stored events.
+
+        Every written row gets this run's updated_at, so after a full sync
+        the rows with an older one are the events Google no longer lists.
+
+        Returns:
+            (rows written, events deleted)
+        """
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        rows, deleted_ids = [], []
+        for event_id, event in changes.events.items():
+            # A cancelled series or single event is gone; a cancelled instance
+            # is kept, it removes that occurrence from the series
+            if event.get("status") == "cancelled" and not event.get("recurringEventId"):
+                deleted_ids.append(event_id)
+            else:
+                rows.append(event_row(user_id, self.calendar_id, event, now))
+
+        for offset in range(0, len(rows), CALENDAR_EVENT_WRITE_CHUNK):
+            self.client.table("calendar_events") \
+                .upsert(rows[offset:offset + CALENDAR_EVENT_WRITE_CHUNK], on_conflict="user_id,calendar_id,event_id") \
+                .execute()
+        if replace:
+            # Written last: a failed sync leaves the previous copy in place
+            self._delete_events(user_id).lt("updated_at", now).execute()
+        elif deleted_ids:
+            self._delete_events(user_id).in_("event_id", deleted_ids).execute()
+            # Modified and cancelled instances of deleted series
+            self._delete_events(user_id).in_("recurring_event_id", deleted_ids).execute()
+        return len(rows), len(deleted_ids)
+
+    def _delete_events(self, user_id: str) -> Any:
+        return self.client.table("calendar_events").delete() \
+            .eq("user_id", user_id) \
+            .eq("calendar_id", self.calendar_id)
+
+    def _save_cursor(self, user_id: str, values: Dict[str, Any]) -> None:
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        row = {"user_id": user_id, "calendar_id": self.calendar_id, "updated_at": now, **values}
+        if "sync_token" in values:
+            row["last_synced_at"] = now
+        self.client.table("calendar_sync_cursors").upsert(row, on_conflict="user_id,calendar_id").execute()
+
+
+# Process-wide store shared by the calendar tools
+calendar_event_store = CalendarEventStore()
@@ -0,0 +1,273 @@
+"""
+Event/glucose alignment index.
+
+Lines up logged events (meals, exercise sessions, medication doses) with the
+glucose readings that follow them. Event windows are located with
+``searchsorted`` on the sorted glucose timestamps (O(log n) per event) and
+the per-window statistics are computed for all events at once with
+``reduceat`` and prefix sums, so the work grows with the readings inside
+the windows rather than with events x readings.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .glucose_metrics import GlucoseSeries, LOW_THRESHOLD, parse_timestamps
+
+# Post-event window analyzed for every event
+DEFAULT_WINDOW_SECONDS = 4 * 3600
+# A baseline reading must be at most this long before the event
+DEFAULT_BASELINE_SECONDS = 30 * 60
+# Readings further than this from a checkpoint (e.g. +2h) are not used for it
+CHECKPOINT_TOLERANCE_SECONDS = 15 * 60
+# Checkpoints after the event for time-lag effects
+DEFAULT_CHECKPOINTS_SECONDS = (3600, 2 * 3600, 4 * 3600)
+
+
+@dataclass
+class EventResponses:
+    """
+    Glucose response of every event, as arrays aligned with the event order.
+
+    Values are NaN where the event has no usable baseline or readings.
+    """
+    event_times: np.ndarray
+    baseline: np.ndarray
+    peak: np.ndarray
+    nadir: np.ndarray
+    mean: np.ndarray
+    readings: np.ndarray
+    time_to_peak_minutes: np.ndarray
+    checkpoints: Dict[int, np.ndarray]
+
+    @property
+    def peak_delta(self) -> np.ndarray:
+        return self.peak - self.baseline
+
+    @property
+    def nadir_delta(self) -> np.ndarray:
+        return self.nadir - self.baseline
+
+    def checkpoint_delta(self, seconds: int) -> np.ndarray:
+        return self.checkpoints[seconds] - self.baseline
+
+    @property
+    def usable(self) -> np.ndarray:
+        """Events with both a baseline and at least one reading in the window."""
+        return ~np.isnan(self.baseline) & (self.readings > 0)
+
+
+class EventAlignmentIndex:
+    """
+    Index over a glucose series for looking up post-event windows.
+
+    Args:
+        series: Glucose readings
+        window_seconds: Length of the post-event window
+        baseline_seconds: Maximum age of the pre-event baseline reading
+    """
+
+    def __init__(
+        self,
+        series: GlucoseSeries,
+        window_seconds: int = DEFAULT_WINDOW_SECONDS,
+        baseline_seconds: int = DEFAULT_BASELINE_SECONDS
+    ):
+        self.series = series
+        self.window_seconds = window_seconds
+        self.baseline_seconds = baseline_seconds
+        # Prefix sums give every window's mean in O(1)
+        self._prefix = np.concatenate(([0.0], np.cumsum(series.values)))
+
+    def windows(self, event_times: np.ndarray) -> np.ndarray:
+        """
+        Index range of the readings in each event's window.
+
+        Returns:
+            Array of shape (n_events, 2) with [start, end) reading indices
+            for event_time < reading_timestamp <= event_time + window
+        """
+        timestamps = self.series.timestamps
+        starts = np.searchsorted(timestamps, event_times, side="right")
+        ends = np.searchsorted(timestamps, event_times + self.window_seconds, side="right")
+        return np.stack((starts, ends), axis=1)
+
+    def baseline(self, event_times: np.ndarray) -> np.ndarray:
+        """Last reading at or before each event, NaN if older than baseline_seconds."""
+        timestamps = self.series.timestamps
+        if timestamps.size == 0:
+            return np.full(event_times.shape, np.nan)
+        index = np.searchsorted(timestamps, event_times, side="right") - 1
+        valid = index >= 0
+        index = np.clip(index, 0, None)
+        valid &= event_times - timestamps[index] <= self.baseline_seconds
+        return np.where(valid, self.series.values[index], np.nan)
+
+    def value_at(self, times: np.ndarray, tolerance_seconds: int = CHECKPOINT_TOLERANCE_SECONDS) -> np.ndarray:
+        """Reading nearest to each time, NaN if none lies within tolerance_seconds."""
+        timestamps = self.series.timestamps
+        if timestamps.size == 0:
+            return np.full(times.shape, np.nan)
+        right = np.clip(np.searchsorted(timestamps, times, side="left"), 0, timestamps.size - 1)
+        left = np.clip(right - 1, 0, None)
+        use_left = np.abs(times - timestamps[left]) < np.abs(timestamps[right] - times)
+        nearest = np.where(use_left, left, right)
+        return np.where(np.abs(timestamps[nearest] - times) <= tolerance_seconds, self.series.values[nearest], np.nan)
+
+    def responses(
+        self,
+        event_times: np.ndarray,
+        checkpoints: Sequence[int] = DEFAULT_CHECKPOINTS_SECONDS
+    ) -> EventResponses:
+        """
+        Glucose response of every event in one batch.
+
+        Args:
+            event_times: Event epoch seconds (any order)
+            checkpoints: Offsets (seconds) at which to sample the glucose value
+
+        Returns:
+            EventResponses with baseline, peak, nadir, mean, reading count,
+            time to peak and checkpoint values per event
+        """
+        event_times = np.asarray(event_times, dtype=np.int64)
+        bounds = self.windows(event_times)
+        starts, ends = bounds[:, 0], bounds[:, 1]
+        counts = ends - starts
+        has_readings = counts > 0
+
+        values = self.series.values
+        peak = np.full(event_times.shape, np.nan)
+        nadir = np.full(event_times.shape, np.nan)
+        peak_index = np.zeros(event_times.shape, dtype=np.int64)
+        if has_readings.any():
+            # reduceat over interleaved [start, end) pairs; a sentinel keeps
+            # every index in bounds and the odd (between-window) results are dropped
+            padded = np.append(values, np.nan)
+            pairs = np.stack((starts[has_readings], ends[has_readings]), axis=1).ravel()
+            peak[has_readings] = np.maximum.reduceat(padded, pairs)[::2]
+            nadir[has_readings] = np.minimum.reduceat(padded, pairs)[::2]
+            peak_index[has_readings] = self._first_index_of(peak[has_readings], starts[has_readings], ends[has_readings])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(has_readings, (self._prefix[ends] - self._prefix[starts]) / counts, np.nan)
+
+        timestamps = self.series.timestamps
+        time_to_peak = np.full(event_times.shape, np.nan)
+        if has_readings.any():
+            time_to_peak[has_readings] = (timestamps[peak_index[has_readings]] - event_times[has_readings]) / 60
+
+        return EventResponses(
+            event_times=event_times,
+            baseline=self.baseline(event_times),
+            peak=peak,
+            nadir=nadir,
+            mean=mean,
+            readings=counts,
+            time_to_peak_minutes=time_to_peak,
+            checkpoints={offset: self.value_at(event_times + offset) for offset in checkpoints}
+        )
+
+    def _first_index_of(self, targets: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """First reading index in each [start, end) range whose value equals its target."""
+        values = self.series.values
+        # Mark matches per window by expanding the (short) windows once
+        lengths = ends - starts
+        window_ids = np.repeat(np.arange(starts.size), lengths)
+        positions = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+        matches = values[positions] == targets[window_ids]
+        # Matches are ordered by window then position, so the first per window wins
+        _, first = np.unique(window_ids[matches], return_index=True)
+        return positions[matches][first]
+
+
+def event_times(events: List[Dict[str, Any]], timestamp_key: str = "log_timestamp") -> np.ndarray:
+    """Epoch seconds of a list of log rows (rows without a timestamp are dropped by the caller)."""
+    return parse_timestamps(event[timestamp_key] for event in events)
+
+
+def numeric_column(events: List[Dict[str, Any]], key: str) -> np.ndarray:
+    """A numeric field of every row as float64, NaN where missing or not numeric."""
+    column = np.full(len(events), np.nan)
+    for i, event in enumerate(events):
+        try:
+            column[i] = float(event.get(key))
+        except (TypeError, ValueError):
+            pass
+    return column
+
+
+def pearson_correlation(x: np.ndarray, y: np.ndarray) -> Dict[str, Optional[float]]:
+    """
+    Pearson correlation of two arrays, ignoring pairs with a NaN.
+
+    The two-sided p-value uses the Fisher z approximation.
+
+    Returns:
+        Dictionary with r, n and p_value (None when n < 4 or a side is constant)
+    """
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[mask], y[mask]
+    n = int(x.size)
+    if n < 4 or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return {"r": None, "n": n, "p_value": None}
+    r = float(np.corrcoef(x, y)[0, 1])
+    r = max(min(r, 0.999999), -0.999999)
+    z = math.atanh(r) * math.sqrt(n - 3)
+    return {"r": round(r, 3), "n": n, "p_value": round(math.erfc(abs(z) / math.sqrt(2)), 4)}
+
+
+def grouped_summary(labels: Sequence[str], values: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Mean, median and count of values per label, ignoring NaN values.
+
+    Returns:
+        One entry per label, ordered by count (descending)
+    """
+    labels = np.asarray(labels, dtype=object)
+    mask = ~np.isnan(values)
+    if not mask.any():
+        return []
+    names, groups = np.unique(labels[mask].astype(str), return_inverse=True)
+    values = values[mask]
+    counts = np.bincount(groups, minlength=names.size)
+    means = np.bincount(groups, weights=values, minlength=names.size) / counts
+    # Medians from one sort of the (group, value) pairs
+    order = np.lexsort((values, groups))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sorted_values = values[order]
+    medians = (sorted_values[starts + (counts - 1) // 2] + sorted_values[starts + counts // 2]) / 2
+    summary = [
+        {"label": str(name), "count": int(count), "mean": round(float(mean), 1), "median": round(float(median), 1)}
+        for name, count, mean, median in zip(names, counts, means, medians)
+    ]
+    summary.sort(key=lambda entry: entry["count"], reverse=True)
+    return summary
+
+
+def share_below(values: np.ndarray, threshold: float = LOW_THRESHOLD) -> Optional[float]:
+    """Percentage of non-NaN values below threshold."""
+    values = values[~np.isnan(values)]
+    return round(float(np.mean(values < threshold)) * 100, 1) if values.size else None
+
+
+def event_rows(data: Any, timestamp_key: str = "log_timestamp") -> List[Dict[str, Any]]:
+    """
+    Log rows as passed to the agent tools, keeping only rows with a timestamp.
+
+    Accepts either a list of rows or a reader result ({"data": [...]}).
+    """
+    if isinstance(data, dict):
+        data = data.get("data", [])
+    return [row for row in (data or []) if isinstance(row, dict) and row.get(timestamp_key)]
+
+
+def row_label(row: Dict[str, Any], key: str, embedded_table: str, embedded_key: str, default: str = "Unspecified") -> str:
+    """A row's label from a flat field or from its embedded lookup-table join."""
+    label = row.get(key)
+    if not label and isinstance(row.get(embedded_table), dict):
+        label = row[embedded_table].get(embedded_key)
+    return str(label) if label else default
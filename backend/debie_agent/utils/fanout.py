@@ -0,0 +1,113 @@
+"""
+Concurrent fan-out helper for the DiaBeatThis agent tools.
+
+The Supabase and Fitbit clients used by the tools are blocking, so independent
+fetches are dispatched on a bounded thread pool and collected per source.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of fetches in flight at once for a single fan-out
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("DEBIE_FANOUT_CONCURRENCY", "8"))
+
+
+class FanOut:
+    """
+    Runs named, independent fetches concurrently under a concurrency limit.
+
+    Each fetch is registered under a source name. A source fails when its
+    callable raises or returns a tool-style ``{"status": "error"}`` dictionary;
+    failures are collected per source instead of aborting the whole fan-out.
+
+    Usage:
+        with FanOut(max_concurrency=8) as fan_out:
+            fan_out.submit("glucose", get_glucose_readings, user_id)
+            fan_out.submit("food", get_food_logs, user_id)
+            outcome = fan_out.gather()
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max(1, max_concurrency or DEFAULT_MAX_CONCURRENCY)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="debie-fanout"
+        )
+        self._futures: Dict[str, Future] = {}
+        self._timings: Dict[str, float] = {}
+
+    def __enter__(self) -> "FanOut":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the worker threads once every submitted fetch has finished."""
+        self._executor.shutdown(wait=True)
+
+    def submit(self, source: str, fn: Callable[..., Any], *args, **kwargs) -> None:
+        """
+        Schedule a fetch under the given source name.
+
+        Args:
+            source: Unique name used to report the result or failure
+            fn: Blocking callable performing the fetch
+            *args, **kwargs: Arguments forwarded to the callable
+        """
+        if source in self._futures:
+            raise ValueError(f"Source '{source}' has already been submitted")
+
+        def timed_call():
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._timings[source] = round((time.perf_counter() - started) * 1000, 2)
+
+        self._futures[source] = self._executor.submit(timed_call)
+
+    def result(self, source: str) -> Any:
+        """
+        Wait for a single source and return its value.
+
+        Returns:
+            The callable's return value, or None if it raised
+        """
+        try:
+            return self._futures[source].result()
+        except Exception:
+            return None
+
+    def gather(self) -> Dict[str, Any]:
+        """
+        Wait for every submitted source.
+
+        Returns:
+            Dictionary with per-source ``results``, ``errors`` and ``timings_ms``
+        """
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+
+        for source, future in self._futures.items():
+            try:
+                value = future.result()
+            except Exception as e:
+                logger.warning(f"Fan-out source '{source}' failed: {str(e)}")
+                errors[source] = str(e)
+                continue
+
+            if isinstance(value, dict) and value.get("status") == "error":
+                errors[source] = value.get("message", "Unknown error")
+            results[source] = value
+
+        return {
+            "results": results,
+            "errors": errors,
+            "timings_ms": dict(self._timings)
+        }
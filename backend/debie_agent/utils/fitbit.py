@@ -0,0 +1,318 @@
+"""
+Fitbit Web API client shared by the agent tools.
+
+- one pooled requests.Session (keep-alive connections reused across calls
+  and threads) with connect/read timeouts
+- retries of connection errors and 5xx responses with exponential backoff
+  and full jitter
+- a per-user token bucket fed by the Fitbit-Rate-Limit-Limit / -Remaining /
+  -Reset response headers, so requests wait for (or fail fast on) an
+  exhausted hourly quota instead of collecting 429s
+- daily() fetching the activity, heart rate and sleep endpoints concurrently
+
+FITBIT_API_BASE points the client elsewhere, e.g. at the local fake server
+in benchmarks/fake_fitbit_server.py.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+FITBIT_API_BASE = os.getenv("FITBIT_API_BASE", "https://api.fitbit.com")
+# (connect, read) timeouts in seconds
+FITBIT_TIMEOUT = (
+    float(os.getenv("DEBIE_FITBIT_CONNECT_TIMEOUT", "3.05")),
+    float(os.getenv("DEBIE_FITBIT_READ_TIMEOUT", "10"))
+)
+FITBIT_MAX_RETRIES = int(os.getenv("DEBIE_FITBIT_MAX_RETRIES", "3"))
+# First backoff delay in seconds; doubles on every retry (before jitter)
+FITBIT_BACKOFF_SECONDS = float(os.getenv("DEBIE_FITBIT_BACKOFF", "0.5"))
+# Longest wait for a user's quota to reset before giving up with a rate-limit error
+FITBIT_MAX_QUOTA_WAIT_SECONDS = float(os.getenv("DEBIE_FITBIT_MAX_QUOTA_WAIT", "5"))
+# Keep-alive connections kept per host
+FITBIT_POOL_SIZE = int(os.getenv("DEBIE_FITBIT_POOL_SIZE", "16"))
+
+# Fitbit's documented default: 150 requests per user per hour
+DEFAULT_HOURLY_QUOTA = 150
+
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+
+class FitbitAPIError(Exception):
+    """A Fitbit request failed with a non-success status."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class FitbitRateLimitError(FitbitAPIError):
+    """The user's hourly quota is exhausted; retry_after is the time to the reset in seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(429, f"Fitbit rate limit reached, resets in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class QuotaBucket:
+    """
+    Token bucket for one user's hourly quota.
+
+    Fitbit's quota is a fixed window: remaining requests only come back, all
+    at once, when the window resets. Tokens are taken locally per request and
+    corrected from the headers of every response.
+    """
+    capacity: int = DEFAULT_HOURLY_QUOTA
+    tokens: float = DEFAULT_HOURLY_QUOTA
+    reset_at: float = 0.0
+
+    def refill(self, now: float) -> None:
+        if self.reset_at and now >= self.reset_at:
+            self.tokens = self.capacity
+            self.reset_at = 0.0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return max(self.reset_at - now, 0.0) if self.reset_at else 0.0
+
+    def update(self, limit: Optional[int], remaining: Optional[int], reset_seconds: Optional[float], now: float) -> None:
+        if limit is not None:
+            self.capacity = limit
+        if remaining is not None:
+            self.tokens = remaining
+        if reset_seconds is not None:
+            self.reset_at = now + reset_seconds
+
+
+class FitbitClient:
+    """
+    Thread-safe Fitbit client.
+
+    Args:
+        base_url: API root (default: FITBIT_API_BASE)
+        timeout: (connect, read) timeouts in seconds
+        max_retries: Retries of connection errors and 5xx responses
+        backoff_seconds: Base delay of the exponential backoff
+        max_quota_wait: Longest wait for an exhausted quota to reset
+        pool_size: Keep-alive connections kept to the API host
+        sleep: Sleep function (replaceable for benchmarks)
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Tuple[float, float] = FITBIT_TIMEOUT,
+        max_retries: int = FITBIT_MAX_RETRIES,
+        backoff_seconds: float = FITBIT_BACKOFF_SECONDS,
+        max_quota_wait: float = FITBIT_MAX_QUOTA_WAIT_SECONDS,
+        pool_size: int = FITBIT_POOL_SIZE,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.base_url = (base_url or FITBIT_API_BASE).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_quota_wait = max_quota_wait
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._buckets: Dict[str, QuotaBucket] = {}
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.retries = 0
+
+    def close(self) -> None:
+        self.session.close()
+
+    # ---------- endpoints ----------
+
+    def activity_summary(self, credentials: Dict[str, Any], date: str) -> Dict[str, Any]:
+        """Daily activity summary (GET /1/user/-/activities/date/{date}.json)."""
+        return self.get(credentials, f"/1/user/-/activities/date/{date}.json")
+
+    def heart_rate(self, credentials: Dict[str, Any], date: str) -> Dict[str, Any]:
+        """Daily heart rate summary (GET /1/user/-/activities/heart/date/{date}/1d.json)."""
+        return self.get(credentials, f"/1/user/-/activities/heart/date/{date}/1d.json")
+
+    def sleep_log(self, credentials: Dict[str, Any], date: str) -> Dict[str, Any]:
+        """Sleep logs of a night (GET /1.2/user/-/sleep/date/{date}.json)."""
+        return self.get(credentials, f"/1.2/user/-/sleep/date/{date}.json")
+
+    def intraday(self, credentials: Dict[str, Any], resource: str, date: str) -> Dict[str, Any]:
+        """
+        One day of 1-minute intraday data (GET /1/user/-/activities/{resource}/date/{date}/1d/1min.json).
+
+        Args:
+            resource: "heart" or "steps"
+        """
+        return self.get(credentials, f"/1/user/-/activities/{resource}/date/{date}/1d/1min.json")
+
+    def sleep_range(self, credentials: Dict[str, Any], start_date: str, end_date: str) -> Dict[str, Any]:
+        """Sleep logs ending between two dates (GET /1.2/user/-/sleep/date/{start}/{end}.json)."""
+        return self.get(credentials, f"/1.2/user/-/sleep/date/{start_date}/{end_date}.json")
+
+    def profile(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        """User profile, including the UTC offset of the user's timezone (GET /1/user/-/profile.json)."""
+        return self.get(credentials, "/1/user/-/profile.json")
+
+    def devices(self, credentials: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Paired devices with their last sync time (GET /1/user/-/devices.json)."""
+        return self.get(credentials, "/1/user/-/devices.json")
+
+    def daily(self, credentials: Dict[str, Any], date: str) -> Dict[str, Any]:
+        """
+        Fetch activity, heart rate and sleep of one day concurrently.
+
+        Returns:
+            Dictionary with "activity", "heart_rate" and "sleep", each holding
+            the response JSON or the exception raised by that request
+        """
+        fetches = {
+            "activity": self.activity_summary,
+            "heart_rate": self.heart_rate,
+            "sleep": self.sleep_log,
+        }
+        with ThreadPoolExecutor(max_workers=len(fetches), thread_name_prefix="debie-fitbit") as executor:
+            futures = {name: executor.submit(fetch, credentials, date) for name, fetch in fetches.items()}
+        results = {}
+        for name, future in futures.items():
+            error = future.exception()
+            results[name] = error if error is not None else future.result()
+        return results
+
+    # ---------- transport ----------
+
+    def get(self, credentials: Dict[str, Any], path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET a Fitbit API path and return the decoded JSON.
+
+        Raises:
+            FitbitRateLimitError: The user's quota is exhausted for longer than max_quota_wait
+            FitbitAPIError: Any other non-200 response, after retries
+            requests.RequestException: Connection errors, after retries
+        """
+        access_token = credentials.get("access_token")
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Accept-Language": "en_US"
+        }
+        bucket_key = self._bucket_key(credentials)
+
+        attempt = 0
+        while True:
+            self._take_token(bucket_key)
+            try:
+                response = self.session.get(f"{self.base_url}{path}", headers=headers, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                self._backoff(attempt, f"{path}: {e}")
+                attempt += 1
+                continue
+            finally:
+                with self._lock:
+                    self.requests_sent += 1
+
+            self._update_quota(bucket_key, response)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 429:
+                retry_after = _header_float(response.headers, "Retry-After") or 0.0
+                if retry_after > self.max_quota_wait or attempt >= self.max_retries:
+                    raise FitbitRateLimitError(retry_after)
+                self.sleep(retry_after)
+                attempt += 1
+                continue
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                self._backoff(attempt, f"{path}: HTTP {response.status_code}")
+                attempt += 1
+                continue
+            raise FitbitAPIError(response.status_code, response.text)
+
+    def quota(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        """Last known quota state of a user."""
+        with self._lock:
+            bucket = self._buckets.get(self._bucket_key(credentials)) or QuotaBucket()
+            bucket.refill(time.monotonic())
+            return {
+                "limit": bucket.capacity,
+                "remaining": int(bucket.tokens),
+                "resets_in": round(max(bucket.reset_at - time.monotonic(), 0.0), 1) if bucket.reset_at else None
+            }
+
+    @staticmethod
+    def _bucket_key(credentials: Dict[str, Any]) -> str:
+        # The quota is per Fitbit user; fall back to the token when the id is unknown
+        user_id = credentials.get("user_id") or credentials.get("fitbit_user_id")
+        if user_id:
+            return str(user_id)
+        return hashlib.sha256(str(credentials.get("access_token")).encode()).hexdigest()[:16]
+
+    def _take_token(self, key: str) -> None:
+        with self._lock:
+            bucket = self._buckets.setdefault(key, QuotaBucket())
+            wait = bucket.wait_time(time.monotonic())
+            if wait > self.max_quota_wait:
+                raise FitbitRateLimitError(wait)
+        if wait > 0:
+            logger.info(f"Fitbit quota exhausted, waiting {wait:.1f}s for the reset")
+            self.sleep(wait)
+        with self._lock:
+            bucket.refill(time.monotonic())
+            bucket.tokens -= 1
+
+    def _update_quota(self, key: str, response: requests.Response) -> None:
+        headers = response.headers
+        limit = _header_float(headers, "Fitbit-Rate-Limit-Limit")
+        remaining = _header_float(headers, "Fitbit-Rate-Limit-Remaining")
+        reset = _header_float(headers, "Fitbit-Rate-Limit-Reset")
+        if response.status_code == 429:
+            remaining = 0
+            reset = reset if reset is not None else _header_float(headers, "Retry-After")
+        if limit is None and remaining is None and reset is None:
+            return
+        with self._lock:
+            self._buckets.setdefault(key, QuotaBucket()).update(
+                int(limit) if limit is not None else None,
+                int(remaining) if remaining is not None else None,
+                reset,
+                time.monotonic()
+            )
+
+    def _backoff(self, attempt: int, reason: str) -> None:
+        # Full jitter: uniform in [0, base * 2^attempt]
+        delay = random.uniform(0, self.backoff_seconds * (2 ** attempt))
+        with self._lock:
+            self.retries += 1
+        logger.warning(f"Retrying Fitbit request in {delay:.2f}s ({reason})")
+        self.sleep(delay)
+
+
+def _header_float(headers: Any, name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# Process-wide client shared by the tools
+fitbit_client = FitbitClient()
@@ -0,0 +1,305 @@
+"""
+NumPy-backed glucose metrics engine.
+
+Readings are converted once into contiguous timestamp/value arrays
+(GlucoseSeries) and the standard CGM metric panel is computed from them with
+vectorized operations: mean, SD, CV, time in ranges, hypo/hyperglycemic
+events, GMI / estimated A1C and MAGE.
+"""
+
+import datetime
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# International consensus CGM thresholds (mg/dL)
+VERY_LOW_THRESHOLD = 54
+LOW_THRESHOLD = 70
+HIGH_THRESHOLD = 180
+VERY_HIGH_THRESHOLD = 250
+
+# Minimum duration of a hypo/hyperglycemic event
+EVENT_MIN_SECONDS = 15 * 60
+
+_UTC_SUFFIXES = ("", "Z", "+00:00")
+
+
+def _is_utc_or_naive(tail: str) -> bool:
+    """True if the part of an ISO timestamp after the seconds carries no non-UTC offset."""
+    if tail.startswith("."):
+        tail = tail.lstrip(".0123456789")
+    return tail in _UTC_SUFFIXES
+
+
+def parse_timestamps(raw: Iterable[Any]) -> np.ndarray:
+    """
+    Convert timestamps to int64 epoch seconds.
+
+    Accepts ISO strings (as returned by Supabase), datetimes or epoch numbers.
+    UTC and naive strings take a vectorized NumPy path; strings with other
+    offsets fall back to datetime.fromisoformat. Naive values are read as UTC.
+    """
+    raw = list(raw)
+    if not raw:
+        return np.empty(0, dtype=np.int64)
+
+    first = raw[0]
+    if isinstance(first, (int, float, np.integer, np.floating)):
+        return np.asarray(raw, dtype=np.int64)
+
+    # Timestamps from one source share a handful of distinct suffixes, so
+    # checking the unique tails is much cheaper than parsing every string
+    if isinstance(first, str) and all(_is_utc_or_naive(tail) for tail in {value[19:] for value in raw}):
+        return np.array([value[:19] for value in raw], dtype="datetime64[s]").astype(np.int64)
+
+    seconds = np.empty(len(raw), dtype=np.int64)
+    for i, value in enumerate(raw):
+        if isinstance(value, str):
+            value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        seconds[i] = int(value.timestamp())
+    return seconds
+
+
+@dataclass
+class GlucoseSeries:
+    """
+    Glucose readings as sorted, contiguous arrays.
+
+    Attributes:
+        timestamps: int64 epoch seconds, ascending
+        values: float64 glucose values in mg/dL
+    """
+    timestamps: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def from_readings(
+        cls,
+        readings: List[Dict[str, Any]],
+        timestamp_key: str = "reading_timestamp",
+        value_key: str = "glucose_value"
+    ) -> "GlucoseSeries":
+        """Build a series from glucose_readings rows, skipping rows without a value."""
+        raw_timestamps = [r.get(timestamp_key) for r in readings]
+        raw_values = [r.get(value_key) for r in readings]
+        if None in raw_values or None in raw_timestamps:
+            pairs = [(t, v) for t, v in zip(raw_timestamps, raw_values) if t and v is not None]
+            raw_timestamps = [t for t, _ in pairs]
+            raw_values = [v for _, v in pairs]
+        return cls.from_arrays(parse_timestamps(raw_timestamps), np.asarray(raw_values, dtype=np.float64))
+
+    @classmethod
+    def from_pages(
+        cls,
+        pages: Iterable[List[Dict[str, Any]]],
+        timestamp_key: str = "reading_timestamp",
+        value_key: str = "glucose_value"
+    ) -> "GlucoseSeries":
+        """
+        Build a series from pages of rows (e.g. tools.iter_glucose_reading_pages).
+
+        Each page is converted to arrays as it arrives, so only one page of
+        row dictionaries is alive at a time.
+        """
+        parts = [cls.from_readings(page, timestamp_key, value_key) for page in pages]
+        if not parts:
+            return cls.from_arrays(np.empty(0, dtype=np.int64), np.empty(0))
+        return cls.from_arrays(
+            np.concatenate([part.timestamps for part in parts]),
+            np.concatenate([part.values for part in parts])
+        )
+
+    @classmethod
+    def from_arrays(cls, timestamps: np.ndarray, values: np.ndarray) -> "GlucoseSeries":
+        """Build a series from raw arrays, sorting by time if needed."""
+        timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if timestamps.size > 1 and np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+        return cls(timestamps, values)
+
+    def __len__(self) -> int:
+        return int(self.values.size)
+
+    def window(self, start: Optional[int] = None, end: Optional[int] = None) -> "GlucoseSeries":
+        """Readings with start <= timestamp < end (epoch seconds), without copying."""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, start, side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side="left"))
+        return GlucoseSeries(self.timestamps[lo:hi], self.values[lo:hi])
+
+
+def _typical_interval(timestamps: np.ndarray) -> float:
+    """Median sampling interval in seconds, capped at the event duration."""
+    if timestamps.size < 2:
+        return float(EVENT_MIN_SECONDS)
+    return float(min(np.median(np.diff(timestamps)), EVENT_MIN_SECONDS))
+
+
+def count_events(series: GlucoseSeries, mask: np.ndarray, min_seconds: int = EVENT_MIN_SECONDS) -> int:
+    """
+    Count runs of consecutive readings flagged by mask lasting at least min_seconds.
+
+    A run's duration is measured from its first to its last reading plus one
+    sampling interval, so a single low fingerstick counts as an event while
+    CGM data needs three consecutive 5-minute readings.
+    """
+    if not mask.any():
+        return 0
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    durations = series.timestamps[ends] - series.timestamps[starts] + _typical_interval(series.timestamps)
+    return int(np.count_nonzero(durations >= min_seconds))
+
+
+def mean_amplitude_of_glycemic_excursions(values: np.ndarray, sd: float) -> Optional[float]:
+    """
+    MAGE: mean amplitude of peak-to-nadir swings larger than one SD.
+
+    Turning points are found with a vectorized sign-change pass; a zig-zag
+    over the (much shorter) turning-point sequence then keeps only swings
+    exceeding the SD, so small wiggles inside a larger excursion are ignored.
+    """
+    if values.size < 3 or not sd:
+        return None
+
+    diffs = np.diff(values)
+    nonzero = np.flatnonzero(diffs)
+    if nonzero.size == 0:
+        return None
+    signs = np.sign(diffs[nonzero])
+    turning = nonzero[1:][signs[1:] != signs[:-1]]
+    extrema = np.concatenate(([values[0]], values[turning], [values[-1]])).tolist()
+
+    amplitudes = []
+    trend = 0
+    low = high = pivot = current = extrema[0]
+    for value in extrema[1:]:
+        if trend == 0:
+            low, high = min(low, value), max(high, value)
+            if high - low > sd:
+                trend = 1 if value == high else -1
+                pivot, current = (low, high) if trend == 1 else (high, low)
+        elif trend == 1:
+            if value > current:
+                current = value
+            elif current - value > sd:
+                amplitudes.append(current - pivot)
+                pivot, current, trend = current, value, -1
+        else:
+            if value < current:
+                current = value
+            elif value - current > sd:
+                amplitudes.append(pivot - current)
+                pivot, current, trend = current, value, 1
+    if trend != 0 and abs(current - pivot) > sd:
+        amplitudes.append(abs(current - pivot))
+
+    return float(np.mean(amplitudes)) if amplitudes else None
+
+
+def estimated_a1c(mean_glucose: float) -> float:
+    """ADAG estimated A1C (%) from mean glucose in mg/dL."""
+    return (mean_glucose + 46.7) / 28.7
+
+
+def glucose_management_indicator(mean_glucose: float) -> float:
+    """GMI (%) from mean CGM glucose in mg/dL."""
+    return 3.31 + 0.02392 * mean_glucose
+
+
+def compute_glucose_metrics(series: GlucoseSeries) -> Dict[str, Any]:
+    """
+    Compute the standard CGM metric panel for a series.
+
+    Returns:
+        Dictionary of JSON-ready metrics, or {"count": 0} for an empty series
+    """
+    values = series.values
+    n = len(series)
+    if n == 0:
+        return {"count": 0}
+
+    mean = float(values.mean())
+    sd = float(values.std(ddof=1)) if n > 1 else 0.0
+
+    # One pass of bucket assignment for the five consensus ranges
+    buckets = np.searchsorted(
+        np.array([VERY_LOW_THRESHOLD, LOW_THRESHOLD, HIGH_THRESHOLD + 1e-9, VERY_HIGH_THRESHOLD + 1e-9]),
+        values,
+        side="right"
+    )
+    counts = np.bincount(buckets, minlength=5) * (100.0 / n)
+
+    span_seconds = int(series.timestamps[-1] - series.timestamps[0])
+    interval = _typical_interval(series.timestamps)
+    mage = mean_amplitude_of_glycemic_excursions(values, sd)
+
+    return {
+        "count": n,
+        "mean": round(mean, 2),
+        "median": round(float(np.median(values)), 2),
+        "minimum": round(float(values.min()), 2),
+        "maximum": round(float(values.max()), 2),
+        "standard_deviation": round(sd, 2),
+        "coefficient_of_variation": round(sd / mean * 100, 2) if mean else None,
+        "time_in_ranges": {
+            "very_low_pct": round(float(counts[0]), 1),
+            "low_pct": round(float(counts[1]), 1),
+            "in_range_pct": round(float(counts[2]), 1),
+            "high_pct": round(float(counts[3]), 1),
+            "very_high_pct": round(float(counts[4]), 1)
+        },
+        "hypo_events": count_events(series, values < LOW_THRESHOLD),
+        "severe_hypo_events": count_events(series, values < VERY_LOW_THRESHOLD),
+        "hyper_events": count_events(series, values > HIGH_THRESHOLD),
+        "severe_hyper_events": count_events(series, values > VERY_HIGH_THRESHOLD),
+        "gmi": round(glucose_management_indicator(mean), 2),
+        "estimated_a1c": round(estimated_a1c(mean), 2),
+        "mage": round(mage, 2) if mage is not None else None,
+        "coverage": {
+            "days": round(span_seconds / 86400, 2),
+            "readings_per_day": round(n / max(span_seconds / 86400, 1), 1),
+            "active_pct": round(min(n * interval / max(span_seconds + interval, 1), 1.0) * 100, 1)
+        }
+    }
+
+
+def time_in_range_by_weekday(series: GlucoseSeries) -> np.ndarray:
+    """
+    Percentage of readings in range (70-180 mg/dL) per UTC weekday.
+
+    Returns:
+        Array of 7 percentages, Monday first; NaN for weekdays without readings
+    """
+    # 1970-01-01 was a Thursday
+    weekdays = (series.timestamps // 86400 + 3) % 7
+    in_range = (series.values >= LOW_THRESHOLD) & (series.values <= HIGH_THRESHOLD)
+    totals = np.bincount(weekdays, minlength=7)
+    hits = np.bincount(weekdays, weights=in_range, minlength=7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(totals > 0, hits * 100.0 / totals, np.nan)
+
+
+def summarize_readings(readings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Glucose statistics for a list of glucose_readings rows.
+
+    Keeps the "average"/"maximum"/"minimum" keys used by the agent context
+    alongside the full metric panel.
+
+    Returns:
+        Dictionary of statistics, or an empty dictionary if there are no readings
+    """
+    metrics = compute_glucose_metrics(GlucoseSeries.from_readings(readings))
+    if not metrics["count"]:
+        return {}
+    return {
+        "average": metrics["mean"],
+        **metrics
+    }
@@ -0,0 +1,340 @@
+"""
+Columnar glucose pattern analysis.
+
+Works on GlucoseSeries arrays (see glucose_metrics) with vectorized binning:
+readings are assigned to integer groups (time-of-day bin, weekday x hour,
+user x hour, ...) and per-group statistics are computed with one sort and
+a few bincounts, so the cost stays O(n log n) however many groups there are.
+
+Provides the ambulatory glucose profile (hourly percentile bands),
+dawn-phenomenon detection, weekday/weekend splits and anomaly windows, plus
+a batch AGP across several users at once.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .glucose_metrics import GlucoseSeries, HIGH_THRESHOLD, LOW_THRESHOLD
+
+# Percentile bands of the ambulatory glucose profile
+AGP_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Local-time windows (hours) used for dawn-phenomenon detection
+DAWN_BASELINE_HOURS = (3, 4)
+DAWN_PEAK_HOURS = (7, 8)
+# Clinically significant pre-breakfast rise (mg/dL)
+DAWN_RISE_THRESHOLD = 20
+
+# Robust z-score above which a reading deviates from its time-of-day profile
+ANOMALY_Z_THRESHOLD = 3.0
+# Flagged readings closer than this are merged into one window
+ANOMALY_MAX_GAP_SECONDS = 30 * 60
+
+# Parts of the day (local hours, end exclusive) for time-in-range breakdowns
+DAY_PARTS = (
+    ("Overnight (12-6 AM)", 0, 6),
+    ("Morning (6-11 AM)", 6, 11),
+    ("Afternoon (11 AM-5 PM)", 11, 17),
+    ("Evening (5 PM-12 AM)", 17, 24),
+)
+
+_SECONDS_PER_DAY = 86400
+
+
+def local_seconds(series: GlucoseSeries, utc_offset_minutes: int = 0) -> np.ndarray:
+    """Epoch seconds shifted to the user's local wall clock."""
+    return series.timestamps + utc_offset_minutes * 60
+
+
+def hour_of_day(series: GlucoseSeries, utc_offset_minutes: int = 0) -> np.ndarray:
+    """Local hour (0-23) of every reading."""
+    return (local_seconds(series, utc_offset_minutes) % _SECONDS_PER_DAY) // 3600
+
+
+def day_index(series: GlucoseSeries, utc_offset_minutes: int = 0) -> np.ndarray:
+    """Local calendar day (days since epoch) of every reading."""
+    return local_seconds(series, utc_offset_minutes) // _SECONDS_PER_DAY
+
+
+def weekday(series: GlucoseSeries, utc_offset_minutes: int = 0) -> np.ndarray:
+    """Local weekday of every reading, Monday = 0 (1970-01-01 was a Thursday)."""
+    return (day_index(series, utc_offset_minutes) + 3) % 7
+
+
+def grouped_percentiles(
+    groups: np.ndarray,
+    values: np.ndarray,
+    n_groups: int,
+    percentiles: Sequence[float] = AGP_PERCENTILES
+) -> Dict[str, np.ndarray]:
+    """
+    Percentiles of values within each integer group, in one sort.
+
+    Values are sorted by (group, value) in one pass by sorting the composite
+    key group * span + value, where span exceeds the value range; each group
+    is then a contiguous sorted run whose percentiles are read with linear
+    interpolation (NumPy's default method).
+
+    Args:
+        groups: Group id (0 <= id < n_groups) of every value
+        values: Values to summarize
+        n_groups: Number of groups
+        percentiles: Percentiles to compute (0-100)
+
+    Returns:
+        Dictionary with "counts" (n_groups,) and "percentiles"
+        (n_groups, len(percentiles)); groups without values are NaN
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    counts = np.bincount(groups, minlength=n_groups)
+    result = np.full((n_groups, len(percentiles)), np.nan)
+    if values.size == 0:
+        return {"counts": counts, "percentiles": result}
+
+    # Sorting the keys in place is several times faster than a lexsort
+    offset = float(values.min())
+    span = float(values.max()) - offset + 1.0
+    keys = groups * span + (values - offset)
+    keys.sort()
+    sorted_values = keys - np.repeat(np.arange(n_groups), counts) * span + offset
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    present = counts > 0
+    starts, sizes = starts[present], counts[present]
+    for column, percentile in enumerate(percentiles):
+        position = starts + (sizes - 1) * (percentile / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, starts + sizes - 1)
+        fraction = position - lower
+        result[present, column] = sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+    return {"counts": counts, "percentiles": result}
+
+
+def grouped_means(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Mean of values within each integer group (NaN for empty groups)."""
+    counts = np.bincount(groups, minlength=n_groups)
+    sums = np.bincount(groups, weights=values, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def grouped_time_in_range(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Percentage of readings within 70-180 mg/dL per group (NaN for empty groups)."""
+    in_range = (values >= LOW_THRESHOLD) & (values <= HIGH_THRESHOLD)
+    return grouped_means(groups, in_range.astype(np.float64), n_groups) * 100
+
+
+def ambulatory_glucose_profile(
+    series: GlucoseSeries,
+    utc_offset_minutes: int = 0,
+    bin_minutes: int = 60,
+    percentiles: Sequence[float] = AGP_PERCENTILES
+) -> Dict[str, Any]:
+    """
+    Time-of-day percentile bands (AGP) for one user.
+
+    Args:
+        series: Glucose readings
+        utc_offset_minutes: User's UTC offset, so bins follow local time
+        bin_minutes: Width of each time-of-day bin
+        percentiles: Percentile bands to compute
+
+    Returns:
+        Dictionary with the bin start minutes, reading counts and the
+        percentile matrix (n_bins x len(percentiles))
+    """
+    n_bins = 1440 // bin_minutes
+    bins = (local_seconds(series, utc_offset_minutes) % _SECONDS_PER_DAY) // (bin_minutes * 60)
+    grouped = grouped_percentiles(bins, series.values, n_bins, percentiles)
+    return {
+        "bin_start_minutes": np.arange(n_bins) * bin_minutes,
+        "percentiles": tuple(percentiles),
+        "counts": grouped["counts"],
+        "bands": grouped["percentiles"]
+    }
+
+
+def batch_ambulatory_glucose_profiles(
+    user_index: np.ndarray,
+    series: GlucoseSeries,
+    n_users: int,
+    utc_offset_minutes: Optional[np.ndarray] = None,
+    percentiles: Sequence[float] = AGP_PERCENTILES
+) -> Dict[str, Any]:
+    """
+    Hourly AGP bands for many users in a single grouped pass.
+
+    Readings of all users are concatenated into one series and grouped by
+    user_index * 24 + hour.
+
+    Args:
+        user_index: User position (0 <= i < n_users) of every reading
+        series: Concatenated readings of all users
+        n_users: Number of users
+        utc_offset_minutes: Optional per-user UTC offsets (n_users,)
+        percentiles: Percentile bands to compute
+
+    Returns:
+        Dictionary with "counts" (n_users, 24) and "bands" (n_users, 24, len(percentiles))
+    """
+    user_index = np.asarray(user_index, dtype=np.int64)
+    seconds = series.timestamps
+    if utc_offset_minutes is not None:
+        seconds = seconds + np.asarray(utc_offset_minutes, dtype=np.int64)[user_index] * 60
+    groups = user_index * 24 + (seconds % _SECONDS_PER_DAY) // 3600
+    grouped = grouped_percentiles(groups, series.values, n_users * 24, percentiles)
+    return {
+        "percentiles": tuple(percentiles),
+        "counts": grouped["counts"].reshape(n_users, 24),
+        "bands": grouped["percentiles"].reshape(n_users, 24, len(percentiles))
+    }
+
+
+def detect_dawn_phenomenon(series: GlucoseSeries, utc_offset_minutes: int = 0) -> Dict[str, Any]:
+    """
+    Detect a consistent early-morning glucose rise.
+
+    For every day with readings in both windows the mean of the
+    pre-dawn baseline (3-4 AM) is compared with the pre-breakfast
+    window (7-8 AM).
+
+    Returns:
+        Dictionary with the number of days evaluated, median rise, share of
+        days rising at least DAWN_RISE_THRESHOLD and whether it was detected
+    """
+    if len(series) == 0:
+        return {"days_evaluated": 0, "detected": False}
+
+    hours = hour_of_day(series, utc_offset_minutes)
+    days = day_index(series, utc_offset_minutes)
+    first_day = days.min()
+    days = days - first_day
+    n_days = int(days.max()) + 1
+
+    def window_means(window):
+        mask = (hours >= window[0]) & (hours < window[1])
+        return grouped_means(days[mask], series.values[mask], n_days)
+
+    rises = window_means(DAWN_PEAK_HOURS) - window_means(DAWN_BASELINE_HOURS)
+    rises = rises[~np.isnan(rises)]
+    if rises.size == 0:
+        return {"days_evaluated": 0, "detected": False}
+
+    median_rise = float(np.median(rises))
+    rising_share = float(np.mean(rises >= DAWN_RISE_THRESHOLD))
+    return {
+        "days_evaluated": int(rises.size),
+        "median_rise": round(median_rise, 1),
+        "days_with_rise_pct": round(rising_share * 100, 1),
+        "detected": median_rise >= DAWN_RISE_THRESHOLD and rising_share >= 0.5
+    }
+
+
+def weekday_weekend_split(series: GlucoseSeries, utc_offset_minutes: int = 0) -> Dict[str, Any]:
+    """
+    Compare weekdays with weekends and summarize each weekday.
+
+    Returns:
+        Dictionary with weekday/weekend means, time in range and counts,
+        the mean difference, and per-weekday means and time in range
+    """
+    days = weekday(series, utc_offset_minutes)
+    weekend = (days >= 5).astype(np.int64)
+    means = grouped_means(weekend, series.values, 2)
+    tir = grouped_time_in_range(weekend, series.values, 2)
+    counts = np.bincount(weekend, minlength=2)
+
+    def _round(value):
+        return None if np.isnan(value) else round(float(value), 1)
+
+    return {
+        "weekday": {"mean": _round(means[0]), "time_in_range_pct": _round(tir[0]), "count": int(counts[0])},
+        "weekend": {"mean": _round(means[1]), "time_in_range_pct": _round(tir[1]), "count": int(counts[1])},
+        "weekend_minus_weekday": _round(means[1] - means[0]),
+        "by_weekday_mean": [_round(v) for v in grouped_means(days, series.values, 7)],
+        "by_weekday_time_in_range_pct": [_round(v) for v in grouped_time_in_range(days, series.values, 7)]
+    }
+
+
+def find_anomaly_windows(
+    series: GlucoseSeries,
+    utc_offset_minutes: int = 0,
+    z_threshold: float = ANOMALY_Z_THRESHOLD,
+    max_gap_seconds: int = ANOMALY_MAX_GAP_SECONDS,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Find windows where glucose departs from the user's usual level for that hour.
+
+    Each reading is scored against its hour's median with a robust z-score
+    (IQR / 1.349 as the scale); flagged readings within max_gap_seconds of
+    each other are merged into one window.
+
+    Returns:
+        Up to limit windows, largest deviation first, with start/end epoch
+        seconds, reading count, peak value, typical value and deviation
+    """
+    if len(series) < 2:
+        return []
+
+    hours = hour_of_day(series, utc_offset_minutes)
+    bands = grouped_percentiles(hours, series.values, 24, (25, 50, 75))["percentiles"]
+    median = bands[hours, 1]
+    scale = np.maximum((bands[hours, 2] - bands[hours, 0]) / 1.349, 10.0)
+    deviation = series.values - median
+    flagged = np.flatnonzero(np.abs(deviation) / scale > z_threshold)
+    if flagged.size == 0:
+        return []
+
+    # Split flagged readings into windows wherever the gap is too large
+    breaks = np.flatnonzero(np.diff(series.timestamps[flagged]) > max_gap_seconds) + 1
+    window_starts = np.concatenate(([0], breaks))
+    window_ends = np.concatenate((breaks, [flagged.size]))
+
+    # Peak = reading with the largest absolute deviation in each window
+    magnitude = np.abs(deviation[flagged])
+    window_ids = np.repeat(np.arange(window_starts.size), window_ends - window_starts)
+    order = np.lexsort((-magnitude, window_ids))
+    peaks = flagged[order[window_starts]]
+
+    windows = [
+        {
+            "start": int(series.timestamps[flagged[start]]),
+            "end": int(series.timestamps[flagged[end - 1]]),
+            "readings": int(end - start),
+            "peak_value": round(float(series.values[peak]), 1),
+            "typical_value": round(float(median[peak]), 1),
+            "deviation": round(float(deviation[peak]), 1)
+        }
+        for start, end, peak in zip(window_starts, window_ends, peaks)
+    ]
+    windows.sort(key=lambda window: abs(window["deviation"]), reverse=True)
+    return windows[:limit]
+
+
+def time_in_range_by_day_part(series: GlucoseSeries, utc_offset_minutes: int = 0) -> List[Dict[str, Any]]:
+    """Time in range for each part of the day in DAY_PARTS."""
+    hours = hour_of_day(series, utc_offset_minutes)
+    part_of_hour = np.zeros(24, dtype=np.int64)
+    for index, (_, start, end) in enumerate(DAY_PARTS):
+        part_of_hour[start:end] = index
+    parts = part_of_hour[hours]
+    tir = grouped_time_in_range(parts, series.values, len(DAY_PARTS))
+    counts = np.bincount(parts, minlength=len(DAY_PARTS))
+    return [
+        {
+            "part": name,
+            "in_range_pct": None if np.isnan(tir[index]) else round(float(tir[index]), 1),
+            "count": int(counts[index])
+        }
+        for index, (name, _, _) in enumerate(DAY_PARTS)
+    ]
+
+
+def weekday_hour_heatmap(series: GlucoseSeries, utc_offset_minutes: int = 0) -> np.ndarray:
+    """Median glucose per (weekday, hour) cell as a 7 x 24 matrix."""
+    groups = weekday(series, utc_offset_minutes) * 24 + hour_of_day(series, utc_offset_minutes)
+    medians = grouped_percentiles(groups, series.values, 7 * 24, (50,))["percentiles"]
+    return medians.reshape(7, 24)
@@ -0,0 +1,170 @@
+"""
+Glucose metrics from the precomputed hourly/daily rollups.
+
+The glucose_rollups table (see app/models/rollups.py) keeps per-bucket
+reading counts, sums, sums of squares, min/max and time-in-range counts, so
+a 90-day window is summarized from ~90 daily rows instead of ~26k readings.
+Metrics that need the individual readings (median, events, MAGE) are not
+available from rollups and are reported as None.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .glucose_metrics import estimated_a1c, glucose_management_indicator, parse_timestamps
+
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+# Columns of the five consensus ranges, in threshold order
+RANGE_COLUMNS = ("very_low_count", "low_count", "in_range_count", "high_count", "very_high_count")
+
+
+@dataclass
+class GlucoseRollups:
+    """
+    Rollup rows of one user and granularity as sorted arrays.
+
+    Attributes:
+        bucket_starts: int64 epoch seconds of each bucket start, ascending
+        bucket_seconds: Bucket length in seconds
+        counts: Readings per bucket
+        sums, sum_squares: Sum and sum of squares of the values per bucket
+        minimums, maximums: Extremes per bucket
+        range_counts: (n_buckets, 5) readings per consensus range
+    """
+    bucket_starts: np.ndarray
+    bucket_seconds: int
+    counts: np.ndarray
+    sums: np.ndarray
+    sum_squares: np.ndarray
+    minimums: np.ndarray
+    maximums: np.ndarray
+    range_counts: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], granularity: Optional[str] = None) -> "GlucoseRollups":
+        """Build from glucose_rollups rows (all of one granularity)."""
+        granularity = granularity or (rows[0].get("granularity") if rows else None) or "day"
+        starts = parse_timestamps(row["bucket_start"] for row in rows)
+        order = np.argsort(starts, kind="stable")
+
+        def column(key, dtype=np.float64):
+            return np.asarray([row.get(key) or 0 for row in rows], dtype=dtype)[order]
+
+        return cls(
+            bucket_starts=starts[order],
+            bucket_seconds=BUCKET_SECONDS[granularity],
+            counts=column("reading_count", np.int64),
+            sums=column("value_sum"),
+            sum_squares=column("value_sum_squares"),
+            minimums=column("min_value"),
+            maximums=column("max_value"),
+            range_counts=np.stack([column(key, np.int64) for key in RANGE_COLUMNS], axis=1)
+            if rows else np.zeros((0, 5), dtype=np.int64)
+        )
+
+    def __len__(self) -> int:
+        return int(self.bucket_starts.size)
+
+    @property
+    def reading_count(self) -> int:
+        return int(self.counts.sum())
+
+    def window(self, start: Optional[int] = None, end: Optional[int] = None) -> "GlucoseRollups":
+        """Buckets starting at start <= bucket_start < end (epoch seconds)."""
+        lo = 0 if start is None else int(np.searchsorted(self.bucket_starts, start, side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.bucket_starts, end, side="left"))
+        return GlucoseRollups(
+            self.bucket_starts[lo:hi], self.bucket_seconds, self.counts[lo:hi], self.sums[lo:hi],
+            self.sum_squares[lo:hi], self.minimums[lo:hi], self.maximums[lo:hi], self.range_counts[lo:hi]
+        )
+
+
+def compute_rollup_metrics(rollups: GlucoseRollups) -> Dict[str, Any]:
+    """
+    The CGM metric panel of compute_glucose_metrics, from rollups.
+
+    SD is the sample SD recovered from the pooled sums. Coverage counts the
+    buckets in the span that have readings.
+
+    Returns:
+        Dictionary with the same keys as compute_glucose_metrics (median,
+        events and MAGE are None), or {"count": 0} without readings
+    """
+    n = rollups.reading_count
+    if n == 0:
+        return {"count": 0}
+
+    total = float(rollups.sums.sum())
+    mean = total / n
+    variance = (float(rollups.sum_squares.sum()) - total * mean) / (n - 1) if n > 1 else 0.0
+    sd = float(np.sqrt(max(variance, 0.0)))
+    ranges = rollups.range_counts.sum(axis=0) * (100.0 / n)
+
+    span_seconds = int(rollups.bucket_starts[-1] - rollups.bucket_starts[0]) + rollups.bucket_seconds
+    buckets_in_span = span_seconds // rollups.bucket_seconds
+    days = span_seconds / 86400
+
+    return {
+        "count": n,
+        "mean": round(mean, 2),
+        "median": None,
+        "minimum": round(float(rollups.minimums.min()), 2),
+        "maximum": round(float(rollups.maximums.max()), 2),
+        "standard_deviation": round(sd, 2),
+        "coefficient_of_variation": round(sd / mean * 100, 2) if mean else None,
+        "time_in_ranges": {
+            "very_low_pct": round(float(ranges[0]), 1),
+            "low_pct": round(float(ranges[1]), 1),
+            "in_range_pct": round(float(ranges[2]), 1),
+            "high_pct": round(float(ranges[3]), 1),
+            "very_high_pct": round(float(ranges[4]), 1)
+        },
+        "hypo_events": None,
+        "severe_hypo_events": None,
+        "hyper_events": None,
+        "severe_hyper_events": None,
+        "gmi": round(glucose_management_indicator(mean), 2),
+        "estimated_a1c": round(estimated_a1c(mean), 2),
+        "mage": None,
+        "coverage": {
+            "days": round(days, 2),
+            "readings_per_day": round(n / max(days, 1), 1),
+            "active_pct": round(float(np.count_nonzero(rollups.counts)) / max(buckets_in_span, 1) * 100, 1)
+        },
+        "source": "rollups"
+    }
+
+
+def rollup_time_in_range_by_weekday(rollups: GlucoseRollups) -> np.ndarray:
+    """
+    Percentage of readings in range (70-180 mg/dL) per UTC weekday.
+
+    Returns:
+        Array of 7 percentages, Monday first; NaN for weekdays without readings
+    """
+    # 1970-01-01 was a Thursday
+    weekdays = (rollups.bucket_starts // 86400 + 3) % 7
+    totals = np.bincount(weekdays, weights=rollups.counts, minlength=7)
+    hits = np.bincount(weekdays, weights=rollups.range_counts[:, 2], minlength=7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(totals > 0, hits * 100.0 / totals, np.nan)
+
+
+def summarize_rollups(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Glucose statistics for a list of glucose_rollups rows, in the shape of
+    glucose_metrics.summarize_readings.
+
+    Returns:
+        Dictionary of statistics, or an empty dictionary if there are no readings
+    """
+    metrics = compute_rollup_metrics(GlucoseRollups.from_rows(rows))
+    if not metrics["count"]:
+        return {}
+    return {
+        "average": metrics["mean"],
+        **metrics
+    }
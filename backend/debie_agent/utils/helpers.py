@@ -7,6 +7,8 @@ Utility functions for Debie Agent, particularly focusing on Google Calendar inte
 import datetime
 from typing import Dict, List, Any, Optional
 
+from .recurrence import upcoming_occurrences
+
 def create_calendar_event(
     summary: str,
     start_time: datetime.datetime,
@@ -83,19 +85,28 @@ def add_logging_reminder(event_id: str, minutes_after: int = 15) -> Dict[str, An
 def get_upcoming_events(
     calendar_id: str = "primary", 
     max_results: int = 10,
-    time_min: Optional[datetime.datetime] = None
+    time_min: Optional[datetime.datetime] = None,
+    events: Optional[List[Dict[str, Any]]] = None,
+    hours: float = 24
 ) -> List[Dict[str, Any]]:
     """
     Retrieves upcoming events from the user's Google Calendar.
-    
+
     Args:
         calendar_id: ID of the calendar to query (default: primary)
         max_results: Maximum number of events to retrieve
         time_min: Minimum time for events (default: current time)
-        
+        events: Stored events of the calendar, recurring series included;
+            when given, they are expanded locally instead of queried
+        hours: How far ahead to expand stored events
+
     Returns:
         List of upcoming events
     """
+    if events is not None:
+        occurrences = upcoming_occurrences(events, hours=hours, now=time_min)
+        return [occurrence.to_event() for occurrence in occurrences[:max_results]]
+
     # This is a placeholder implementation
     # In a real implementation, this would query the Google Calendar API
     
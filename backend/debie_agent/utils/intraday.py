@@ -0,0 +1,171 @@
+"""
+Compact storage and NumPy loading of Fitbit 1-minute intraday data.
+
+A day of one metric (heart rate or steps) is stored as a single
+fitbit_intraday row holding 1440 little-endian int16 samples, one per minute
+of the user's local day, with MISSING (-1) where the tracker recorded
+nothing: 2880 bytes instead of 1440 biometric_data rows. The day's UTC
+offset is stored next to it, so samples map back to UTC instants.
+
+load_intraday() reads days straight into IntradaySeries arrays (epoch
+seconds + float values) that line up with GlucoseSeries, so a week of
+heart rate (~10k samples) is joined against glucose without building a
+dict per minute.
+"""
+
+import datetime
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+# Sample value of minutes without data
+MISSING = -1
+SAMPLE_DTYPE = np.dtype("<i2")
+INTRADAY_METRICS = ("heart_rate", "steps")
+
+INTRADAY_COLUMNS = "metric, day, utc_offset_minutes, samples"
+
+
+def pack_day(dataset: Iterable[Dict[str, Any]]) -> Tuple[bytes, int]:
+    """
+    Pack a Fitbit intraday dataset ([{"time": "HH:MM:SS", "value": n}, ...]).
+
+    Returns:
+        Tuple of (1440 int16 samples as bytes, number of minutes with data)
+    """
+    samples = np.full(MINUTES_PER_DAY, MISSING, dtype=SAMPLE_DTYPE)
+    for point in dataset:
+        time = point["time"]
+        minute = int(time[:2]) * 60 + int(time[3:5])
+        # int16 holds any heart rate or per-minute step count
+        samples[minute] = min(max(int(point["value"]), 0), np.iinfo(SAMPLE_DTYPE).max)
+    return samples.tobytes(), int(np.count_nonzero(samples != MISSING))
+
+
+def unpack_day(blob: Any) -> np.ndarray:
+    """
+    Samples of a packed day as an int16 array.
+
+    Accepts bytes (database drivers) or the "\\x..." hex text PostgREST
+    returns for bytea columns.
+    """
+    if isinstance(blob, str):
+        blob = bytes.fromhex(blob[2:] if blob.startswith("\\x") else blob)
+    return np.frombuffer(blob, dtype=SAMPLE_DTYPE)
+
+
+@dataclass
+class IntradaySeries:
+    """
+    Minutes with data of one intraday metric as sorted, contiguous arrays.
+
+    Attributes:
+        timestamps: int64 epoch seconds (UTC) of each minute's start, ascending
+        values: float64 samples
+    """
+    timestamps: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "IntradaySeries":
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+
+    @classmethod
+    def from_days(cls, days: Sequence[Tuple[datetime.date, int, Any]]) -> "IntradaySeries":
+        """
+        Build a series from packed days.
+
+        Args:
+            days: (local date, UTC offset in minutes, packed samples) per day
+        """
+        if not days:
+            return cls.empty()
+        minute_offsets = np.arange(MINUTES_PER_DAY, dtype=np.int64) * 60
+        timestamps, values = [], []
+        for day, offset_minutes, blob in sorted(days, key=lambda item: item[0]):
+            samples = unpack_day(blob)
+            present = samples != MISSING
+            midnight = int(np.datetime64(day, "s").astype(np.int64)) - offset_minutes * 60
+            timestamps.append((midnight + minute_offsets)[present])
+            values.append(samples[present].astype(np.float64))
+        return cls(np.concatenate(timestamps), np.concatenate(values))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def window_mean(self, timestamps: np.ndarray, window_seconds: int = 15 * 60) -> np.ndarray:
+        """
+        Mean of the samples in [t - window_seconds, t) for every t, NaN where there are none.
+
+        Uses prefix sums and searchsorted, so aligning every glucose reading of
+        a week costs O((readings + samples) log samples).
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if not len(self):
+            return np.full(len(timestamps), np.nan)
+        prefix = np.concatenate(([0.0], np.cumsum(self.values)))
+        lo = np.searchsorted(self.timestamps, timestamps - window_seconds, side="left")
+        hi = np.searchsorted(self.timestamps, timestamps, side="left")
+        counts = hi - lo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, (prefix[hi] - prefix[lo]) / counts, np.nan)
+
+    def window_sum(self, timestamps: np.ndarray, window_seconds: int = 15 * 60) -> np.ndarray:
+        """Sum of the samples in [t - window_seconds, t) for every t (0 where there are none)."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if not len(self):
+            return np.zeros(len(timestamps))
+        prefix = np.concatenate(([0.0], np.cumsum(self.values)))
+        lo = np.searchsorted(self.timestamps, timestamps - window_seconds, side="left")
+        hi = np.searchsorted(self.timestamps, timestamps, side="left")
+        return prefix[hi] - prefix[lo]
+
+
+def series_from_rows(rows: Iterable[Dict[str, Any]], metrics: Sequence[str]) -> Dict[str, IntradaySeries]:
+    """Group fitbit_intraday rows by metric into IntradaySeries."""
+    days: Dict[str, List[Tuple[datetime.date, int, Any]]] = {metric: [] for metric in metrics}
+    for row in rows:
+        if row["metric"] in days:
+            day = row["day"]
+            if isinstance(day, str):
+                day = datetime.date.fromisoformat(day[:10])
+            days[row["metric"]].append((day, int(row.get("utc_offset_minutes") or 0), row["samples"]))
+    return {metric: IntradaySeries.from_days(metric_days) for metric, metric_days in days.items()}
+
+
+def load_intraday(
+    client: Any,
+    user_id: str,
+    metrics: Sequence[str] = INTRADAY_METRICS,
+    days: int = 7,
+    end_day: Optional[datetime.date] = None
+) -> Dict[str, IntradaySeries]:
+    """
+    Load a user's packed intraday days as NumPy series.
+
+    A week of both metrics is 14 rows, so one request covers it.
+
+    Args:
+        client: Supabase client
+        user_id: The user's ID
+        metrics: Metrics to load ("heart_rate", "steps")
+        days: Number of local days to load, ending with end_day
+        end_day: Last day to load (default: today, UTC)
+
+    Returns:
+        Dictionary mapping each metric to its IntradaySeries
+    """
+    end_day = end_day or datetime.datetime.now(datetime.timezone.utc).date()
+    start_day = end_day - datetime.timedelta(days=days - 1)
+    rows = client.table("fitbit_intraday") \
+        .select(INTRADAY_COLUMNS) \
+        .eq("user_id", user_id) \
+        .in_("metric", list(metrics)) \
+        .gte("day", start_day.isoformat()) \
+        .lte("day", end_day.isoformat()) \
+        .order("day", desc=False) \
+        .execute() \
+        .data
+    return series_from_rows(rows, metrics)
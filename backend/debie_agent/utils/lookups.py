@@ -0,0 +1,243 @@
+"""
+Process-wide registry for the lookup tables defined in app/models/lookups.py.
+
+Lookup tables are small and change rarely, so each one is loaded in a single
+query, kept in memory for a TTL and consulted for name -> id and id -> name
+resolution instead of issuing a Supabase round trip per lookup.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a loaded lookup table is considered stale and reloaded
+LOOKUP_TTL_SECONDS = float(os.getenv("DEBIE_LOOKUP_TTL", "3600"))
+# Load every lookup table in the background when the agent's tools start
+LOOKUP_PRELOAD_ON_START = os.getenv("DEBIE_LOOKUP_PRELOAD", "1") == "1"
+
+
+@dataclass(frozen=True)
+class LookupTable:
+    """Describes how a lookup table maps names to primary keys."""
+    table: str
+    id_column: str
+    name_column: str = "type_name"
+    # Extra columns to set when get-or-create inserts a new row
+    create_defaults: Optional[Callable[[str], Dict[str, Any]]] = None
+
+
+# Mirrors the lookup models in app/models/lookups.py
+LOOKUP_TABLES: Dict[str, LookupTable] = {
+    "meal_types": LookupTable("meal_types", "meal_type_id"),
+    "biometric_types": LookupTable("biometric_types", "biometric_type_id"),
+    "insight_types": LookupTable(
+        "insight_types", "insight_type_id",
+        create_defaults=lambda name: {"description": f"AI-generated insights about {name}"}
+    ),
+    "sender_types": LookupTable("sender_types", "sender_type_id"),
+    "message_types": LookupTable("message_types", "message_type_id"),
+    "notification_types": LookupTable("notification_types", "notification_type_id"),
+    "insulin_types": LookupTable("insulin_types", "insulin_type_id"),
+    "medications": LookupTable("medications", "medication_id", name_column="medication_name"),
+}
+
+
+class _LoadedTable:
+    """In-memory snapshot of one lookup table."""
+
+    def __init__(self):
+        self.by_name: Dict[str, Any] = {}
+        self.by_id: Dict[Any, str] = {}
+        self.loaded_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.created = 0
+
+    def add(self, name: str, row_id: Any) -> None:
+        self.by_name[name] = row_id
+        self.by_id[row_id] = name
+
+
+class LookupRegistry:
+    """
+    Thread-safe name <-> id cache for lookup tables.
+
+    Each table is loaded in full on first use (or by preload()) and reloaded
+    once it is older than the TTL. A table is loaded by one thread at a time,
+    outside the registry lock, so lookups in other tables don't wait for the
+    query. Names missing from a fresh snapshot are
+    reported as misses without another round trip; get_or_create_id() inserts
+    them and adds the new id to the snapshot.
+
+    Args:
+        client: Supabase client used to load and insert lookup rows
+        tables: Lookup table definitions (default: LOOKUP_TABLES)
+        ttl_seconds: Seconds before a table snapshot is reloaded
+    """
+
+    def __init__(self, client: Any, tables: Optional[Dict[str, LookupTable]] = None, ttl_seconds: float = LOOKUP_TTL_SECONDS):
+        self.client = client
+        self.tables = tables or LOOKUP_TABLES
+        self.ttl_seconds = ttl_seconds
+        self._loaded: Dict[str, _LoadedTable] = {name: _LoadedTable() for name in self.tables}
+        self._lock = threading.RLock()
+        # Held while a table is loaded, so concurrent lookups wait for one query
+        self._load_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in self.tables}
+
+    def preload(self, tables: Optional[Iterable[str]] = None) -> None:
+        """Load the given tables (default: all) regardless of their age."""
+        for table in tables or self.tables:
+            self._refresh(table, force=True)
+
+    def preload_in_background(self) -> threading.Thread:
+        """Best-effort preload() on a daemon thread, so first lookups find the tables loaded."""
+        def run() -> None:
+            for table in self.tables:
+                try:
+                    self._refresh(table, force=True)
+                except Exception as e:
+                    logger.warning(f"Preloading lookup table {table} failed: {str(e)}")
+
+        thread = threading.Thread(target=run, name="lookup-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Mark one table (or all) as stale so the next lookup reloads it."""
+        with self._lock:
+            for name in [table] if table else self.tables:
+                self._loaded[name].loaded_at = None
+
+    def get_id(self, table: str, name: str) -> Optional[Any]:
+        """
+        Resolve a lookup name to its primary key.
+
+        Returns:
+            The id, or None if the name does not exist in the table
+        """
+        loaded = self._fresh(table)
+        with self._lock:
+            row_id = loaded.by_name.get(name)
+            if row_id is None:
+                loaded.misses += 1
+            else:
+                loaded.hits += 1
+            return row_id
+
+    def get_name(self, table: str, row_id: Any) -> Optional[str]:
+        """
+        Resolve a lookup primary key to its name.
+
+        Returns:
+            The name, or None if the id does not exist in the table
+        """
+        loaded = self._fresh(table)
+        with self._lock:
+            name = loaded.by_id.get(row_id)
+            if name is None:
+                loaded.misses += 1
+            else:
+                loaded.hits += 1
+            return name
+
+    def get_or_create_id(self, table: str, name: str) -> Any:
+        """
+        Resolve a lookup name to its primary key, inserting the row if needed.
+
+        Concurrent creators of the same name are tolerated: if the insert
+        fails because the row already exists, the existing id is fetched.
+        """
+        row_id = self.get_id(table, name)
+        if row_id is not None:
+            return row_id
+
+        spec = self.tables[table]
+        row = {spec.name_column: name}
+        if spec.create_defaults:
+            row.update(spec.create_defaults(name))
+
+        try:
+            response = self.client.table(spec.table).insert(row).execute()
+            row_id = response.data[0][spec.id_column]
+        except Exception as e:
+            # Most likely a unique violation from a concurrent insert
+            existing = self.client.table(spec.table) \
+                .select(spec.id_column) \
+                .eq(spec.name_column, name) \
+                .execute()
+            if not existing.data:
+                raise
+            logger.info(f"Lookup '{name}' in {spec.table} was created concurrently: {str(e)}")
+            row_id = existing.data[0][spec.id_column]
+
+        with self._lock:
+            loaded = self._loaded[table]
+            loaded.add(name, row_id)
+            loaded.created += 1
+        return row_id
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters and snapshot sizes per table.
+
+        Returns:
+            Dictionary with per-table counters and overall totals
+        """
+        now = time.monotonic()
+        with self._lock:
+            tables = {
+                name: {
+                    "size": len(loaded.by_name),
+                    "hits": loaded.hits,
+                    "misses": loaded.misses,
+                    "refreshes": loaded.refreshes,
+                    "created": loaded.created,
+                    "age_seconds": round(now - loaded.loaded_at, 1) if loaded.loaded_at is not None else None
+                }
+                for name, loaded in self._loaded.items()
+            }
+        hits = sum(t["hits"] for t in tables.values())
+        misses = sum(t["misses"] for t in tables.values())
+        return {
+            "tables": tables,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None
+        }
+
+    def _fresh(self, table: str) -> _LoadedTable:
+        if table not in self.tables:
+            raise KeyError(f"Unknown lookup table: {table}")
+        loaded = self._loaded[table]
+        if loaded.loaded_at is None or time.monotonic() - loaded.loaded_at >= self.ttl_seconds:
+            self._refresh(table)
+        return loaded
+
+    def _refresh(self, table: str, force: bool = False) -> None:
+        spec = self.tables[table]
+        loaded = self._loaded[table]
+        with self._load_locks[table]:
+            with self._lock:
+                # Another thread may have refreshed while we waited for the lock
+                fresh = loaded.loaded_at is not None and time.monotonic() - loaded.loaded_at < self.ttl_seconds
+            if fresh and not force:
+                return
+
+            response = self.client.table(spec.table) \
+                .select(f"{spec.id_column}, {spec.name_column}") \
+                .execute()
+
+            snapshot = _LoadedTable()
+            for row in response.data or []:
+                snapshot.add(row[spec.name_column], row[spec.id_column])
+            with self._lock:
+                loaded.by_name = snapshot.by_name
+                loaded.by_id = snapshot.by_id
+                loaded.loaded_at = time.monotonic()
+                loaded.refreshes += 1
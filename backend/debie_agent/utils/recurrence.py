@@ -0,0 +1,348 @@
+"""
+Local expansion of recurring Google Calendar events.
+
+Medication reminders and workouts are stored as recurring series
+(RRULE:FREQ=DAILY, RRULE:FREQ=WEEKLY;COUNT=4). Knowing what happens in the
+next 24 hours used to mean listing instances from Google with
+singleEvents=True, a network round trip per context build. Instead the
+series' rules are expanded here, for any window:
+
+- RRULE/EXRULE/RDATE/EXDATE lines as Google stores them in "recurrence"
+- times are expanded in the series' own time zone, so a daily 8:00 AM dose
+  stays at 8:00 AM across DST changes, as Google does it
+- modified instances (events with recurringEventId/originalStartTime)
+  replace the occurrence they override, cancelled ones remove it
+- parsed rule sets are kept in an LRU keyed by the series' id, etag and
+  rules; dateutil caches the occurrences each set has generated, so
+  repeated windows over the same series don't regenerate them
+"""
+
+import datetime
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rruleset, rrulestr
+
+logger = logging.getLogger(__name__)
+
+RECURRENCE_CACHE_SIZE = int(os.getenv("RECURRENCE_CACHE_SIZE", "1024"))
+
+UTC = datetime.timezone.utc
+
+
+@dataclass
+class Occurrence:
+    """One instance of a calendar event within a window."""
+    event: Dict[str, Any]
+    start: datetime.datetime
+    end: datetime.datetime
+    all_day: bool = False
+    # ID of the series the instance belongs to, None for single events
+    recurring_event_id: Optional[str] = None
+
+    @property
+    def event_id(self) -> str:
+        if self.recurring_event_id is None or self.event.get("recurringEventId"):
+            return self.event.get("id", "")
+        suffix = self.start.strftime("%Y%m%d") if self.all_day else self.start.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+        return f"{self.recurring_event_id}_{suffix}"
+
+    def to_event(self) -> Dict[str, Any]:
+        """The instance as the Calendar API lists it with singleEvents=True."""
+        if self.recurring_event_id is None or self.event.get("recurringEventId"):
+            return self.event
+        event = {key: value for key, value in self.event.items() if key != "recurrence"}
+        time_zone = self.event.get("start", {}).get("timeZone")
+        event.update({
+            "id": self.event_id,
+            "recurringEventId": self.recurring_event_id,
+            "start": _event_time(self.start, self.all_day, time_zone),
+            "end": _event_time(self.end, self.all_day, time_zone),
+            "originalStartTime": _event_time(self.start, self.all_day, time_zone)
+        })
+        return event
+
+
+def _event_time(value: datetime.datetime, all_day: bool, time_zone: Optional[str]) -> Dict[str, str]:
+    if all_day:
+        return {"date": value.date().isoformat()}
+    moment = {"dateTime": value.isoformat()}
+    if time_zone:
+        moment["timeZone"] = time_zone
+    return moment
+
+
+def _zone(name: Optional[str]) -> datetime.tzinfo:
+    if not name:
+        return UTC
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown time zone {name!r}, expanding in UTC")
+        return UTC
+
+
+def parse_event_time(moment: Dict[str, Any], default_zone: Optional[str] = None) -> Tuple[datetime.datetime, bool]:
+    """
+    An event's start/end/originalStartTime as an aware datetime.
+
+    Returns:
+        (time, all_day); all-day times are midnight in the event's zone
+    """
+    zone = _zone(moment.get("timeZone") or default_zone)
+    if moment.get("date"):
+        return datetime.datetime.combine(datetime.date.fromisoformat(moment["date"]), datetime.time(), zone), True
+    parsed = datetime.datetime.fromisoformat(moment["dateTime"].replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=zone), False
+    return parsed.astimezone(zone) if moment.get("timeZone") else parsed, False
+
+
+def _instance_key(start: datetime.datetime, all_day: bool) -> str:
+    """Identifies an instance of a series, as originalStartTime does."""
+    return start.date().isoformat() if all_day else start.astimezone(UTC).isoformat()
+
+
+def _parse_value(value: str, params: Dict[str, str], zone: datetime.tzinfo, start_time: datetime.time) -> datetime.datetime:
+    """An RDATE/EXDATE value as naive wall time in the series' zone."""
+    if params.get("VALUE") == "DATE" or "T" not in value:
+        return datetime.datetime.combine(datetime.datetime.strptime(value, "%Y%m%d").date(), start_time)
+    if value.endswith("Z"):
+        parsed = datetime.datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=UTC)
+        return parsed.astimezone(zone).replace(tzinfo=None)
+    parsed = datetime.datetime.strptime(value, "%Y%m%dT%H%M%S")
+    if "TZID" in params:
+        return parsed.replace(tzinfo=_zone(params["TZID"])).astimezone(zone).replace(tzinfo=None)
+    return parsed
+
+
+def _local_rule(rule: str, zone: datetime.tzinfo) -> str:
+    """
+    Rewrite UNTIL in UTC ("...Z") as wall time in the series' zone.
+
+    dateutil refuses a UTC UNTIL with the naive DTSTART the expansion uses.
+    """
+    parts = []
+    for part in rule.split(";"):
+        name, _, value = part.partition("=")
+        if name.upper() == "UNTIL" and value.endswith("Z"):
+            until = datetime.datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=UTC)
+            part = "UNTIL=" + until.astimezone(zone).strftime("%Y%m%dT%H%M%S")
+        elif name.upper() == "UNTIL" and "T" not in value:
+            # A date-only UNTIL includes that whole day
+            part = f"UNTIL={value}T235959"
+        parts.append(part)
+    return ";".join(parts)
+
+
+def build_rule_set(recurrence: Iterable[str], dtstart: datetime.datetime) -> rruleset:
+    """
+    Rule set of a series' "recurrence" lines.
+
+    Args:
+        recurrence: RRULE/EXRULE/RDATE/EXDATE lines as stored by Google
+        dtstart: Aware start of the first instance; occurrences are
+            generated as naive wall time in its zone
+    """
+    zone = dtstart.tzinfo
+    local_start = dtstart.replace(tzinfo=None)
+    rules = rruleset(cache=True)
+    for line in recurrence:
+        head, _, value = line.strip().partition(":")
+        name, *param_parts = head.split(";")
+        params = dict(part.split("=", 1) for part in param_parts if "=" in part)
+        name = name.upper()
+        if name in ("RRULE", "EXRULE"):
+            rule = rrulestr(_local_rule(value, zone), dtstart=local_start)
+            (rules.rrule if name == "RRULE" else rules.exrule)(rule)
+        elif name in ("RDATE", "EXDATE"):
+            for item in value.split(","):
+                moment = _parse_value(item.strip(), params, zone, local_start.time())
+                (rules.rdate if name == "RDATE" else rules.exdate)(moment)
+        else:
+            logger.warning(f"Ignoring unsupported recurrence line {line!r}")
+    return rules
+
+
+class RecurrenceCache:
+    """
+    Thread-safe LRU cache of parsed rule sets per series.
+
+    An entry is keyed by the series' ID together with its etag/updated,
+    start and rules, so an edited series gets a new entry.
+
+    Args:
+        max_entries: Rule sets to keep before evicting the least recently used
+    """
+
+    def __init__(self, max_entries: int = RECURRENCE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[Any, ...], rruleset]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def rule_set(self, event: Dict[str, Any], dtstart: datetime.datetime) -> rruleset:
+        key = (
+            event.get("id"),
+            event.get("etag") or event.get("updated"),
+            dtstart.isoformat(),
+            str(dtstart.tzinfo),
+            tuple(event.get("recurrence") or ())
+        )
+        with self.lock:
+            rules = self.entries.get(key)
+            if rules is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return rules
+            self.misses += 1
+
+        rules = build_rule_set(event.get("recurrence") or (), dtstart)
+        with self.lock:
+            rules = self.entries.setdefault(key, rules)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return rules
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+recurrence_cache = RecurrenceCache()
+
+
+def series_end(event: Dict[str, Any], cache: Optional[RecurrenceCache] = None) -> Optional[datetime.datetime]:
+    """
+    End of an event's last occurrence.
+
+    Returns:
+        The end of the event itself for single events, None for a series
+        without COUNT/UNTIL (it never ends)
+    """
+    first_start, _ = parse_event_time(event["start"])
+    first_end, _ = parse_event_time(event.get("end") or event["start"], event["start"].get("timeZone"))
+    recurrence = event.get("recurrence") or []
+    if not recurrence:
+        return first_end
+    rules = [line for line in recurrence if line.upper().startswith("RRULE")]
+    if any("COUNT=" not in rule.upper() and "UNTIL=" not in rule.upper() for rule in rules):
+        return None
+    rule_set = (cache or recurrence_cache).rule_set(event, first_start)
+    last = None
+    for last in rule_set:
+        pass
+    if last is None:
+        return first_end
+    duration = first_end.replace(tzinfo=None) - first_start.replace(tzinfo=None)
+    return (last + duration).replace(tzinfo=first_start.tzinfo)
+
+
+def _overlaps(
+    occurrence_start: datetime.datetime,
+    occurrence_end: datetime.datetime,
+    start: datetime.datetime,
+    end: datetime.datetime
+) -> bool:
+    # Zero-length events (reminders) count when they start inside the window
+    return occurrence_start < end and (occurrence_end > start or occurrence_start >= start)
+
+
+def expand_event(
+    event: Dict[str, Any],
+    start: datetime.datetime,
+    end: datetime.datetime,
+    cache: Optional[RecurrenceCache] = None
+) -> List[Occurrence]:
+    """
+    Occurrences of one event that overlap [start, end).
+
+    Args:
+        event: Calendar event, recurring or single
+        start: Aware start of the window
+        end: Aware end of the window
+        cache: Rule set cache (default: the process-wide one)
+
+    Returns:
+        Occurrences in start order (overrides are not applied, see expand_events)
+    """
+    if event.get("status") == "cancelled" or "start" not in event:
+        return []
+    first_start, all_day = parse_event_time(event["start"])
+    first_end, _ = parse_event_time(event.get("end") or event["start"], event["start"].get("timeZone"))
+    # Wall-clock duration, so instances keep their length across DST changes
+    duration = first_end.replace(tzinfo=None) - first_start.replace(tzinfo=None)
+
+    if not event.get("recurrence"):
+        if _overlaps(first_start, first_end, start, end):
+            return [Occurrence(event, first_start, first_end, all_day, event.get("recurringEventId"))]
+        return []
+
+    zone = first_start.tzinfo
+    rules = (cache or recurrence_cache).rule_set(event, first_start)
+    # Instances starting before the window may still be running in it
+    window_start = (start.astimezone(zone) - duration).replace(tzinfo=None)
+    window_end = end.astimezone(zone).replace(tzinfo=None)
+    occurrences = []
+    for local_start in rules.between(window_start, window_end, inc=True):
+        occurrence_start = local_start.replace(tzinfo=zone)
+        occurrence_end = (local_start + duration).replace(tzinfo=zone)
+        if _overlaps(occurrence_start, occurrence_end, start, end):
+            occurrences.append(Occurrence(event, occurrence_start, occurrence_end, all_day, event.get("id")))
+    return occurrences
+
+
+def expand_events(
+    events: Iterable[Dict[str, Any]],
+    start: datetime.datetime,
+    end: datetime.datetime,
+    cache: Optional[RecurrenceCache] = None
+) -> List[Occurrence]:
+    """
+    Expand stored events (series, their modified instances and single
+    events) into the occurrences overlapping [start, end).
+
+    Args:
+        events: Events as listed with singleEvents=False (or synced)
+        start: Aware start of the window
+        end: Aware end of the window
+        cache: Rule set cache (default: the process-wide one)
+
+    Returns:
+        Occurrences in start order
+    """
+    events = list(events)
+    # (series ID, original start) of every instance that was modified or cancelled
+    overridden = set()
+    for event in events:
+        if event.get("recurringEventId") and event.get("originalStartTime"):
+            original, all_day = parse_event_time(event["originalStartTime"])
+            overridden.add((event["recurringEventId"], _instance_key(original, all_day)))
+
+    occurrences = []
+    for event in events:
+        for occurrence in expand_event(event, start, end, cache):
+            if event.get("recurrence") and (event.get("id"), _instance_key(occurrence.start, occurrence.all_day)) in overridden:
+                continue
+            occurrences.append(occurrence)
+    occurrences.sort(key=lambda occurrence: (occurrence.start, occurrence.event_id))
+    return occurrences
+
+
+def upcoming_occurrences(
+    events: Iterable[Dict[str, Any]],
+    hours: float = 24,
+    now: Optional[datetime.datetime] = None
+) -> List[Occurrence]:
+    """Occurrences of the given events within the next `hours` hours."""
+    now = now or datetime.datetime.now(UTC)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=UTC)
+    return expand_events(events, now, now + datetime.timedelta(hours=hours))
@@ -0,0 +1,326 @@
+"""
+Incremental glucose statistics over rolling windows.
+
+CGM data only grows by appending, so instead of recomputing a window's
+statistics from every reading, each user keeps one accumulator per rolling
+window (24h/7d/30d) that is updated as readings arrive:
+
+- mean and variance with Welford's algorithm (and its inverse on eviction)
+- minimum and maximum with monotonic deques
+- time-in-range counters for the five consensus ranges
+
+Adding or evicting a reading is O(1) amortized and reading the statistics is
+O(1), so a statistics call only costs the query for readings inserted since
+the last refresh. New readings are found by created_at rather than by their
+reading time: a backfilled or out-of-order batch is inserted with readings
+older than the newest one seen, and those can't be folded into the
+accumulators, so they trigger a rebuild of the user's windows.
+"""
+
+import datetime
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .glucose_metrics import (
+    HIGH_THRESHOLD,
+    LOW_THRESHOLD,
+    VERY_HIGH_THRESHOLD,
+    VERY_LOW_THRESHOLD,
+    estimated_a1c,
+    glucose_management_indicator,
+    parse_timestamps
+)
+
+# Rolling windows kept per user
+WINDOWS: Dict[str, int] = {
+    "24h": 86400,
+    "7d": 7 * 86400,
+    "30d": 30 * 86400,
+}
+
+# Seconds between checks for new readings of a user
+REFRESH_INTERVAL_SECONDS = 60
+
+# Refreshes re-read this far behind the newest created_at seen: created_at is
+# the inserting transaction's start, so a slow transaction can commit rows
+# stamped before readings that are already visible
+CREATED_AT_OVERLAP_SECONDS = 300
+
+
+def _range_index(value: float) -> int:
+    """Consensus range of a value: 0 very low, 1 low, 2 in range, 3 high, 4 very high."""
+    if value < VERY_LOW_THRESHOLD:
+        return 0
+    if value < LOW_THRESHOLD:
+        return 1
+    if value <= HIGH_THRESHOLD:
+        return 2
+    if value <= VERY_HIGH_THRESHOLD:
+        return 3
+    return 4
+
+
+class RollingWindowStats:
+    """
+    Running statistics of the readings within the last window_seconds.
+
+    Readings must be added in timestamp order.
+
+    Args:
+        window_seconds: Length of the rolling window
+    """
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self._readings: Deque[Tuple[int, float]] = deque()
+        # Monotonic deques: values decreasing (max) / increasing (min) from the front
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._range_counts = [0] * 5
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self) -> int:
+        return len(self._readings)
+
+    def add(self, timestamp: int, value: float) -> None:
+        self._readings.append((timestamp, value))
+
+        n = len(self._readings)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+
+        self._range_counts[_range_index(value)] += 1
+        self.evict(timestamp)
+
+    def evict(self, now: int) -> None:
+        """Drop readings at or before now - window_seconds."""
+        cutoff = now - self.window_seconds
+        readings = self._readings
+        while readings and readings[0][0] <= cutoff:
+            _, value = readings.popleft()
+            n = len(readings)
+            if n == 0:
+                self._mean = self._m2 = 0.0
+            else:
+                # Inverse Welford update
+                previous_mean = self._mean
+                self._mean = (previous_mean * (n + 1) - value) / n
+                self._m2 = max(self._m2 - (value - self._mean) * (value - previous_mean), 0.0)
+            self._range_counts[_range_index(value)] -= 1
+        while self._max and self._max[0][0] <= cutoff:
+            self._max.popleft()
+        while self._min and self._min[0][0] <= cutoff:
+            self._min.popleft()
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Current statistics of the window.
+
+        Returns:
+            Dictionary with count, mean, standard_deviation,
+            coefficient_of_variation, minimum, maximum, time_in_ranges, gmi
+            and estimated_a1c, or {"count": 0} for an empty window
+        """
+        n = len(self._readings)
+        if n == 0:
+            return {"count": 0}
+        sd = math.sqrt(self._m2 / (n - 1)) if n > 1 else 0.0
+        pct = [count * 100.0 / n for count in self._range_counts]
+        return {
+            "count": n,
+            "mean": round(self._mean, 2),
+            "standard_deviation": round(sd, 2),
+            "coefficient_of_variation": round(sd / self._mean * 100, 2) if self._mean else None,
+            "minimum": round(self._min[0][1], 2),
+            "maximum": round(self._max[0][1], 2),
+            "time_in_ranges": {
+                "very_low_pct": round(pct[0], 1),
+                "low_pct": round(pct[1], 1),
+                "in_range_pct": round(pct[2], 1),
+                "high_pct": round(pct[3], 1),
+                "very_high_pct": round(pct[4], 1)
+            },
+            "gmi": round(glucose_management_indicator(self._mean), 2),
+            "estimated_a1c": round(estimated_a1c(self._mean), 2)
+        }
+
+
+class UserGlucoseStats:
+    """
+    Rolling-window accumulators of one user, fed in timestamp order.
+
+    A reading older than the last one seen cannot be folded into the
+    monotonic deques; it marks the accumulators stale so they are rebuilt.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, int]] = None):
+        self.windows = {name: RollingWindowStats(seconds) for name, seconds in (windows or WINDOWS).items()}
+        self.last_timestamp: Optional[int] = None
+        # Ids seen at last_timestamp: timestamps are whole seconds, so a
+        # re-read from last_timestamp can return both old and new readings
+        self._last_ids: set = set()
+        self.last_refresh: float = 0.0
+        self.stale = False
+        # Newest created_at seen, and the ids seen within the overlap before it
+        self.created_through: Optional[datetime.datetime] = None
+        self._recent_ids: Dict[Any, datetime.datetime] = {}
+
+    def unseen(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop rows a previous refresh already returned (refreshes overlap)."""
+        return [row for row in rows if row.get("glucose_reading_id") not in self._recent_ids]
+
+    def track(self, rows: List[Dict[str, Any]]) -> None:
+        """Move the created_at cursor past rows that have been read."""
+        for row in rows:
+            if not row.get("created_at"):
+                continue
+            created = datetime.datetime.fromisoformat(str(row["created_at"]).replace("Z", "+00:00"))
+            if self.created_through is None or created > self.created_through:
+                self.created_through = created
+            self._recent_ids[row.get("glucose_reading_id")] = created
+        if self.created_through is not None:
+            horizon = self.created_through - datetime.timedelta(seconds=CREATED_AT_OVERLAP_SECONDS)
+            self._recent_ids = {
+                reading_id: created for reading_id, created in self._recent_ids.items() if created >= horizon
+            }
+
+    def refresh_since(self) -> Optional[str]:
+        """created_at from which the next refresh reads, None when nothing was seen yet."""
+        if self.created_through is None:
+            return None
+        return (self.created_through - datetime.timedelta(seconds=CREATED_AT_OVERLAP_SECONDS)).isoformat()
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray, ids: Optional[List[Any]] = None) -> int:
+        """
+        Fold new readings into every window.
+
+        Args:
+            timestamps: int64 epoch seconds, ascending
+            values: Glucose values
+            ids: Optional reading ids, to skip readings already folded in
+
+        Returns:
+            Number of readings added
+        """
+        added = 0
+        ids = ids if ids is not None else [None] * len(values)
+        for timestamp, value, reading_id in zip(timestamps.tolist(), values.tolist(), ids):
+            if self.last_timestamp is not None:
+                if timestamp < self.last_timestamp:
+                    self.stale = True
+                    continue
+                if timestamp == self.last_timestamp and (reading_id is None or reading_id in self._last_ids):
+                    continue
+            for window in self.windows.values():
+                window.add(timestamp, value)
+            if timestamp != self.last_timestamp:
+                self._last_ids = set()
+            self._last_ids.add(reading_id)
+            self.last_timestamp = timestamp
+            added += 1
+        return added
+
+    def statistics(self, window: str, now: Optional[int] = None) -> Dict[str, Any]:
+        stats = self.windows[window]
+        stats.evict(int(time.time()) if now is None else now)
+        return stats.statistics()
+
+
+class RunningStatsRegistry:
+    """
+    Process-wide accumulators per user, refreshed with only the new readings.
+
+    Args:
+        load_since: Callable (user_id, created_since ISO timestamp or None)
+            returning pages of the longest window's glucose_readings rows
+            (with created_at) inserted at or after created_since; None asks
+            for the whole window
+        refresh_interval_seconds: Minimum time between refreshes of a user
+    """
+
+    def __init__(
+        self,
+        load_since: Callable[[str, Optional[str]], Iterable[List[Dict[str, Any]]]],
+        refresh_interval_seconds: float = REFRESH_INTERVAL_SECONDS,
+        windows: Optional[Dict[str, int]] = None
+    ):
+        self.load_since = load_since
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.windows = windows or WINDOWS
+        self._users: Dict[str, UserGlucoseStats] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def statistics(self, user_id: str, window: str = "24h") -> Dict[str, Any]:
+        """
+        Statistics of one rolling window, after folding in readings that
+        arrived since the last refresh.
+        """
+        if window not in self.windows:
+            raise ValueError(f"Unknown window '{window}', expected one of {', '.join(self.windows)}")
+        with self._user_lock(user_id):
+            user = self._users.get(user_id)
+            if user is not None and time.monotonic() - user.last_refresh >= self.refresh_interval_seconds:
+                since = user.refresh_since()
+                if since is None:
+                    user.stale = True
+                else:
+                    rows = user.unseen(self._rows(self.load_since(user_id, since)))
+                    user.track(rows)
+                    # Marks the user stale when a backfilled reading is older
+                    # than the newest one folded in
+                    self._extend(user, rows)
+                    user.last_refresh = time.monotonic()
+            if user is None or user.stale:
+                user = UserGlucoseStats(self.windows)
+                rows = self._rows(self.load_since(user_id, None))
+                user.track(rows)
+                self._extend(user, rows)
+                user.last_refresh = time.monotonic()
+                self._users[user_id] = user
+            return user.statistics(window)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    @staticmethod
+    def _rows(pages: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        return [
+            row for page in pages for row in page
+            if row.get("reading_timestamp") and row.get("glucose_value") is not None
+        ]
+
+    @staticmethod
+    def _extend(user: UserGlucoseStats, rows: List[Dict[str, Any]]) -> None:
+        """Fold rows into the accumulators in reading time order."""
+        if not rows:
+            return
+        timestamps = parse_timestamps(row["reading_timestamp"] for row in rows)
+        order = np.argsort(timestamps, kind="stable")
+        user.extend(
+            timestamps[order],
+            np.asarray([row["glucose_value"] for row in rows], dtype=np.float64)[order],
+            [rows[index].get("glucose_reading_id") for index in order.tolist()]
+        )
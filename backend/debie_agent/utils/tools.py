@@ -1,13 +1,23 @@
 import supabase
 from supabase import create_client
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 import datetime
 import os
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-import requests
 import json
 
+from .fanout import FanOut, DEFAULT_MAX_CONCURRENCY
+from .lookups import LOOKUP_PRELOAD_ON_START, LookupRegistry
+from .cache import ToolCache
+from .glucose_metrics import summarize_readings
+from .glucose_rollups import summarize_rollups
+from .running_stats import RunningStatsRegistry, WINDOWS as RUNNING_STATS_WINDOWS
+from .write_buffer import WriteBuffer
+from .fitbit import FitbitAPIError, fitbit_client
+from .intraday import INTRADAY_METRICS, load_intraday
+from .calendar_service import get_user_calendar_service
+from .calendar_auth import calendar_credentials
+from .calendar_sync import calendar_event_store
+
 # Placeholder for configuration - in production, use environment variables
 SUPABASE_URL = os.getenv("SUPABASE_URL", "your-supabase-url")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "your-supabase-key")
@@ -15,8 +25,416 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY", "your-supabase-key")
 # Initialize Supabase client
 supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Process-wide cache of lookup tables (biometric_types, insight_types, ...)
+lookup_registry = LookupRegistry(supabase_client)
+if LOOKUP_PRELOAD_ON_START:
+    lookup_registry.preload_in_background()
+
+# Shared session/process cache for the data readers (policies in cache.CACHE_POLICIES)
+tool_cache = ToolCache()
+
+# Pending biometric and insight writes, flushed as multi-row inserts
+write_buffer = WriteBuffer(supabase_client, lookup_registry)
+
+# Users' Google Calendar credentials, refreshed in the background ahead of expiry
+# (the store lives in calendar_auth, shared with calendar_integration)
+calendar_credentials.client = supabase_client
+
+# Users' calendars, synced incrementally into calendar_events and read from there
+# (the store lives in calendar_sync, shared with calendar_integration)
+calendar_event_store.client = supabase_client
+
+# Per-user rolling glucose statistics (24h/7d/30d), fed with new readings only
+running_glucose_stats = RunningStatsRegistry(lambda user_id, since: _load_glucose_readings_since(user_id, since))
+
+# Maximum number of concurrent fetches when building the comprehensive context
+# (1 runs every fetch sequentially)
+FANOUT_MAX_CONCURRENCY = DEFAULT_MAX_CONCURRENCY
+
+# Biometric types included in the comprehensive user context
+COMPREHENSIVE_BIOMETRIC_TYPES = ["Steps", "Heart Rate", "Exercise", "Weight"]
+
+# source and biometric types of the rows written by the background Fitbit
+# sync, as in app.services.fitbit_sync
+FITBIT_SOURCE = "Fitbit"
+FITBIT_BIOMETRIC_TYPES = ["Steps", "Resting Heart Rate", "Sleep Minutes", "Sleep Efficiency"]
+# Steps in a minute for it to count as active (roughly a brisk walk)
+ACTIVE_MINUTE_STEPS = 100
+
+# Rows per page for the paginated readers. PostgREST silently caps every
+# response at its max-rows setting (1000 on Supabase), so keep this at or
+# below that limit: a short page is taken as the end of the result set.
+READER_PAGE_SIZE = int(os.getenv("DEBIE_READER_PAGE_SIZE", "1000"))
+
+# Columns selected by the log readers
+GLUCOSE_READING_COLUMNS = """
+    glucose_reading_id,
+    reading_timestamp,
+    glucose_value,
+    reading_source,
+    created_at
+"""
+FOOD_LOG_COLUMNS = """
+    food_log_id,
+    log_timestamp,
+    meal_type_id,
+    food_description,
+    quantity,
+    unit_of_measure,
+    estimated_carbs,
+    estimated_calories,
+    created_at,
+    meal_types(type_name)
+"""
+MEDICATION_LOG_COLUMNS = """
+    medication_log_id,
+    log_timestamp,
+    medication_id,
+    dosage,
+    unit_of_measure,
+    notes,
+    created_at,
+    medications(medication_name, dosage_form)
+"""
+EXERCISE_LOG_COLUMNS = """
+    exercise_log_id,
+    log_timestamp,
+    exercise_type_id,
+    duration_minutes,
+    intensity,
+    calories_burned,
+    notes,
+    created_at,
+    exercise_types(type_name)
+"""
+
+GLUCOSE_ROLLUP_COLUMNS = """
+    granularity,
+    bucket_start,
+    reading_count,
+    value_sum,
+    value_sum_squares,
+    min_value,
+    max_value,
+    very_low_count,
+    low_count,
+    in_range_count,
+    high_count,
+    very_high_count
+"""
+BIOMETRIC_ROLLUP_COLUMNS = """
+    biometric_type_id,
+    granularity,
+    bucket_start,
+    reading_count,
+    value_sum,
+    value_sum_squares,
+    min_value,
+    max_value,
+    biometric_types(type_name)
+"""
+
+# Windows of at least this many days take their glucose statistics from the
+# daily rollups (~1 row per day) instead of the raw readings (~288 per day)
+ROLLUP_MIN_DAYS = int(os.getenv("DEBIE_ROLLUP_MIN_DAYS", "14"))
+
+# Hours of upcoming calendar events in the comprehensive context (its `days`
+# is how far back the history readers look)
+CALENDAR_CONTEXT_HOURS = float(os.getenv("DEBIE_CALENDAR_CONTEXT_HOURS", "24"))
+
+# ========== PAGINATED READERS ==========
+
+def _iter_keyset_pages(
+    table: str,
+    columns: str,
+    timestamp_column: str,
+    id_column: str,
+    user_id: str,
+    start_date: str,
+    page_size: Optional[int] = None,
+    filters=None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield a user's rows since start_date page by page, oldest first
+    
+    Uses keyset pagination: every page continues after the (timestamp, id) of
+    the previous page's last row, so deep pages cost the same as the first one
+    and rows inserted meanwhile don't shift the pages like an offset would.
+    
+    Args:
+        table: Table to read
+        columns: PostgREST select string (must include both key columns)
+        timestamp_column: Timestamp column ordering the rows
+        id_column: Unique id column breaking timestamp ties
+        user_id: The user's ID
+        start_date: ISO timestamp of the oldest row to include
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        filters: Optional callable adding filters to the query builder
+        
+    Yields:
+        Lists of at most page_size rows
+    """
+    page_size = page_size or READER_PAGE_SIZE
+    cursor = None
+    while True:
+        query = supabase_client.table(table) \
+            .select(columns) \
+            .eq("user_id", user_id) \
+            .gte(timestamp_column, start_date)
+        if filters:
+            query = filters(query)
+        if cursor:
+            last_timestamp, last_id = cursor
+            query = query.or_(
+                f'{timestamp_column}.gt."{last_timestamp}",'
+                f'and({timestamp_column}.eq."{last_timestamp}",{id_column}.gt."{last_id}")'
+            )
+        rows = query \
+            .order(timestamp_column, desc=False) \
+            .order(id_column, desc=False) \
+            .limit(page_size) \
+            .execute() \
+            .data
+        
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1][timestamp_column], rows[-1][id_column])
+
+def iter_rows(pages: Iterable[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """Flatten pages from one of the iter_*_pages readers into rows"""
+    for page in pages:
+        yield from page
+
+def iter_glucose_reading_pages(user_id: str, days: int = 7, page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily yield pages of a user's glucose readings, oldest first
+    
+    Args:
+        user_id: The user's ID
+        days: Number of days to look back (default: 7)
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        
+    Yields:
+        Lists of glucose_readings rows
+    """
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    return _iter_keyset_pages(
+        "glucose_readings", GLUCOSE_READING_COLUMNS, "reading_timestamp", "glucose_reading_id",
+        user_id, start_date, page_size
+    )
+
+def iter_food_log_pages(user_id: str, days: int = 7, page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily yield pages of a user's food logs, oldest first
+    
+    Args:
+        user_id: The user's ID
+        days: Number of days to look back (default: 7)
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        
+    Yields:
+        Lists of food_logs rows
+    """
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    return _iter_keyset_pages(
+        "food_logs", FOOD_LOG_COLUMNS, "log_timestamp", "food_log_id",
+        user_id, start_date, page_size
+    )
+
+def iter_medication_log_pages(user_id: str, days: int = 7, page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily yield pages of a user's medication logs, oldest first
+    
+    Args:
+        user_id: The user's ID
+        days: Number of days to look back (default: 7)
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        
+    Yields:
+        Lists of medication_logs rows
+    """
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    return _iter_keyset_pages(
+        "medication_logs", MEDICATION_LOG_COLUMNS, "log_timestamp", "medication_log_id",
+        user_id, start_date, page_size
+    )
+
+def iter_exercise_log_pages(user_id: str, days: int = 7, page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily yield pages of a user's exercise logs, oldest first
+    
+    Args:
+        user_id: The user's ID
+        days: Number of days to look back (default: 7)
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        
+    Yields:
+        Lists of exercise_logs rows
+    """
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    return _iter_keyset_pages(
+        "exercise_logs", EXERCISE_LOG_COLUMNS, "log_timestamp", "exercise_log_id",
+        user_id, start_date, page_size
+    )
+
+def iter_biometric_data_pages(
+    user_id: str,
+    biometric_types: List[str],
+    days: int = 7,
+    page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily yield pages of a user's biometric readings of several types, oldest first
+    
+    Args:
+        user_id: The user's ID
+        biometric_types: Biometric type names (e.g., ["Steps", "Heart Rate"])
+        days: Number of days to look back (default: 7)
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        
+    Yields:
+        Lists of biometric_data rows with their embedded biometric_types(type_name)
+    """
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    type_ids = [
+        type_id for type_id in (lookup_registry.get_id("biometric_types", name) for name in biometric_types)
+        if type_id is not None
+    ]
+    return _iter_biometric_pages(user_id, type_ids, start_date, page_size)
+
+def _iter_biometric_pages(
+    user_id: str,
+    type_ids: List[int],
+    start_date: str,
+    page_size: Optional[int] = None,
+    exclude_source: Optional[str] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    if not type_ids:
+        return iter(())
+    
+    def filters(query):
+        query = query.in_("biometric_type_id", type_ids)
+        if exclude_source:
+            # Rows without a source are kept
+            query = query.or_(f"source.is.null,source.neq.{exclude_source}")
+        return query
+    
+    return _iter_keyset_pages(
+        "biometric_data", "*, biometric_types(type_name)", "reading_timestamp", "biometric_data_id",
+        user_id, start_date, page_size,
+        filters=filters
+    )
+
+def _rollup_start(days: int, granularity: str) -> str:
+    """UTC start of the bucket containing the start of the window"""
+    start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+    start = start.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        start = start.replace(hour=0)
+    return start.isoformat()
+
+def iter_glucose_rollup_pages(
+    user_id: str,
+    days: int = 90,
+    granularity: str = "day",
+    page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily yield pages of a user's glucose rollups, oldest first
+    
+    Args:
+        user_id: The user's ID
+        days: Number of days to look back (default: 90)
+        granularity: Bucket size, "hour" or "day" (default: "day")
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        
+    Yields:
+        Lists of glucose_rollups rows
+    """
+    return _iter_keyset_pages(
+        "glucose_rollups", GLUCOSE_ROLLUP_COLUMNS, "bucket_start", "bucket_start",
+        user_id, _rollup_start(days, granularity), page_size,
+        filters=lambda query: query.eq("granularity", granularity)
+    )
+
+def iter_biometric_rollup_pages(
+    user_id: str,
+    biometric_types: List[str],
+    days: int = 90,
+    granularity: str = "day",
+    page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily yield pages of a user's biometric rollups of several types, oldest first
+    
+    Args:
+        user_id: The user's ID
+        biometric_types: Biometric type names (e.g., ["Steps", "Heart Rate"])
+        days: Number of days to look back (default: 90)
+        granularity: Bucket size, "hour" or "day" (default: "day")
+        page_size: Rows per page (default: READER_PAGE_SIZE)
+        
+    Yields:
+        Lists of biometric_rollups rows with their embedded biometric_types(type_name)
+    """
+    type_ids = [
+        type_id for type_id in (lookup_registry.get_id("biometric_types", name) for name in biometric_types)
+        if type_id is not None
+    ]
+    if not type_ids:
+        return iter(())
+    return _iter_keyset_pages(
+        "biometric_rollups", BIOMETRIC_ROLLUP_COLUMNS, "bucket_start", "biometric_type_id",
+        user_id, _rollup_start(days, granularity), page_size,
+        filters=lambda query: query.eq("granularity", granularity).in_("biometric_type_id", type_ids)
+    )
+
+def summarize_log_pages(pages: Iterable[List[Dict[str, Any]]], fields: List[str]) -> Dict[str, Any]:
+    """
+    Count rows and total numeric fields page by page
+    
+    Only one page is held in memory at a time, so long windows can be
+    summarized without materializing every row.
+    
+    Args:
+        pages: Pages from one of the iter_*_pages readers
+        fields: Numeric fields to total (missing values count as 0)
+        
+    Returns:
+        Dictionary with "count" and "totals" per field
+    """
+    count = 0
+    totals = {field: 0.0 for field in fields}
+    for page in pages:
+        count += len(page)
+        for field in fields:
+            totals[field] += sum(float(row.get(field) or 0) for row in page)
+    return {"count": count, "totals": totals}
+
 # ========== SUPABASE TOOLS ==========
 
+def _cached_read(name: str, key: str, loader, tool_context=None, cache_if=None) -> Dict[str, Any]:
+    """
+    Serve a reader's result through the shared tool cache
+    
+    Args:
+        name: Reader name selecting the cache policy in CACHE_POLICIES
+        key: Cache key within the reader
+        loader: Callable running the uncached query
+        tool_context: Optional ToolContext object for session-level caching
+        cache_if: Optional predicate deciding whether a result is cached
+        
+    Returns:
+        The reader's result, tagged with "source" when served from a cache
+    """
+    kwargs = {"cache_if": cache_if} if cache_if else {}
+    result, source = tool_cache.get_or_load(name, key, loader, tool_context, **kwargs)
+    if source:
+        result = {**result, "source": source}
+    return result
+
 def get_user_info(user_id: str, tool_context=None) -> Dict[str, Any]:
     """
     Get user information from the database to serve as the context for the agent
@@ -73,7 +491,7 @@ def get_user_info(user_id: str, tool_context=None) -> Dict[str, Any]:
             "message": str(e)
         }
 
-def get_glucose_readings(user_id: str, tool_context=None, days: int = 7) -> Dict[str, Any]:
+def get_glucose_readings(user_id: str, tool_context=None, days: int = 7, include_readings: bool = True) -> Dict[str, Any]:
     """
     Retrieve glucose readings for a specified user over a time period
     
@@ -81,167 +499,185 @@ def get_glucose_readings(user_id: str, tool_context=None, days: int = 7) -> Dict
         user_id: The user's ID
         tool_context: Optional ToolContext object for state management
         days: Number of days to look back (default: 7)
+        include_readings: Return the individual readings. When False and the
+            window is at least ROLLUP_MIN_DAYS long, only statistics are
+            returned, computed from the daily rollups
         
     Returns:
         Dictionary containing glucose readings data
     """
     try:
-        # Check state cache if tool_context is provided
-        if tool_context and tool_context.state.get(f"temp:glucose_readings:{user_id}:{days}"):
-            cache_time_str = tool_context.state.get(f"temp:glucose_readings_timestamp:{user_id}:{days}")
-            if cache_time_str:
-                try:
-                    # Parse the timestamp
-                    cache_time = datetime.datetime.fromisoformat(cache_time_str)
-                    now = datetime.datetime.now()
-                    # If cache is less than 5 minutes old, use it
-                    if (now - cache_time).total_seconds() < 300:  # 5 minutes
-                        return {
-                            "status": "success",
-                            "data": tool_context.state.get(f"temp:glucose_readings:{user_id}:{days}"),
-                            "statistics": tool_context.state.get(f"temp:glucose_statistics:{user_id}:{days}", {}),
-                            "source": "state_cache"
-                        }
-                except Exception as e:
-                    # If parsing fails, ignore cache and continue with fresh data
-                    print(f"Cache timestamp parsing error: {str(e)}")
+        if not include_readings and days >= ROLLUP_MIN_DAYS:
+            result = get_glucose_rollups(user_id, tool_context, days)
+            # Fall back to the readings until the rollups have been backfilled
+            if result.get("status") != "success" or result.get("count"):
+                return result
+        return _cached_read(
+            "glucose_readings", f"{user_id}:{days}",
+            lambda: _load_glucose_readings(user_id, days),
+            tool_context
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+def _load_glucose_readings(user_id: str, days: int) -> Dict[str, Any]:
+    """Query glucose readings and their statistics (uncached)"""
+    # Page through the window so long histories aren't truncated by the row cap
+    readings = list(iter_rows(iter_glucose_reading_pages(user_id, days)))
+    
+    # Process the data to include relevant statistics
+    if readings:
+        statistics = summarize_readings(readings)
         
-        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+        return {
+            "status": "success",
+            "data": readings,
+            "count": len(readings),
+            "period": f"Last {days} days",
+            "statistics": statistics
+        }
+    else:
+        return {
+            "status": "success",
+            "data": [],
+            "count": 0,
+            "period": f"Last {days} days",
+            "message": "No glucose readings found for the specified period"
+        }
+
+def _load_glucose_readings_since(user_id: str, created_since: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Pages of the longest running-stats window's readings inserted at or
+    after created_since (all of them when None)
+    
+    Readings are selected by insertion time, so backfilled readings older
+    than the newest one are found too.
+    """
+    days = max(RUNNING_STATS_WINDOWS.values()) // 86400
+    if created_since is None:
+        return iter_glucose_reading_pages(user_id, days)
+    window_start = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    return _iter_keyset_pages(
+        "glucose_readings", GLUCOSE_READING_COLUMNS, "created_at", "glucose_reading_id",
+        user_id, created_since,
+        # The reading time bound keeps the query on the window's partitions
+        filters=lambda query: query.gte("reading_timestamp", window_start)
+    )
+
+def get_glucose_statistics(user_id: str, window: str = "24h") -> Dict[str, Any]:
+    """
+    Retrieve glucose statistics over a rolling window, kept up to date incrementally
+    
+    The first call for a user loads the longest window once; later calls only
+    query readings inserted since the last refresh and fold them into running
+    accumulators, so the statistics don't depend on the window's size.
+    Backfilled readings older than the newest one rebuild the windows.
+    
+    Args:
+        user_id: The user's ID
+        window: Rolling window, one of "24h", "7d" or "30d" (default: "24h")
         
-        # Query aligned with the glucose_readings table schema
-        response = supabase_client.table("glucose_readings") \
-            .select("""
-                glucose_reading_id,
-                reading_timestamp,
-                glucose_value,
-                reading_source,
-                created_at
-            """) \
-            .eq("user_id", user_id) \
-            .gte("reading_timestamp", start_date) \
-            .order("reading_timestamp", desc=False) \
-            .execute()
-            
-        # Process the data to include relevant statistics
-        readings = response.data
-        if readings:
-            avg_glucose = sum(reading['glucose_value'] for reading in readings) / len(readings)
-            max_glucose = max(reading['glucose_value'] for reading in readings)
-            min_glucose = min(reading['glucose_value'] for reading in readings)
-            
-            statistics = {
-                "average": round(avg_glucose, 2),
-                "maximum": max_glucose,
-                "minimum": min_glucose
-            }
-            
-            # Cache in state if tool_context provided
-            if tool_context:
-                now = datetime.datetime.now()
-                tool_context.state[f"temp:glucose_readings:{user_id}:{days}"] = readings
-                tool_context.state[f"temp:glucose_statistics:{user_id}:{days}"] = statistics
-                tool_context.state[f"temp:glucose_readings_timestamp:{user_id}:{days}"] = now.isoformat()
-            
-            return {
-                "status": "success",
-                "data": readings,
-                "count": len(readings),
-                "period": f"Last {days} days",
-                "statistics": statistics
-            }
-        else:
-            return {
-                "status": "success",
-                "data": [],
-                "count": 0,
-                "period": f"Last {days} days",
-                "message": "No glucose readings found for the specified period"
-            }
+    Returns:
+        Dictionary containing count, mean, standard deviation, CV, min/max,
+        time in ranges, GMI and estimated A1C for the window
+    """
+    try:
+        statistics = running_glucose_stats.statistics(user_id, window)
+        return {
+            "status": "success",
+            "window": window,
+            "count": statistics["count"],
+            "statistics": statistics
+        }
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
         }
 
-def get_food_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[str, Any]:
+def get_glucose_rollups(user_id: str, tool_context=None, days: int = 90, granularity: str = "day") -> Dict[str, Any]:
     """
-    Retrieve food log entries for a specified user
+    Retrieve a user's precomputed hourly or daily glucose aggregates
     
     Args:
         user_id: The user's ID
         tool_context: Optional ToolContext object for state management
-        days: Number of days to look back (default: 7)
+        days: Number of days to look back (default: 90)
+        granularity: Bucket size, "hour" or "day" (default: "day")
         
     Returns:
-        Dictionary containing food log data
+        Dictionary containing the rollup rows ("rollups"), the number of
+        readings they cover ("count") and statistics for the whole window
     """
     try:
-        # Check state cache if tool_context is provided
-        if tool_context and tool_context.state.get(f"temp:food_logs:{user_id}:{days}"):
-            cache_time_str = tool_context.state.get(f"temp:food_logs_timestamp:{user_id}:{days}")
-            if cache_time_str:
-                try:
-                    # Parse the timestamp
-                    cache_time = datetime.datetime.fromisoformat(cache_time_str)
-                    now = datetime.datetime.now()
-                    # If cache is less than 5 minutes old, use it
-                    if (now - cache_time).total_seconds() < 300:  # 5 minutes
-                        return {
-                            "status": "success",
-                            "data": tool_context.state.get(f"temp:food_logs:{user_id}:{days}"),
-                            "summary": tool_context.state.get(f"temp:food_logs_summary:{user_id}:{days}", {}),
-                            "source": "state_cache"
-                        }
-                except Exception as e:
-                    # If parsing fails, ignore cache and continue with fresh data
-                    print(f"Cache timestamp parsing error: {str(e)}")
-        
-        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
-        
-        # Query aligned with the food_logs table schema
-        response = supabase_client.table("food_logs") \
-            .select("""
-                food_log_id,
-                log_timestamp,
-                meal_type_id,
-                food_description,
-                quantity,
-                unit_of_measure,
-                estimated_carbs,
-                estimated_calories,
-                created_at,
-                meal_types(type_name)
-            """) \
-            .eq("user_id", user_id) \
-            .gte("log_timestamp", start_date) \
-            .order("log_timestamp", desc=False) \
-            .execute()
-            
-        # Process the data for easier consumption
-        logs = response.data
-        total_carbs = sum(log.get('estimated_carbs', 0) or 0 for log in logs)
-        total_calories = sum(log.get('estimated_calories', 0) or 0 for log in logs)
-        
-        summary = {
-            "total_carbs": round(total_carbs, 2),
-            "total_calories": round(total_calories, 2),
-            "daily_avg_carbs": round(total_carbs / days, 2) if logs else 0,
-            "daily_avg_calories": round(total_calories / days, 2) if logs else 0
+        return _cached_read(
+            "glucose_rollups", f"{user_id}:{days}:{granularity}",
+            lambda: _load_glucose_rollups(user_id, days, granularity),
+            tool_context
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
         }
+
+def _load_glucose_rollups(user_id: str, days: int, granularity: str) -> Dict[str, Any]:
+    """Query glucose rollups and their statistics (uncached)"""
+    rollups = list(iter_rows(iter_glucose_rollup_pages(user_id, days, granularity)))
+    statistics = summarize_rollups(rollups)
+    return {
+        "status": "success",
+        "data": [],
+        "rollups": rollups,
+        "granularity": granularity,
+        "count": statistics.get("count", 0),
+        "period": f"Last {days} days",
+        "statistics": statistics
+    }
+
+def get_biometric_rollups(user_id: str, biometric_types: List[str], days: int = 90, granularity: str = "day") -> Dict[str, Any]:
+    """
+    Retrieve a user's precomputed hourly or daily aggregates of several biometric types
+    
+    Args:
+        user_id: The user's ID
+        biometric_types: Biometric type names (e.g., ["Steps", "Heart Rate", "Weight"])
+        days: Number of days to look back (default: 90)
+        granularity: Bucket size, "hour" or "day" (default: "day")
         
-        # Cache in state if tool_context provided
-        if tool_context:
-            now = datetime.datetime.now()
-            tool_context.state[f"temp:food_logs:{user_id}:{days}"] = logs
-            tool_context.state[f"temp:food_logs_summary:{user_id}:{days}"] = summary
-            tool_context.state[f"temp:food_logs_timestamp:{user_id}:{days}"] = now.isoformat()
+    Returns:
+        Dictionary containing rollup rows and window statistics (count, mean,
+        minimum, maximum, total) grouped by biometric type
+    """
+    try:
+        grouped = {name: [] for name in biometric_types}
+        for row in iter_rows(iter_biometric_rollup_pages(user_id, biometric_types, days, granularity)):
+            name = (row.get("biometric_types") or {}).get("type_name")
+            if name in grouped:
+                grouped[name].append(row)
+        
+        statistics = {}
+        for name, rows in grouped.items():
+            count = sum(row["reading_count"] for row in rows)
+            if count:
+                total = sum(float(row["value_sum"]) for row in rows)
+                statistics[name] = {
+                    "count": count,
+                    "mean": round(total / count, 2),
+                    "minimum": min(float(row["min_value"]) for row in rows),
+                    "maximum": max(float(row["max_value"]) for row in rows),
+                    "total": round(total, 2)
+                }
         
         return {
             "status": "success",
-            "data": logs,
-            "count": len(logs),
-            "period": f"Last {days} days",
-            "summary": summary
+            "data": grouped,
+            "statistics": statistics,
+            "granularity": granularity,
+            "period": f"Last {days} days"
         }
     except Exception as e:
         return {
@@ -249,6 +685,54 @@ def get_food_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[str, A
             "message": str(e)
         }
 
+def get_food_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[str, Any]:
+    """
+    Retrieve food log entries for a specified user
+    
+    Args:
+        user_id: The user's ID
+        tool_context: Optional ToolContext object for state management
+        days: Number of days to look back (default: 7)
+        
+    Returns:
+        Dictionary containing food log data
+    """
+    try:
+        return _cached_read(
+            "food_logs", f"{user_id}:{days}",
+            lambda: _load_food_logs(user_id, days),
+            tool_context
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+def _load_food_logs(user_id: str, days: int) -> Dict[str, Any]:
+    """Query food logs and their nutrition summary (uncached)"""
+    # Page through the window so long histories aren't truncated by the row cap
+    logs = list(iter_rows(iter_food_log_pages(user_id, days)))
+    
+    # Process the data for easier consumption
+    total_carbs = sum(log.get('estimated_carbs', 0) or 0 for log in logs)
+    total_calories = sum(log.get('estimated_calories', 0) or 0 for log in logs)
+    
+    summary = {
+        "total_carbs": round(total_carbs, 2),
+        "total_calories": round(total_calories, 2),
+        "daily_avg_carbs": round(total_carbs / days, 2) if logs else 0,
+        "daily_avg_calories": round(total_calories / days, 2) if logs else 0
+    }
+    
+    return {
+        "status": "success",
+        "data": logs,
+        "count": len(logs),
+        "period": f"Last {days} days",
+        "summary": summary
+    }
+
 def get_medication_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[str, Any]:
     """
     Retrieve medication log entries for a specified user
@@ -262,66 +746,29 @@ def get_medication_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[
         Dictionary containing medication log data
     """
     try:
-        # Check state cache if tool_context is provided
-        if tool_context and tool_context.state.get(f"temp:medication_logs:{user_id}:{days}"):
-            cache_time_str = tool_context.state.get(f"temp:medication_logs_timestamp:{user_id}:{days}")
-            if cache_time_str:
-                try:
-                    # Parse the timestamp
-                    cache_time = datetime.datetime.fromisoformat(cache_time_str)
-                    now = datetime.datetime.now()
-                    # If cache is less than 5 minutes old, use it
-                    if (now - cache_time).total_seconds() < 300:  # 5 minutes
-                        return {
-                            "status": "success",
-                            "data": tool_context.state.get(f"temp:medication_logs:{user_id}:{days}"),
-                            "source": "state_cache"
-                        }
-                except Exception as e:
-                    # If parsing fails, ignore cache and continue with fresh data
-                    print(f"Cache timestamp parsing error: {str(e)}")
-        
-        # Rest of implementation remains the same
-        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
-        
-        # Query the medication_logs table
-        response = supabase_client.table("medication_logs") \
-            .select("""
-                medication_log_id,
-                log_timestamp,
-                medication_id,
-                dosage,
-                unit_of_measure,
-                notes,
-                created_at,
-                medications(medication_name, dosage_form)
-            """) \
-            .eq("user_id", user_id) \
-            .gte("log_timestamp", start_date) \
-            .order("log_timestamp", desc=False) \
-            .execute()
-            
-        # Process the data
-        logs = response.data
-        
-        # Cache in state if tool_context provided
-        if tool_context:
-            now = datetime.datetime.now()
-            tool_context.state[f"temp:medication_logs:{user_id}:{days}"] = logs
-            tool_context.state[f"temp:medication_logs_timestamp:{user_id}:{days}"] = now.isoformat()
-        
-        return {
-            "status": "success",
-            "data": logs,
-            "count": len(logs),
-            "period": f"Last {days} days"
-        }
+        return _cached_read(
+            "medication_logs", f"{user_id}:{days}",
+            lambda: _load_medication_logs(user_id, days),
+            tool_context
+        )
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
         }
 
+def _load_medication_logs(user_id: str, days: int) -> Dict[str, Any]:
+    """Query medication logs (uncached)"""
+    # Page through the window so long histories aren't truncated by the row cap
+    logs = list(iter_rows(iter_medication_log_pages(user_id, days)))
+    
+    return {
+        "status": "success",
+        "data": logs,
+        "count": len(logs),
+        "period": f"Last {days} days"
+    }
+
 def get_exercise_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[str, Any]:
     """
     Retrieve exercise log entries for a specified user
@@ -335,72 +782,63 @@ def get_exercise_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[st
         Dictionary containing exercise log data
     """
     try:
-        # Check state cache if tool_context is provided
-        if tool_context and tool_context.state.get(f"temp:exercise_logs:{user_id}:{days}"):
-            cache_time_str = tool_context.state.get(f"temp:exercise_logs_timestamp:{user_id}:{days}")
-            if cache_time_str:
-                try:
-                    # Parse the timestamp
-                    cache_time = datetime.datetime.fromisoformat(cache_time_str)
-                    now = datetime.datetime.now()
-                    # If cache is less than 5 minutes old, use it
-                    if (now - cache_time).total_seconds() < 300:  # 5 minutes
-                        return {
-                            "status": "success",
-                            "data": tool_context.state.get(f"temp:exercise_logs:{user_id}:{days}"),
-                            "summary": tool_context.state.get(f"temp:exercise_logs_summary:{user_id}:{days}", {}),
-                            "source": "state_cache"
-                        }
-                except Exception as e:
-                    # If parsing fails, ignore cache and continue with fresh data
-                    print(f"Cache timestamp parsing error: {str(e)}")
-        
-        # Rest of implementation remains the same
-        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
-        
-        # Query the exercise_logs table
-        response = supabase_client.table("exercise_logs") \
-            .select("""
-                exercise_log_id,
-                log_timestamp,
-                exercise_type_id,
-                duration_minutes,
-                intensity,
-                calories_burned,
-                notes,
-                created_at,
-                exercise_types(type_name)
-            """) \
-            .eq("user_id", user_id) \
-            .gte("log_timestamp", start_date) \
-            .order("log_timestamp", desc=False) \
-            .execute()
-            
-        # Process the data
-        logs = response.data
-        total_calories = sum(log.get('calories_burned', 0) or 0 for log in logs)
-        total_duration = sum(log.get('duration_minutes', 0) or 0 for log in logs)
-        
-        summary = {
-            "total_calories": round(total_calories, 2),
-            "total_duration": total_duration,
-            "daily_avg_calories": round(total_calories / days, 2) if logs else 0,
-            "daily_avg_duration": round(total_duration / days, 2) if logs else 0
+        return _cached_read(
+            "exercise_logs", f"{user_id}:{days}",
+            lambda: _load_exercise_logs(user_id, days),
+            tool_context
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
         }
+
+def _load_exercise_logs(user_id: str, days: int) -> Dict[str, Any]:
+    """Query exercise logs and their activity summary (uncached)"""
+    # Page through the window so long histories aren't truncated by the row cap
+    logs = list(iter_rows(iter_exercise_log_pages(user_id, days)))
+    
+    # Process the data
+    total_calories = sum(log.get('calories_burned', 0) or 0 for log in logs)
+    total_duration = sum(log.get('duration_minutes', 0) or 0 for log in logs)
+    
+    summary = {
+        "total_calories": round(total_calories, 2),
+        "total_duration": total_duration,
+        "daily_avg_calories": round(total_calories / days, 2) if logs else 0,
+        "daily_avg_duration": round(total_duration / days, 2) if logs else 0
+    }
+    
+    return {
+        "status": "success",
+        "data": logs,
+        "count": len(logs),
+        "period": f"Last {days} days",
+        "summary": summary
+    }
+
+def get_biometric_data(user_id: str, biometric_types: List[str], days: int = 7) -> Dict[str, Any]:
+    """
+    Retrieve biometric readings of several types for a specified user
+    
+    Args:
+        user_id: The user's ID
+        biometric_types: Biometric type names (e.g., ["Steps", "Heart Rate", "Weight"])
+        days: Number of days to look back (default: 7)
         
-        # Cache in state if tool_context provided
-        if tool_context:
-            now = datetime.datetime.now()
-            tool_context.state[f"temp:exercise_logs:{user_id}:{days}"] = logs
-            tool_context.state[f"temp:exercise_logs_summary:{user_id}:{days}"] = summary
-            tool_context.state[f"temp:exercise_logs_timestamp:{user_id}:{days}"] = now.isoformat()
+    Returns:
+        Dictionary containing readings grouped by biometric type
+        (e.g., {"steps": [...], "heart_rate": [...]})
+    """
+    try:
+        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+        grouped = _get_biometric_data_bulk(user_id, biometric_types, start_date)
         
         return {
             "status": "success",
-            "data": logs,
-            "count": len(logs),
-            "period": f"Last {days} days",
-            "summary": summary
+            "data": grouped,
+            "count": sum(len(rows) for rows in grouped.values()),
+            "period": f"Last {days} days"
         }
     except Exception as e:
         return {
@@ -408,7 +846,7 @@ def get_exercise_logs(user_id: str, tool_context=None, days: int = 7) -> Dict[st
             "message": str(e)
         }
 
-def save_insight(user_id: str, insight_type: str, content: Dict[str, Any]) -> Dict[str, Any]:
+def save_insight(user_id: str, insight_type: str, content: Dict[str, Any], buffered: bool = False) -> Dict[str, Any]:
     """
     Save an AI-generated insight to the database
     
@@ -416,67 +854,117 @@ def save_insight(user_id: str, insight_type: str, content: Dict[str, Any]) -> Di
         user_id: The user's ID
         insight_type: Type of insight (glucose_pattern, food_correlation, etc.)
         content: The insight content
+        buffered: Queue the insight and write it with the next flush
+            (see flush_pending_writes) instead of inserting it now
         
     Returns:
         Dictionary containing operation result
     """
     try:
-        # Get the insight_type_id first
-        insight_type_response = supabase_client.table("insight_types") \
-            .select("insight_type_id") \
-            .eq("type_name", insight_type) \
-            .execute()
-            
-        if not insight_type_response.data:
-            # If the insight type doesn't exist, create it
-            new_type = supabase_client.table("insight_types").insert({
-                "type_name": insight_type,
-                "description": f"AI-generated insights about {insight_type}"
-            }).execute()
-            
-            insight_type_id = new_type.data[0]['insight_type_id']
-        else:
-            insight_type_id = insight_type_response.data[0]['insight_type_id']
-        
-        # Now create the insight record
-        data = {
-            "user_id": user_id,
-            "insight_type_id": insight_type_id,
-            "generated_timestamp": datetime.datetime.now().isoformat(),
-            "insight_details": content,
-            "model_version": "debie-agent-1.0"  # Track which model version generated the insight
-        }
-        
-        response = supabase_client.table("ai_insights").insert(data).execute()
-        
+        if buffered:
+            return _queued_result(write_buffer.add_insight(user_id, insight_type, content), f"{insight_type} insight")
+        single = _single_write()
+        return _flushed_result(single, single.add_insight(user_id, insight_type, content))
+    except Exception as e:
         return {
-            "status": "success",
-            "data": response.data[0] if response.data else {},
-            "message": "Insight saved successfully"
+            "status": "error",
+            "message": str(e)
         }
+
+def flush_pending_writes(user_id: str) -> Dict[str, Any]:
+    """
+    Write the user's queued biometric readings and insights
+    
+    Pending rows are inserted with one multi-row insert per table. Queued
+    rows that already failed in a timed flush are reported here as well.
+    
+    Args:
+        user_id: The user's ID
+        
+    Returns:
+        Dictionary with saved/failed counts and a result per queued row
+        (ticket, status, and the saved row or an error message)
+    """
+    try:
+        return write_buffer.flush(user_id=user_id)
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
         }
 
+def _queued_result(ticket: int, label: str) -> Dict[str, Any]:
+    # The row may already have been written by a size-triggered flush
+    result = write_buffer.result(ticket)
+    if result is not None:
+        return _row_result(result)
+    return {
+        "status": "success",
+        "queued": True,
+        "ticket": ticket,
+        "message": f"{label} queued; it will be saved with the next flush"
+    }
+
+def _single_write() -> WriteBuffer:
+    # A private buffer: the shared one's timed and size-triggered flushes
+    # could take the row while the caller is waiting for its result
+    return WriteBuffer(supabase_client, lookup_registry, max_rows=2, max_age_seconds=0)
+
+def _flushed_result(buffer: WriteBuffer, ticket: int) -> Dict[str, Any]:
+    buffer.flush()
+    return _row_result(buffer.result(ticket))
+
+def _row_result(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if result is None:
+        return {
+            "status": "error",
+            "message": "Write was not flushed"
+        }
+    if result["status"] == "error":
+        return {
+            "status": "error",
+            "message": result["message"]
+        }
+    return {
+        "status": "success",
+        "data": result["data"],
+        "message": result["message"]
+    }
+
 # ========== GOOGLE CALENDAR TOOLS ==========
 
-def get_calendar_events(user_credentials: Dict[str, Any], days: int = 7) -> Dict[str, Any]:
+def get_calendar_events(
+    user_credentials: Optional[Dict[str, Any]] = None,
+    days: int = 7,
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Retrieve upcoming calendar events for a user
     
+    With a user_id the events come from the synced copy of the user's
+    calendar (calendar_event_store); otherwise the window is listed from
+    the API with user_credentials.
+    
     Args:
         user_credentials: Google OAuth credentials for the user
         days: Number of days to look ahead (default: 7)
+        user_id: The user's ID
         
     Returns:
         Dictionary containing calendar events
     """
     try:
+        if user_id:
+            events = calendar_event_store.upcoming(user_id, hours=days * 24)
+            return {
+                "status": "success",
+                "data": events,
+                "count": len(events),
+                "period": f"Next {days} days"
+            }
+        
         # This is a placeholder - in a real implementation, you would use proper credentials
-        credentials = Credentials.from_authorized_user_info(user_credentials)
-        service = build('calendar', 'v3', credentials=credentials)
+        service = get_user_calendar_service(user_credentials)
         
         # Get upcoming events
         now = datetime.datetime.utcnow().isoformat() + 'Z'
@@ -543,8 +1031,7 @@ def create_calendar_event(
     """
     try:
         # This is a placeholder - in a real implementation, you would use proper credentials
-        credentials = Credentials.from_authorized_user_info(user_credentials)
-        service = build('calendar', 'v3', credentials=credentials)
+        service = get_user_calendar_service(user_credentials)
         
         # Set up default reminders if none provided
         if not reminders:
@@ -611,8 +1098,7 @@ def create_log_reminder(
     """
     try:
         # This is a placeholder - in a real implementation, you would use proper credentials
-        credentials = Credentials.from_authorized_user_info(user_credentials)
-        service = build('calendar', 'v3', credentials=credentials)
+        service = get_user_calendar_service(user_credentials)
         
         # Get the parent event to determine when to schedule the reminder
         parent_event = service.events().get(calendarId='primary', eventId=parent_event_id).execute()
@@ -689,6 +1175,19 @@ def create_log_reminder(
 
 # ========== FITBIT TOOLS ==========
 
+def _fitbit_error(error: Exception, data_kind: str) -> Dict[str, Any]:
+    """Tool error response for a failed Fitbit request."""
+    if isinstance(error, FitbitAPIError):
+        return {
+            "status": "error",
+            "code": error.status_code,
+            "message": f"Failed to retrieve Fitbit {data_kind} data: {error.message}"
+        }
+    return {
+        "status": "error",
+        "message": str(error)
+    }
+
 def get_fitbit_activity(user_credentials: Dict[str, Any], date: str = None) -> Dict[str, Any]:
     """
     Retrieve Fitbit activity data for a specific date
@@ -705,52 +1204,29 @@ def get_fitbit_activity(user_credentials: Dict[str, Any], date: str = None) -> D
         if not date:
             date = datetime.datetime.now().strftime('%Y-%m-%d')
             
-        # This is a placeholder - in a real implementation, you would use proper auth
-        access_token = user_credentials.get('access_token')
-        
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'Accept-Language': 'en_US'
-        }
-        
         # Get daily activity summary
-        response = requests.get(
-            f'https://api.fitbit.com/1/user/-/activities/date/{date}.json',
-            headers=headers
-        )
+        data = fitbit_client.activity_summary(user_credentials, date)
+        
+        # Extract relevant activity metrics
+        summary = data.get('summary', {})
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract relevant activity metrics
-            summary = data.get('summary', {})
-            
-            return {
-                "status": "success",
-                "date": date,
-                "data": {
-                    "steps": summary.get('steps', 0),
-                    "distance": summary.get('distances', [{}])[0].get('distance', 0),
-                    "calories": summary.get('caloriesOut', 0),
-                    "active_minutes": sum([
-                        summary.get('fairlyActiveMinutes', 0),
-                        summary.get('veryActiveMinutes', 0)
-                    ]),
-                    "sedentary_minutes": summary.get('sedentaryMinutes', 0),
-                    "activities": data.get('activities', [])
-                }
-            }
-        else:
-            return {
-                "status": "error",
-                "code": response.status_code,
-                "message": f"Failed to retrieve Fitbit activity data: {response.text}"
-            }
-    except Exception as e:
         return {
-            "status": "error",
-            "message": str(e)
+            "status": "success",
+            "date": date,
+            "data": {
+                "steps": summary.get('steps', 0),
+                "distance": summary.get('distances', [{}])[0].get('distance', 0),
+                "calories": summary.get('caloriesOut', 0),
+                "active_minutes": sum([
+                    summary.get('fairlyActiveMinutes', 0),
+                    summary.get('veryActiveMinutes', 0)
+                ]),
+                "sedentary_minutes": summary.get('sedentaryMinutes', 0),
+                "activities": data.get('activities', [])
+            }
         }
+    except Exception as e:
+        return _fitbit_error(e, "activity")
 
 def get_fitbit_heart_rate(user_credentials: Dict[str, Any], date: str = None) -> Dict[str, Any]:
     """
@@ -768,47 +1244,24 @@ def get_fitbit_heart_rate(user_credentials: Dict[str, Any], date: str = None) ->
         if not date:
             date = datetime.datetime.now().strftime('%Y-%m-%d')
             
-        # This is a placeholder - in a real implementation, you would use proper auth
-        access_token = user_credentials.get('access_token')
-        
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'Accept-Language': 'en_US'
-        }
-        
         # Get heart rate data
-        response = requests.get(
-            f'https://api.fitbit.com/1/user/-/activities/heart/date/{date}/1d.json',
-            headers=headers
-        )
+        data = fitbit_client.heart_rate(user_credentials, date)
+        
+        # Extract heart rate data
+        activities_heart = data.get('activities-heart', [{}])[0]
+        value = activities_heart.get('value', {})
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract heart rate data
-            activities_heart = data.get('activities-heart', [{}])[0]
-            value = activities_heart.get('value', {})
-            
-            return {
-                "status": "success",
-                "date": date,
-                "data": {
-                    "resting_heart_rate": value.get('restingHeartRate', 0),
-                    "heart_rate_zones": value.get('heartRateZones', []),
-                    "intraday_data": data.get('activities-heart-intraday', {}).get('dataset', [])
-                }
-            }
-        else:
-            return {
-                "status": "error",
-                "code": response.status_code,
-                "message": f"Failed to retrieve Fitbit heart rate data: {response.text}"
-            }
-    except Exception as e:
         return {
-            "status": "error",
-            "message": str(e)
+            "status": "success",
+            "date": date,
+            "data": {
+                "resting_heart_rate": value.get('restingHeartRate', 0),
+                "heart_rate_zones": value.get('heartRateZones', []),
+                "intraday_data": data.get('activities-heart-intraday', {}).get('dataset', [])
+            }
         }
+    except Exception as e:
+        return _fitbit_error(e, "heart rate")
 
 def get_fitbit_sleep(user_credentials: Dict[str, Any], date: str = None) -> Dict[str, Any]:
     """
@@ -826,48 +1279,25 @@ def get_fitbit_sleep(user_credentials: Dict[str, Any], date: str = None) -> Dict
         if not date:
             date = datetime.datetime.now().strftime('%Y-%m-%d')
             
-        # This is a placeholder - in a real implementation, you would use proper auth
-        access_token = user_credentials.get('access_token')
-        
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'Accept-Language': 'en_US'
-        }
-        
         # Get sleep data
-        response = requests.get(
-            f'https://api.fitbit.com/1.2/user/-/sleep/date/{date}.json',
-            headers=headers
-        )
+        data = fitbit_client.sleep_log(user_credentials, date)
+        
+        # Extract sleep summary data
+        summary = data.get('summary', {})
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract sleep summary data
-            summary = data.get('summary', {})
-            
-            return {
-                "status": "success",
-                "date": date,
-                "data": {
-                    "total_minutes_asleep": summary.get('totalMinutesAsleep', 0),
-                    "total_time_in_bed": summary.get('totalTimeInBed', 0),
-                    "sleep_efficiency": summary.get('efficiency', 0),
-                    "stages": summary.get('stages', {}),
-                    "sleep_records": data.get('sleep', [])
-                }
-            }
-        else:
-            return {
-                "status": "error",
-                "code": response.status_code,
-                "message": f"Failed to retrieve Fitbit sleep data: {response.text}"
-            }
-    except Exception as e:
         return {
-            "status": "error",
-            "message": str(e)
+            "status": "success",
+            "date": date,
+            "data": {
+                "total_minutes_asleep": summary.get('totalMinutesAsleep', 0),
+                "total_time_in_bed": summary.get('totalTimeInBed', 0),
+                "sleep_efficiency": summary.get('efficiency', 0),
+                "stages": summary.get('stages', {}),
+                "sleep_records": data.get('sleep', [])
+            }
         }
+    except Exception as e:
+        return _fitbit_error(e, "sleep")
 
 # ========== INTEGRATED TOOLS ==========
 
@@ -877,7 +1307,8 @@ def save_biometric_data(
     value: float, 
     source: str = "Manual", 
     systolic_bp: float = None, 
-    diastolic_bp: float = None
+    diastolic_bp: float = None,
+    buffered: bool = False
 ) -> Dict[str, Any]:
     """
     Save biometric data to the database
@@ -889,50 +1320,51 @@ def save_biometric_data(
         source: Source of the data (e.g., 'Manual', 'Fitbit', 'API')
         systolic_bp: Optional systolic blood pressure (for BP readings)
         diastolic_bp: Optional diastolic blood pressure (for BP readings)
+        buffered: Queue the reading and write it with the next flush
+            (see flush_pending_writes) instead of inserting it now
         
     Returns:
         Dictionary containing operation result
     """
     try:
-        # Get the biometric_type_id first
-        biometric_type_response = supabase_client.table("biometric_types") \
-            .select("biometric_type_id") \
-            .eq("type_name", biometric_type) \
-            .execute()
-            
-        if not biometric_type_response.data:
-            # If the biometric type doesn't exist, create it
-            new_type = supabase_client.table("biometric_types").insert({
-                "type_name": biometric_type
-            }).execute()
-            
-            biometric_type_id = new_type.data[0]['biometric_type_id']
-        else:
-            biometric_type_id = biometric_type_response.data[0]['biometric_type_id']
-        
-        # Now create the biometric data record
-        data = {
-            "user_id": user_id,
-            "reading_timestamp": datetime.datetime.now().isoformat(),
-            "biometric_type_id": biometric_type_id,
-            "value": value,
-            "source": source
-        }
-        
-        # Add blood pressure values if provided
-        if systolic_bp is not None:
-            data["systolic_bp"] = systolic_bp
-        
-        if diastolic_bp is not None:
-            data["diastolic_bp"] = diastolic_bp
-        
-        response = supabase_client.table("biometric_data").insert(data).execute()
-        
+        if buffered:
+            ticket = write_buffer.add_biometric(user_id, biometric_type, value, source, systolic_bp, diastolic_bp)
+            return _queued_result(ticket, biometric_type)
+        single = _single_write()
+        return _flushed_result(single, single.add_biometric(user_id, biometric_type, value, source, systolic_bp, diastolic_bp))
+    except Exception as e:
         return {
-            "status": "success",
-            "data": response.data[0] if response.data else {},
-            "message": f"{biometric_type} data saved successfully"
+            "status": "error",
+            "message": str(e)
         }
+
+def save_biometric_data_batch(user_id: str, readings: List[Dict[str, Any]], source: str = "Manual") -> Dict[str, Any]:
+    """
+    Save several biometric readings with one insert
+    
+    Args:
+        user_id: The user's ID
+        readings: Readings as {"biometric_type", "value"} with optional
+            "systolic_bp", "diastolic_bp", "source" and "reading_timestamp"
+        source: Source used for readings that don't set their own
+        
+    Returns:
+        Dictionary with saved/failed counts and a result per reading, in order
+    """
+    try:
+        # A private buffer so the readings are written together, and only them
+        batch = WriteBuffer(supabase_client, lookup_registry, max_rows=len(readings) + 1, max_age_seconds=0)
+        for reading in readings:
+            batch.add_biometric(
+                user_id,
+                reading["biometric_type"],
+                reading["value"],
+                reading.get("source") or source,
+                reading.get("systolic_bp"),
+                reading.get("diastolic_bp"),
+                reading.get("reading_timestamp")
+            )
+        return batch.flush()
     except Exception as e:
         return {
             "status": "error",
@@ -1001,197 +1433,248 @@ def get_user_notifications(user_id: str) -> Dict[str, Any]:
             "message": str(e)
         }
 
-def get_comprehensive_user_data(user_id: str, tool_context=None, days: int = 7) -> Dict[str, Any]:
+def _biometric_key(biometric_type: str) -> str:
+    """Key used for a biometric type in grouped results (e.g. 'Heart Rate' -> 'heart_rate')"""
+    return biometric_type.lower().replace(" ", "_")
+
+def _get_biometric_data_bulk(
+    user_id: str,
+    biometric_types: List[str],
+    start_date: str,
+    exclude_source: Optional[str] = None
+) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Retrieve comprehensive user data from all sources for agent context
+    Fetch readings for several biometric types in a single query
+    
+    Type names are resolved through the lookup registry, every matching row is
+    pulled with one in_-filtered query joined to biometric_types (paginated
+    past the row cap), and the rows are grouped by type in memory. Rows from
+    exclude_source, if given, are left out.
     
-    Args:
-        user_id: The user's ID in Supabase
-        tool_context: Optional ToolContext object for state management
-        days: Number of days of data to retrieve (default: 7)
-        
     Returns:
-        Dictionary containing comprehensive user data
+        Dictionary mapping each existing type's key to its readings; types that
+        don't exist in biometric_types are omitted
     """
-    # First check if we have a cached version in state when tool_context is provided
-    if tool_context and tool_context.state.get(f"temp:comprehensive_data:{user_id}"):
-        cache_time_str = tool_context.state.get(f"temp:comprehensive_data_timestamp:{user_id}")
-        if cache_time_str:
-            try:
-                # Parse the timestamp
-                cache_time = datetime.datetime.fromisoformat(cache_time_str)
-                now = datetime.datetime.now()
-                # If cache is less than 30 minutes old, use it
-                if (now - cache_time).total_seconds() < 1800:  # 30 minutes
-                    return {
-                        "status": "success",
-                        "data": tool_context.state.get(f"temp:comprehensive_data:{user_id}"),
-                        "source": "state_cache"
-                    }
-            except Exception as e:
-                # If parsing fails, ignore cache and continue with fresh data
-                print(f"Cache timestamp parsing error: {str(e)}")
-    
-    # Get basic user info
-    user_info = get_user_info(user_id, tool_context)
-    
-    # Get health data from Supabase
-    glucose_data = get_glucose_readings(user_id, tool_context, days)
-    food_data = get_food_logs(user_id, tool_context, days)
-    medication_data = get_medication_logs(user_id, tool_context, days)
-    
-    # Get biometric data for different types
-    biometric_types = ["Steps", "Heart Rate", "Exercise", "Weight"]
-    biometric_data = {}
-    
+    type_names = {}
     for biometric_type in biometric_types:
-        # Get the biometric_type_id
-        type_response = supabase_client.table("biometric_types") \
-            .select("biometric_type_id") \
-            .eq("type_name", biometric_type) \
-            .execute()
-            
-        if type_response.data:
-            type_id = type_response.data[0]['biometric_type_id']
-            
-            # Get the data for this type
-            start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
-            response = supabase_client.table("biometric_data") \
-                .select("*") \
-                .eq("user_id", user_id) \
-                .eq("biometric_type_id", type_id) \
-                .gte("reading_timestamp", start_date) \
-                .order("reading_timestamp", desc=False) \
-                .execute()
-                
-            biometric_data[biometric_type.lower().replace(" ", "_")] = response.data
+        type_id = lookup_registry.get_id("biometric_types", biometric_type)
+        if type_id is not None:
+            type_names[type_id] = biometric_type
     
-    # Get insulin data if applicable
-    insulin_data = {}
-    if user_info.get('data', {}).get('diabetes_type') in [1, "1", "Type 1"]:
-        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
-        insulin_response = supabase_client.table("insulin_intake_log") \
-            .select("""
-                insulin_log_id,
-                log_timestamp,
-                insulin_type_id,
-                dosage_units,
-                notes,
-                created_at,
-                insulin_types(type_name)
-            """) \
-            .eq("user_id", user_id) \
-            .gte("log_timestamp", start_date) \
-            .order("log_timestamp", desc=False) \
-            .execute()
-            
-        insulin_data = insulin_response.data
+    if not type_names:
+        return {}
     
-    # Get Fitbit data if enabled
-    fitbit_data = {}
-    if user_info.get('data', {}).get('is_fitbit_activated', False):
-        # Get Fitbit credentials from tool_context if available, otherwise use dummy
-        fitbit_credentials = {}
-        
-        if tool_context:
-            # In a real implementation, we would use:
-            # try:
-            #     from google.adk.auth import AuthConfig
-            #     FITBIT_AUTH_CONFIG = AuthConfig(
-            #         provider="oauth2",
-            #         client_id=os.getenv("FITBIT_CLIENT_ID"),
-            #         auth_uri="https://www.fitbit.com/oauth2/authorize",
-            #         token_uri="https://api.fitbit.com/oauth2/token",
-            #         scope=["activity", "heartrate", "sleep"]
-            #     )
-            #     # Request authentication if needed
-            #     fitbit_credentials = tool_context.get_auth_response(FITBIT_AUTH_CONFIG)
-            # except Exception as e:
-            #     print(f"Fitbit auth error: {str(e)}")
-            
-            # For now, just use from state if available
-            fitbit_credentials = tool_context.state.get("user:fitbit_credentials", {})
-        
-        yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime('%Y-%m-%d')
-        fitbit_activity = get_fitbit_activity(fitbit_credentials, yesterday)
-        fitbit_heart_rate = get_fitbit_heart_rate(fitbit_credentials, yesterday)
-        fitbit_sleep = get_fitbit_sleep(fitbit_credentials, yesterday)
-        
-        fitbit_data = {
-            "activity": fitbit_activity.get('data', {}),
-            "heart_rate": fitbit_heart_rate.get('data', {}),
-            "sleep": fitbit_sleep.get('data', {})
-        }
+    grouped = {_biometric_key(name): [] for name in type_names.values()}
+    for row in iter_rows(_iter_biometric_pages(user_id, list(type_names), start_date, exclude_source=exclude_source)):
+        joined_type = row.pop("biometric_types", None) or {}
+        type_name = joined_type.get("type_name") or type_names.get(row.get("biometric_type_id"))
+        if type_name:
+            grouped.setdefault(_biometric_key(type_name), []).append(row)
     
-    # Get Google Calendar events
-    calendar_events = []
-    if tool_context:
-        # Similar to Fitbit, in a real implementation we would use:
-        # try:
-        #     from google.adk.auth import AuthConfig
-        #     GOOGLE_AUTH_CONFIG = AuthConfig(
-        #         provider="oauth2",
-        #         client_id=os.getenv("GOOGLE_CLIENT_ID"),
-        #         auth_uri="https://accounts.google.com/o/oauth2/v2/auth",
-        #         token_uri="https://oauth2.googleapis.com/token",
-        #         scope=["https://www.googleapis.com/auth/calendar.readonly"]
-        #     )
-        #     # Request authentication if needed
-        #     google_credentials = tool_context.get_auth_response(GOOGLE_AUTH_CONFIG)
-        #     calendar_response = get_calendar_events(google_credentials, days)
-        #     calendar_events = calendar_response.get('data', [])
-        # except Exception as e:
-        #     print(f"Google Calendar auth error: {str(e)}")
-        
-        # For now, just access state
-        calendar_events = tool_context.state.get("user:calendar_events", [])
+    return grouped
+
+def _get_synced_fitbit_data(user_id: str, day: datetime.date) -> Dict[str, Any]:
+    """
+    Summarize one day of synced Fitbit data
+    
+    Day totals, resting heart rate and sleep come from the daily biometric
+    rollups; heart rate and active minutes from the packed intraday day.
+    
+    Returns:
+        Dictionary with "activity", "heart_rate" and "sleep" summaries of the
+        day; empty when nothing has been synced for it
+    """
+    days_back = (datetime.datetime.now(datetime.timezone.utc).date() - day).days + 1
+    totals = {}
+    for row in iter_rows(iter_biometric_rollup_pages(user_id, FITBIT_BIOMETRIC_TYPES, days_back, "day")):
+        if row["bucket_start"][:10] != day.isoformat():
+            continue
+        name = (row.get("biometric_types") or {}).get("type_name")
+        count = row["reading_count"]
+        if name and count:
+            totals[name] = {
+                "total": float(row["value_sum"]),
+                "mean": round(float(row["value_sum"]) / count, 2)
+            }
+    intraday = load_intraday(supabase_client, user_id, INTRADAY_METRICS, days=1, end_day=day)
+    heart_rate, steps = intraday["heart_rate"].values, intraday["steps"].values
+    if not totals and not len(heart_rate) and not len(steps):
+        return {}
+    
+    def stat(name: str, key: str) -> Any:
+        return totals.get(name, {}).get(key)
     
-    # Get recent AI insights
+    return {
+        "date": day.isoformat(),
+        "activity": {
+            "steps": int(stat("Steps", "total") or steps.sum()),
+            "active_minutes": int((steps >= ACTIVE_MINUTE_STEPS).sum())
+        },
+        "heart_rate": {
+            "resting_heart_rate": stat("Resting Heart Rate", "mean"),
+            "average_heart_rate": round(float(heart_rate.mean()), 1) if len(heart_rate) else None,
+            "minimum_heart_rate": float(heart_rate.min()) if len(heart_rate) else None,
+            "maximum_heart_rate": float(heart_rate.max()) if len(heart_rate) else None,
+            "minutes_recorded": len(heart_rate)
+        },
+        "sleep": {
+            "total_minutes_asleep": stat("Sleep Minutes", "total"),
+            "sleep_efficiency": stat("Sleep Efficiency", "mean")
+        }
+    }
+
+def _get_insulin_logs(user_id: str, start_date: str) -> List[Dict[str, Any]]:
+    """Fetch insulin intake logs since the given start date"""
+    insulin_response = supabase_client.table("insulin_intake_log") \
+        .select("""
+            insulin_log_id,
+            log_timestamp,
+            insulin_type_id,
+            dosage_units,
+            notes,
+            created_at,
+            insulin_types(type_name)
+        """) \
+        .eq("user_id", user_id) \
+        .gte("log_timestamp", start_date) \
+        .order("log_timestamp", desc=False) \
+        .execute()
+        
+    return insulin_response.data
+
+def _get_recent_insights(user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """Fetch the most recent AI insights for a user"""
     insights_response = supabase_client.table("ai_insights") \
         .select("*") \
         .eq("user_id", user_id) \
         .order("generated_timestamp", desc=True) \
-        .limit(5) \
+        .limit(limit) \
         .execute()
         
-    recent_insights = insights_response.data
-    
-    # Get user settings
+    return insights_response.data
+
+def _get_user_settings(user_id: str) -> Dict[str, Any]:
+    """Fetch the user's settings row, or an empty dictionary if none exists"""
     settings_response = supabase_client.table("user_settings") \
         .select("*") \
         .eq("user_id", user_id) \
         .execute()
         
-    user_settings = settings_response.data[0] if settings_response.data else {}
+    return settings_response.data[0] if settings_response.data else {}
+
+def get_comprehensive_user_data(user_id: str, tool_context=None, days: int = 7) -> Dict[str, Any]:
+    """
+    Retrieve comprehensive user data from all sources for agent context
+    
+    Independent sources are fetched concurrently (up to FANOUT_MAX_CONCURRENCY
+    at a time). A failing source does not fail the whole call; it is reported
+    under "source_errors" and its section falls back to an empty value.
+    
+    Args:
+        user_id: The user's ID in Supabase
+        tool_context: Optional ToolContext object for state management
+        days: Number of days of history to retrieve (default: 7); calendar
+            events cover the next CALENDAR_CONTEXT_HOURS hours
+        
+    Returns:
+        Dictionary containing comprehensive user data
+    """
+    try:
+        return _cached_read(
+            "comprehensive_data", f"{user_id}:{days}",
+            lambda: _load_comprehensive_user_data(user_id, tool_context, days),
+            tool_context,
+            # Partial results are not cached so a transient failure is retried
+            cache_if=lambda result: result.get("status") == "success" and not result.get("source_errors")
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+def _load_comprehensive_user_data(user_id: str, tool_context, days: int) -> Dict[str, Any]:
+    """Fetch every context source concurrently (uncached)"""
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    
+    with FanOut(FANOUT_MAX_CONCURRENCY) as fan_out:
+        # Independent fetches are all sent at once
+        fan_out.submit("user_info", get_user_info, user_id, tool_context)
+        fan_out.submit("glucose", get_glucose_readings, user_id, tool_context, days)
+        fan_out.submit("food", get_food_logs, user_id, tool_context, days)
+        fan_out.submit("medication", get_medication_logs, user_id, tool_context, days)
+        
+        # Get biometric data for different types in a single query
+        # Fitbit rows are summarized under fitbit_data instead
+        fan_out.submit(
+            "biometric",
+            _get_biometric_data_bulk, user_id, COMPREHENSIVE_BIOMETRIC_TYPES, start_date, FITBIT_SOURCE
+        )
+        
+        fan_out.submit("recent_insights", _get_recent_insights, user_id)
+        fan_out.submit("user_settings", _get_user_settings, user_id)
+        
+        # Insulin and Fitbit fetches depend on the user profile, so wait for it
+        # while the independent fetches keep running
+        user_info = fan_out.result("user_info") or {}
+        profile = user_info.get('data', {}) if user_info.get('status') == 'success' else {}
+        
+        # Get insulin data if applicable
+        if profile.get('diabetes_type') in [1, "1", "Type 1"]:
+            fan_out.submit("insulin", _get_insulin_logs, user_id, start_date)
+        
+        # Fitbit data is synced into the database in the background
+        # (app.services.fitbit_sync), so no Fitbit API call is made here
+        if profile.get('is_fitbit_activated', False):
+            yesterday = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)).date()
+            fan_out.submit("fitbit", _get_synced_fitbit_data, user_id, yesterday)
+        
+        # Upcoming events, read from the calendar_events copy (synced
+        # incrementally, series expanded locally)
+        fan_out.submit("calendar", calendar_event_store.upcoming, user_id, CALENDAR_CONTEXT_HOURS)
+        
+        outcome = fan_out.gather()
+    
+    results = outcome["results"]
+    
+    def source_value(source: str, key: str, default: Any) -> Any:
+        value = results.get(source) or {}
+        return value.get(key, default) if isinstance(value, dict) else default
+    
+    fitbit_data = results.get("fitbit") or {}
+    
+    # Google Calendar events come from the synced copy in calendar_events;
+    # the session state is the fallback for users without a synced calendar
+    calendar_events = results.get("calendar") or []
+    if not calendar_events and tool_context:
+        calendar_events = tool_context.state.get("user:calendar_events", [])
     
     # Compile all data
     result = {
-        "user_info": user_info.get('data', {}),
-        "user_settings": user_settings,
+        "user_info": profile,
+        "user_settings": results.get("user_settings") or {},
         "health_data": {
-            "glucose": glucose_data.get('data', []),
-            "food": food_data.get('data', []),
-            "medication": medication_data.get('data', []),
-            "insulin": insulin_data,
-            "biometric": biometric_data
+            "glucose": source_value("glucose", "data", []),
+            "food": source_value("food", "data", []),
+            "medication": source_value("medication", "data", []),
+            "insulin": results.get("insulin") or {},
+            "biometric": results.get("biometric") or {}
         },
         "fitbit_data": fitbit_data,
         "calendar_events": calendar_events,
-        "recent_insights": recent_insights,
+        "recent_insights": results.get("recent_insights") or [],
         "period": f"Last {days} days",
         "timestamp": datetime.datetime.now().isoformat()
     }
     
-    # Cache the data in state if tool_context is provided
-    if tool_context:
-        now = datetime.datetime.now()
-        tool_context.state[f"temp:comprehensive_data:{user_id}"] = result
-        tool_context.state[f"temp:comprehensive_data_timestamp:{user_id}"] = now.isoformat()
-    
-    return {
+    response = {
         "status": "success",
         "data": result
     }
+    if outcome["errors"]:
+        response["source_errors"] = outcome["errors"]
+    
+    return response
 
 def enrich_with_user_context(user_id: str, query: str, tool_context=None) -> Dict[str, Any]:
     """
@@ -1272,14 +1755,7 @@ USER CONTEXT:
                 glucose_stats = stats
             elif isinstance(glucose_data, list) and len(glucose_data) > 0:
                 # Calculate stats if we only have raw data
-                avg_glucose = sum(reading.get('glucose_value', 0) for reading in glucose_data) / len(glucose_data)
-                max_glucose = max(reading.get('glucose_value', 0) for reading in glucose_data)
-                min_glucose = min(reading.get('glucose_value', 0) for reading in glucose_data)
-                glucose_stats = {
-                    "average": round(avg_glucose, 2),
-                    "maximum": max_glucose,
-                    "minimum": min_glucose
-                }
+                glucose_stats = summarize_readings(glucose_data)
         else:
             # Query directly
             glucose_data = get_glucose_readings(user_id, tool_context, days=3)
@@ -1293,6 +1769,11 @@ USER CONTEXT:
   * Highest: {glucose_stats.get('maximum', 'N/A')} mg/dL
   * Lowest: {glucose_stats.get('minimum', 'N/A')} mg/dL
 """
+            if glucose_stats.get("time_in_ranges"):
+                context_summary += f"""  * Time in range (70-180): {glucose_stats['time_in_ranges']['in_range_pct']}%
+  * Variability (CV): {glucose_stats.get('coefficient_of_variation', 'N/A')}%
+  * Estimated A1C: {glucose_stats.get('estimated_a1c', 'N/A')}%
+"""
         
         # Enrich the query with context
         enriched_query = f"{context_summary}\n\nUSER QUERY:\n{query}"
@@ -0,0 +1,297 @@
+"""
+Buffered writer for biometric readings and AI insights.
+
+Writes recorded during a turn are queued instead of being inserted one at a
+time. Lookup types (biometric_types, insight_types) are resolved through the
+shared LookupRegistry, so a known type costs no round trip, and each table's
+pending rows are flushed as one multi-row insert.
+
+A flush happens when it is requested explicitly, when the buffer reaches
+max_rows, or max_age_seconds after the first queued row. When a multi-row
+insert fails the rows are retried one by one so every row gets its own
+success or error result.
+
+An explicit flush can be limited to one user's rows, so a caller doesn't
+write (and wait for) everyone else's.
+Rows that fail in a timed or size-triggered flush, which no caller waits
+for, are kept per user and reported by that user's next flush.
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .lookups import LookupRegistry
+
+logger = logging.getLogger(__name__)
+
+# Flush once this many rows are pending
+WRITE_BUFFER_MAX_ROWS = int(os.getenv("DEBIE_WRITE_BUFFER_MAX_ROWS", "100"))
+# Flush this many seconds after the first row was queued (0 disables the timer)
+WRITE_BUFFER_MAX_AGE_SECONDS = float(os.getenv("DEBIE_WRITE_BUFFER_MAX_AGE", "2.0"))
+
+MODEL_VERSION = "debie-agent-1.0"
+# Flush results kept for result() lookups by ticket
+MAX_KEPT_RESULTS = 1000
+
+
+@dataclass
+class PendingWrite:
+    """One queued row and the lookup it needs before it can be inserted."""
+    ticket: int
+    table: str
+    row: Dict[str, Any]
+    lookup_table: str
+    lookup_name: str
+    lookup_column: str
+    label: str
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class WriteBuffer:
+    """
+    Thread-safe buffer of pending biometric_data and ai_insights rows.
+
+    Args:
+        client: Supabase client used for the inserts
+        registry: Lookup registry resolving (and creating) type ids
+        max_rows: Pending rows that trigger a flush
+        max_age_seconds: Delay after the first queued row before a timed flush
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        registry: LookupRegistry,
+        max_rows: int = WRITE_BUFFER_MAX_ROWS,
+        max_age_seconds: float = WRITE_BUFFER_MAX_AGE_SECONDS
+    ):
+        self.client = client
+        self.registry = registry
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self._pending: List[PendingWrite] = []
+        self._results: Dict[int, Dict[str, Any]] = {}
+        # user_id -> failed rows of flushes nobody waited for, until reported
+        self._unreported_failures: Dict[str, List[Dict[str, Any]]] = {}
+        self._next_ticket = 1
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __enter__(self) -> "WriteBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def add_biometric(
+        self,
+        user_id: str,
+        biometric_type: str,
+        value: float,
+        source: str = "Manual",
+        systolic_bp: float = None,
+        diastolic_bp: float = None,
+        reading_timestamp: Optional[str] = None
+    ) -> int:
+        """
+        Queue a biometric reading.
+
+        Returns:
+            Ticket identifying the row in the flush results
+        """
+        row = {
+            "user_id": user_id,
+            "reading_timestamp": reading_timestamp or datetime.datetime.now().isoformat(),
+            "value": value,
+            "source": source,
+            # Always present so every row of a multi-row insert has the same keys
+            "systolic_bp": systolic_bp,
+            "diastolic_bp": diastolic_bp
+        }
+        return self._add("biometric_data", row, "biometric_types", biometric_type, "biometric_type_id", biometric_type)
+
+    def add_insight(self, user_id: str, insight_type: str, content: Dict[str, Any]) -> int:
+        """
+        Queue an AI insight.
+
+        Returns:
+            Ticket identifying the row in the flush results
+        """
+        row = {
+            "user_id": user_id,
+            "generated_timestamp": datetime.datetime.now().isoformat(),
+            "insight_details": content,
+            "model_version": MODEL_VERSION
+        }
+        return self._add("ai_insights", row, "insight_types", insight_type, "insight_type_id", f"{insight_type} insight")
+
+    def flush(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Insert pending rows, one multi-row insert per table.
+
+        Args:
+            user_id: Only flush this user's rows; their rows that failed in an
+                earlier timed or size-triggered flush are reported too
+
+        Returns:
+            Dictionary with per-row results (ticket, table, status and the
+            inserted row or an error message) and saved/failed counts
+        """
+        with self._lock:
+            pending, kept = [], []
+            for write in self._pending:
+                (pending if user_id is None or write.row["user_id"] == user_id else kept).append(write)
+            self._pending = kept
+            if not kept:
+                self._cancel_timer()
+            earlier = self._unreported_failures.pop(user_id, []) if user_id is not None else []
+
+        results = self._write(pending)
+        return self._summary(earlier + results)
+
+    def result(self, ticket: int) -> Optional[Dict[str, Any]]:
+        """Result of a flushed row, or None while it is still pending."""
+        with self._lock:
+            return self._results.get(ticket)
+
+    def _add(self, table: str, row: Dict[str, Any], lookup_table: str, lookup_name: str, lookup_column: str, label: str) -> int:
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._pending.append(PendingWrite(ticket, table, row, lookup_table, lookup_name, lookup_column, label))
+            full = len(self._pending) >= self.max_rows
+            if not full and self._timer is None and self.max_age_seconds > 0:
+                self._timer = threading.Timer(self.max_age_seconds, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self._flush_unattended()
+        return ticket
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._flush_unattended()
+
+    def _flush_unattended(self) -> None:
+        """Flush everything pending; failures wait for their user's next flush."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._cancel_timer()
+        users = {write.ticket: write.row["user_id"] for write in pending}
+        failures = [result for result in self._write(pending) if result["status"] == "error"]
+        if not failures:
+            return
+        logger.warning(f"{len(failures)} of {len(pending)} buffered writes failed; reporting them with the next flush")
+        with self._lock:
+            for result in failures:
+                kept = self._unreported_failures.setdefault(users[result["ticket"]], [])
+                kept.append(result)
+                del kept[:-MAX_KEPT_RESULTS]
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _write(self, pending: List[PendingWrite]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        if pending:
+            started = time.perf_counter()
+            try:
+                by_table: Dict[str, List[PendingWrite]] = {}
+                for write in self._resolve_types(pending, results):
+                    by_table.setdefault(write.table, []).append(write)
+                for table, writes in by_table.items():
+                    results.extend(self._insert(table, writes))
+            except Exception as e:
+                # Never drop rows silently: whatever wasn't written gets an error result
+                done = {result["ticket"] for result in results}
+                results.extend(self._error(write, str(e)) for write in pending if write.ticket not in done)
+            results.sort(key=lambda result: result["ticket"])
+            logger.debug(
+                f"Flushed {len(pending)} buffered writes in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+
+        with self._lock:
+            for result in results:
+                self._results[result["ticket"]] = result
+            while len(self._results) > MAX_KEPT_RESULTS:
+                del self._results[next(iter(self._results))]
+        return results
+
+    @staticmethod
+    def _summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        failed = sum(1 for result in results if result["status"] == "error")
+        return {
+            "status": "success" if not failed else ("error" if failed == len(results) else "partial"),
+            "saved": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
+
+    def _resolve_types(self, pending: List[PendingWrite], results: List[Dict[str, Any]]) -> List[PendingWrite]:
+        """Fill in each row's type id; rows whose type cannot be resolved fail individually."""
+        resolved = []
+        type_ids: Dict[tuple, Any] = {}
+        for write in pending:
+            key = (write.lookup_table, write.lookup_name)
+            try:
+                if key not in type_ids:
+                    type_ids[key] = self.registry.get_or_create_id(write.lookup_table, write.lookup_name)
+            except Exception as e:
+                results.append(self._error(write, f"Could not resolve {write.lookup_name}: {str(e)}"))
+                continue
+            write.row[write.lookup_column] = type_ids[key]
+            resolved.append(write)
+        return resolved
+
+    def _insert(self, table: str, writes: List[PendingWrite]) -> List[Dict[str, Any]]:
+        try:
+            response = self.client.table(table).insert([write.row for write in writes]).execute()
+            rows = response.data or []
+            return [
+                self._success(write, rows[i] if i < len(rows) else {})
+                for i, write in enumerate(writes)
+            ]
+        except Exception as e:
+            if len(writes) == 1:
+                return [self._error(writes[0], str(e))]
+            # One bad row fails the whole statement; retry row by row to isolate it
+            logger.warning(f"Multi-row insert into {table} failed, retrying {len(writes)} rows individually: {str(e)}")
+            results = []
+            for write in writes:
+                try:
+                    response = self.client.table(table).insert(write.row).execute()
+                    results.append(self._success(write, response.data[0] if response.data else {}))
+                except Exception as row_error:
+                    results.append(self._error(write, str(row_error)))
+            return results
+
+    @staticmethod
+    def _success(write: PendingWrite, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "ticket": write.ticket,
+            "table": write.table,
+            "status": "success",
+            "data": data,
+            "message": f"{write.label} saved successfully"
+        }
+
+    @staticmethod
+    def _error(write: PendingWrite, message: str) -> Dict[str, Any]:
+        return {
+            "ticket": write.ticket,
+            "table": write.table,
+            "status": "error",
+            "message": message
+        }
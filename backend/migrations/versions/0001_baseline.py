@@ -0,0 +1,371 @@
+"""Baseline schema
+
+Creates the schema as defined by the models before migrations were
+introduced, including the glucose_readings (user_id, reading_timestamp)
+unique constraint and the rollup tables with their maintenance triggers.
+Databases created earlier with Base.metadata.create_all() can be marked as
+migrated with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.models.rollups import BIOMETRIC_ROLLUP_DDL, GLUCOSE_ROLLUP_DDL
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_FUNCTIONS = [
+    f"{rollup}_{name}"
+    for rollup in ("glucose_rollups", "biometric_rollups")
+    for name in ("apply_inserts", "recompute_updated", "recompute_deleted")
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('biometric_types',
+    sa.Column('biometric_type_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('type_name', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('biometric_type_id'),
+    sa.UniqueConstraint('type_name')
+    )
+    op.create_table('insight_types',
+    sa.Column('insight_type_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('type_name', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('insight_type_id'),
+    sa.UniqueConstraint('type_name')
+    )
+    op.create_table('insulin_types',
+    sa.Column('insulin_type_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('type_name', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('insulin_type_id'),
+    sa.UniqueConstraint('type_name')
+    )
+    op.create_table('meal_types',
+    sa.Column('meal_type_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('type_name', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('meal_type_id'),
+    sa.UniqueConstraint('type_name')
+    )
+    op.create_table('medications',
+    sa.Column('medication_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('medication_name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('medication_id'),
+    sa.UniqueConstraint('medication_name')
+    )
+    op.create_table('message_types',
+    sa.Column('message_type_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('type_name', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('message_type_id'),
+    sa.UniqueConstraint('type_name')
+    )
+    op.create_table('notification_types',
+    sa.Column('notification_type_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('type_name', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('notification_type_id'),
+    sa.UniqueConstraint('type_name')
+    )
+    op.create_table('sender_types',
+    sa.Column('sender_type_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('type_name', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('sender_type_id'),
+    sa.UniqueConstraint('type_name')
+    )
+    op.create_table('users',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('last_login_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('date_of_birth', sa.Date(), nullable=True),
+    sa.Column('gender', sa.String(length=20), nullable=True),
+    sa.Column('weight', sa.DECIMAL(precision=5, scale=2), nullable=True),
+    sa.Column('height', sa.DECIMAL(precision=5, scale=2), nullable=True),
+    sa.Column('unit_preference', sa.String(length=10), nullable=True),
+    sa.Column('is_cgm_activated', sa.Boolean(), nullable=False),
+    sa.Column('is_fitbit_activated', sa.Boolean(), nullable=False),
+    sa.Column('fitbit_access_token', sa.String(length=255), nullable=True),
+    sa.Column('fitbit_refresh_token', sa.String(length=255), nullable=True),
+    sa.Column('cgm_device_info', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('ai_insights',
+    sa.Column('insight_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('insight_type_id', sa.Integer(), nullable=False),
+    sa.Column('generated_timestamp', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('insight_details', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('related_data_points', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('model_version', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['insight_type_id'], ['insight_types.insight_type_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('insight_id')
+    )
+    op.create_index(op.f('ix_ai_insights_generated_timestamp'), 'ai_insights', ['generated_timestamp'], unique=False)
+    op.create_index(op.f('ix_ai_insights_user_id'), 'ai_insights', ['user_id'], unique=False)
+    op.create_table('biometric_data',
+    sa.Column('biometric_data_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('reading_timestamp', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('biometric_type_id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('systolic_bp', sa.DECIMAL(precision=5, scale=2), nullable=True),
+    sa.Column('diastolic_bp', sa.DECIMAL(precision=5, scale=2), nullable=True),
+    sa.Column('source', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['biometric_type_id'], ['biometric_types.biometric_type_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('biometric_data_id')
+    )
+    op.create_index(op.f('ix_biometric_data_reading_timestamp'), 'biometric_data', ['reading_timestamp'], unique=False)
+    op.create_index(op.f('ix_biometric_data_user_id'), 'biometric_data', ['user_id'], unique=False)
+    op.create_table('biometric_rollups',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('biometric_type_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('reading_count', sa.Integer(), nullable=False),
+    sa.Column('value_sum', sa.Float(), nullable=False),
+    sa.Column('value_sum_squares', sa.Float(), nullable=False),
+    sa.Column('min_value', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('max_value', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['biometric_type_id'], ['biometric_types.biometric_type_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'biometric_type_id', 'granularity', 'bucket_start')
+    )
+    op.create_table('conversations',
+    sa.Column('conversation_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('start_timestamp', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('last_activity_timestamp', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('conversation_id')
+    )
+    op.create_index(op.f('ix_conversations_last_activity_timestamp'), 'conversations', ['last_activity_timestamp'], unique=False)
+    op.create_index(op.f('ix_conversations_user_id'), 'conversations', ['user_id'], unique=False)
+    op.create_table('food_logs',
+    sa.Column('food_log_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('log_timestamp', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('meal_type_id', sa.Integer(), nullable=True),
+    sa.Column('food_description', sa.Text(), nullable=False),
+    sa.Column('quantity', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('unit_of_measure', sa.String(length=50), nullable=True),
+    sa.Column('estimated_carbs', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('estimated_calories', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['meal_type_id'], ['meal_types.meal_type_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('food_log_id')
+    )
+    op.create_index(op.f('ix_food_logs_log_timestamp'), 'food_logs', ['log_timestamp'], unique=False)
+    op.create_index(op.f('ix_food_logs_user_id'), 'food_logs', ['user_id'], unique=False)
+    op.create_table('glucose_readings',
+    sa.Column('glucose_reading_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('reading_timestamp', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('glucose_value', sa.DECIMAL(precision=6, scale=2), nullable=False),
+    sa.Column('reading_source', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('glucose_reading_id'),
+    sa.UniqueConstraint('user_id', 'reading_timestamp', name='uq_glucose_readings_user_timestamp')
+    )
+    op.create_index(op.f('ix_glucose_readings_reading_timestamp'), 'glucose_readings', ['reading_timestamp'], unique=False)
+    op.create_index(op.f('ix_glucose_readings_user_id'), 'glucose_readings', ['user_id'], unique=False)
+    op.create_table('glucose_rollups',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('reading_count', sa.Integer(), nullable=False),
+    sa.Column('value_sum', sa.Float(), nullable=False),
+    sa.Column('value_sum_squares', sa.Float(), nullable=False),
+    sa.Column('min_value', sa.DECIMAL(precision=6, scale=2), nullable=False),
+    sa.Column('max_value', sa.DECIMAL(precision=6, scale=2), nullable=False),
+    sa.Column('very_low_count', sa.Integer(), nullable=False),
+    sa.Column('low_count', sa.Integer(), nullable=False),
+    sa.Column('in_range_count', sa.Integer(), nullable=False),
+    sa.Column('high_count', sa.Integer(), nullable=False),
+    sa.Column('very_high_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'granularity', 'bucket_start')
+    )
+    op.create_table('insulin_intake_log',
+    sa.Column('insulin_log_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('log_timestamp', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('insulin_type_id', sa.UUID(), nullable=False),
+    sa.Column('dosage_units', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['insulin_type_id'], ['insulin_types.insulin_type_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('insulin_log_id')
+    )
+    op.create_index(op.f('ix_insulin_intake_log_insulin_type_id'), 'insulin_intake_log', ['insulin_type_id'], unique=False)
+    op.create_index(op.f('ix_insulin_intake_log_log_timestamp'), 'insulin_intake_log', ['log_timestamp'], unique=False)
+    op.create_index(op.f('ix_insulin_intake_log_user_id'), 'insulin_intake_log', ['user_id'], unique=False)
+    op.create_table('medications_log',
+    sa.Column('medication_log_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('log_timestamp', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('medication_id', sa.UUID(), nullable=False),
+    sa.Column('dosage', sa.String(length=100), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['medication_id'], ['medications.medication_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('medication_log_id')
+    )
+    op.create_index(op.f('ix_medications_log_log_timestamp'), 'medications_log', ['log_timestamp'], unique=False)
+    op.create_index(op.f('ix_medications_log_medication_id'), 'medications_log', ['medication_id'], unique=False)
+    op.create_index(op.f('ix_medications_log_user_id'), 'medications_log', ['user_id'], unique=False)
+    op.create_table('user_settings',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('food_log_reminder_enabled', sa.Boolean(), nullable=False),
+    sa.Column('food_log_reminder_frequency_hours', sa.Integer(), nullable=True),
+    sa.Column('medication_reminder_enabled', sa.Boolean(), nullable=False),
+    sa.Column('insulin_reminder_enabled', sa.Boolean(), nullable=False),
+    sa.Column('notification_delivery_method', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('messages',
+    sa.Column('message_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('sender_type_id', sa.Integer(), nullable=False),
+    sa.Column('sender_user_id', sa.UUID(), nullable=True),
+    sa.Column('message_content', sa.Text(), nullable=False),
+    sa.Column('timestamp', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('message_type_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.conversation_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['message_type_id'], ['message_types.message_type_id'], ),
+    sa.ForeignKeyConstraint(['sender_type_id'], ['sender_types.sender_type_id'], ),
+    sa.ForeignKeyConstraint(['sender_user_id'], ['users.user_id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('message_id')
+    )
+    op.create_index(op.f('ix_messages_conversation_id'), 'messages', ['conversation_id'], unique=False)
+    op.create_index(op.f('ix_messages_timestamp'), 'messages', ['timestamp'], unique=False)
+    op.create_table('notifications',
+    sa.Column('notification_id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('notification_type_id', sa.Integer(), nullable=False),
+    sa.Column('scheduled_send_time', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('sent_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('is_sent', sa.Boolean(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('related_insight_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['notification_type_id'], ['notification_types.notification_type_id'], ),
+    sa.ForeignKeyConstraint(['related_insight_id'], ['ai_insights.insight_id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('notification_id')
+    )
+    op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
+
+    # Rollup maintenance functions and triggers (see app/models/rollups.py)
+    for ddl in GLUCOSE_ROLLUP_DDL + BIOMETRIC_ROLLUP_DDL:
+        op.execute(ddl)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notifications_user_id'), table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_index(op.f('ix_messages_timestamp'), table_name='messages')
+    op.drop_index(op.f('ix_messages_conversation_id'), table_name='messages')
+    op.drop_table('messages')
+    op.drop_table('user_settings')
+    op.drop_index(op.f('ix_medications_log_user_id'), table_name='medications_log')
+    op.drop_index(op.f('ix_medications_log_medication_id'), table_name='medications_log')
+    op.drop_index(op.f('ix_medications_log_log_timestamp'), table_name='medications_log')
+    op.drop_table('medications_log')
+    op.drop_index(op.f('ix_insulin_intake_log_user_id'), table_name='insulin_intake_log')
+    op.drop_index(op.f('ix_insulin_intake_log_log_timestamp'), table_name='insulin_intake_log')
+    op.drop_index(op.f('ix_insulin_intake_log_insulin_type_id'), table_name='insulin_intake_log')
+    op.drop_table('insulin_intake_log')
+    op.drop_table('glucose_rollups')
+    op.drop_index(op.f('ix_glucose_readings_user_id'), table_name='glucose_readings')
+    op.drop_index(op.f('ix_glucose_readings_reading_timestamp'), table_name='glucose_readings')
+    op.drop_table('glucose_readings')
+    op.drop_index(op.f('ix_food_logs_user_id'), table_name='food_logs')
+    op.drop_index(op.f('ix_food_logs_log_timestamp'), table_name='food_logs')
+    op.drop_table('food_logs')
+    op.drop_index(op.f('ix_conversations_user_id'), table_name='conversations')
+    op.drop_index(op.f('ix_conversations_last_activity_timestamp'), table_name='conversations')
+    op.drop_table('conversations')
+    op.drop_table('biometric_rollups')
+    op.drop_index(op.f('ix_biometric_data_user_id'), table_name='biometric_data')
+    op.drop_index(op.f('ix_biometric_data_reading_timestamp'), table_name='biometric_data')
+    op.drop_table('biometric_data')
+    op.drop_index(op.f('ix_ai_insights_user_id'), table_name='ai_insights')
+    op.drop_index(op.f('ix_ai_insights_generated_timestamp'), table_name='ai_insights')
+    op.drop_table('ai_insights')
+    op.drop_table('users')
+    op.drop_table('sender_types')
+    op.drop_table('notification_types')
+    op.drop_table('message_types')
+    op.drop_table('medications')
+    op.drop_table('meal_types')
+    op.drop_table('insulin_types')
+    op.drop_table('insight_types')
+    op.drop_table('biometric_types')
+    # Dropping the source tables dropped the triggers; the functions remain
+    for function in ROLLUP_FUNCTIONS:
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
@@ -0,0 +1,78 @@
+"""Composite, BRIN and covering indexes for the hot query shapes
+
+Every hot read filters on user_id, takes a range on the row's timestamp and
+orders by it. This replaces the separate single-column indexes with:
+
+- composite (user_id, <timestamp>) btrees on the log tables; glucose_readings
+  already has one through uq_glucose_readings_user_timestamp
+- (user_id, biometric_type_id, reading_timestamp) on biometric_data
+- BRIN indexes on the append-only glucose_readings/biometric_data
+  reading_timestamp columns, for user-independent time ranges (rollup
+  rebuilds, retention) at a fraction of a btree's size
+- (user_id, generated_timestamp DESC) INCLUDE (insight_type_id) on ai_insights,
+  so "latest insights" reads the first index entries without a sort
+
+The single-column user_id indexes are dropped since every composite index
+leads with user_id. Indexes are built CONCURRENTLY so the tables stay
+writable during the migration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, options)
+NEW_INDEXES = [
+    ('ix_food_logs_user_timestamp', 'food_logs', ['user_id', 'log_timestamp'], {}),
+    ('ix_medications_log_user_timestamp', 'medications_log', ['user_id', 'log_timestamp'], {}),
+    ('ix_insulin_intake_log_user_timestamp', 'insulin_intake_log', ['user_id', 'log_timestamp'], {}),
+    ('ix_biometric_data_user_type_timestamp', 'biometric_data', ['user_id', 'biometric_type_id', 'reading_timestamp'], {}),
+    ('ix_glucose_readings_reading_timestamp_brin', 'glucose_readings', ['reading_timestamp'], {'postgresql_using': 'brin'}),
+    ('ix_biometric_data_reading_timestamp_brin', 'biometric_data', ['reading_timestamp'], {'postgresql_using': 'brin'}),
+    ('ix_ai_insights_user_generated', 'ai_insights', ['user_id', sa.text('generated_timestamp DESC')],
+     {'postgresql_include': ['insight_type_id']}),
+]
+
+# (name, table, columns) of the baseline indexes the new ones replace
+REPLACED_INDEXES = [
+    ('ix_glucose_readings_user_id', 'glucose_readings', ['user_id']),
+    ('ix_glucose_readings_reading_timestamp', 'glucose_readings', ['reading_timestamp']),
+    ('ix_biometric_data_user_id', 'biometric_data', ['user_id']),
+    ('ix_biometric_data_reading_timestamp', 'biometric_data', ['reading_timestamp']),
+    ('ix_food_logs_user_id', 'food_logs', ['user_id']),
+    ('ix_medications_log_user_id', 'medications_log', ['user_id']),
+    ('ix_insulin_intake_log_user_id', 'insulin_intake_log', ['user_id']),
+    ('ix_ai_insights_user_id', 'ai_insights', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in NEW_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **options)
+        for name, table, _ in REPLACED_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table in sorted({table for _, table, _, _ in NEW_INDEXES}):
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _, _ in NEW_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,165 @@
+"""Partition glucose_readings and biometric_data by month
+
+Both tables grow by ~288 rows per user per day. Monthly range partitions
+keep each partition's indexes small, let queries over the usual 7/30/90-day
+windows prune to the months they touch, leave closed months untouched by
+autovacuum once frozen, and let old months be detached instead of deleted
+row by row.
+
+Each table is rebuilt as a partitioned table with the same name:
+
+1. the old table and its constraints/indexes are renamed out of the way
+2. the partitioned table is created with (id, reading_timestamp) as primary
+   key (unique constraints must contain the partition key), a DEFAULT
+   partition and monthly partitions from the oldest row to 3 months ahead
+3. the rows are copied over, then the old table is dropped
+4. the rollup triggers are recreated on the new table; they are added after
+   the copy so the existing rollups aren't counted twice
+
+The copy runs inside the migration's transaction and locks the tables for
+its duration; schedule it in a maintenance window on large databases.
+
+If pg_cron is installed, a nightly job keeps the partitions 3 months ahead;
+otherwise app.services.partitions.run_partition_maintenance does it (it also
+runs at application startup).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 15:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.partitions import PARTITION_FUNCTIONS_DDL, PARTITION_MONTHS_AHEAD, PARTITIONED_TABLES
+from app.models.rollups import BIOMETRIC_ROLLUP_DDL, GLUCOSE_ROLLUP_DDL
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CRON_JOB = 'debie_partition_maintenance'
+
+
+def _columns(table: str, id_column: str, partitioned: bool) -> list:
+    timestamp = sa.Column('reading_timestamp', sa.TIMESTAMP(timezone=True), nullable=False)
+    row_id = sa.Column(id_column, sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False)
+    audit = [
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    ]
+    user = sa.Column('user_id', sa.UUID(), nullable=False)
+    key = sa.PrimaryKeyConstraint(id_column, 'reading_timestamp') if partitioned else sa.PrimaryKeyConstraint(id_column)
+    user_fk = sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE')
+    if table == 'glucose_readings':
+        return [
+            row_id, user, timestamp,
+            sa.Column('glucose_value', sa.DECIMAL(precision=6, scale=2), nullable=False),
+            sa.Column('reading_source', sa.String(length=50), nullable=True),
+            *audit, user_fk, key,
+            sa.UniqueConstraint('user_id', 'reading_timestamp', name='uq_glucose_readings_user_timestamp'),
+        ]
+    return [
+        row_id, user, timestamp,
+        sa.Column('biometric_type_id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column('systolic_bp', sa.DECIMAL(precision=5, scale=2), nullable=True),
+        sa.Column('diastolic_bp', sa.DECIMAL(precision=5, scale=2), nullable=True),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        *audit, user_fk, key,
+        sa.ForeignKeyConstraint(['biometric_type_id'], ['biometric_types.biometric_type_id']),
+    ]
+
+
+# table -> (id column, rollup DDL, constraints and indexes to rename with the old table)
+TABLES = {
+    'glucose_readings': (
+        'glucose_reading_id', GLUCOSE_ROLLUP_DDL,
+        ['glucose_readings_pkey', 'uq_glucose_readings_user_timestamp'],
+        ['ix_glucose_readings_reading_timestamp_brin'],
+    ),
+    'biometric_data': (
+        'biometric_data_id', BIOMETRIC_ROLLUP_DDL,
+        ['biometric_data_pkey'],
+        ['ix_biometric_data_user_type_timestamp', 'ix_biometric_data_reading_timestamp_brin'],
+    ),
+}
+
+
+def _create_indexes(table: str) -> None:
+    op.create_index(f'ix_{table}_reading_timestamp_brin', table, ['reading_timestamp'], postgresql_using='brin')
+    if table == 'biometric_data':
+        op.create_index(
+            'ix_biometric_data_user_type_timestamp', table, ['user_id', 'biometric_type_id', 'reading_timestamp']
+        )
+
+
+def _rebuild(table: str, partitioned: bool) -> None:
+    id_column, rollup_ddl, constraints, indexes = TABLES[table]
+    old = f'{table}_old'
+    op.rename_table(table, old)
+    for constraint in constraints:
+        op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {constraint} TO {constraint}_old')
+    for index in indexes:
+        op.execute(f'ALTER INDEX {index} RENAME TO {index}_old')
+
+    options = {'postgresql_partition_by': 'RANGE (reading_timestamp)'} if partitioned else {}
+    columns = _columns(table, id_column, partitioned)
+    op.create_table(table, *columns, **options)
+    _create_indexes(table)
+    if partitioned:
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        op.execute(
+            f"SELECT create_monthly_partitions('{table}', 'reading_timestamp', "
+            f"coalesce((SELECT min(reading_timestamp) FROM {old}), now()), {PARTITION_MONTHS_AHEAD})"
+        )
+
+    names = ', '.join(column.name for column in columns if isinstance(column, sa.Column))
+    op.execute(f'INSERT INTO {table} ({names}) SELECT {names} FROM {old}')
+    # Drops the old table's rollup triggers with it
+    op.drop_table(old)
+    for ddl in rollup_ddl:
+        op.execute(ddl)
+    op.execute(f'ANALYZE {table}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for ddl in PARTITION_FUNCTIONS_DDL:
+        op.execute(ddl)
+    for table in PARTITIONED_TABLES:
+        _rebuild(table, partitioned=True)
+
+    job = " ".join(
+        f"SELECT create_monthly_partitions('{table}', '{column}', now(), {PARTITION_MONTHS_AHEAD});"
+        for table, column in PARTITIONED_TABLES.items()
+    )
+    op.execute(f"""
+DO $cron$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('{CRON_JOB}', '17 3 * * *', $job${job}$job$);
+    END IF;
+END $cron$;
+""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"""
+DO $cron$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.unschedule(jobid) FROM cron.job WHERE jobname = '{CRON_JOB}';
+    END IF;
+END $cron$;
+""")
+    # Partitions detached by retention (e.g. into an archive schema) are not restored
+    for table in PARTITIONED_TABLES:
+        _rebuild(table, partitioned=False)
+    op.execute('DROP FUNCTION IF EXISTS create_monthly_partitions(text, text, timestamptz, integer)')
+    op.execute('DROP FUNCTION IF EXISTS detach_expired_partitions(text, integer, text)')
@@ -0,0 +1,47 @@
+"""Fitbit sync cursors
+
+Adds fitbit_sync_cursors, the per-user, per-resource position of the
+background Fitbit sync (app.services.fitbit_sync), and seeds the
+biometric_types it writes.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.sync import FITBIT_BIOMETRIC_TYPES
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fitbit_sync_cursors',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('resource', sa.String(length=30), nullable=False),
+    sa.Column('synced_through', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('last_synced_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('retry_after', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'resource')
+    )
+    values = ', '.join(f"('{name}')" for name in FITBIT_BIOMETRIC_TYPES)
+    op.execute(f'INSERT INTO biometric_types (type_name) VALUES {values} ON CONFLICT (type_name) DO NOTHING')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The seeded biometric_types are kept: biometric_data rows may reference them
+    op.drop_table('fitbit_sync_cursors')
@@ -0,0 +1,104 @@
+"""Fitbit intraday days
+
+Adds fitbit_intraday: one row per user, metric and local day holding the
+day's 1-minute heart rate or steps as 1440 packed int16 samples
+(debie_agent/utils/intraday.py). The sync used to write every minute as a
+biometric_data row (~2900 rows per user per day).
+
+Existing minute-level Fitbit 'Heart Rate' and 'Steps' rows are packed into
+days (reckoned in UTC, since their local offset wasn't stored), the step
+total of every day the sync won't revisit is kept as a daily 'Steps' row at
+00:00 UTC in place of the deleted minute rows. The rollup triggers keep the
+biometric rollups in step with the delete.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 17:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Minute-level Fitbit rows, one value per user, metric and UTC minute
+MINUTES_SQL = """
+CREATE TEMPORARY TABLE fitbit_minutes ON COMMIT DROP AS
+SELECT d.user_id,
+       CASE t.type_name WHEN 'Heart Rate' THEN 'heart_rate' ELSE 'steps' END AS metric,
+       (d.reading_timestamp AT TIME ZONE 'UTC')::date AS day,
+       (extract(hour FROM d.reading_timestamp AT TIME ZONE 'UTC') * 60
+        + extract(minute FROM d.reading_timestamp AT TIME ZONE 'UTC'))::int AS minute,
+       least(greatest(round(max(d.value)), 0), 32767)::int AS value
+FROM biometric_data d
+JOIN biometric_types t ON t.biometric_type_id = d.biometric_type_id
+WHERE d.source = 'Fitbit' AND t.type_name IN ('Heart Rate', 'Steps')
+GROUP BY 1, 2, 3, 4
+"""
+
+# Little-endian int16 per minute, 0xffff (-1) where there is no sample
+PACK_SQL = r"""
+INSERT INTO fitbit_intraday (user_id, metric, day, utc_offset_minutes, samples, sample_count)
+SELECT k.user_id, k.metric, k.day, 0,
+       string_agg(
+           CASE WHEN m.value IS NULL THEN '\xffff'::bytea
+                ELSE set_byte(set_byte('\x0000'::bytea, 0, m.value & 255), 1, m.value >> 8)
+           END, ''::bytea ORDER BY g.minute),
+       count(m.value)
+FROM (SELECT DISTINCT user_id, metric, day FROM fitbit_minutes) k
+CROSS JOIN generate_series(0, 1439) AS g(minute)
+LEFT JOIN fitbit_minutes m
+       ON m.user_id = k.user_id AND m.metric = k.metric AND m.day = k.day AND m.minute = g.minute
+GROUP BY k.user_id, k.metric, k.day
+"""
+
+# Days from the steps cursor's date on are refetched (and totalled) by the sync
+DAILY_STEPS_SQL = """
+INSERT INTO biometric_data (user_id, reading_timestamp, biometric_type_id, value, source)
+SELECT m.user_id, m.day::timestamp AT TIME ZONE 'UTC', t.biometric_type_id, sum(m.value), 'Fitbit'
+FROM fitbit_minutes m
+JOIN biometric_types t ON t.type_name = 'Steps'
+LEFT JOIN fitbit_sync_cursors c ON c.user_id = m.user_id AND c.resource = 'steps'
+WHERE m.metric = 'steps'
+  AND (c.synced_through IS NULL OR m.day < (c.synced_through AT TIME ZONE 'UTC')::date)
+GROUP BY m.user_id, m.day, t.biometric_type_id
+"""
+
+DELETE_MINUTES_SQL = """
+DELETE FROM biometric_data d
+USING biometric_types t
+WHERE t.biometric_type_id = d.biometric_type_id
+  AND d.source = 'Fitbit' AND t.type_name IN ('Heart Rate', 'Steps')
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fitbit_intraday',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('metric', sa.String(length=20), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('utc_offset_minutes', sa.SmallInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('samples', sa.LargeBinary(), nullable=False),
+    sa.Column('sample_count', sa.SmallInteger(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'metric', 'day')
+    )
+    op.execute(MINUTES_SQL)
+    op.execute(PACK_SQL)
+    op.execute(DELETE_MINUTES_SQL)
+    op.execute(DAILY_STEPS_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The minute rows aren't restored: the packed days are dropped with the table
+    op.drop_table('fitbit_intraday')
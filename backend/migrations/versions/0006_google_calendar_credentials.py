@@ -0,0 +1,43 @@
+"""Google Calendar credentials
+
+Adds google_calendar_credentials, the per-user Google OAuth grant the
+calendar tools read into memory (debie_agent.utils.calendar_auth) instead
+of a token.json file in the working directory.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('google_calendar_credentials',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('refresh_token', sa.Text(), nullable=False),
+    sa.Column('access_token', sa.Text(), nullable=True),
+    sa.Column('token_expiry', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('scopes', sa.Text(), nullable=True),
+    sa.Column('last_refreshed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('google_calendar_credentials')
@@ -0,0 +1,68 @@
+"""Calendar events
+
+Adds calendar_events, the local copy of each user's Google Calendar the
+agent reads its calendar context from, and calendar_sync_cursors, the
+nextSyncToken the incremental sync (debie_agent.utils.calendar_sync)
+continues from.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('calendar_sync_cursors',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('calendar_id', sa.String(length=255), nullable=False),
+    sa.Column('sync_token', sa.Text(), nullable=True),
+    sa.Column('last_synced_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'calendar_id')
+    )
+    op.create_table('calendar_events',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('calendar_id', sa.String(length=255), nullable=False),
+    sa.Column('event_id', sa.String(length=1024), nullable=False),
+    sa.Column('recurring_event_id', sa.String(length=1024), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=20), nullable=False),
+    sa.Column('all_day', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('starts_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('ends_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('event_updated_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('event', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'calendar_id', 'event_id')
+    )
+    op.create_index('ix_calendar_events_user_starts_at', 'calendar_events', ['user_id', 'calendar_id', 'starts_at'], unique=False)
+    op.create_index('ix_calendar_events_user_category', 'calendar_events', ['user_id', 'category', 'starts_at'], unique=False)
+    op.create_index('ix_calendar_events_user_recurring_event', 'calendar_events', ['user_id', 'calendar_id', 'recurring_event_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_calendar_events_user_recurring_event', table_name='calendar_events')
+    op.drop_index('ix_calendar_events_user_category', table_name='calendar_events')
+    op.drop_index('ix_calendar_events_user_starts_at', table_name='calendar_events')
+    op.drop_table('calendar_events')
+    op.drop_table('calendar_sync_cursors')